@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gói benchmarks đo hiệu năng cho Hệ thống Quản lý Hóa đơn.
+
+Gói này chứa:
+- datagen: Sinh dữ liệu tổng hợp có tính lặp lại (cùng seed, cùng dữ liệu)
+- suite: Đo thời gian các thao tác của manager và báo cáo thống kê
+
+Cách dùng (từ thư mục gốc của repository):
+    python -m benchmarks run --scale 10k --output bench.json
+    python -m benchmarks compare old.json new.json
+"""
+
+import os
+import sys
+
+# Thêm src vào path để import các module của ứng dụng
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Điểm vào dòng lệnh cho gói benchmarks.
+
+    python -m benchmarks run --scale 100k --repeat 3 --output bench.json
+    python -m benchmarks run --lines 50000 --lines-per-invoice 8 --only "statistics.*"
+    python -m benchmarks compare bench_old.json bench_new.json --threshold 0.15
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from .datagen import DatasetSpec, SCALES
+from .suite import run_benchmarks, compare_results
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    if args.lines:
+        spec = DatasetSpec.for_lines(args.lines, args.lines_per_invoice, args.seed)
+    else:
+        spec = DatasetSpec.for_scale(args.scale, args.lines_per_invoice, args.seed)
+
+    results = run_benchmarks(spec, repeat=args.repeat, db_path=args.db, only=args.only, skip=args.skip)
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        for name, result in results["results"].items():
+            print(f"{name:<45} {result['best'] * 1000:>12.3f} ms  ({result['best_per_op'] * 1e6:,.1f} µs/op)")
+    else:
+        print(text)
+    return 0
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.threshold)
+    for row in rows:
+        flag = "  HỒI QUY" if row["regression"] else ""
+        print(f"{row['name']:<45} {row['ratio']:>8.3f}x{flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Điểm vào của gói benchmarks."""
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Benchmark Hệ thống Quản lý Hóa đơn")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("run", help="Sinh dữ liệu và chạy benchmark")
+    p.add_argument("--scale", default="10k", choices=list(SCALES), help="Quy mô theo số dòng mục hóa đơn")
+    p.add_argument("--lines", type=int, help="Số dòng mục hóa đơn (thay cho --scale)")
+    p.add_argument("--lines-per-invoice", type=int, default=5)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--db", help="Giữ database sinh ra tại đường dẫn này (phải là file mới)")
+    p.add_argument("--only", action="append", default=[], help="Chỉ chạy phép đo khớp mẫu")
+    p.add_argument("--skip", action="append", default=[], help="Bỏ qua phép đo khớp mẫu")
+    p.add_argument("--output", help="Ghi kết quả JSON ra file")
+    p.set_defaults(func=_cmd_run)
+
+    p = subparsers.add_parser("compare", help="So sánh hai file kết quả JSON")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.10)
+    p.set_defaults(func=_cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sinh dữ liệu tổng hợp cho benchmark.
+
+Dữ liệu được sinh từ random.Random(seed) nên cùng một DatasetSpec luôn
+cho cùng một database. Phân bố được làm lệch cho gần với thực tế:
+- Mức độ phổ biến của sản phẩm và khách hàng theo phân bố Zipf
+- Số mặt hàng mỗi hóa đơn dao động quanh giá trị trung bình
+- Số lượng mỗi mặt hàng chủ yếu là 1-2
+- Giá sản phẩm theo phân bố log-normal, làm tròn tới 1.000 đồng
+- Ngày hóa đơn tăng dần theo ID, trải đều trên khoảng ngày cho trước
+
+Các dòng được ghi bằng executemany theo từng lô, không giữ toàn bộ
+dữ liệu trong bộ nhớ, nên có thể sinh tới hàng chục triệu dòng.
+"""
+
+import random
+import sqlite3
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Tuple
+
+from database.database import initialize_database
+
+# Quy mô theo tổng số dòng invoice_items
+SCALES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+_CATEGORIES = ["Electronics", "Office", "Food", "Home", "Fashion", "Toys", "Sports", "Books"]
+_UNITS = ["cái", "chiếc", "hộp", "kg", "bộ"]
+_QUANTITIES = [1, 2, 3, 5, 10]
+_QUANTITY_WEIGHTS = [55, 22, 11, 8, 4]
+_WRITE_BATCH = 50_000
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Mô tả bộ dữ liệu tổng hợp.
+
+    Thuộc tính:
+        products (int): Số sản phẩm
+        invoices (int): Số hóa đơn
+        lines_per_invoice (int): Số mặt hàng trung bình mỗi hóa đơn
+        customers (int): Số khách hàng
+        days (int): Số ngày trải dữ liệu
+        start_date (str): Ngày đầu tiên (YYYY-MM-DD)
+        zipf_s (float): Độ lệch phân bố Zipf
+        seed (int): Seed cho bộ sinh số ngẫu nhiên
+    """
+    products: int
+    invoices: int
+    lines_per_invoice: int = 5
+    customers: int = 1000
+    days: int = 730
+    start_date: str = "2023-01-01"
+    zipf_s: float = 1.1
+    seed: int = 42
+
+    @classmethod
+    def for_lines(cls, lines: int, lines_per_invoice: int = 5, seed: int = 42) -> 'DatasetSpec':
+        """Tạo spec với tổng số dòng mục hóa đơn xấp xỉ `lines`."""
+        invoices = max(1, lines // lines_per_invoice)
+        return cls(
+            products=max(50, lines // 200),
+            invoices=invoices,
+            lines_per_invoice=lines_per_invoice,
+            customers=max(20, invoices // 10),
+            seed=seed
+        )
+
+    @classmethod
+    def for_scale(cls, scale: str, lines_per_invoice: int = 5, seed: int = 42) -> 'DatasetSpec':
+        """Tạo spec theo tên quy mô trong SCALES (ví dụ "10k")."""
+        try:
+            lines = SCALES[scale.lower()]
+        except KeyError:
+            raise ValueError(f"Quy mô '{scale}' không hợp lệ. Các quy mô: {', '.join(SCALES)}")
+        return cls.for_lines(lines, lines_per_invoice, seed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển spec sang dict (dùng cho JSON)."""
+        return asdict(self)
+
+
+def _zipf_cum_weights(n: int, s: float) -> List[float]:
+    """Trọng số tích lũy Zipf cho n phần tử (phần tử đầu phổ biến nhất)."""
+    return list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+def product_id(index: int) -> str:
+    """Mã sản phẩm tổng hợp thứ `index` (hợp lệ theo validate_product_id)."""
+    return f"SP{index:07d}"
+
+def customer_name(index: int) -> str:
+    """Tên khách hàng tổng hợp thứ `index`."""
+    return f"Khách Hàng {index:07d}"
+
+def _iter_products(spec: DatasetSpec, rng: random.Random) -> Iterator[Tuple]:
+    for index in range(1, spec.products + 1):
+        price = max(1000, round(rng.lognormvariate(11.5, 1.2), -3))
+        yield (
+            product_id(index),
+            f"Sản phẩm {index}",
+            int(price) * 100,
+            rng.choice(_UNITS),
+            rng.choice(_CATEGORIES),
+        )
+
+def _iter_invoices(spec: DatasetSpec, rng: random.Random, prices: List[int]
+                   ) -> Iterator[Tuple[Tuple, List[Tuple]]]:
+    product_weights = _zipf_cum_weights(spec.products, spec.zipf_s)
+    customer_weights = _zipf_cum_weights(spec.customers, spec.zipf_s)
+    product_indexes = range(spec.products)
+    customer_indexes = range(1, spec.customers + 1)
+    start = date.fromisoformat(spec.start_date)
+    max_lines = max(1, 2 * spec.lines_per_invoice - 1)
+
+    for invoice_id in range(1, spec.invoices + 1):
+        customer = rng.choices(customer_indexes, cum_weights=customer_weights)[0]
+        day = start + timedelta(days=(invoice_id - 1) * spec.days // spec.invoices)
+        header = (invoice_id, customer_name(customer), day.isoformat(), customer)
+
+        line_count = rng.randint(1, max_lines)
+        picks = rng.choices(product_indexes, cum_weights=product_weights, k=line_count)
+        quantities = rng.choices(_QUANTITIES, weights=_QUANTITY_WEIGHTS, k=line_count)
+        items = [(invoice_id, product_id(index + 1), quantity, prices[index])
+                 for index, quantity in zip(picks, quantities)]
+        yield header, items
+
+def generate_database(path: str, spec: DatasetSpec) -> Dict[str, int]:
+    """
+    Tạo database mới tại `path` và điền dữ liệu theo spec.
+
+    Database mặc định của tiến trình không bị thay đổi; để các manager
+    dùng database này, truyền DatabaseContext(path) cho chúng hoặc đặt
+    qua set_default_database (xem run_benchmarks).
+
+    Tham số:
+        path: Đường dẫn file database (nên là file mới/rỗng)
+        spec: Mô tả bộ dữ liệu
+
+    Trả về:
+        Dict[str, int]: Số dòng đã ghi vào mỗi bảng
+    """
+    success, message = initialize_database(path)
+    if not success:
+        raise RuntimeError(message)
+
+    rng = random.Random(spec.seed)
+    conn = sqlite3.connect(path)
+    # Chỉ dùng khi sinh dữ liệu: ưu tiên tốc độ ghi hơn độ bền
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    counts = {"products": 0, "customers": 0, "invoices": 0, "invoice_items": 0}
+    try:
+        with conn:
+            products = list(_iter_products(spec, rng))
+            conn.executemany(
+                "INSERT INTO products (product_id, name, unit_price, calculation_unit, category) "
+                "VALUES (?, ?, ?, ?, ?)",
+                products
+            )
+            counts["products"] = len(products)
+            prices = [row[2] for row in products]
+            conn.executemany(
+                "INSERT INTO product_prices (product_id, unit_price, effective_from) VALUES (?, ?, ?)",
+                ((row[0], row[2], spec.start_date) for row in products)
+            )
+            del products
+
+            conn.executemany(
+                "INSERT INTO customers (id, name, normalized_name) VALUES (?, ?, ?)",
+                ((index, customer_name(index), customer_name(index).casefold())
+                 for index in range(1, spec.customers + 1))
+            )
+            counts["customers"] = spec.customers
+
+        headers: List[Tuple] = []
+        items: List[Tuple] = []
+        for header, invoice_items in _iter_invoices(spec, rng, prices):
+            headers.append(header)
+            items.extend(invoice_items)
+            if len(items) >= _WRITE_BATCH:
+                _write_invoices(conn, headers, items, counts)
+                headers, items = [], []
+        _write_invoices(conn, headers, items, counts)
+    finally:
+        conn.close()
+    return counts
+
+def _write_invoices(conn: sqlite3.Connection, headers: List[Tuple], items: List[Tuple],
+                    counts: Dict[str, int]) -> None:
+    if not headers:
+        return
+    with conn:
+        conn.executemany(
+            "INSERT INTO invoices (id, customer_name, date, customer_id) VALUES (?, ?, ?, ?)",
+            headers
+        )
+        conn.executemany(
+            "INSERT INTO invoice_items (invoice_id, product_id, quantity, unit_price) VALUES (?, ?, ?, ?)",
+            items
+        )
+    counts["invoices"] += len(headers)
+    counts["invoice_items"] += len(items)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bộ benchmark cho các manager và báo cáo thống kê.
+
+Module này đo thời gian:
+- Khởi động: tạo manager (tải ngay hoặc trì hoãn) và mở cửa sổ GUI (khi có
+  màn hình; mục tiêu dưới 300 ms với database 1 triệu dòng)
+- Tải dữ liệu của ProductManager/InvoiceManager
+- create_invoice (trực tiếp và qua InvoiceWriteQueue), find_product, find_invoice, find_invoices_by_customer
+- Từng báo cáo của StatisticsManager (kể cả khi xem lại qua ReportCache)
+- Kiểm tra dữ liệu nhập: từng giá trị (validate_*) so với theo cột (validate_rows)
+- Hiển thị danh sách sản phẩm/hóa đơn dạng bảng (list_products, list_invoices)
+
+Kết quả là một dict có thể ghi ra JSON, kèm commit git hiện tại, để
+so sánh giữa các commit bằng compare_results.
+"""
+
+import contextlib
+import fnmatch
+import io
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core import ProductManager, InvoiceManager, StatisticsManager, InvoiceWriteQueue, ReportCache
+from database.context import DatabaseContext
+from utils.db_utils import set_default_database
+from utils.validation import (
+    check_date, check_product_id, check_quantity, validate_date_format, validate_product_id,
+    validate_quantity, validate_rows
+)
+from .datagen import DatasetSpec, generate_database, product_id, customer_name
+
+# Số lần gọi cho các thao tác tra cứu/ghi được đo theo thời gian mỗi lần gọi
+LOOKUP_OPS = 1000
+CREATE_OPS = 20
+QUEUE_OPS = 500
+VALIDATION_ROWS = 10000
+
+
+def _git_commit() -> Optional[str]:
+    """Commit git hiện tại, hoặc None nếu không lấy được."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+def _measure(func: Callable[[], Any], repeat: int, ops: int = 1) -> Dict[str, Any]:
+    """Chạy func `repeat` lần (ẩn stdout) và trả về thống kê thời gian."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        runs.append(time.perf_counter() - start)
+    return {
+        "ops": ops,
+        "runs": [round(value, 6) for value in runs],
+        "best": round(min(runs), 6),
+        "mean": round(sum(runs) / len(runs), 6),
+        "best_per_op": round(min(runs) / ops, 9),
+    }
+
+def _measure_window_startup(repeat: int) -> Optional[Dict[str, Any]]:
+    """
+    Đo thời gian từ lúc tạo cửa sổ tới khi GUI vẽ xong lần đầu.
+
+    Trả về:
+        Optional[Dict[str, Any]]: Thống kê thời gian, hoặc None nếu không
+        có tkinter hoặc màn hình
+    """
+    try:
+        import tkinter as tk
+        from ui.gui import InvoiceAppGUI
+    except ImportError:
+        return None
+
+    def open_window() -> None:
+        root = tk.Tk()
+        try:
+            InvoiceAppGUI(root)
+            root.update()
+        finally:
+            root.destroy()
+
+    try:
+        return _measure(open_window, repeat)
+    except tk.TclError:
+        return None
+
+def _selected(name: str, only: Sequence[str], skip: Sequence[str]) -> bool:
+    if only and not any(fnmatch.fnmatch(name, pattern) for pattern in only):
+        return False
+    return not any(fnmatch.fnmatch(name, pattern) for pattern in skip)
+
+def run_benchmarks(spec: DatasetSpec, repeat: int = 3, db_path: Optional[str] = None,
+                   only: Sequence[str] = (), skip: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Sinh dữ liệu theo spec và đo các thao tác.
+
+    Tham số:
+        spec: Mô tả bộ dữ liệu
+        repeat: Số lần lặp mỗi phép đo (lấy best và mean)
+        db_path: File database (mặc định: file tạm, xóa sau khi chạy)
+        only: Chỉ chạy các phép đo khớp mẫu (fnmatch), ví dụ "statistics.*"
+        skip: Bỏ qua các phép đo khớp mẫu
+
+    Trả về:
+        Dict[str, Any]: Kết quả gồm meta, dataset và results
+    """
+    temp_dir = None
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix="invoicebench-")
+        db_path = os.path.join(temp_dir.name, "bench.db")
+
+    # Database sinh ra là database mặc định trong lúc đo (kể cả luồng ghi
+    # của InvoiceWriteQueue và cửa sổ GUI), rồi trả lại database mặc định cũ
+    database = DatabaseContext(db_path)
+    previous_database = set_default_database(database)
+    try:
+        start = time.perf_counter()
+        counts = generate_database(db_path, spec)
+        generate_seconds = time.perf_counter() - start
+
+        rng = random.Random(spec.seed + 1)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def bench(name: str, func: Callable[[], Any], ops: int = 1, times: int = repeat) -> None:
+            if _selected(name, only, skip):
+                results[name] = _measure(func, times, ops)
+
+        bench("startup.managers", lambda: InvoiceManager(ProductManager()))
+        bench("startup.managers_deferred", lambda: InvoiceManager(ProductManager(load=False), load=False))
+        if _selected("startup.window", only, skip):
+            window = _measure_window_startup(repeat)
+            if window is not None:
+                results["startup.window"] = window
+
+        product_manager = ProductManager()
+        bench("product_manager.load", product_manager.load_products)
+        invoice_manager = InvoiceManager(product_manager)
+        bench("invoice_manager.load", invoice_manager.load_invoices)
+        statistics_manager = StatisticsManager(invoice_manager, product_manager)
+
+        product_ids = [product_id(rng.randint(1, spec.products)) for _ in range(LOOKUP_OPS)]
+        invoice_ids = [str(rng.randint(1, spec.invoices)) for _ in range(LOOKUP_OPS)]
+        customers = [customer_name(rng.randint(1, spec.customers)) for _ in range(LOOKUP_OPS // 10)]
+
+        bench("product_manager.find_product",
+              lambda: [product_manager.find_product(pid) for pid in product_ids], ops=len(product_ids))
+        bench("invoice_manager.find_invoice",
+              lambda: [invoice_manager.find_invoice(iid) for iid in invoice_ids], ops=len(invoice_ids))
+        bench("invoice_manager.find_invoices_by_customer",
+              lambda: [invoice_manager.find_invoices_by_customer(name) for name in customers],
+              ops=len(customers))
+
+        rows = [{"product_id": product_id(rng.randint(1, spec.products)),
+                 "quantity": str(rng.randint(1, 20)),
+                 "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}
+                for _ in range(VALIDATION_ROWS)]
+        bench("validation.scalar",
+              lambda: [(validate_product_id(row["product_id"]), validate_quantity(row["quantity"]),
+                        validate_date_format(row["date"], "Ngày")) for row in rows],
+              ops=len(rows))
+        bench("validation.rows",
+              lambda: validate_rows(rows, [("product_id", check_product_id), ("quantity", check_quantity),
+                                           ("date", lambda values: check_date(values, "Ngày"))]),
+              ops=len(rows))
+
+        bench("rendering.list_products", product_manager.list_products)
+        bench("rendering.list_invoices", invoice_manager.list_invoices)
+
+        bench("statistics.revenue_by_date", statistics_manager.revenue_by_date)
+        bench("statistics.revenue_by_product", statistics_manager.revenue_by_product)
+        bench("statistics.top_customers", statistics_manager.top_customers)
+        bench("statistics.basket_analysis", statistics_manager.get_basket_analysis)
+
+        # Tính trực tiếp từ database trên nhiều tiến trình (mỗi lõi CPU một tiến trình)
+        bench("statistics_parallel.revenue_by_product",
+              lambda: statistics_manager.get_report_parallel("revenue_by_product"))
+        bench("statistics_parallel.top_customers",
+              lambda: statistics_manager.get_report_parallel("top_customers"))
+
+        # Xem lại báo cáo khi dữ liệu chưa đổi (lần đầu tính, các lần sau lấy từ bộ nhớ đệm)
+        cached_statistics = StatisticsManager(invoice_manager, product_manager, cache=ReportCache())
+        bench("statistics_cached.revenue_by_product",
+              lambda: [cached_statistics.revenue_by_product() for _ in range(10)], ops=10)
+
+        # Ghi sau cùng để các phép đo đọc không bị ảnh hưởng bởi dữ liệu mới
+        def create_invoices() -> None:
+            for index in range(CREATE_OPS):
+                invoice_manager.create_invoice(
+                    customer_name(rng.randint(1, spec.customers)),
+                    [{"product_id": product_id(rng.randint(1, spec.products)), "quantity": 1}
+                     for _ in range(spec.lines_per_invoice)],
+                    date=spec.start_date
+                )
+        bench("invoice_manager.create_invoice", create_invoices, ops=CREATE_OPS, times=1)
+
+        # Cùng tải ghi nhưng gửi đồng thời qua hàng đợi group commit
+        def queue_invoices() -> None:
+            with InvoiceWriteQueue(invoice_manager) as writer:
+                futures = [
+                    writer.submit(
+                        customer_name(rng.randint(1, spec.customers)),
+                        [{"product_id": product_id(rng.randint(1, spec.products)), "quantity": 1}
+                         for _ in range(spec.lines_per_invoice)],
+                        date=spec.start_date
+                    )
+                    for _ in range(QUEUE_OPS)
+                ]
+                for future in futures:
+                    future.result()
+        bench("invoice_write_queue.create_invoice", queue_invoices, ops=QUEUE_OPS, times=1)
+
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": repeat,
+            },
+            "dataset": {**spec.to_dict(), "rows": counts, "generate_seconds": round(generate_seconds, 3)},
+            "results": results,
+        }
+    finally:
+        set_default_database(previous_database)
+        database.close()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    So sánh hai kết quả benchmark theo thời gian best mỗi thao tác.
+
+    Tham số:
+        baseline: Kết quả cũ
+        current: Kết quả mới
+        threshold: Tỉ lệ chậm đi tối thiểu để coi là hồi quy (0.10 = 10%)
+
+    Trả về:
+        List[Dict]: Mỗi phép đo chung gồm name, baseline, current, ratio, regression
+    """
+    rows = []
+    for name, result in current.get("results", {}).items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        ratio = result["best_per_op"] / old["best_per_op"] if old["best_per_op"] > 0 else float("inf")
+        rows.append({
+            "name": name,
+            "baseline": old["best_per_op"],
+            "current": result["best_per_op"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
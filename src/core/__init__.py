@@ -7,14 +7,62 @@ Gói này chứa các manager classes:
 - ProductManager: Quản lý sản phẩm
 - InvoiceManager: Quản lý hóa đơn
 - StatisticsManager: Quản lý thống kê và báo cáo
+- ImportManager: Nhập dữ liệu hàng loạt từ CSV/JSONL
+- ExportManager: Xuất dữ liệu và báo cáo ra CSV/JSONL dạng luồng
+- ReportCache: Bộ nhớ đệm LRU có phiên bản cho các báo cáo thống kê
+- InvoiceWriteQueue: Hàng đợi ghi hóa đơn theo lô (group commit)
+- ArchiveManager: Lưu trữ hóa đơn các năm đã đóng sổ ra file riêng theo năm
+- BackupManager: Sao lưu trực tuyến theo từng bước và khôi phục từ snapshot
+- MaintenanceManager: ANALYZE/optimize, incremental_vacuum, quick_check
+- Async*Manager, DatabaseExecutor: Lớp vỏ asyncio cho các manager
 """
 
-from .product_manager import ProductManager
-from .invoice_manager import InvoiceManager
-from .statistics_manager import StatisticsManager
+import importlib
+
+# Các lớp được import khi dùng tới lần đầu (PEP 562): GUI/CLI chỉ cần vài
+# manager không phải trả thời gian import asyncio, concurrent.futures,
+# urllib... của các module còn lại lúc khởi động
+_EXPORTS = {
+    'ProductManager': '.product_manager',
+    'InvoiceManager': '.invoice_manager',
+    'StatisticsManager': '.statistics_manager',
+    'ImportManager': '.import_manager',
+    'ExportManager': '.export_manager',
+    'ReportCache': '.report_cache',
+    'InvoiceWriteQueue': '.invoice_writer',
+    'ArchiveManager': '.archive_manager',
+    'BackupManager': '.backup_manager',
+    'MaintenanceManager': '.maintenance_manager',
+    'DatabaseExecutor': '.async_managers',
+    'AsyncProductManager': '.async_managers',
+    'AsyncInvoiceManager': '.async_managers',
+    'AsyncStatisticsManager': '.async_managers',
+}
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
 
 __all__ = [
     'ProductManager',
     'InvoiceManager',
-    'StatisticsManager'
+    'StatisticsManager',
+    'ImportManager',
+    'ExportManager',
+    'ReportCache',
+    'InvoiceWriteQueue',
+    'ArchiveManager',
+    'BackupManager',
+    'MaintenanceManager',
+    'DatabaseExecutor',
+    'AsyncProductManager',
+    'AsyncInvoiceManager',
+    'AsyncStatisticsManager'
 ] 
\ No newline at end of file
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lưu trữ hóa đơn theo năm cho Hệ thống Quản lý Hóa đơn.
+
+Hóa đơn và mục hóa đơn của các năm đã đóng sổ được chuyển khỏi database
+chính sang các file lưu trữ riêng cho từng năm, đặt cạnh database chính:
+
+    invoicemanager.db                 (dữ liệu đang hoạt động)
+    invoicemanager_archive_2022.db    (hóa đơn năm 2022)
+    invoicemanager_archive_2023.db    (hóa đơn năm 2023)
+
+File lưu trữ có cùng bảng invoices/invoice_items (giữ nguyên ID); khách
+hàng và sản phẩm vẫn nằm ở database chính. Nhờ vậy database chính luôn
+nhỏ: InvoiceManager chỉ nạp hóa đơn đang hoạt động, còn các truy vấn
+theo khoảng ngày (xuất dữ liệu, báo cáo song song) gắn (ATTACH) thêm
+đúng những năm lưu trữ nằm trong khoảng ngày được yêu cầu.
+
+Ví dụ:
+    manager = ArchiveManager(invoice_manager)
+    manager.archive_year(2022)      # chuyển hóa đơn năm 2022 ra file riêng
+    with partition_sources("2022-06-01", "2024-01-31") as tables:
+        stream_query(f"SELECT ... FROM {tables['invoices']} i ...")
+"""
+
+import contextlib
+import glob
+import os
+import re
+import sqlite3
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils import db_utils
+from utils.db_utils import bind_connection, bind_database_methods, open_connection, query_operation
+
+# Các cột của hai bảng được chuyển sang file lưu trữ
+_INVOICE_COLUMNS = "id, customer_name, date, customer_id"
+_ITEM_COLUMNS = "id, invoice_id, product_id, quantity, unit_price"
+
+_ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.invoices (
+        id INTEGER PRIMARY KEY,
+        customer_name TEXT NOT NULL,
+        date TEXT NOT NULL,
+        customer_id INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.invoice_items (
+        id INTEGER PRIMARY KEY,
+        invoice_id INTEGER NOT NULL,
+        product_id TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_invoices_date ON invoices(date)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_invoices_customer_id ON invoices(customer_id)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_invoice_items_invoice_id ON invoice_items(invoice_id)",
+)
+
+
+def archive_path(year: int, db_path: Optional[str] = None) -> str:
+    """
+    Đường dẫn file lưu trữ của một năm.
+
+    Tham số:
+        year: Năm lưu trữ
+        db_path: Database chính (mặc định: database hiện hành)
+
+    Trả về:
+        str: <tên database>_archive_<năm>.db, cùng thư mục với database chính
+    """
+    stem, _ = os.path.splitext(db_path or db_utils.current_database_path())
+    return f"{stem}_archive_{int(year)}.db"
+
+def archived_years(db_path: Optional[str] = None) -> List[int]:
+    """
+    Các năm đã có file lưu trữ, sắp xếp tăng dần.
+
+    Tham số:
+        db_path: Database chính (mặc định: database hiện hành)
+    """
+    stem, _ = os.path.splitext(db_path or db_utils.current_database_path())
+    pattern = re.compile(re.escape(stem) + r"_archive_(\d{4})\.db$")
+    years = []
+    for path in glob.glob(glob.escape(stem) + "_archive_*.db"):
+        match = pattern.match(path)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+def archives_for_range(date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       db_path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Chọn các file lưu trữ giao với khoảng ngày.
+
+    Tham số:
+        date_from, date_to: Khoảng ngày YYYY-MM-DD (None: không giới hạn)
+        db_path: Database chính (mặc định: database hiện hành)
+
+    Trả về:
+        Dict[str, str]: Tên schema dùng khi ATTACH (archive_<năm>) -> đường dẫn file
+    """
+    selected = {}
+    for year in archived_years(db_path):
+        if date_from is not None and f"{year}-12-31" < date_from:
+            continue
+        if date_to is not None and f"{year}-01-01" > date_to:
+            continue
+        selected[f"archive_{year}"] = archive_path(year, db_path)
+    return selected
+
+def union_tables(schemas: List[str]) -> Dict[str, str]:
+    """
+    Nguồn dữ liệu cho invoices/invoice_items gộp qua nhiều schema.
+
+    Tham số:
+        schemas: Các schema (ví dụ ["main", "archive_2022"])
+
+    Trả về:
+        Dict[str, str]: "invoices"/"invoice_items" -> tên bảng (một schema)
+            hoặc truy vấn con UNION ALL (nhiều schema), dùng được sau FROM/JOIN
+    """
+    if schemas == ["main"]:
+        return {"invoices": "invoices", "invoice_items": "invoice_items"}
+    tables = {}
+    for table, columns in (("invoices", _INVOICE_COLUMNS), ("invoice_items", _ITEM_COLUMNS)):
+        parts = " UNION ALL ".join(f"SELECT {columns} FROM {schema}.{table}" for schema in schemas)
+        tables[table] = f"({parts})"
+    return tables
+
+@contextlib.contextmanager
+def partition_sources(date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    Chuẩn bị nguồn dữ liệu hóa đơn cho một truy vấn theo khoảng ngày.
+
+    Nếu khoảng ngày không chạm tới năm nào đã lưu trữ, truy vấn chạy
+    nguyên trên database chính. Ngược lại, một kết nối riêng được mở,
+    gắn các file lưu trữ cần thiết và được dùng cho các hàm tiện ích
+    trong khối with (bind_connection); kết nối được đóng khi ra khỏi khối.
+
+    Tham số:
+        date_from, date_to: Khoảng ngày YYYY-MM-DD (None: không giới hạn)
+
+    Trả về:
+        Iterator[Dict[str, str]]: Kết quả của union_tables
+    """
+    archives = archives_for_range(date_from, date_to)
+    if not archives:
+        yield union_tables(["main"])
+        return
+
+    conn = open_connection()
+    try:
+        for schema, path in archives.items():
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        with bind_connection(conn):
+            yield union_tables(["main"] + list(archives))
+    finally:
+        conn.close()
+
+
+@bind_database_methods
+class ArchiveManager:
+    """
+    Quản lý việc chuyển hóa đơn của các năm đã đóng sổ sang file lưu trữ.
+
+    Thuộc tính:
+        invoice_manager (Optional[InvoiceManager]): Được nạp lại sau khi
+            chuyển dữ liệu, để danh sách trong bộ nhớ khớp database chính
+        database (Optional[DatabaseContext]): Database chính (mặc định là
+            database của invoice_manager, hoặc database hiện hành)
+    """
+
+    def __init__(self, invoice_manager=None, database=None):
+        """Khởi tạo trình quản lý lưu trữ."""
+        self.invoice_manager = invoice_manager
+        self.database = database if database is not None else getattr(invoice_manager, "database", None)
+
+    @query_operation("archive.archive_year")
+    def archive_year(self, year: int) -> Tuple[bool, str]:
+        """
+        Chuyển hóa đơn và mục hóa đơn của một năm sang file lưu trữ.
+
+        Dữ liệu được chép sang file lưu trữ rồi mới xóa khỏi database
+        chính, trong cùng một transaction. Chạy lại cho cùng năm là an
+        toàn: hóa đơn đã có trong file lưu trữ được bỏ qua.
+
+        Tham số:
+            year: Năm cần lưu trữ (phải nhỏ hơn năm hiện tại)
+
+        Trả về:
+            Tuple[bool, str]: (True/False, thông báo)
+        """
+        valid, error = self._validate_year(year)
+        if not valid:
+            return False, error
+        year = int(year)
+        bounds = (f"{year}-01-01", f"{year}-12-31")
+        path = archive_path(year)
+
+        conn = open_connection()
+        try:
+            conn.execute("ATTACH DATABASE ? AS archive", (path,))
+            for statement in _ARCHIVE_SCHEMA:
+                conn.execute(statement.format(schema="archive"))
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = self._move(conn, "main", "archive", bounds)
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            return False, f"Lỗi khi lưu trữ năm {year}: {e}"
+        finally:
+            conn.close()
+
+        if moved and self.invoice_manager is not None:
+            self.invoice_manager.load_invoices()
+        return True, f"Đã chuyển {moved} hóa đơn năm {year} sang '{path}'."
+
+    @query_operation("archive.restore_year")
+    def restore_year(self, year: int) -> Tuple[bool, str]:
+        """
+        Đưa hóa đơn của một năm từ file lưu trữ trở lại database chính.
+
+        File lưu trữ bị xóa sau khi chuyển xong.
+
+        Tham số:
+            year: Năm cần khôi phục
+
+        Trả về:
+            Tuple[bool, str]: (True/False, thông báo)
+        """
+        valid, error = self._validate_year(year, closed_only=False)
+        if not valid:
+            return False, error
+        year = int(year)
+        path = archive_path(year)
+        if not os.path.exists(path):
+            return False, f"Không có dữ liệu lưu trữ cho năm {year}."
+
+        conn = open_connection()
+        try:
+            conn.execute("ATTACH DATABASE ? AS archive", (path,))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = self._move(conn, "archive", "main", (f"{year}-01-01", f"{year}-12-31"))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("DETACH DATABASE archive")
+        except sqlite3.Error as e:
+            conn.close()
+            return False, f"Lỗi khi khôi phục năm {year}: {e}"
+        conn.close()
+        os.remove(path)
+
+        # Nạp lại cả khi không có hóa đơn nào: danh sách năm lưu trữ đã đổi
+        # (StatisticsManager lưu đệm danh sách này theo data_version)
+        if self.invoice_manager is not None:
+            self.invoice_manager.load_invoices()
+        return True, f"Đã đưa {moved} hóa đơn năm {year} trở lại database chính."
+
+    def list_archives(self) -> List[Dict[str, Any]]:
+        """
+        Liệt kê các file lưu trữ.
+
+        Trả về:
+            List[Dict[str, Any]]: Mỗi năm một dict gồm year, path, invoices, size_bytes
+        """
+        archives = []
+        for year in archived_years():
+            path = archive_path(year)
+            conn = sqlite3.connect(path)
+            try:
+                count = conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+            except sqlite3.Error:
+                count = 0
+            finally:
+                conn.close()
+            archives.append({"year": year, "path": path, "invoices": count,
+                             "size_bytes": os.path.getsize(path)})
+        return archives
+
+    @staticmethod
+    def _validate_year(year: Any, closed_only: bool = True) -> Tuple[bool, str]:
+        """Kiểm tra năm lưu trữ: số nguyên 4 chữ số và (nếu closed_only) đã đóng sổ."""
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            return False, "Năm lưu trữ phải là số nguyên."
+        if year < 1000 or year > 9999:
+            return False, "Năm lưu trữ phải có 4 chữ số."
+        if closed_only and year >= date.today().year:
+            return False, f"Chỉ lưu trữ được năm đã đóng sổ (trước {date.today().year})."
+        return True, ""
+
+    @staticmethod
+    def _move(conn: sqlite3.Connection, source: str, target: str, bounds: Tuple[str, str]) -> int:
+        """Chép hóa đơn trong khoảng ngày từ schema source sang target rồi xóa ở source."""
+        selected = f"SELECT id FROM {source}.invoices WHERE date BETWEEN ? AND ?"
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {target}.invoices ({_INVOICE_COLUMNS})
+            SELECT {_INVOICE_COLUMNS} FROM {source}.invoices WHERE date BETWEEN ? AND ?
+        """, bounds)
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {target}.invoice_items ({_ITEM_COLUMNS})
+            SELECT {_ITEM_COLUMNS} FROM {source}.invoice_items WHERE invoice_id IN ({selected})
+        """, bounds)
+        conn.execute(f"DELETE FROM {source}.invoice_items WHERE invoice_id IN ({selected})", bounds)
+        return conn.execute(f"DELETE FROM {source}.invoices WHERE date BETWEEN ? AND ?", bounds).rowcount
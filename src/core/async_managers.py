@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lớp vỏ asyncio cho các manager của Hệ thống Quản lý Hóa đơn.
+
+Module này cho phép dùng các manager (đồng bộ, dùng SQLite) trong một
+ứng dụng asyncio mà không chặn event loop:
+- DatabaseExecutor: Các luồng làm việc, mỗi luồng giữ một kết nối riêng.
+  Mọi thao tác ghi đi qua một luồng ghi duy nhất (tuần tự), các thao tác
+  đọc chạy song song trên nhóm luồng đọc nhờ journal_mode=WAL.
+- AsyncProductManager, AsyncInvoiceManager, AsyncStatisticsManager:
+  Phiên bản async của các manager tương ứng.
+
+Ví dụ:
+    executor = DatabaseExecutor(readers=4)
+    products, invoices, statistics = await create_async_managers(executor)
+    invoice, message = await invoices.create_invoice("Nguyễn Văn A", items)
+    rows, total = await statistics.get_revenue_by_date()
+    await executor.aclose()
+"""
+
+import asyncio
+import functools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from database.context import DatabaseContext
+from models import Invoice, Product
+from utils.db_utils import open_connection, bind_connection
+from .product_manager import ProductManager
+from .invoice_manager import InvoiceManager
+from .statistics_manager import StatisticsManager
+
+
+class DatabaseExecutor:
+    """
+    Chạy công việc SQLite trên các luồng riêng, mỗi luồng một kết nối.
+
+    Thuộc tính:
+        readers (int): Số luồng đọc
+        database (Optional[DatabaseContext]): Database các luồng kết nối tới
+            (None: database mặc định)
+
+    Ghi chú:
+        Database được chuyển sang journal_mode=WAL khi luồng đầu tiên
+        mở kết nối. Trong mỗi công việc, các hàm của utils.db_utils dùng
+        kết nối của luồng đang chạy (xem bind_connection).
+    """
+
+    def __init__(self, readers: int = 4, busy_timeout_ms: int = 5000,
+                 database: Optional[DatabaseContext] = None):
+        """Khởi tạo nhóm luồng đọc và luồng ghi (kết nối được mở khi luồng bắt đầu)."""
+        if readers <= 0:
+            raise ValueError("Số luồng đọc phải lớn hơn 0.")
+        self.readers = readers
+        self.database = database
+        self._busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="invoice-writer",
+                                          initializer=self._open_connection)
+        self._reader_pool = ThreadPoolExecutor(readers, thread_name_prefix="invoice-reader",
+                                               initializer=self._open_connection)
+        self._closed = False
+
+    def _open_connection(self) -> None:
+        path = self.database.path if self.database is not None else None
+        conn = open_connection(wal=True, busy_timeout_ms=self._busy_timeout_ms, check_same_thread=False,
+                               path=path)
+        self._local.connection = conn
+        with self._lock:
+            self._connections.append(conn)
+
+    def _run(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        with bind_connection(self._local.connection):
+            return func(*args, **kwargs)
+
+    async def _submit(self, pool: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        if self._closed:
+            raise RuntimeError("DatabaseExecutor đã đóng.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, functools.partial(self._run, func, args, kwargs))
+
+    async def read(self, func: Callable, *args, **kwargs) -> Any:
+        """Chạy một công việc chỉ đọc trên nhóm luồng đọc."""
+        return await self._submit(self._reader_pool, func, *args, **kwargs)
+
+    async def write(self, func: Callable, *args, **kwargs) -> Any:
+        """Chạy một công việc ghi trên luồng ghi duy nhất (theo thứ tự gửi)."""
+        return await self._submit(self._writer, func, *args, **kwargs)
+
+    def close(self) -> None:
+        """Chờ các công việc đang chạy, dừng các luồng và đóng kết nối."""
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.shutdown(wait=True)
+        self._reader_pool.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    async def aclose(self) -> None:
+        """Phiên bản async của close (không chặn event loop)."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> 'DatabaseExecutor':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class AsyncProductManager:
+    """
+    Phiên bản async của ProductManager.
+
+    Thuộc tính:
+        manager (ProductManager): Manager đồng bộ bên dưới
+        executor (DatabaseExecutor): Nơi chạy các thao tác database
+    """
+
+    def __init__(self, manager: ProductManager, executor: DatabaseExecutor):
+        """Bọc một ProductManager đã khởi tạo."""
+        self.manager = manager
+        self.executor = executor
+
+    @classmethod
+    async def create(cls, executor: DatabaseExecutor) -> 'AsyncProductManager':
+        """Khởi tạo ProductManager (và tải sản phẩm) trên luồng ghi."""
+        return cls(await executor.write(ProductManager, database=executor.database), executor)
+
+    @property
+    def products(self) -> List[Product]:
+        """Danh sách sản phẩm đã tải."""
+        return self.manager.products
+
+    async def load_products(self) -> Tuple[bool, str]:
+        """Tải lại danh sách sản phẩm."""
+        return await self.executor.read(self.manager.load_products)
+
+    async def add_product(self, *args, **kwargs) -> Tuple[bool, str]:
+        """Thêm sản phẩm (tham số giống ProductManager.add_product)."""
+        return await self.executor.write(self.manager.add_product, *args, **kwargs)
+
+    async def update_product(self, *args, **kwargs) -> Tuple[bool, str]:
+        """Cập nhật sản phẩm (tham số giống ProductManager.update_product)."""
+        return await self.executor.write(self.manager.update_product, *args, **kwargs)
+
+    async def delete_product(self, product_id: str) -> Tuple[bool, str]:
+        """Xóa sản phẩm."""
+        return await self.executor.write(self.manager.delete_product, product_id)
+
+    def find_product(self, product_id: str) -> Optional[Product]:
+        """Tìm sản phẩm trong danh sách đã tải (không truy cập database)."""
+        return self.manager.find_product(product_id)
+
+
+class AsyncInvoiceManager:
+    """
+    Phiên bản async của InvoiceManager.
+
+    Thuộc tính:
+        manager (InvoiceManager): Manager đồng bộ bên dưới
+        executor (DatabaseExecutor): Nơi chạy các thao tác database
+    """
+
+    def __init__(self, manager: InvoiceManager, executor: DatabaseExecutor):
+        """Bọc một InvoiceManager đã khởi tạo."""
+        self.manager = manager
+        self.executor = executor
+
+    @classmethod
+    async def create(cls, product_manager: AsyncProductManager,
+                     executor: DatabaseExecutor) -> 'AsyncInvoiceManager':
+        """Khởi tạo InvoiceManager (và tải hóa đơn) trên luồng ghi."""
+        return cls(await executor.write(InvoiceManager, product_manager.manager), executor)
+
+    @property
+    def invoices(self) -> List[Invoice]:
+        """Danh sách hóa đơn đã tải."""
+        return self.manager.invoices
+
+    async def load_invoices(self) -> Tuple[bool, str]:
+        """Tải lại danh sách hóa đơn."""
+        return await self.executor.read(self.manager.load_invoices)
+
+    async def create_invoice(self, *args, **kwargs) -> Tuple[Optional[Invoice], str]:
+        """Tạo hóa đơn (tham số giống InvoiceManager.create_invoice)."""
+        return await self.executor.write(self.manager.create_invoice, *args, **kwargs)
+
+    async def delete_invoice(self, invoice_id: str) -> Tuple[bool, str]:
+        """Xóa hóa đơn."""
+        return await self.executor.write(self.manager.delete_invoice, invoice_id)
+
+    async def find_invoices_by_customer(self, customer_name: str) -> List[Invoice]:
+        """Lấy lịch sử hóa đơn của một khách hàng."""
+        return await self.executor.read(self.manager.find_invoices_by_customer, customer_name)
+
+    def find_invoice(self, invoice_id: str) -> Optional[Invoice]:
+        """Tìm hóa đơn trong danh sách đã tải (không truy cập database)."""
+        return self.manager.find_invoice(invoice_id)
+
+
+class AsyncStatisticsManager:
+    """
+    Phiên bản async của StatisticsManager.
+
+    Các báo cáo trả về dữ liệu (giống các phương thức get_* của
+    StatisticsManager) thay vì in ra console, và được tính trên nhóm
+    luồng đọc để không chặn event loop.
+    """
+
+    def __init__(self, manager: StatisticsManager, executor: DatabaseExecutor):
+        """Bọc một StatisticsManager đã khởi tạo."""
+        self.manager = manager
+        self.executor = executor
+
+    async def get_revenue_by_date(self) -> Tuple[List[Tuple[str, int]], int]:
+        """Doanh thu theo ngày (xem StatisticsManager.get_revenue_by_date)."""
+        return await self.executor.read(self.manager.get_revenue_by_date)
+
+    async def get_revenue_by_product(self) -> Tuple[List[Tuple[str, str, int, int]], int]:
+        """Doanh thu theo sản phẩm (xem StatisticsManager.get_revenue_by_product)."""
+        return await self.executor.read(self.manager.get_revenue_by_product)
+
+    async def get_top_customers(self, limit: int = 5) -> Tuple[List[Tuple[str, int]], int]:
+        """Khách hàng chi tiêu nhiều nhất (xem StatisticsManager.get_top_customers)."""
+        return await self.executor.read(self.manager.get_top_customers, limit)
+
+
+async def create_async_managers(executor: DatabaseExecutor
+                                ) -> Tuple[AsyncProductManager, AsyncInvoiceManager, AsyncStatisticsManager]:
+    """
+    Khởi tạo bộ ba manager async dùng chung một DatabaseExecutor.
+
+    Tham số:
+        executor: Nơi chạy các thao tác database
+
+    Trả về:
+        Tuple: (AsyncProductManager, AsyncInvoiceManager, AsyncStatisticsManager)
+    """
+    products = await AsyncProductManager.create(executor)
+    invoices = await AsyncInvoiceManager.create(products, executor)
+    statistics = AsyncStatisticsManager(StatisticsManager(invoices.manager, products.manager), executor)
+    return products, invoices, statistics
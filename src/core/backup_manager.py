@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sao lưu và khôi phục trực tuyến cho Hệ thống Quản lý Hóa đơn.
+
+Module này cung cấp lớp BackupManager dùng API backup của SQLite
+(sqlite3.Connection.backup) thay vì chép file: bản sao luôn nhất quán kể
+cả khi ứng dụng đang ghi. Việc sao chép chia thành từng bước nhỏ (một số
+trang mỗi bước); giữa các bước khóa đọc được nhả ra và có thể nghỉ một
+chút, nên các quầy vẫn ghi hóa đơn bình thường trong lúc sao lưu.
+
+Ví dụ:
+    manager = BackupManager(pages_per_step=512)
+    report, message = manager.backup("backup/2024-06-30.db.gz",
+                                     progress=lambda done, total: print(done, total))
+    manager.restore("backup/2024-06-30.db.gz")
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from urllib.request import pathname2url
+
+from database.database import connect_database, initialize_database, is_uri
+from utils import db_utils
+from utils.db_utils import bind_database_methods, query_operation
+
+# Kích thước khối khi nén/giải nén snapshot
+_COPY_CHUNK_BYTES = 1024 * 1024
+# Thời gian chờ khóa ghi của database đích khi khôi phục (giây)
+_RESTORE_TIMEOUT_SECONDS = 30
+
+# Hàm nhận tiến độ: (số trang đã chép, tổng số trang)
+ProgressCallback = Callable[[int, int], None]
+
+@dataclass
+class BackupReport:
+    """
+    Kết quả một lần sao lưu.
+
+    Thuộc tính:
+        source (str): Database được sao lưu
+        destination (str): File snapshot
+        pages (int): Số trang database đã chép
+        steps (int): Số bước sao chép
+        size_bytes (int): Kích thước file snapshot
+        compressed (bool): Snapshot có được nén gzip hay không
+        elapsed_seconds (float): Thời gian chạy
+    """
+    source: str
+    destination: str
+    pages: int = 0
+    steps: int = 0
+    size_bytes: int = 0
+    compressed: bool = False
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        """Tóm tắt kết quả sao lưu dưới dạng một dòng thông báo."""
+        return (f"Đã sao lưu {self.pages} trang ({self.steps} bước) ra '{self.destination}' "
+                f"({self.size_bytes:,} bytes) trong {self.elapsed_seconds:.2f}s.")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển báo cáo sang dict (dùng cho JSON)."""
+        return {
+            "source": self.source,
+            "destination": self.destination,
+            "pages": self.pages,
+            "steps": self.steps,
+            "size_bytes": self.size_bytes,
+            "compressed": self.compressed,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+        }
+
+
+@bind_database_methods
+class BackupManager:
+    """
+    Sao lưu database đang chạy và khôi phục từ snapshot.
+
+    Thuộc tính:
+        pages_per_step (int): Số trang chép mỗi bước; càng nhỏ thì bên ghi
+            càng ít phải chờ nhưng sao lưu càng lâu
+        step_delay (float): Thời gian nghỉ (giây) giữa các bước để nhường
+            cho bên ghi
+        product_manager, invoice_manager: Được nạp lại sau khi khôi phục
+            (tùy chọn)
+        database (Optional[DatabaseContext]): Database được sao lưu/khôi phục
+            (mặc định là database của các manager, hoặc database hiện hành)
+
+    Ghi chú:
+        Nếu database bị ghi bởi kết nối khác trong lúc sao lưu, SQLite tự
+        bắt đầu lại từ đầu để bản sao luôn nhất quán. File lưu trữ theo năm
+        (ArchiveManager) không đổi sau khi tạo nên chỉ cần chép một lần.
+    """
+
+    def __init__(self, pages_per_step: int = 256, step_delay: float = 0.0,
+                 product_manager=None, invoice_manager=None, database=None):
+        """Khởi tạo trình sao lưu."""
+        if pages_per_step <= 0:
+            raise ValueError("Số trang mỗi bước phải lớn hơn 0.")
+        self.pages_per_step = pages_per_step
+        self.step_delay = step_delay
+        self.product_manager = product_manager
+        self.invoice_manager = invoice_manager
+        if database is None:
+            database = getattr(product_manager, "database", None) or getattr(invoice_manager, "database", None)
+        self.database = database
+
+    @query_operation("backup.backup")
+    def backup(self, destination: str, compress: bool = False,
+               progress: Optional[ProgressCallback] = None) -> tuple[Optional[BackupReport], str]:
+        """
+        Sao lưu database hiện hành ra một file snapshot.
+
+        Snapshot được ghi ra file tạm rồi đổi tên, nên file đích không bao
+        giờ ở trạng thái dở dang.
+
+        Tham số:
+            destination: File đích (.gz để nén)
+            compress: Nén gzip (tự thêm đuôi .gz nếu thiếu)
+            progress: Hàm nhận tiến độ sau mỗi bước
+
+        Trả về:
+            tuple[Optional[BackupReport], str]: (Báo cáo nếu thành công, thông báo)
+        """
+        if compress and not destination.endswith(".gz"):
+            destination += ".gz"
+        source = db_utils.current_database_path()
+        if not is_uri(source) and not os.path.exists(source):
+            return None, f"Database không tồn tại: {source}"
+
+        report = BackupReport(source=source, destination=destination,
+                              compressed=destination.endswith(".gz"))
+        directory = os.path.dirname(os.path.abspath(destination))
+        snapshot = os.path.join(directory, f".{os.path.basename(destination)}.{os.getpid()}.tmp")
+        start = time.perf_counter()
+
+        def on_step(status: int, remaining: int, total: int) -> None:
+            report.steps += 1
+            report.pages = total
+            if progress is not None:
+                progress(total - remaining, total)
+            if self.step_delay > 0 and remaining:
+                time.sleep(self.step_delay)
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            src = connect_database(source)
+            dst = sqlite3.connect(snapshot)
+            try:
+                src.backup(dst, pages=self.pages_per_step, progress=on_step)
+            finally:
+                dst.close()
+                src.close()
+
+            if report.compressed:
+                packed = snapshot + ".gz"
+                with open(snapshot, "rb") as f_in, gzip.open(packed, "wb", compresslevel=6) as f_out:
+                    shutil.copyfileobj(f_in, f_out, _COPY_CHUNK_BYTES)
+                os.remove(snapshot)
+                snapshot = packed
+            os.replace(snapshot, destination)
+        except (sqlite3.Error, OSError) as e:
+            for path in (snapshot, snapshot + ".gz"):
+                if os.path.exists(path):
+                    os.remove(path)
+            return None, f"Lỗi khi sao lưu database: {e}"
+        finally:
+            report.elapsed_seconds = time.perf_counter() - start
+
+        report.size_bytes = os.path.getsize(destination)
+        return report, report.summary()
+
+    @query_operation("backup.restore")
+    def restore(self, source: str) -> tuple[bool, str]:
+        """
+        Khôi phục database hiện hành từ một file snapshot.
+
+        Nội dung được chép một lượt vào database đang dùng (không thay
+        file), nên các kết nối đang mở thấy ngay dữ liệu mới. Snapshot của
+        phiên bản schema cũ được migrate sau khi khôi phục.
+
+        Tham số:
+            source: File snapshot (.db hoặc .db.gz)
+
+        Trả về:
+            tuple[bool, str]: (True/False, thông báo)
+        """
+        if not os.path.exists(source):
+            return False, f"File sao lưu không tồn tại: {source}"
+
+        unpacked = None
+        path = source
+        start = time.perf_counter()
+        try:
+            if source.endswith(".gz"):
+                target = db_utils.current_database_path()
+                directory = os.path.dirname(os.path.abspath(source if is_uri(target) else target))
+                unpacked = os.path.join(directory, f".restore.{os.getpid()}.tmp")
+                with gzip.open(source, "rb") as f_in, open(unpacked, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out, _COPY_CHUNK_BYTES)
+                path = unpacked
+
+            src = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+            try:
+                tables = {row[0] for row in src.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                if not {"products", "invoices", "invoice_items"} <= tables:
+                    return False, f"'{source}' không phải bản sao lưu của database hóa đơn."
+                dst = connect_database(db_utils.current_database_path(), timeout=_RESTORE_TIMEOUT_SECONDS)
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+        except (sqlite3.Error, OSError, EOFError) as e:
+            return False, f"Lỗi khi khôi phục database: {e}"
+        finally:
+            if unpacked is not None and os.path.exists(unpacked):
+                os.remove(unpacked)
+
+        success, message = initialize_database(db_utils.current_database_path())
+        if not success:
+            return False, message
+        if self.product_manager is not None:
+            self.product_manager.load_products()
+        if self.invoice_manager is not None:
+            self.invoice_manager.load_invoices()
+        return True, f"Đã khôi phục database từ '{source}' trong {time.perf_counter() - start:.2f}s."
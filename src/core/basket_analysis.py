@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Phân tích giỏ hàng (các sản phẩm thường được mua cùng nhau).
+
+Mỗi hóa đơn là một giỏ hàng (tập mã sản phẩm). Module này tìm các cặp sản
+phẩm xuất hiện cùng nhau trong ít nhất min_support phần giỏ hàng và suy ra
+luật kết hợp A -> B với các chỉ số:
+- support: Tỷ lệ giỏ hàng chứa cả A và B
+- confidence: Tỷ lệ giỏ hàng chứa B trong số các giỏ hàng chứa A
+- lift: confidence chia cho tỷ lệ giỏ hàng chứa B (> 1: mua A làm tăng
+  khả năng mua B)
+
+Thuật toán đếm cặp thưa hai lượt (Apriori cho cặp):
+1. Đếm số giỏ hàng chứa từng sản phẩm; chỉ giữ sản phẩm đạt ngưỡng, vì
+   support của một cặp không vượt quá support của từng sản phẩm trong cặp
+2. Duyệt lại các giỏ hàng, chỉ đếm cặp giữa các sản phẩm đã giữ
+
+Bộ đếm chỉ có một mục cho mỗi cặp thật sự xuất hiện cùng nhau (không phải
+ma trận đầy đủ), nên bộ nhớ phụ thuộc vào số cặp phổ biến chứ không vào số
+giỏ hàng. Khi đọc từ database (analyze_database), lượt 1 là một truy vấn
+GROUP BY và lượt 2 đọc invoice_items theo luồng, theo thứ tự invoice_id.
+"""
+import itertools
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.db_utils import stream_query
+
+@dataclass
+class ItemPair:
+    """
+    Một cặp sản phẩm thường được mua cùng nhau.
+
+    Thuộc tính:
+        items (Tuple[str, str]): Hai mã sản phẩm (theo thứ tự tăng dần)
+        count (int): Số giỏ hàng chứa cả hai sản phẩm
+        support (float): count / tổng số giỏ hàng
+    """
+    items: Tuple[str, str]
+    count: int
+    support: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển cặp sản phẩm sang dict (dùng cho JSON)."""
+        return {"items": list(self.items), "count": self.count, "support": round(self.support, 6)}
+
+
+@dataclass
+class AssociationRule:
+    """
+    Luật kết hợp antecedent -> consequent.
+
+    Thuộc tính:
+        antecedent (str): Sản phẩm đã có trong giỏ hàng
+        consequent (str): Sản phẩm được gợi ý
+        count (int): Số giỏ hàng chứa cả hai sản phẩm
+        support (float): Tỷ lệ giỏ hàng chứa cả hai sản phẩm
+        confidence (float): P(consequent | antecedent)
+        lift (float): confidence / P(consequent)
+    """
+    antecedent: str
+    consequent: str
+    count: int
+    support: float
+    confidence: float
+    lift: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển luật sang dict (dùng cho JSON)."""
+        return {
+            "antecedent": self.antecedent,
+            "consequent": self.consequent,
+            "count": self.count,
+            "support": round(self.support, 6),
+            "confidence": round(self.confidence, 6),
+            "lift": round(self.lift, 6),
+        }
+
+
+@dataclass
+class BasketReport:
+    """
+    Kết quả phân tích giỏ hàng.
+
+    Thuộc tính:
+        baskets (int): Số giỏ hàng (hóa đơn) đã phân tích
+        min_support (float): Ngưỡng support
+        min_count (int): Ngưỡng support quy ra số giỏ hàng
+        frequent_items (int): Số sản phẩm đạt ngưỡng (được đếm cặp)
+        pairs (List[ItemPair]): Các cặp đạt ngưỡng, nhiều giỏ hàng nhất trước
+        rules (List[AssociationRule]): Các luật đạt ngưỡng, lift cao nhất trước
+        elapsed_seconds (float): Thời gian phân tích
+    """
+    baskets: int
+    min_support: float
+    min_count: int
+    frequent_items: int = 0
+    pairs: List[ItemPair] = field(default_factory=list)
+    rules: List[AssociationRule] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        """Tóm tắt kết quả dưới dạng một dòng thông báo."""
+        return (f"Đã phân tích {self.baskets:,} giỏ hàng: {self.frequent_items} sản phẩm phổ biến, "
+                f"{len(self.pairs)} cặp và {len(self.rules)} luật đạt support >= {self.min_support:g} "
+                f"({self.elapsed_seconds:.2f}s).")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển kết quả sang dict (dùng cho JSON)."""
+        return {
+            "baskets": self.baskets,
+            "min_support": self.min_support,
+            "min_count": self.min_count,
+            "frequent_items": self.frequent_items,
+            "pairs": [pair.to_dict() for pair in self.pairs],
+            "rules": [rule.to_dict() for rule in self.rules],
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+        }
+
+
+def min_basket_count(min_support: float, baskets: int) -> int:
+    """
+    Quy ngưỡng support thành số giỏ hàng tối thiểu.
+
+    Ném ra:
+        ValueError: Nếu min_support không nằm trong (0, 1]
+    """
+    if not 0 < min_support <= 1:
+        raise ValueError("Ngưỡng support phải lớn hơn 0 và không vượt quá 1.")
+    # Trừ sai số dấu phẩy động để 0.01 * 300 không thành 4
+    return max(1, math.ceil(min_support * baskets - 1e-9))
+
+def count_pairs(baskets: Iterable[Iterable[str]], item_counts: Dict[str, int],
+                min_count: int) -> Dict[Tuple[str, str], int]:
+    """
+    Đếm các cặp sản phẩm đạt ngưỡng (lượt 2 của thuật toán).
+
+    Tham số:
+        baskets: Các giỏ hàng (mã sản phẩm, có thể trùng trong một giỏ)
+        item_counts: Số giỏ hàng chứa từng sản phẩm (kết quả lượt 1)
+        min_count: Số giỏ hàng tối thiểu
+
+    Trả về:
+        Dict[Tuple[str, str], int]: (sản phẩm nhỏ hơn, sản phẩm lớn hơn) -> số giỏ hàng
+    """
+    frequent = sorted(item for item, count in item_counts.items() if count >= min_count)
+    index = {item: position for position, item in enumerate(frequent)}
+    counts: Counter = Counter()
+    for basket in baskets:
+        ids = sorted({index[item] for item in basket if item in index})
+        if len(ids) > 1:
+            # Counter.update đếm bằng vòng lặp C, không tạo danh sách cặp trung gian
+            counts.update(itertools.combinations(ids, 2))
+    return {(frequent[a], frequent[b]): count for (a, b), count in counts.items() if count >= min_count}
+
+def build_report(baskets: int, item_counts: Dict[str, int], pair_counts: Dict[Tuple[str, str], int],
+                 min_support: float, min_count: int, min_confidence: float = 0.0,
+                 min_lift: float = 0.0, limit: Optional[int] = None) -> BasketReport:
+    """
+    Dựng báo cáo (cặp và luật kết hợp) từ kết quả đếm.
+
+    Tham số:
+        baskets: Tổng số giỏ hàng
+        item_counts: Số giỏ hàng chứa từng sản phẩm
+        pair_counts: Số giỏ hàng chứa từng cặp (đã lọc theo min_count)
+        min_support, min_count: Ngưỡng support đã dùng khi đếm
+        min_confidence: Confidence tối thiểu của một luật
+        min_lift: Lift tối thiểu của một luật
+        limit: Số cặp/luật tối đa trong báo cáo (None: không giới hạn)
+
+    Trả về:
+        BasketReport: Báo cáo (elapsed_seconds do nơi gọi điền)
+    """
+    report = BasketReport(baskets=baskets, min_support=min_support, min_count=min_count,
+                          frequent_items=sum(1 for count in item_counts.values() if count >= min_count))
+    pairs = sorted(pair_counts.items(), key=lambda entry: (-entry[1], entry[0]))
+    report.pairs = [ItemPair(items, count, count / baskets) for items, count in pairs[:limit]]
+
+    rules = []
+    for (first, second), count in pair_counts.items():
+        for antecedent, consequent in ((first, second), (second, first)):
+            confidence = count / item_counts[antecedent]
+            lift = confidence * baskets / item_counts[consequent]
+            if confidence >= min_confidence and lift >= min_lift:
+                rules.append(AssociationRule(antecedent, consequent, count, count / baskets, confidence, lift))
+    rules.sort(key=lambda rule: (-rule.lift, -rule.confidence, -rule.count, rule.antecedent, rule.consequent))
+    report.rules = rules[:limit]
+    return report
+
+def analyze_baskets(baskets: Callable[[], Iterable[Iterable[str]]], min_support: float = 0.01,
+                    min_confidence: float = 0.0, min_lift: float = 0.0,
+                    limit: Optional[int] = None) -> BasketReport:
+    """
+    Phân tích các giỏ hàng trong bộ nhớ.
+
+    Tham số:
+        baskets: Hàm trả về một lượt duyệt mới qua các giỏ hàng (được gọi
+            hai lần)
+        min_support, min_confidence, min_lift, limit: Xem build_report
+
+    Trả về:
+        BasketReport: Báo cáo
+
+    Ném ra:
+        ValueError: Nếu min_support không hợp lệ
+    """
+    start = time.perf_counter()
+    item_counts: Counter = Counter()
+    total = 0
+    for basket in baskets():
+        item_counts.update(set(basket))
+        total += 1
+    min_count = min_basket_count(min_support, total)
+    pair_counts = count_pairs(baskets(), item_counts, min_count)
+    report = build_report(total, item_counts, pair_counts, min_support, min_count,
+                          min_confidence, min_lift, limit)
+    report.elapsed_seconds = time.perf_counter() - start
+    return report
+
+def _date_filter(date_from: Optional[str], date_to: Optional[str]) -> Tuple[str, List[str]]:
+    """Phần JOIN/WHERE lọc mục hóa đơn theo ngày của hóa đơn."""
+    clauses, params = [], []
+    if date_from:
+        clauses.append("i.date >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("i.date <= ?")
+        params.append(date_to)
+    if not clauses:
+        return "", params
+    return " JOIN invoices i ON i.id = ii.invoice_id WHERE " + " AND ".join(clauses), params
+
+def _stream_baskets(date_from: Optional[str], date_to: Optional[str]) -> Iterator[Sequence[str]]:
+    """Đọc các giỏ hàng từ invoice_items theo thứ tự invoice_id (dùng index invoice_id)."""
+    where, params = _date_filter(date_from, date_to)
+    _, rows = stream_query(
+        f"SELECT ii.invoice_id, ii.product_id FROM invoice_items ii{where} ORDER BY ii.invoice_id",
+        params, batch_size=5000
+    )
+    for _, group in itertools.groupby(rows, key=lambda row: row[0]):
+        yield [product_id for _, product_id in group]
+
+def analyze_database(min_support: float = 0.01, min_confidence: float = 0.0, min_lift: float = 0.0,
+                     limit: Optional[int] = None, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> BasketReport:
+    """
+    Phân tích giỏ hàng trực tiếp từ database hiện hành.
+
+    Lượt 1 đếm số hóa đơn chứa từng sản phẩm bằng GROUP BY; lượt 2 đọc
+    invoice_items theo luồng nên không cần tải hóa đơn vào bộ nhớ. Chỉ
+    đọc database hiện hành (không gồm các năm đã lưu trữ).
+
+    Tham số:
+        min_support, min_confidence, min_lift, limit: Xem build_report
+        date_from, date_to: Khoảng ngày hóa đơn YYYY-MM-DD (tùy chọn)
+
+    Trả về:
+        BasketReport: Báo cáo
+
+    Ném ra:
+        ValueError: Nếu min_support không hợp lệ
+        sqlite3.Error: Nếu truy vấn thất bại
+    """
+    start = time.perf_counter()
+    where, params = _date_filter(date_from, date_to)
+    _, rows = stream_query(f"SELECT COUNT(DISTINCT ii.invoice_id) FROM invoice_items ii{where}", params)
+    total = list(rows)[0][0]
+    # Kiểm tra ngưỡng trước khi đọc dữ liệu
+    min_count = min_basket_count(min_support, total)
+    _, rows = stream_query(
+        f"SELECT ii.product_id, COUNT(DISTINCT ii.invoice_id) FROM invoice_items ii{where} "
+        "GROUP BY ii.product_id",
+        params
+    )
+    item_counts = dict(rows)
+
+    if total and any(count >= min_count for count in item_counts.values()):
+        pair_counts = count_pairs(_stream_baskets(date_from, date_to), item_counts, min_count)
+    else:
+        pair_counts = {}
+    report = build_report(total, item_counts, pair_counts, min_support, min_count,
+                          min_confidence, min_lift, limit)
+    report.elapsed_seconds = time.perf_counter() - start
+    return report
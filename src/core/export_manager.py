@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Xuất dữ liệu và báo cáo cho Hệ thống Quản lý Hóa đơn.
+
+Module này cung cấp lớp ExportManager để xuất hóa đơn, các mục hóa đơn
+và các báo cáo của StatisticsManager ra file CSV/JSONL (có thể nén gzip).
+Dữ liệu được đọc trực tiếp từ database bằng fetchmany và ghi ngay ra
+file, không nạp toàn bộ vào bộ nhớ như InvoiceManager.invoices, nên
+bộ nhớ sử dụng không phụ thuộc vào kích thước dữ liệu. Hóa đơn của các
+năm đã lưu trữ (xem ArchiveManager) được đọc kèm khi khoảng ngày cần.
+"""
+import csv
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models import Money
+from database.context import DatabaseContext
+from utils.db_utils import bind_database_methods, stream_query, query_operation
+from utils.file_io import open_text, detect_format
+from utils.validation import validate_date_format
+from .archive_manager import partition_sources
+
+# Tên hiển thị khi sản phẩm không còn trong bảng products
+_MISSING_PRODUCT_NAME = "[Sản phẩm không tồn tại]"
+
+@dataclass
+class ExportReport:
+    """
+    Báo cáo kết quả một lần xuất dữ liệu.
+
+    Thuộc tính:
+        destination (str): Đường dẫn file đích
+        kind (str): Loại dữ liệu đã xuất
+        rows_written (int): Số dòng đã ghi
+        elapsed_seconds (float): Thời gian chạy
+    """
+    destination: str
+    kind: str
+    rows_written: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Số dòng ghi mỗi giây."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows_written / self.elapsed_seconds
+
+    def summary(self) -> str:
+        """Tóm tắt kết quả xuất dưới dạng một dòng thông báo."""
+        return (f"Đã xuất {self.rows_written} dòng ({self.kind}) ra '{self.destination}' "
+                f"trong {self.elapsed_seconds:.2f}s ({self.rows_per_second:,.0f} dòng/s).")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển báo cáo sang dict (dùng cho JSON)."""
+        return {
+            "destination": self.destination,
+            "kind": self.kind,
+            "rows_written": self.rows_written,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+            "rows_per_second": round(self.rows_per_second, 2),
+        }
+
+
+@bind_database_methods
+class ExportManager:
+    """
+    Xuất hóa đơn, mục hóa đơn và báo cáo thống kê ra file dạng luồng.
+
+    Thuộc tính:
+        fetch_size (int): Số dòng mỗi lần fetchmany
+        database (Optional[DatabaseContext]): Database được đọc (None:
+            database hiện hành)
+
+    Ghi chú:
+        Các cột tiền được xuất dưới dạng chuỗi thập phân chính xác
+        (ví dụ "1234.50"), chuyển từ số nguyên đơn vị nhỏ nhất.
+        Đuôi file quyết định định dạng (.csv hoặc .jsonl, có thể kèm .gz).
+    """
+
+    REPORTS = ("revenue_by_date", "revenue_by_product", "top_customers")
+
+    def __init__(self, fetch_size: int = 1000, database: Optional[DatabaseContext] = None):
+        """Khởi tạo trình xuất dữ liệu."""
+        if fetch_size <= 0:
+            raise ValueError("Kích thước lô phải lớn hơn 0.")
+        self.fetch_size = fetch_size
+        self.database = database
+
+    @query_operation("export.invoices")
+    def export_invoices(self, path: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                        compress: bool = False) -> tuple[Optional[ExportReport], str]:
+        """
+        Xuất danh sách hóa đơn kèm tổng số lượng và tổng tiền.
+
+        Tham số:
+            path: File đích (.csv/.jsonl, có thể kèm .gz)
+            date_from, date_to: Khoảng ngày YYYY-MM-DD (tùy chọn, bao gồm hai đầu)
+            compress: Nén gzip (tự thêm đuôi .gz nếu thiếu)
+
+        Trả về:
+            tuple[Optional[ExportReport], str]: (Báo cáo nếu thành công, thông báo)
+        """
+        where, params, error = self._date_filter(date_from, date_to)
+        if error:
+            return None, error
+        with partition_sources(date_from, date_to) as tables:
+            query = f"""
+            SELECT i.id AS invoice_id, i.date, i.customer_id, i.customer_name,
+                   COUNT(ii.id) AS line_count,
+                   COALESCE(SUM(ii.quantity), 0) AS total_items,
+                   COALESCE(SUM(ii.quantity * ii.unit_price), 0) AS total_amount
+            FROM {tables['invoices']} i
+            LEFT JOIN {tables['invoice_items']} ii ON ii.invoice_id = i.id
+            {where}
+            GROUP BY i.id
+            ORDER BY i.id
+            """
+            return self._export("invoices", path, query, params, ["total_amount"], compress)
+
+    @query_operation("export.items")
+    def export_items(self, path: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     compress: bool = False) -> tuple[Optional[ExportReport], str]:
+        """
+        Xuất toàn bộ mục hóa đơn (mỗi dòng một mặt hàng).
+
+        Tham số và giá trị trả về giống export_invoices.
+        """
+        where, params, error = self._date_filter(date_from, date_to)
+        if error:
+            return None, error
+        with partition_sources(date_from, date_to) as tables:
+            query = f"""
+            SELECT ii.invoice_id, i.date, i.customer_name, ii.product_id,
+                   COALESCE(p.name, '{_MISSING_PRODUCT_NAME}') AS product_name,
+                   ii.quantity, ii.unit_price,
+                   ii.quantity * ii.unit_price AS total_price
+            FROM {tables['invoice_items']} ii
+            JOIN {tables['invoices']} i ON i.id = ii.invoice_id
+            LEFT JOIN products p ON p.product_id = ii.product_id
+            {where}
+            ORDER BY ii.invoice_id, ii.id
+            """
+            return self._export("items", path, query, params, ["unit_price", "total_price"], compress)
+
+    @query_operation("export.report")
+    def export_report(self, report: str, path: str, limit: int = 5,
+                      date_from: Optional[str] = None, date_to: Optional[str] = None,
+                      compress: bool = False) -> tuple[Optional[ExportReport], str]:
+        """
+        Xuất một báo cáo của StatisticsManager (kèm cột tỉ lệ phần trăm).
+
+        Tham số:
+            report: Một trong ExportManager.REPORTS
+            path: File đích (.csv/.jsonl, có thể kèm .gz)
+            limit: Số khách hàng tối đa (chỉ dùng cho top_customers)
+            date_from, date_to: Khoảng ngày YYYY-MM-DD (tùy chọn)
+            compress: Nén gzip (tự thêm đuôi .gz nếu thiếu)
+
+        Trả về:
+            tuple[Optional[ExportReport], str]: (Báo cáo nếu thành công, thông báo)
+        """
+        if report not in self.REPORTS:
+            return None, f"Báo cáo '{report}' không tồn tại. Các báo cáo hợp lệ: {', '.join(self.REPORTS)}."
+        where, params, error = self._date_filter(date_from, date_to)
+        if error:
+            return None, error
+
+        revenue = "SUM(ii.quantity * ii.unit_price)"
+        with partition_sources(date_from, date_to) as tables:
+            if report == "revenue_by_date":
+                query = f"""
+                SELECT i.date, {revenue} AS revenue
+                FROM {tables['invoice_items']} ii
+                JOIN {tables['invoices']} i ON i.id = ii.invoice_id
+                {where}
+                GROUP BY i.date
+                ORDER BY i.date DESC
+                """
+                money_column = "revenue"
+            elif report == "revenue_by_product":
+                query = f"""
+                SELECT ii.product_id,
+                       COALESCE(p.name, '{_MISSING_PRODUCT_NAME}') AS product_name,
+                       SUM(ii.quantity) AS quantity,
+                       {revenue} AS revenue
+                FROM {tables['invoice_items']} ii
+                JOIN {tables['invoices']} i ON i.id = ii.invoice_id
+                LEFT JOIN products p ON p.product_id = ii.product_id
+                {where}
+                GROUP BY ii.product_id
+                ORDER BY revenue DESC
+                """
+                money_column = "revenue"
+            else:
+                query = f"""
+                SELECT MIN(COALESCE(c.name, i.customer_name)) AS customer_name,
+                       {revenue} AS spending
+                FROM {tables['invoice_items']} ii
+                JOIN {tables['invoices']} i ON i.id = ii.invoice_id
+                LEFT JOIN customers c ON c.id = i.customer_id
+                {where}
+                GROUP BY COALESCE(i.customer_id, i.customer_name)
+                ORDER BY spending DESC
+                LIMIT {max(int(limit), 0)}
+                """
+                money_column = "spending"
+
+            total_query = f"""
+            SELECT COALESCE({revenue}, 0)
+            FROM {tables['invoice_items']} ii
+            JOIN {tables['invoices']} i ON i.id = ii.invoice_id
+            {where}
+            """
+            return self._export(report, path, query, params, [money_column], compress,
+                                percent_of=money_column, total_query=total_query)
+
+    @staticmethod
+    def _date_filter(date_from: Optional[str], date_to: Optional[str]) -> Tuple[str, List[Any], str]:
+        """Tạo mệnh đề WHERE theo khoảng ngày; trả về (mệnh đề, tham số, lỗi)."""
+        clauses = []
+        params: List[Any] = []
+        for value, label, op in ((date_from, "Ngày bắt đầu", ">="), (date_to, "Ngày kết thúc", "<=")):
+            if value is None:
+                continue
+            valid, error = validate_date_format(value, label)
+            if not valid:
+                return "", [], error
+            clauses.append(f"i.date {op} ?")
+            params.append(value)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params, ""
+
+    def _export(self, kind: str, path: str, query: str, params: Sequence[Any],
+                money_columns: List[str], compress: bool,
+                percent_of: Optional[str] = None,
+                total_query: Optional[str] = None) -> tuple[Optional[ExportReport], str]:
+        """
+        Thực thi truy vấn và ghi kết quả ra file theo từng dòng.
+
+        Nếu có percent_of, total_query (cùng tham số với query) được chạy
+        trước để lấy tổng, rồi thêm cột "percentage" cho mỗi dòng.
+        """
+        if compress and not path.endswith(".gz"):
+            path += ".gz"
+        try:
+            fmt = detect_format(path)
+        except ValueError as e:
+            return None, str(e)
+
+        report = ExportReport(destination=path, kind=kind)
+        start = time.perf_counter()
+        try:
+            total = 0
+            if total_query is not None:
+                _, total_rows = stream_query(total_query, params, 1)
+                try:
+                    total = next(total_rows)[0]
+                finally:
+                    total_rows.close()
+
+            # Mở file trước khi truy vấn, và luôn đóng iterator (trả kết nối)
+            # kể cả khi ghi file lỗi giữa chừng
+            with open_text(path, "w") as f:
+                columns, rows = stream_query(query, params, self.fetch_size)
+                try:
+                    money_indexes = [columns.index(name) for name in money_columns]
+                    percent_index = columns.index(percent_of) if percent_of else None
+                    if percent_of:
+                        columns = columns + ["percentage"]
+
+                    write_row = self._row_writer(f, fmt, columns)
+                    for row in rows:
+                        values = list(row)
+                        if percent_index is not None:
+                            share = (values[percent_index] / total) * 100 if total > 0 else 0
+                            values.append(f"{share:.2f}")
+                        for index in money_indexes:
+                            values[index] = format(Money(values[index] or 0), ".2f")
+                        write_row(values)
+                        report.rows_written += 1
+                finally:
+                    rows.close()
+        except (sqlite3.Error, OSError) as e:
+            return None, f"Lỗi khi xuất dữ liệu ({kind}): {e}"
+        finally:
+            report.elapsed_seconds = time.perf_counter() - start
+
+        return report, report.summary()
+
+    @staticmethod
+    def _row_writer(f, fmt: str, columns: List[str]) -> Callable[[List[Any]], None]:
+        """Tạo hàm ghi một dòng theo định dạng; với CSV ghi luôn dòng tiêu đề."""
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            return writer.writerow
+
+        def write_jsonl(values: List[Any]) -> None:
+            f.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+            f.write("\n")
+        return write_jsonl
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nhập dữ liệu hàng loạt cho Hệ thống Quản lý Hóa đơn.
+
+Module này cung cấp lớp ImportManager để nhập sản phẩm và hóa đơn
+từ file CSV/JSONL (có thể nén .gz). Dữ liệu được đọc dạng luồng,
+kiểm tra theo lô bằng các quy tắc trong utils.validation và ghi vào
+database bằng executemany, mỗi lô một transaction. Dòng lỗi được ghi
+vào báo cáo thay vì dừng toàn bộ quá trình nhập.
+"""
+import csv
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import Money
+from utils.db_utils import bind_database_methods, save_many, transaction, query_operation
+from utils.file_io import iter_records, batched, open_text
+from utils.validation import (
+    check_date,
+    check_positive_number,
+    check_product_id,
+    check_quantity,
+    check_required,
+    check_string_length,
+    validate_rows
+)
+from utils.formatting import format_product_id, format_customer_name, normalize_customer_name
+from database.context import DatabaseContext
+from .product_manager import ProductManager, price_timestamp
+from .invoice_manager import InvoiceManager
+
+# Số tham số tối đa trong một mệnh đề IN (giới hạn an toàn của SQLite)
+_MAX_IN_PARAMS = 500
+
+# Quy tắc kiểm tra theo cột, cùng quy tắc với ProductManager.add_product
+# và InvoiceManager.create_invoice
+_PRODUCT_RULES = (
+    ("product_id", check_product_id),
+    ("name", lambda values: check_required(values, "Tên sản phẩm")),
+    ("name", lambda values: check_string_length(values, "Tên sản phẩm", 2, 50)),
+    ("unit_price", lambda values: check_positive_number(values, "Đơn giá")),
+)
+_INVOICE_HEADER_RULES = (
+    ("customer_name", lambda values: check_required(values, "Tên khách hàng")),
+    ("date", lambda values: check_date(values, "Ngày hóa đơn")),
+)
+# Lỗi của dòng có đơn giá hợp lệ về số nhưng không biểu diễn được bằng Money
+_INVALID_PRICE = "Đơn giá không hợp lệ."
+
+@dataclass
+class RowError:
+    """
+    Lỗi của một dòng dữ liệu khi nhập.
+
+    Thuộc tính:
+        line_number (int): Số dòng trong file nguồn
+        message (str): Mô tả lỗi
+    """
+    line_number: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    """
+    Báo cáo kết quả một lần nhập dữ liệu.
+
+    Thuộc tính:
+        source (str): Đường dẫn file nguồn
+        kind (str): Loại dữ liệu ("products" hoặc "invoices")
+        rows_read (int): Số dòng đã đọc
+        rows_imported (int): Số dòng đã ghi vào database
+        rows_rejected (int): Số dòng bị loại
+        records_imported (int): Số sản phẩm/hóa đơn đã tạo
+        batches (int): Số lô đã xử lý
+        elapsed_seconds (float): Thời gian chạy
+        errors (List[RowError]): Các lỗi (tối đa max_errors lỗi đầu tiên)
+        max_errors (int): Số lỗi tối đa được giữ lại trong báo cáo
+    """
+    source: str
+    kind: str
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    records_imported: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[RowError] = field(default_factory=list)
+    max_errors: int = 10000
+
+    def add_error(self, line_number: int, message: str) -> None:
+        """Ghi nhận một lỗi (bỏ qua chi tiết khi đã đủ max_errors)."""
+        if len(self.errors) < self.max_errors:
+            self.errors.append(RowError(line_number, message))
+
+    @property
+    def rows_per_second(self) -> float:
+        """Số dòng xử lý mỗi giây."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows_read / self.elapsed_seconds
+
+    def summary(self) -> str:
+        """Tóm tắt kết quả nhập dưới dạng một dòng thông báo."""
+        return (f"Đã nhập {self.rows_imported}/{self.rows_read} dòng từ '{self.source}' "
+                f"({self.records_imported} bản ghi, {self.rows_rejected} dòng lỗi) "
+                f"trong {self.elapsed_seconds:.2f}s ({self.rows_per_second:,.0f} dòng/s).")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển báo cáo sang dict (dùng cho JSON)."""
+        return {
+            "source": self.source,
+            "kind": self.kind,
+            "rows_read": self.rows_read,
+            "rows_imported": self.rows_imported,
+            "rows_rejected": self.rows_rejected,
+            "records_imported": self.records_imported,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+            "rows_per_second": round(self.rows_per_second, 2),
+            "errors": [{"line_number": e.line_number, "message": e.message} for e in self.errors],
+        }
+
+    def write_errors(self, path: str) -> None:
+        """Ghi danh sách lỗi ra file CSV (line_number, message)."""
+        with open_text(path, "w") as f:
+            writer = csv.writer(f)
+            writer.writerow(["line_number", "message"])
+            for error in self.errors:
+                writer.writerow([error.line_number, error.message])
+
+
+@bind_database_methods
+class ImportManager:
+    """
+    Nhập sản phẩm và hóa đơn hàng loạt từ file CSV/JSONL.
+
+    Thuộc tính:
+        product_manager (ProductManager): Trình quản lý sản phẩm
+        invoice_manager (Optional[InvoiceManager]): Trình quản lý hóa đơn
+            (bắt buộc khi nhập hóa đơn)
+        batch_size (int): Số dòng (sản phẩm) hoặc số hóa đơn mỗi lô ghi
+        database (Optional[DatabaseContext]): Database được ghi (mặc định là
+            database của các manager, hoặc database hiện hành)
+
+    Ghi chú:
+        Cột của file sản phẩm: product_id, name, unit_price,
+        calculation_unit, category.
+
+        Cột của file hóa đơn: invoice_ref, customer_name, date, product_id,
+        quantity, unit_price (tùy chọn, mặc định là giá hiện tại của sản phẩm).
+        Các dòng liên tiếp có cùng invoice_ref thuộc về một hóa đơn; dòng
+        không có invoice_ref là một hóa đơn riêng. Với JSONL, một bản ghi
+        cũng có thể chứa danh sách "items".
+    """
+
+    def __init__(self, product_manager: ProductManager,
+                 invoice_manager: Optional[InvoiceManager] = None,
+                 batch_size: int = 5000, database: Optional[DatabaseContext] = None):
+        """Khởi tạo trình nhập dữ liệu."""
+        if batch_size <= 0:
+            raise ValueError("Kích thước lô phải lớn hơn 0.")
+        self.product_manager = product_manager
+        self.invoice_manager = invoice_manager
+        self.batch_size = batch_size
+        if database is None:
+            database = getattr(product_manager, "database", None) or getattr(invoice_manager, "database", None)
+        self.database = database
+
+    # ------------------------------------------------------------------
+    # Sản phẩm
+    # ------------------------------------------------------------------
+
+    @query_operation("import.products")
+    def import_products(self, path: str) -> tuple[Optional[ImportReport], str]:
+        """
+        Nhập sản phẩm từ file CSV/JSONL.
+
+        Tham số:
+            path: Đường dẫn file nguồn
+
+        Trả về:
+            tuple[Optional[ImportReport], str]: (Báo cáo nếu đọc được file, thông báo)
+        """
+        report = ImportReport(source=path, kind="products")
+        existing_ids = {product.product_id for product in self.product_manager.products}
+        start = time.perf_counter()
+
+        try:
+            for batch in batched(iter_records(path), self.batch_size):
+                rows, lines = self._validate_product_batch(batch, existing_ids, report)
+                report.batches += 1
+                if not rows:
+                    continue
+
+                count, error = self._write_product_batch(rows)
+                if error:
+                    report.rows_rejected += len(rows)
+                    for line_number in lines:
+                        report.add_error(line_number, error)
+                    continue
+
+                existing_ids.update(row["product_id"] for row in rows)
+                report.rows_imported += count
+                report.records_imported += count
+        except (OSError, ValueError) as e:
+            return None, f"Không thể đọc file '{path}': {e}"
+        finally:
+            report.elapsed_seconds = time.perf_counter() - start
+
+        if report.rows_imported:
+            self.product_manager.load_products()
+        return report, report.summary()
+
+    def _write_product_batch(self, rows: List[Dict[str, Any]]) -> Tuple[int, str]:
+        """Ghi một lô sản phẩm cùng giá ban đầu vào lịch sử giá, trong một transaction."""
+        effective_from = price_timestamp()
+        try:
+            with transaction() as uow:
+                count, error = save_many("products", rows)
+                if not error:
+                    _, error = save_many("product_prices", [
+                        {"product_id": row["product_id"], "unit_price": row["unit_price"],
+                         "effective_from": effective_from}
+                        for row in rows
+                    ])
+                if error:
+                    uow.rollback()
+                    return 0, error
+        except sqlite3.Error as e:
+            return 0, f"Lỗi khi ghi lô sản phẩm: {e}"
+        return count, ""
+
+    def _validate_product_batch(self, batch: List[Tuple[int, Optional[Dict[str, Any]]]],
+                                existing_ids: set, report: ImportReport) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """Kiểm tra một lô bản ghi sản phẩm, trả về (các dòng hợp lệ, số dòng tương ứng)."""
+        rows = []
+        lines = []
+        batch_ids = set()
+        row_errors = validate_rows([record for _, record in batch], _PRODUCT_RULES)
+        for (line_number, record), errors in zip(batch, row_errors):
+            report.rows_read += 1
+            if errors:
+                row, error = None, errors[0]
+            else:
+                try:
+                    row, error = self._product_row(record), ""
+                except (ValueError, OverflowError):
+                    row, error = None, _INVALID_PRICE
+            if row is not None and (row["product_id"] in existing_ids or row["product_id"] in batch_ids):
+                row, error = None, f"Sản phẩm với Mã '{row['product_id']}' đã tồn tại!"
+            if row is None:
+                report.rows_rejected += 1
+                report.add_error(line_number, error)
+                continue
+            batch_ids.add(row["product_id"])
+            rows.append(row)
+            lines.append(line_number)
+        return rows, lines
+
+    @staticmethod
+    def _product_row(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Chuyển một bản ghi sản phẩm đã kiểm tra thành dòng của bảng products."""
+        return {
+            "product_id": format_product_id(record["product_id"]),
+            "name": record["name"],
+            "unit_price": Money.coerce(record["unit_price"]).to_sqlite(),
+            "calculation_unit": record.get("calculation_unit") or "đơn vị",
+            "category": record.get("category") or "Chung"
+        }
+
+    # ------------------------------------------------------------------
+    # Hóa đơn
+    # ------------------------------------------------------------------
+
+    @query_operation("import.invoices")
+    def import_invoices(self, path: str) -> tuple[Optional[ImportReport], str]:
+        """
+        Nhập hóa đơn (kèm các mục) từ file CSV/JSONL.
+
+        Một hóa đơn có bất kỳ dòng lỗi nào sẽ bị loại toàn bộ.
+
+        Tham số:
+            path: Đường dẫn file nguồn
+
+        Trả về:
+            tuple[Optional[ImportReport], str]: (Báo cáo nếu đọc được file, thông báo)
+        """
+        if self.invoice_manager is None:
+            return None, "Cần InvoiceManager để nhập hóa đơn."
+
+        report = ImportReport(source=path, kind="invoices")
+        products = {product.product_id: product for product in self.product_manager.products}
+        start = time.perf_counter()
+
+        try:
+            groups = self._iter_invoice_groups(iter_records(path))
+            for batch in batched(groups, self.batch_size):
+                invoices = []
+                for group, (invoice, errors) in zip(batch, self._validate_invoice_batch(batch, products)):
+                    report.rows_read += len(group)
+                    if invoice is None:
+                        report.rows_rejected += len(group)
+                        for line_number, message in errors:
+                            report.add_error(line_number, message)
+                        continue
+                    invoices.append(invoice)
+                report.batches += 1
+                if not invoices:
+                    continue
+
+                count, error = self._write_invoice_batch(invoices)
+                if error:
+                    for invoice in invoices:
+                        report.rows_rejected += len(invoice["items"])
+                        report.add_error(invoice["line_number"], error)
+                    continue
+
+                report.records_imported += count
+                report.rows_imported += sum(len(invoice["items"]) for invoice in invoices)
+        except (OSError, ValueError) as e:
+            return None, f"Không thể đọc file '{path}': {e}"
+        finally:
+            report.elapsed_seconds = time.perf_counter() - start
+
+        if report.records_imported:
+            self.invoice_manager.load_invoices()
+        return report, report.summary()
+
+    @staticmethod
+    def _iter_invoice_groups(records: Iterable[Tuple[int, Optional[Dict[str, Any]]]]
+                             ) -> Iterator[List[Tuple[int, Optional[Dict[str, Any]]]]]:
+        """Gom các dòng liên tiếp cùng invoice_ref thành một nhóm (một hóa đơn)."""
+        pending: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+        pending_ref = None
+        for line_number, record in records:
+            ref = record.get("invoice_ref") if record is not None else None
+            if pending and (not ref or ref != pending_ref):
+                yield pending
+                pending = []
+            pending.append((line_number, record))
+            pending_ref = ref or None
+            if not ref:
+                yield pending
+                pending = []
+        if pending:
+            yield pending
+
+    def _validate_invoice_batch(self, batch: List[List[Tuple[int, Optional[Dict[str, Any]]]]],
+                                products: Dict[str, Any]
+                                ) -> List[Tuple[Optional[Dict[str, Any]], List[Tuple[int, str]]]]:
+        """
+        Kiểm tra một lô hóa đơn theo cùng quy tắc với InvoiceManager.create_invoice.
+
+        Tên khách hàng, ngày, số lượng và đơn giá của cả lô được kiểm tra
+        theo cột; trả về (hóa đơn hoặc None, các lỗi) cho từng hóa đơn.
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        headers: List[Optional[Dict[str, Any]]] = []
+        line_sets: List[List[Tuple[int, Any]]] = []
+        for group in batch:
+            first_line, header = group[0]
+            if header is None:
+                headers.append(None)
+                line_sets.append([])
+                continue
+            headers.append({"customer_name": header.get("customer_name"), "date": header.get("date") or today})
+            if isinstance(header.get("items"), list):
+                line_sets.append([(first_line, item) for item in header["items"]])
+            else:
+                line_sets.append(group)
+
+        header_errors = validate_rows(headers, _INVOICE_HEADER_RULES)
+        records = [record for lines in line_sets for _, record in lines]
+        is_line = [isinstance(record, dict) for record in records]
+        quantity_errors = iter(check_quantity([record.get("quantity") if ok else None
+                                               for record, ok in zip(records, is_line)]))
+        price_errors = iter(check_positive_number([record.get("unit_price") if ok else None
+                                                   for record, ok in zip(records, is_line)], "Đơn giá"))
+
+        results = []
+        for group, header, invoice_errors, lines in zip(batch, headers, header_errors, line_sets):
+            first_line = group[0][0]
+            errors = [(first_line, error) for error in invoice_errors]
+            items = []
+            for line_number, record in lines:
+                quantity_error, price_error = next(quantity_errors), next(price_errors)
+                if not isinstance(record, dict):
+                    errors.append((line_number, "Bản ghi không hợp lệ."))
+                    continue
+                if quantity_error:
+                    errors.append((line_number, quantity_error))
+                    continue
+                product_id = format_product_id(record.get("product_id") or "")
+                product = products.get(product_id)
+                if product is None:
+                    errors.append((line_number, f"Sản phẩm với ID {record.get('product_id')} không tồn tại."))
+                    continue
+                unit_price = record.get("unit_price")
+                if price_error and unit_price not in (None, ""):
+                    errors.append((line_number, price_error))
+                    continue
+                try:
+                    price = product.unit_price if unit_price in (None, "") else Money.coerce(unit_price)
+                    items.append((product_id, int(record["quantity"]), price.to_sqlite()))
+                except (ValueError, OverflowError):
+                    errors.append((line_number, _INVALID_PRICE))
+
+            if header is not None and not items and not errors:
+                errors.append((first_line, "Hóa đơn phải có ít nhất một mặt hàng."))
+            if errors:
+                results.append((None, errors))
+                continue
+            results.append(({
+                "line_number": first_line,
+                "customer_name": format_customer_name(header["customer_name"]),
+                "date": header["date"],
+                "items": items
+            }, []))
+        return results
+
+    def _write_invoice_batch(self, invoices: List[Dict[str, Any]]) -> Tuple[int, str]:
+        """
+        Ghi một lô hóa đơn trong một transaction.
+
+        ID hóa đơn được cấp liên tiếp từ sqlite_sequence trong transaction
+        IMMEDIATE, nhờ đó có thể ghi cả hóa đơn lẫn các mục bằng executemany.
+        """
+        try:
+            with transaction() as uow:
+                conn = uow.connection
+
+                # Khách hàng: tạo các tên mới rồi tra lại ID theo lô
+                names = {normalize_customer_name(inv["customer_name"]): inv["customer_name"] for inv in invoices}
+                conn.executemany(
+                    "INSERT OR IGNORE INTO customers (name, normalized_name) VALUES (?, ?)",
+                    [(name, key) for key, name in names.items()]
+                )
+                customer_ids = {}
+                for chunk in batched(names.keys(), _MAX_IN_PARAMS):
+                    placeholders = ', '.join(['?' for _ in chunk])
+                    customer_ids.update(conn.execute(
+                        f"SELECT normalized_name, id FROM customers WHERE normalized_name IN ({placeholders})",
+                        chunk
+                    ).fetchall())
+
+                # Cấp ID hóa đơn liên tiếp, không dùng lại ID đã bị xóa
+                row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'invoices'").fetchone()
+                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM invoices").fetchone()[0]
+                next_id = max(row[0] if row else 0, max_id) + 1
+
+                invoice_rows = []
+                item_rows = []
+                for offset, invoice in enumerate(invoices):
+                    invoice_id = next_id + offset
+                    invoice_rows.append((
+                        invoice_id,
+                        invoice["customer_name"],
+                        invoice["date"],
+                        customer_ids[normalize_customer_name(invoice["customer_name"])]
+                    ))
+                    item_rows.extend((invoice_id, product_id, quantity, price)
+                                     for product_id, quantity, price in invoice["items"])
+
+                conn.executemany(
+                    "INSERT INTO invoices (id, customer_name, date, customer_id) VALUES (?, ?, ?, ?)",
+                    invoice_rows
+                )
+                conn.executemany(
+                    "INSERT INTO invoice_items (invoice_id, product_id, quantity, unit_price) VALUES (?, ?, ?, ?)",
+                    item_rows
+                )
+            return len(invoice_rows), ""
+        except sqlite3.Error as e:
+            return 0, f"Lỗi khi ghi lô hóa đơn: {e}"
@@ -7,72 +7,169 @@ Module này cung cấp lớp InvoiceManager để quản lý các hóa đơn
 bao gồm tạo mới, xóa, xem chi tiết và hiển thị danh sách.
 Làm việc với cả bảng invoices và invoice_items trong database.
 """
+import sqlite3
+import threading
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from models import Invoice, InvoiceItem
-from utils.db_utils import load_data, save_data, update_data, delete_data
+from models import Invoice, InvoiceItem, Money
+from utils.db_utils import (
+    load_data, save_many, insert_data, delete_data, stream_query, transaction, query_operation,
+    bind_database_methods, current_database_path
+)
 from utils.validation import (
     validate_required_field,
     validate_date_format,
     validate_quantity
 )
-from utils.formatting import format_date, format_customer_name
-from database.database import initialize_database
+from utils.formatting import format_date, format_dates, format_customer_name, normalize_customer_name
+from utils.profiling import profile_methods
+from utils.rendering import TableRenderer
+from database.context import DatabaseContext
+from database.database import ensure_database_initialized
 from .product_manager import ProductManager
 
+@profile_methods("invoice")
+@bind_database_methods
 class InvoiceManager:
     """
     Quản lý các thao tác với hóa đơn, kết nối trực tiếp với database SQLite.
+
+    Thuộc tính:
+        database (Optional[DatabaseContext]): Database của manager (mặc định
+            là database của product_manager)
     """
     
-    def __init__(self, product_manager: ProductManager):
-        """Khởi tạo và tải hóa đơn từ database."""
+    def __init__(self, product_manager: ProductManager, load: bool = True,
+                 database: Optional[DatabaseContext] = None):
+        """
+        Khởi tạo và tải hóa đơn từ database.
+
+        Tham số:
+            product_manager: Trình quản lý sản phẩm
+            load: Tải hóa đơn ngay; False để trì hoãn tới lần gọi
+                load_invoices() đầu tiên (ví dụ GUI chỉ tải khi mở tab)
+            database: Database dùng chung (mặc định: database của product_manager)
+        """
+        self.database = database if database is not None else getattr(product_manager, "database", None)
         self.product_manager = product_manager
         self.invoices: List[Invoice] = []
-        # Khởi tạo database nếu chưa tồn tại
-        initialize_database()
-        self.load_invoices()
+        # Mã hóa đơn -> hóa đơn, cập nhật cùng lúc với self.invoices
+        self._invoices_by_id: Dict[str, Invoice] = {}
+        # Tăng sau mỗi lần danh sách hóa đơn thay đổi (dùng cho ReportCache)
+        self.data_version = 0
+        # Giữ khi thay danh sách hóa đơn theo kiểu đọc-sửa-gán (xem _publish)
+        self._publish_lock = threading.Lock()
+        # Khởi tạo database nếu chưa tồn tại hoặc schema còn cũ
+        if self.database is None:
+            ensure_database_initialized(current_database_path())
+        else:
+            self.database.initialize()
+        if load:
+            self.load_invoices()
 
+    @query_operation("invoice.load")
     def load_invoices(self) -> tuple[bool, str]:
-        """Tải tất cả hóa đơn và các mục chi tiết từ database."""
-        self.invoices = []
+        """
+        Tải tất cả hóa đơn và các mục chi tiết từ database.
 
+        Các mục của mọi hóa đơn được đọc bằng một truy vấn duy nhất rồi
+        nhóm theo hóa đơn (thay vì một truy vấn cho mỗi hóa đơn).
+        Danh sách mới được dựng riêng rồi mới gán vào self.invoices, nên
+        luồng khác đang đọc không thấy danh sách tải dở.
+        """
         # Tải hóa đơn
         invoice_rows, error = load_data("invoices")
         if error:
+            self._replace_invoices([])
             return False, error
         if not invoice_rows:
+            self._replace_invoices([])
             return True, "Đã tải 0 hóa đơn từ database."
 
-        for inv_row in invoice_rows:
-            invoice_id = inv_row['id']
-
-            # Tải các mục hóa đơn
-            item_rows, error = load_data("invoice_items", {"invoice_id": invoice_id})
-            if error:
-                return False, error
-
-            items = [
-                InvoiceItem(
-                    product_id=row['product_id'],
-                    quantity=row['quantity'],
-                    unit_price=row['unit_price']
-                )
-                for row in item_rows
-            ] if item_rows else []
-
-            # Tạo đối tượng Invoice
-            invoice = Invoice(
-                invoice_id=str(invoice_id),
+        # Tải các mục hóa đơn
+        items_by_invoice: Dict[int, List[InvoiceItem]] = {}
+        try:
+            _, item_rows = stream_query(
+                "SELECT invoice_id, product_id, quantity, unit_price FROM invoice_items ORDER BY id"
+            )
+            for invoice_id, product_id, quantity, unit_price in item_rows:
+                item = InvoiceItem(product_id=product_id, quantity=quantity,
+                                   unit_price=Money.from_sqlite(unit_price))
+                items = items_by_invoice.get(invoice_id)
+                if items is None:
+                    items_by_invoice[invoice_id] = [item]
+                else:
+                    items.append(item)
+        except sqlite3.Error as e:
+            self._replace_invoices([])
+            return False, f"Lỗi khi tải dữ liệu từ bảng invoice_items: {e}"
+
+        invoices: List[Invoice] = [
+            Invoice(
+                invoice_id=str(inv_row['id']),
                 customer_name=inv_row['customer_name'],
                 date=inv_row['date'],
-                items=items
+                items=items_by_invoice.get(inv_row['id'], []),
+                customer_id=inv_row.get('customer_id')
             )
-            self.invoices.append(invoice)
+            for inv_row in invoice_rows
+        ]
 
+        self._replace_invoices(invoices)
         return True, f"Đã tải {len(self.invoices)} hóa đơn từ database."
 
+    def find_customer_id(self, customer_name: str) -> Optional[int]:
+        """
+        Tra cứu ID khách hàng theo tên (qua index trên tên đã chuẩn hóa).
+
+        Trả về:
+            Optional[int]: ID khách hàng, hoặc None nếu chưa tồn tại
+        """
+        rows, error = load_data("customers", {"normalized_name": normalize_customer_name(customer_name)})
+        if error or not rows:
+            return None
+        return rows[0]['id']
+
+    def _get_or_create_customer_id(self, customer_name: str) -> tuple[Optional[int], str]:
+        """Lấy ID khách hàng, tạo mới bản ghi customers nếu chưa có."""
+        customer_id = self.find_customer_id(customer_name)
+        if customer_id is not None:
+            return customer_id, ""
+
+        return insert_data("customers", {
+            "name": customer_name,
+            "normalized_name": normalize_customer_name(customer_name)
+        })
+
+    @query_operation("invoice.find_by_customer")
+    def find_invoices_by_customer(self, customer_name: str) -> List[Invoice]:
+        """
+        Lấy lịch sử hóa đơn của một khách hàng.
+
+        Tra cứu dùng index customers.normalized_name và invoices.customer_id
+        thay vì so khớp chuỗi trên toàn bộ danh sách hóa đơn; các hóa đơn
+        tìm được lấy từ bảng mã hóa đơn -> hóa đơn trong bộ nhớ.
+
+        Tham số:
+            customer_name: Tên khách hàng (không phân biệt hoa thường, khoảng trắng)
+
+        Trả về:
+            List[Invoice]: Danh sách hóa đơn của khách hàng (rỗng nếu không có)
+        """
+        customer_id = self.find_customer_id(customer_name)
+        if customer_id is None:
+            return []
+
+        rows, error = load_data("invoices", {"customer_id": customer_id})
+        if error or not rows:
+            return []
+
+        invoices_by_id = self._invoices_by_id
+        invoices = (invoices_by_id.get(str(row['id'])) for row in rows)
+        return [invoice for invoice in invoices if invoice is not None]
+
+    @query_operation("invoice.create")
     def create_invoice(self, customer_name: str, items_data: List[Dict[str, Any]], date: Optional[str] = None) -> tuple[Optional[Invoice], str]:
         """
         Tạo một hóa đơn mới trong database.
@@ -81,6 +178,34 @@ class InvoiceManager:
         Trả về:
             tuple[Optional[Invoice], str]: (Invoice object nếu thành công, thông báo lỗi nếu có)
         """
+        prepared, error = self._prepare_invoice(customer_name, items_data, date)
+        if prepared is None:
+            return None, error
+
+        # Khách hàng, hóa đơn và các mục được ghi trong một transaction:
+        # lỗi ở bất kỳ bước nào sẽ hủy toàn bộ, không để lại hóa đơn thiếu mục
+        try:
+            with transaction() as uow:
+                invoice, error = self._insert_invoice(prepared)
+                if invoice is None:
+                    uow.rollback()
+                    return None, error
+        except sqlite3.Error as e:
+            return None, f"Lỗi khi tạo hóa đơn: {e}"
+
+        # Thêm hóa đơn vừa ghi vào danh sách trong bộ nhớ thay vì tải lại tất cả
+        self._publish(added=[invoice])
+        return invoice, f"Đã tạo thành công hóa đơn #{invoice.invoice_id} cho khách hàng '{invoice.customer_name}'."
+
+    def _prepare_invoice(self, customer_name: str, items_data: List[Dict[str, Any]],
+                         date: Optional[str] = None) -> tuple[Optional[Dict[str, Any]], str]:
+        """
+        Xác thực và chuẩn hóa dữ liệu hóa đơn (không truy cập database).
+
+        Trả về:
+            tuple[Optional[Dict], str]: (Dữ liệu gồm customer_name, date và
+            items [(product_id, quantity, unit_price)], thông báo lỗi nếu có)
+        """
         # Xác thực đầu vào
         valid, error = validate_required_field(customer_name, "Tên khách hàng")
         if not valid:
@@ -94,54 +219,93 @@ class InvoiceManager:
         if not valid:
             return None, error
 
-        # Định dạng đầu vào
-        customer_name = format_customer_name(customer_name)
-
-        # Xác thực các mục
+        # Xác thực các mục, chốt đơn giá tại thời điểm tạo
+        items = []
         for item in items_data:
             valid, error = validate_quantity(item.get('quantity'))
             if not valid:
                 return None, error
-            if not self.product_manager.find_product(item.get('product_id')):
+            # Giá hiện tại lấy từ bộ nhớ đệm giá của ProductManager
+            unit_price = self.product_manager.current_price(item.get('product_id'))
+            if unit_price is None:
                 return None, f"Sản phẩm với ID {item.get('product_id')} không tồn tại."
-        
-        # Chèn hóa đơn
-        invoice_data = {
-            "customer_name": customer_name,
-            "date": invoice_date
-        }
+            items.append((item['product_id'], item['quantity'], unit_price))
 
-        success, error = save_data("invoices", invoice_data)
-        if not success:
-            return None, error
+        return {
+            "customer_name": format_customer_name(customer_name),
+            "date": invoice_date,
+            "items": items
+        }, ""
 
-        # Lấy ID hóa đơn mới
-        new_invoice, error = load_data("invoices", {"customer_name": customer_name, "date": invoice_date})
-        if error:
+    def _insert_invoice(self, prepared: Dict[str, Any]) -> tuple[Optional[Invoice], str]:
+        """
+        Ghi khách hàng, hóa đơn và các mục từ dữ liệu của _prepare_invoice.
+
+        Phải được gọi bên trong transaction(); nơi gọi rollback khi lỗi.
+
+        Trả về:
+            tuple[Optional[Invoice], str]: (Hóa đơn vừa ghi, thông báo lỗi nếu có)
+        """
+        customer_name = prepared["customer_name"]
+        customer_id, error = self._get_or_create_customer_id(customer_name)
+        if customer_id is None:
             return None, error
-        if not new_invoice:
-            return None, "Không thể tìm thấy hóa đơn vừa tạo."
 
-        new_invoice_id = new_invoice[0]['id']
+        new_invoice_id, error = insert_data("invoices", {
+            "customer_name": customer_name,
+            "date": prepared["date"],
+            "customer_id": customer_id
+        })
+        if new_invoice_id is None:
+            return None, error
 
-        # Chèn các mục
-        for item_data in items_data:
-            product = self.product_manager.find_product(item_data['product_id'])
-            item_data = {
+        _, error = save_many("invoice_items", [
+            {
                 "invoice_id": new_invoice_id,
-                "product_id": item_data['product_id'],
-                "quantity": item_data['quantity'],
-                "unit_price": product.unit_price
+                "product_id": product_id,
+                "quantity": quantity,
+                "unit_price": unit_price.to_sqlite()
             }
-            success, error = save_data("invoice_items", item_data)
-            if not success:
-                return None, error
+            for product_id, quantity, unit_price in prepared["items"]
+        ])
+        if error:
+            return None, error
 
-        self.load_invoices()
-        new_invoice = self.find_invoice(str(new_invoice_id))
-        if new_invoice:
-            return new_invoice, f"Đã tạo thành công hóa đơn #{new_invoice.invoice_id} cho khách hàng '{customer_name}'."
-        return None, "Không thể tạo hóa đơn."
+        return Invoice(
+            invoice_id=str(new_invoice_id),
+            customer_name=customer_name,
+            date=prepared["date"],
+            items=[InvoiceItem(product_id, quantity, unit_price)
+                   for product_id, quantity, unit_price in prepared["items"]],
+            customer_id=customer_id
+        ), ""
+
+    def _replace_invoices(self, invoices: List[Invoice]) -> None:
+        """Thay toàn bộ danh sách hóa đơn trong bộ nhớ (sau khi tải lại)."""
+        with self._publish_lock:
+            self._invoices_by_id = {invoice.invoice_id: invoice for invoice in invoices}
+            self.invoices = invoices
+            self.data_version += 1
+
+    def _publish(self, added: Optional[List[Invoice]] = None, removed_id: Optional[str] = None) -> None:
+        """
+        Cập nhật danh sách hóa đơn trong bộ nhớ sau khi ghi, không tải lại.
+
+        Danh sách mới được gán một lần (luồng đọc luôn thấy danh sách đầy
+        đủ); khóa ngăn hai luồng ghi làm mất thay đổi của nhau.
+        """
+        with self._publish_lock:
+            invoices = self.invoices
+            invoices_by_id = dict(self._invoices_by_id)
+            if removed_id is not None:
+                invoices = [invoice for invoice in invoices if invoice.invoice_id != removed_id]
+                invoices_by_id.pop(removed_id, None)
+            if added:
+                invoices = invoices + added
+                invoices_by_id.update((invoice.invoice_id, invoice) for invoice in added)
+            self._invoices_by_id = invoices_by_id
+            self.invoices = invoices
+            self.data_version += 1
 
     def find_invoice(self, invoice_id: str) -> Optional[Invoice]:
         """Tìm một hóa đơn theo ID trong danh sách đã tải."""
@@ -150,6 +314,7 @@ class InvoiceManager:
                 return invoice
         return None
 
+    @query_operation("invoice.delete")
     def delete_invoice(self, invoice_id: str) -> tuple[bool, str]:
         """
         Xóa hóa đơn khỏi database.
@@ -166,18 +331,23 @@ class InvoiceManager:
             return False, f"Không tìm thấy hóa đơn với ID '{invoice_id}'!"
 
         try:
-            # Xóa các mục hóa đơn trước (foreign key constraint)
-            success, error = delete_data("invoice_items", {"invoice_id": int(invoice_id)})
-            if not success:
-                return False, f"Không thể xóa các mục hóa đơn: {error}"
+            invoice_pk = int(invoice_id)
 
-            # Xóa hóa đơn
-            success, error = delete_data("invoices", {"id": int(invoice_id)})
-            if not success:
-                return False, f"Không thể xóa hóa đơn: {error}"
+            # Xóa các mục và hóa đơn trong một transaction
+            with transaction() as uow:
+                # Xóa các mục hóa đơn trước (foreign key constraint)
+                success, error = delete_data("invoice_items", {"invoice_id": invoice_pk})
+                if not success:
+                    uow.rollback()
+                    return False, f"Không thể xóa các mục hóa đơn: {error}"
 
-            # Tải lại danh sách hóa đơn
-            self.load_invoices()
+                # Xóa hóa đơn
+                success, error = delete_data("invoices", {"id": invoice_pk})
+                if not success:
+                    uow.rollback()
+                    return False, f"Không thể xóa hóa đơn: {error}"
+
+            self._publish(removed_id=invoice_id)
 
             return True, f"Đã xóa thành công hóa đơn #{invoice_id} của khách hàng '{invoice.customer_name}'."
 
@@ -193,39 +363,47 @@ class InvoiceManager:
             print(f"Không tìm thấy hóa đơn với Mã '{invoice_id}'.")
             return
 
-        print("\n" + "="*80)
-        print(f"CHI TIẾT HÓA ĐƠN #{invoice.invoice_id}")
-        print(f"Khách hàng: {invoice.customer_name}")
-        print(f"Ngày: {format_date(invoice.date)}")
-        print("="*80)
-        print(f"{'MÃ SP':<10} {'TÊN SẢN PHẨM':<30} {'SL':>5} {'ĐƠN GIÁ':>15} {'THÀNH TIỀN':>15}")
-        print("-"*80)
-
-        for item in invoice.items:
-            product = self.product_manager.find_product(item.product_id)
-            product_name = product.name if product else "[Sản phẩm đã bị xóa]"
-            total_price = item.quantity * item.unit_price
-            print(f"{item.product_id:<10} {product_name:<30} {item.quantity:>5} "
-                  f"{item.unit_price:>15,.2f} {total_price:>15,.2f}")
-        
-        print("-"*80)
-        print(f"{'TỔNG CỘNG:':<64} {invoice.total_amount:>15,.2f}")
-        print("="*80)
-
-    def list_invoices(self) -> None:
-        """Hiển thị danh sách hóa đơn (dùng cho CLI)."""
+        def item_rows():
+            for item in invoice.items:
+                product = self.product_manager.find_product(item.product_id)
+                product_name = product.name if product else "[Sản phẩm đã bị xóa]"
+                yield item.product_id, product_name, item.quantity, item.unit_price, item.total_price
+
+        with TableRenderer() as table:
+            table.line()
+            table.rule("=", 80)
+            table.line(f"CHI TIẾT HÓA ĐƠN #{invoice.invoice_id}")
+            table.line(f"Khách hàng: {invoice.customer_name}")
+            table.line(f"Ngày: {format_date(invoice.date)}")
+            table.rule("=", 80)
+            table.row("{:<10} {:<30} {:>5} {:>15} {:>15}", "MÃ SP", "TÊN SẢN PHẨM", "SL", "ĐƠN GIÁ", "THÀNH TIỀN")
+            table.rule("-", 80)
+            table.rows("{:<10} {:<30} {:>5} {:>15,.2f} {:>15,.2f}", item_rows())
+            table.rule("-", 80)
+            table.row("{:<64} {:>15,.2f}", "TỔNG CỘNG:", invoice.total_amount)
+            table.rule("=", 80)
+
+    def list_invoices(self, flush_every: int = 0) -> None:
+        """
+        Hiển thị danh sách hóa đơn (dùng cho CLI).
+
+        Tham số:
+            flush_every: Ghi ra màn hình sau mỗi flush_every dòng
+                (0: ghi cả bảng một lần)
+        """
         if not self.invoices:
             print("Danh sách hóa đơn trống!")
             return
-        
-        print("\n" + "="*80)
-        print(f"{'MÃ HĐ':<10} {'KHÁCH HÀNG':<30} {'NGÀY':<15} {'SỐ MẶT HÀNG':>15} {'TỔNG TIỀN':>15}")
-        print("-"*80)
-        
-        for invoice in self.invoices:
-            print(f"#{invoice.invoice_id:<9} {invoice.customer_name:<30} {format_date(invoice.date):<15} "
-                  f"{invoice.total_items:>15} {invoice.total_amount:>15,.2f}")
-        
-        print("="*80)
-        print(f"Tổng số: {len(self.invoices)} hóa đơn")
-        print("="*80) 
\ No newline at end of file
+
+        dates = format_dates([invoice.date for invoice in self.invoices])
+        with TableRenderer(flush_every=flush_every) as table:
+            table.line()
+            table.rule("=", 80)
+            table.row("{:<10} {:<30} {:<15} {:>15} {:>15}", "MÃ HĐ", "KHÁCH HÀNG", "NGÀY", "SỐ MẶT HÀNG", "TỔNG TIỀN")
+            table.rule("-", 80)
+            table.rows("#{:<9} {:<30} {:<15} {:>15} {:>15,.2f}",
+                       ((invoice.invoice_id, invoice.customer_name, date, invoice.total_items, invoice.total_amount)
+                        for invoice, date in zip(self.invoices, dates)))
+            table.rule("=", 80)
+            table.line(f"Tổng số: {len(self.invoices)} hóa đơn")
+            table.rule("=", 80) 
\ No newline at end of file
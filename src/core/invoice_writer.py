@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hàng đợi ghi hóa đơn với group commit.
+
+Khi nhiều nơi cùng tạo hóa đơn với tần suất cao, mỗi hóa đơn một
+transaction nghĩa là mỗi hóa đơn một lần fsync. InvoiceWriteQueue gom
+các yêu cầu tạo hóa đơn lại: một luồng ghi duy nhất lấy các yêu cầu đang
+chờ (tối đa max_batch, hoặc chờ thêm tối đa max_delay_ms) và ghi chúng
+trong một transaction, nên số lần fsync tỉ lệ với số lô thay vì số hóa đơn.
+
+Mỗi hóa đơn trong lô có SAVEPOINT riêng: hóa đơn lỗi chỉ bị hủy phần của
+nó, các hóa đơn khác trong lô vẫn được commit. Kết quả của từng yêu cầu
+được trả về qua một Future sau khi lô đã commit.
+
+Ví dụ:
+    with InvoiceWriteQueue(invoice_manager) as queue:
+        future = queue.submit("Nguyễn Văn A", [{"product_id": "SP001", "quantity": 2}])
+        invoice, message = future.result()
+"""
+
+import contextlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Invoice
+from utils.db_utils import open_connection, bind_connection, transaction, query_operation, use_database
+from .invoice_manager import InvoiceManager
+
+# Phần tử đánh dấu yêu cầu dừng luồng ghi
+_STOP = object()
+
+
+class InvoiceWriteQueue:
+    """
+    Hàng đợi một luồng ghi, gom các lần tạo hóa đơn thành transaction theo lô.
+
+    Thuộc tính:
+        invoice_manager (InvoiceManager): Manager dùng để xác thực và ghi hóa đơn
+        max_batch (int): Số hóa đơn tối đa trong một transaction
+        max_delay_ms (float): Thời gian tối đa chờ thêm yêu cầu cho một lô
+
+    Ghi chú:
+        Dữ liệu được xác thực ngay trên luồng gọi submit, nên yêu cầu không
+        hợp lệ có kết quả ngay mà không vào hàng đợi. Hóa đơn đã ghi được
+        thêm vào invoice_manager.invoices sau mỗi lô (không tải lại toàn bộ).
+        Luồng ghi dùng database của invoice_manager (invoice_manager.database).
+    """
+
+    def __init__(self, invoice_manager: InvoiceManager, max_batch: int = 200,
+                 max_delay_ms: float = 5, busy_timeout_ms: int = 5000):
+        """Khởi tạo hàng đợi và khởi động luồng ghi."""
+        if max_batch <= 0:
+            raise ValueError("Kích thước lô phải lớn hơn 0.")
+        self.invoice_manager = invoice_manager
+        self._database = getattr(invoice_manager, "database", None)
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self._busy_timeout_ms = busy_timeout_ms
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._invoices = 0
+        self._max_batch_seen = 0
+        self._thread = threading.Thread(target=self._run, name="invoice-group-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, customer_name: str, items_data: List[Dict[str, Any]],
+               date: Optional[str] = None) -> 'Future[Tuple[Optional[Invoice], str]]':
+        """
+        Gửi một yêu cầu tạo hóa đơn.
+
+        Tham số:
+            customer_name, items_data, date: Giống InvoiceManager.create_invoice
+
+        Trả về:
+            Future: Kết quả là (Invoice nếu thành công, thông báo) như create_invoice
+
+        Ném ra:
+            RuntimeError: Nếu hàng đợi đã đóng
+        """
+        future: Future = Future()
+        with use_database(self._database):
+            prepared, error = self.invoice_manager._prepare_invoice(customer_name, items_data, date)
+        if prepared is None:
+            future.set_result((None, error))
+            return future
+
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("InvoiceWriteQueue đã đóng.")
+            self._queue.put((prepared, future))
+        return future
+
+    def create_invoice(self, customer_name: str, items_data: List[Dict[str, Any]],
+                       date: Optional[str] = None) -> Tuple[Optional[Invoice], str]:
+        """Gửi yêu cầu và chờ kết quả (giao diện giống InvoiceManager.create_invoice)."""
+        return self.submit(customer_name, items_data, date).result()
+
+    def _collect(self, first: Any) -> Tuple[List[Tuple[Dict[str, Any], Future]], bool]:
+        """Gom thêm yêu cầu sau yêu cầu đầu tiên cho đến khi đủ lô hoặc hết thời gian chờ."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay_ms / 1000
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        """Vòng lặp của luồng ghi."""
+        try:
+            path = self._database.path if self._database is not None else None
+            conn = open_connection(busy_timeout_ms=self._busy_timeout_ms, path=path)
+        except sqlite3.Error as e:
+            conn, open_error = None, f"Lỗi khi ghi lô hóa đơn: {e}"
+
+        with bind_connection(conn) if conn is not None else contextlib.nullcontext():
+            stopping = False
+            while not stopping:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch, stopping = self._collect(first)
+                if conn is None:
+                    # Không mở được database: mọi yêu cầu đều nhận lỗi
+                    for _, future in batch:
+                        future.set_result((None, open_error))
+                else:
+                    self._write_batch(conn, batch)
+        if conn is not None:
+            conn.close()
+
+    @query_operation("invoice.write_batch")
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        """Ghi một lô trong một transaction và trả kết quả cho các Future sau khi commit."""
+        results: List[Tuple[Optional[Invoice], str]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for prepared, _ in batch:
+                with transaction() as uow:
+                    invoice, error = self.invoice_manager._insert_invoice(prepared)
+                    if invoice is None:
+                        uow.rollback()
+                results.append((invoice, error))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_result((None, f"Lỗi khi ghi lô hóa đơn: {e}"))
+            return
+        except Exception as e:
+            # Lỗi ngoài SQLite: chuyển exception cho nơi gọi thay vì làm dừng luồng ghi
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        written = [invoice for invoice, _ in results if invoice is not None]
+        if written:
+            self.invoice_manager._publish(added=written)
+        with self._stats_lock:
+            self._batches += 1
+            self._invoices += len(written)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        for (_, future), (invoice, error) in zip(batch, results):
+            if invoice is None:
+                future.set_result((None, error))
+            else:
+                future.set_result((invoice, f"Đã tạo thành công hóa đơn #{invoice.invoice_id} "
+                                            f"cho khách hàng '{invoice.customer_name}'."))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Số liệu của hàng đợi.
+
+        Trả về:
+            Dict[str, Any]: batches, invoices, mean_batch_size, max_batch_size, pending
+        """
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "invoices": self._invoices,
+                "mean_batch_size": round(self._invoices / self._batches, 2) if self._batches else 0.0,
+                "max_batch_size": self._max_batch_seen,
+                "pending": self._queue.qsize(),
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Ngừng nhận yêu cầu; các yêu cầu đã gửi vẫn được ghi trước khi luồng dừng.
+
+        Tham số:
+            wait: Chờ luồng ghi kết thúc
+        """
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def __enter__(self) -> 'InvoiceWriteQueue':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bảo trì database cho Hệ thống Quản lý Hóa đơn.
+
+Sau nhiều tháng xóa hóa đơn/sản phẩm, file database có nhiều trang trống
+và bộ lập kế hoạch truy vấn thiếu thống kê. Module này cung cấp lớp
+MaintenanceManager với ba tác vụ:
+- optimize: PRAGMA optimize (hoặc ANALYZE đầy đủ) để cập nhật thống kê
+- vacuum: PRAGMA incremental_vacuum trả trang trống về cho hệ điều hành
+  (cần auto_vacuum = INCREMENTAL, bật bởi migration v4)
+- check: PRAGMA quick_check kiểm tra tính toàn vẹn
+
+Mỗi tác vụ trả về MaintenanceResult ghi thời gian chạy và dung lượng thu
+hồi. Các tác vụ có thể chạy từ CLI (lệnh db) hoặc định kỳ trên một luồng
+nền (start_schedule), ví dụ khi chạy dịch vụ HTTP.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from database.context import DatabaseContext
+from utils.db_utils import bind_database_methods, open_connection, query_operation
+
+logger = logging.getLogger(__name__)
+
+TASKS = ("optimize", "vacuum", "check")
+
+# Giá trị PRAGMA auto_vacuum
+_AUTO_VACUUM_INCREMENTAL = 2
+
+@dataclass
+class MaintenanceResult:
+    """
+    Kết quả một tác vụ bảo trì.
+
+    Thuộc tính:
+        task (str): Tên tác vụ (một trong TASKS)
+        success (bool): Tác vụ chạy thành công và database không có lỗi
+        elapsed_seconds (float): Thời gian chạy
+        reclaimed_bytes (int): Dung lượng file giảm được (tác vụ vacuum)
+        details (str): Mô tả kết quả
+    """
+    task: str
+    success: bool = True
+    elapsed_seconds: float = 0.0
+    reclaimed_bytes: int = 0
+    details: str = ""
+
+    def summary(self) -> str:
+        """Tóm tắt kết quả dưới dạng một dòng thông báo."""
+        status = "OK" if self.success else "LỖI"
+        reclaimed = f", thu hồi {self.reclaimed_bytes:,} bytes" if self.reclaimed_bytes else ""
+        return f"[{status}] {self.task}: {self.details} ({self.elapsed_seconds:.3f}s{reclaimed})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển kết quả sang dict (dùng cho JSON)."""
+        return {
+            "task": self.task,
+            "success": self.success,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "details": self.details,
+        }
+
+
+@bind_database_methods
+class MaintenanceManager:
+    """
+    Chạy các tác vụ bảo trì trên database của manager.
+
+    Thuộc tính:
+        busy_timeout_ms (int): Thời gian chờ khi database đang bị khóa
+        vacuum_pages (Optional[int]): Số trang tối đa mỗi lần
+            incremental_vacuum (None: toàn bộ freelist); giới hạn để mỗi
+            lần giữ khóa ghi ngắn
+        database (Optional[DatabaseContext]): Database được bảo trì (None:
+            database hiện hành)
+    """
+
+    def __init__(self, busy_timeout_ms: int = 5000, vacuum_pages: Optional[int] = None,
+                 database: Optional[DatabaseContext] = None):
+        """Khởi tạo trình bảo trì."""
+        self.busy_timeout_ms = busy_timeout_ms
+        self.vacuum_pages = vacuum_pages
+        self.database = database
+        self._schedule_stop = threading.Event()
+        self._schedule_thread: Optional[threading.Thread] = None
+
+    @query_operation("maintenance.optimize")
+    def optimize(self, full: bool = False) -> MaintenanceResult:
+        """
+        Cập nhật thống kê cho bộ lập kế hoạch truy vấn.
+
+        Tham số:
+            full: Chạy ANALYZE trên toàn bộ database thay vì PRAGMA optimize
+                (chỉ phân tích các bảng cần thiết)
+
+        Trả về:
+            MaintenanceResult: Kết quả
+        """
+        def run(conn: sqlite3.Connection) -> str:
+            if full:
+                conn.execute("ANALYZE")
+                return "đã chạy ANALYZE"
+            conn.execute("PRAGMA optimize")
+            return "đã chạy PRAGMA optimize"
+        return self._run("optimize", run)
+
+    @query_operation("maintenance.vacuum")
+    def vacuum(self) -> MaintenanceResult:
+        """
+        Trả các trang trống về cho hệ điều hành.
+
+        Dùng PRAGMA incremental_vacuum khi database ở chế độ
+        auto_vacuum = INCREMENTAL; nếu chưa (migration v4 chưa chạy được
+        VACUUM), chạy VACUUM toàn bộ một lần để bật chế độ này.
+
+        Trả về:
+            MaintenanceResult: Kết quả, kèm dung lượng thu hồi
+        """
+        def run(conn: sqlite3.Connection) -> str:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == _AUTO_VACUUM_INCREMENTAL:
+                limit = f"({int(self.vacuum_pages)})" if self.vacuum_pages else ""
+                # incremental_vacuum trả về một dòng cho mỗi trang được giải phóng
+                conn.execute(f"PRAGMA incremental_vacuum{limit}").fetchall()
+                method = "incremental_vacuum"
+            else:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                method = "VACUUM (bật auto_vacuum = INCREMENTAL)"
+            pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            result.reclaimed_bytes = max(pages_before - pages_after, 0) * page_size
+            return (f"{method}: {free_before} -> {free_after} trang trống, "
+                    f"{pages_before} -> {pages_after} trang")
+
+        result = MaintenanceResult("vacuum")
+        return self._run("vacuum", run, result)
+
+    @query_operation("maintenance.check")
+    def quick_check(self) -> MaintenanceResult:
+        """
+        Kiểm tra tính toàn vẹn bằng PRAGMA quick_check.
+
+        Trả về:
+            MaintenanceResult: success = False nếu phát hiện lỗi (details
+                liệt kê các lỗi đầu tiên)
+        """
+        def run(conn: sqlite3.Connection) -> str:
+            problems = [row[0] for row in conn.execute("PRAGMA quick_check(20)")]
+            if problems == ["ok"]:
+                return "không phát hiện lỗi"
+            result.success = False
+            return "; ".join(problems)
+
+        result = MaintenanceResult("check")
+        return self._run("check", run, result)
+
+    def run(self, tasks: Sequence[str] = TASKS) -> List[MaintenanceResult]:
+        """
+        Chạy lần lượt các tác vụ.
+
+        Tham số:
+            tasks: Các tác vụ trong TASKS, theo thứ tự chạy
+
+        Trả về:
+            List[MaintenanceResult]: Kết quả từng tác vụ
+
+        Ném ra:
+            ValueError: Nếu có tác vụ không hợp lệ
+        """
+        self._validate_tasks(tasks)
+        actions = {"optimize": self.optimize, "vacuum": self.vacuum, "check": self.quick_check}
+        return [actions[task]() for task in tasks]
+
+    def start_schedule(self, interval_seconds: float, tasks: Sequence[str] = TASKS) -> None:
+        """
+        Chạy các tác vụ định kỳ trên một luồng nền.
+
+        Lần chạy đầu tiên diễn ra sau interval_seconds. Kết quả được ghi
+        log; lỗi của một lần chạy không dừng lịch.
+
+        Tham số:
+            interval_seconds: Khoảng cách giữa hai lần chạy
+            tasks: Các tác vụ cần chạy
+
+        Ném ra:
+            ValueError: Nếu khoảng cách không hợp lệ hoặc có tác vụ không hợp lệ
+            RuntimeError: Nếu lịch đã được khởi động
+        """
+        if interval_seconds <= 0:
+            raise ValueError("Khoảng cách giữa hai lần bảo trì phải lớn hơn 0.")
+        self._validate_tasks(tasks)
+        if self._schedule_thread is not None:
+            raise RuntimeError("Lịch bảo trì đã được khởi động.")
+
+        def loop() -> None:
+            while not self._schedule_stop.wait(interval_seconds):
+                try:
+                    for result in self.run(tasks):
+                        logger.info("Bảo trì %s", result.summary())
+                except Exception:  # giữ lịch chạy tiếp cho lần sau
+                    logger.exception("Lỗi khi bảo trì database")
+
+        self._schedule_stop.clear()
+        self._schedule_thread = threading.Thread(target=loop, name="db-maintenance", daemon=True)
+        self._schedule_thread.start()
+
+    def stop_schedule(self) -> None:
+        """Dừng lịch bảo trì (chờ lần chạy đang dở kết thúc)."""
+        if self._schedule_thread is None:
+            return
+        self._schedule_stop.set()
+        self._schedule_thread.join()
+        self._schedule_thread = None
+
+    @staticmethod
+    def _validate_tasks(tasks: Sequence[str]) -> None:
+        """Ném ValueError nếu có tác vụ không nằm trong TASKS."""
+        unknown = [task for task in tasks if task not in TASKS]
+        if unknown:
+            raise ValueError(f"Tác vụ bảo trì không hợp lệ: {', '.join(unknown)}. "
+                             f"Các tác vụ hợp lệ: {', '.join(TASKS)}.")
+
+    def _run(self, task: str, action, result: Optional[MaintenanceResult] = None) -> MaintenanceResult:
+        """Chạy một tác vụ trên kết nối autocommit riêng và đo thời gian."""
+        result = result or MaintenanceResult(task)
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = open_connection(busy_timeout_ms=self.busy_timeout_ms)
+            result.details = action(conn)
+        except sqlite3.Error as e:
+            result.success = False
+            result.details = f"Lỗi khi bảo trì database ({task}): {e}"
+        finally:
+            if conn is not None:
+                conn.close()
+            result.elapsed_seconds = time.perf_counter() - start
+        return result
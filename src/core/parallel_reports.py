@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tính báo cáo thống kê song song trên nhiều tiến trình.
+
+Dùng cho các báo cáo trên khoảng dữ liệu rất lớn (nhiều năm): dữ liệu
+được chia thành các phân vùng, mỗi tiến trình con mở một kết nối SQLite
+chỉ đọc riêng, tính kết quả từng phần (PartialAggregate) cho phân vùng
+của mình, rồi tiến trình chính gộp các kết quả lại.
+
+Cách chia phân vùng:
+- revenue_by_date, revenue_by_product: theo khoảng ID hóa đơn
+- top_customers: theo khoảng ID khách hàng (cộng một phân vùng cho hóa
+  đơn cũ chưa có customer_id). Vì mỗi khách hàng chỉ nằm trong một phân
+  vùng, mỗi tiến trình chỉ cần trả về top-K ứng viên của mình.
+
+Mọi kết quả từng phần đều gộp được bằng phép cộng (tổng tiền, số lượng)
+nên thứ tự hoàn thành của các tiến trình không ảnh hưởng kết quả. Các
+năm đã lưu trữ (xem ArchiveManager) chỉ được đọc khi khoảng ngày chạm tới.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.request import pathname2url
+
+from database.database import connect_database, is_memory_database
+
+from .archive_manager import archives_for_range
+
+REPORTS = ("revenue_by_date", "revenue_by_product", "top_customers")
+
+# Phân vùng: (loại, cận dưới, cận trên không bao gồm, các schema cần đọc)
+Partition = Tuple[str, int, int, Tuple[str, ...]]
+
+_REVENUE = "SUM(ii.quantity * ii.unit_price)"
+
+
+@dataclass
+class PartialAggregate:
+    """
+    Kết quả từng phần của một báo cáo, gộp được với nhau.
+
+    Thuộc tính:
+        sums (Dict[Any, List[int]]): Khóa nhóm -> các giá trị cộng dồn
+            (doanh thu; với revenue_by_product là [số lượng, doanh thu])
+        names (Dict[Any, str]): Tên hiển thị của khóa nhóm (top_customers)
+        total (int): Tổng doanh thu của phân vùng (đơn vị nhỏ nhất)
+    """
+    sums: Dict[Any, List[int]] = field(default_factory=dict)
+    names: Dict[Any, str] = field(default_factory=dict)
+    total: int = 0
+
+    def merge(self, other: 'PartialAggregate') -> 'PartialAggregate':
+        """Cộng dồn một kết quả từng phần khác vào kết quả này."""
+        for key, values in other.sums.items():
+            current = self.sums.get(key)
+            if current is None:
+                self.sums[key] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    current[index] += value
+        for key, name in other.names.items():
+            self.names.setdefault(key, name)
+        self.total += other.total
+        return self
+
+
+def _date_filter(date_from: Optional[str], date_to: Optional[str]) -> Tuple[str, List[str]]:
+    clauses, params = [], []
+    if date_from:
+        clauses.append("i.date >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("i.date <= ?")
+        params.append(date_to)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+def _open_read_only(db_path: str) -> sqlite3.Connection:
+    if is_memory_database(db_path):
+        return connect_database(db_path)
+    return sqlite3.connect(_read_only_uri(db_path), uri=True)
+
+def _read_only_uri(path: str) -> str:
+    return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+def _attach(conn: sqlite3.Connection, schemas: Tuple[str, ...], archives: Dict[str, str]) -> None:
+    for schema in schemas:
+        if schema != "main":
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (_read_only_uri(archives[schema]),))
+
+def aggregate_partition(db_path: str, report: str, partition: Partition,
+                        date_from: Optional[str] = None, date_to: Optional[str] = None,
+                        limit: int = 5, archives: Optional[Dict[str, str]] = None) -> PartialAggregate:
+    """
+    Tính kết quả từng phần của một báo cáo trên một phân vùng.
+
+    Chạy trong tiến trình con, với kết nối chỉ đọc riêng.
+
+    Tham số:
+        db_path: Đường dẫn file database
+        report: Một trong REPORTS
+        partition: Phân vùng (xem plan_partitions)
+        date_from, date_to: Khoảng ngày YYYY-MM-DD (tùy chọn)
+        limit: Số khách hàng tối đa (top_customers)
+        archives: Schema -> file lưu trữ theo năm mà phân vùng cần đọc
+
+    Trả về:
+        PartialAggregate: Kết quả từng phần
+    """
+    kind, low, high, schemas = partition
+    date_sql, date_params = _date_filter(date_from, date_to)
+    partial = PartialAggregate()
+
+    conn = _open_read_only(db_path)
+    try:
+        _attach(conn, schemas, archives or {})
+        for schema in schemas:
+            invoices, items = f"{schema}.invoices", f"{schema}.invoice_items"
+            if report == "revenue_by_date":
+                rows = conn.execute(f"""
+                    SELECT i.date, {_REVENUE} FROM {invoices} i
+                    JOIN {items} ii ON ii.invoice_id = i.id
+                    WHERE i.id >= ? AND i.id < ?{date_sql}
+                    GROUP BY i.date
+                """, [low, high] + date_params)
+                partial.merge(PartialAggregate({date: [int(revenue)] for date, revenue in rows}))
+            elif report == "revenue_by_product":
+                rows = conn.execute(f"""
+                    SELECT ii.product_id, SUM(ii.quantity), {_REVENUE} FROM {invoices} i
+                    JOIN {items} ii ON ii.invoice_id = i.id
+                    WHERE i.id >= ? AND i.id < ?{date_sql}
+                    GROUP BY ii.product_id
+                """, [low, high] + date_params)
+                partial.merge(PartialAggregate({product_id: [int(quantity), int(revenue)]
+                                                for product_id, quantity, revenue in rows}))
+            elif kind == "legacy":
+                # Hóa đơn cũ chưa có customer_id: nhóm theo tên như StatisticsManager
+                rows = conn.execute(f"""
+                    SELECT i.customer_name, i.customer_name, {_REVENUE} FROM {invoices} i
+                    JOIN {items} ii ON ii.invoice_id = i.id
+                    WHERE i.customer_id IS NULL{date_sql}
+                    GROUP BY i.customer_name
+                """, date_params)
+                partial.merge(PartialAggregate({key: [int(revenue)] for key, _, revenue in rows}))
+            else:
+                rows = conn.execute(f"""
+                    SELECT i.customer_id, MIN(COALESCE(c.name, i.customer_name)), {_REVENUE}
+                    FROM {invoices} i
+                    JOIN {items} ii ON ii.invoice_id = i.id
+                    LEFT JOIN main.customers c ON c.id = i.customer_id
+                    WHERE i.customer_id >= ? AND i.customer_id < ?{date_sql}
+                    GROUP BY i.customer_id
+                """, [low, high] + date_params)
+                groups = [(key, name, int(revenue)) for key, name, revenue in rows]
+                partial.merge(PartialAggregate({key: [revenue] for key, _, revenue in groups},
+                                               {key: name for key, name, _ in groups}))
+    finally:
+        conn.close()
+
+    if report == "top_customers":
+        partial.total = sum(values[0] for values in partial.sums.values())
+        # Khách hàng không nằm ở phân vùng khác nên chỉ cần giữ top-K ứng viên
+        top = sorted(partial.sums.items(), key=lambda item: item[1][0], reverse=True)[:max(limit, 0)]
+        partial.sums = dict(top)
+        partial.names = {key: partial.names.get(key, key) for key in partial.sums}
+        return partial
+
+    revenue_index = 1 if report == "revenue_by_product" else 0
+    partial.total = sum(values[revenue_index] for values in partial.sums.values())
+    return partial
+
+def plan_partitions(db_path: str, report: str, partitions: int,
+                    date_from: Optional[str] = None, date_to: Optional[str] = None,
+                    archives: Optional[Dict[str, str]] = None) -> List[Partition]:
+    """
+    Chia dữ liệu của báo cáo thành các khoảng ID đều nhau.
+
+    Báo cáo theo hóa đơn được chia tối đa `partitions` khoảng cho mỗi
+    schema (database chính và từng năm lưu trữ); báo cáo theo khách hàng
+    chia theo khoảng ID khách hàng, mỗi phân vùng đọc mọi schema.
+
+    Tham số:
+        archives: Schema -> file lưu trữ cần đọc (mặc định: không có)
+
+    Trả về:
+        List[Partition]: Các phân vùng (rỗng nếu không có dữ liệu)
+    """
+    archives = archives or {}
+    schemas = ("main",) + tuple(archives)
+    conn = _open_read_only(db_path)
+    try:
+        _attach(conn, schemas, archives)
+        if report == "top_customers":
+            ranges = [(schemas, conn.execute("SELECT MIN(id), MAX(id) FROM customers").fetchone())]
+            kind = "customer"
+        else:
+            date_sql, date_params = _date_filter(date_from, date_to)
+            ranges = [((schema,), conn.execute(
+                f"SELECT MIN(i.id), MAX(i.id) FROM {schema}.invoices i WHERE 1 = 1{date_sql}", date_params
+            ).fetchone()) for schema in schemas]
+            kind = "invoice"
+    finally:
+        conn.close()
+
+    result: List[Partition] = []
+    for scope, (low, high) in ranges:
+        if low is None:
+            continue
+        span = high - low + 1
+        count = max(1, min(partitions, span))
+        step = -(-span // count)  # làm tròn lên
+        result.extend((kind, start, min(start + step, high + 1), scope)
+                      for start in range(low, high + 1, step))
+    if report == "top_customers":
+        result.append(("legacy", 0, 0, schemas))
+    return result
+
+def aggregate_parallel(db_path: str, report: str, workers: Optional[int] = None,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: int = 5, partitions: Optional[int] = None) -> PartialAggregate:
+    """
+    Tính một báo cáo song song và gộp các kết quả từng phần.
+
+    Tham số:
+        db_path: Đường dẫn file database
+        report: Một trong REPORTS
+        workers: Số tiến trình (mặc định bằng số lõi CPU); 1 để chạy ngay
+            trong tiến trình hiện tại (luôn như vậy với database trong bộ
+            nhớ, vì tiến trình con không thấy database đó)
+        date_from, date_to: Khoảng ngày YYYY-MM-DD (tùy chọn)
+        limit: Số khách hàng tối đa (top_customers)
+        partitions: Số phân vùng (mặc định bằng số tiến trình)
+
+    Trả về:
+        PartialAggregate: Kết quả đã gộp
+
+    Ném ra:
+        ValueError: Nếu tên báo cáo không hợp lệ
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Báo cáo '{report}' không tồn tại. Các báo cáo hợp lệ: {', '.join(REPORTS)}.")
+    workers = 1 if is_memory_database(db_path) else max(1, workers or os.cpu_count() or 1)
+    archives = archives_for_range(date_from, date_to, db_path)
+    plan = plan_partitions(db_path, report, partitions or workers, date_from, date_to, archives)
+
+    merged = PartialAggregate()
+    if workers == 1 or len(plan) <= 1:
+        for partition in plan:
+            merged.merge(aggregate_partition(db_path, report, partition, date_from, date_to, limit, archives))
+        return merged
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(plan))) as pool:
+        futures = [pool.submit(aggregate_partition, db_path, report, partition, date_from, date_to,
+                               limit, archives)
+                   for partition in plan]
+        for future in futures:
+            merged.merge(future.result())
+    return merged
@@ -6,42 +6,135 @@ Quản lý sản phẩm cho Hệ thống Quản lý Hóa đơn, sử dụng SQLi
 Module này cung cấp lớp ProductManager để thực hiện các thao tác
 CRUD (Create, Read, Update, Delete) với sản phẩm trong database.
 Tất cả dữ liệu được lưu trữ và truy xuất từ SQLite database.
+
+Mỗi lần thêm sản phẩm hoặc đổi giá, một dòng được ghi vào bảng
+product_prices (lịch sử giá), nên có thể tra giá tại một ngày bất kỳ
+(price_as_of, prices_as_of).
 """
-from typing import List, Optional
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from models import Product
-from utils.db_utils import load_data, save_data, update_data, delete_data
+from models import Product, Money
+from utils.db_utils import (
+    load_data, save_data, insert_data, update_data, delete_data, stream_query, transaction,
+    query_operation, bind_database_methods, current_database_path
+)
 from utils.validation import (
+    validate_date_format,
     validate_required_field,
     validate_positive_number,
     validate_product_id,
     validate_string_length
 )
 from utils.formatting import format_product_id
-from database.database import initialize_database
+from utils.profiling import profile_methods
+from utils.rendering import TableRenderer
+from database.context import DatabaseContext
+from database.database import ensure_database_initialized
+
+# Giá mới nhất có hiệu lực tại một thời điểm: một lần tìm theo khoảng trên
+# index (product_id, effective_from)
+_PRICE_AS_OF_SQL = (
+    "SELECT unit_price FROM product_prices "
+    "WHERE product_id = ? AND effective_from <= ? "
+    "ORDER BY effective_from DESC, id DESC LIMIT 1"
+)
+
+# Giá có hiệu lực tại một thời điểm của mọi sản phẩm: cùng truy vấn như
+# trên, tương quan theo từng dòng của products
+_PRICES_AS_OF_SQL = (
+    "SELECT p.product_id, ("
+    "SELECT pp.unit_price FROM product_prices pp "
+    "WHERE pp.product_id = p.product_id AND pp.effective_from <= ? "
+    "ORDER BY pp.effective_from DESC, pp.id DESC LIMIT 1"
+    ") FROM products p"
+)
 
+def price_timestamp() -> str:
+    """Thời điểm hiện tại theo định dạng của cột product_prices.effective_from."""
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+def _as_of_bound(when: str) -> Tuple[Optional[str], str]:
+    """
+    Chuẩn hóa thời điểm tra giá thành cận trên của effective_from.
+
+    Ngày YYYY-MM-DD được hiểu là cuối ngày đó (gồm cả các lần đổi giá
+    trong ngày); thời điểm YYYY-MM-DD HH:MM:SS được dùng nguyên dạng.
+    """
+    if not isinstance(when, str):
+        return None, "Thời điểm tra giá phải là chuỗi YYYY-MM-DD hoặc YYYY-MM-DD HH:MM:SS."
+    if len(when) == 10:
+        valid, error = validate_date_format(when, "Ngày tra giá")
+        return (f"{when} 23:59:59", "") if valid else (None, error)
+    try:
+        datetime.strptime(when, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None, "Thời điểm tra giá phải có định dạng YYYY-MM-DD hoặc YYYY-MM-DD HH:MM:SS."
+    return when, ""
+
+@profile_methods("product")
+@bind_database_methods
 class ProductManager:
     """
     Quản lý các thao tác với sản phẩm, kết nối trực tiếp với database SQLite.
+
+    Thuộc tính:
+        database (Optional[DatabaseContext]): Database của manager (None:
+            database mặc định)
+
+    Ghi chú:
+        Giá hiện tại của mọi sản phẩm được giữ trong một dict theo mã sản
+        phẩm (current_price), dựng lại sau mỗi lần tải; tạo hóa đơn đọc giá
+        từ đây thay vì duyệt danh sách hay truy vấn database.
     """
     
-    def __init__(self):
-        """Khởi tạo và tải danh sách sản phẩm từ database."""
+    def __init__(self, load: bool = True, database: Optional[DatabaseContext] = None):
+        """
+        Khởi tạo và tải danh sách sản phẩm từ database.
+
+        Tham số:
+            load: Tải sản phẩm ngay; False để trì hoãn tới lần gọi
+                load_products() đầu tiên
+            database: Database dùng chung (schema chỉ khởi tạo một lần cho
+                mọi manager cùng database); None dùng database mặc định
+        """
+        self.database = database
         self.products: List[Product] = []
-        # Khởi tạo database nếu chưa tồn tại
-        initialize_database()
-        self.load_products()
+        self._prices: Dict[str, Money] = {}
+        # Tăng sau mỗi lần danh sách sản phẩm thay đổi (dùng cho ReportCache)
+        self.data_version = 0
+        # Khởi tạo database nếu chưa tồn tại hoặc schema còn cũ
+        if database is None:
+            ensure_database_initialized(current_database_path())
+        else:
+            database.initialize()
+        if load:
+            self.load_products()
     
+    @query_operation("product.load")
     def load_products(self) -> tuple[bool, str]:
-        """Tải tất cả sản phẩm từ database vào danh sách self.products."""
-        self.products = []
+        """
+        Tải tất cả sản phẩm từ database vào danh sách self.products.
+
+        Danh sách mới được dựng riêng rồi mới gán, nên luồng khác đang đọc
+        không thấy danh sách rỗng hoặc tải dở.
+        """
         rows, error = load_data("products")
         if error:
+            self.products = []
+            self._prices = {}
+            self.data_version += 1
             return False, error
-        if rows:
-            self.products = [Product(**row) for row in rows]
+        self.products = [
+            Product(**{**row, "unit_price": Money.from_sqlite(row["unit_price"])})
+            for row in rows or []
+        ]
+        self._prices = {product.product_id: product.unit_price for product in self.products}
+        self.data_version += 1
         return True, f"Đã tải {len(self.products)} sản phẩm từ database."
 
+    @query_operation("product.add")
     def add_product(self, product_id: str, name: str, unit_price: float,
                    calculation_unit: str = "đơn vị", category: str = "Chung") -> tuple[bool, str]:
         """Thêm một sản phẩm mới vào database."""
@@ -63,21 +156,119 @@ class ProductManager:
 
         # Định dạng đầu vào
         product_id = format_product_id(product_id)
-        
-        # Thêm vào database
-        success, error = save_data("products", {
-            "product_id": product_id,
-            "name": name,
-            "unit_price": unit_price,
-            "calculation_unit": calculation_unit,
-            "category": category
-        })
+        try:
+            price = Money.coerce(unit_price).to_sqlite()
+        except (ValueError, OverflowError):
+            return False, "Đơn giá không hợp lệ."
+
+        # Thêm vào database cùng dòng lịch sử giá đầu tiên
+        try:
+            with transaction() as uow:
+                success, error = save_data("products", {
+                    "product_id": product_id,
+                    "name": name,
+                    "unit_price": price,
+                    "calculation_unit": calculation_unit,
+                    "category": category
+                })
+                if success:
+                    success, error = self._record_price(product_id, price)
+                if not success:
+                    uow.rollback()
+        except sqlite3.Error as e:
+            return False, f"Lỗi khi thêm sản phẩm: {e}"
 
         if success:
             self.load_products()
             return True, f"Đã thêm sản phẩm '{name}' thành công!"
         return False, error
     
+    def current_price(self, product_id: str) -> Optional[Money]:
+        """
+        Giá hiện tại của sản phẩm, đọc từ bộ nhớ (không truy cập database).
+
+        Tham số:
+            product_id: Mã sản phẩm
+
+        Trả về:
+            Optional[Money]: Đơn giá, hoặc None nếu sản phẩm không tồn tại
+        """
+        return self._prices.get(format_product_id(product_id))
+
+    @query_operation("product.price_as_of")
+    def price_as_of(self, product_id: str, when: str) -> tuple[Optional[Money], str]:
+        """
+        Giá của sản phẩm có hiệu lực tại một thời điểm.
+
+        Tham số:
+            product_id: Mã sản phẩm
+            when: Ngày YYYY-MM-DD (tính đến cuối ngày) hoặc thời điểm
+                YYYY-MM-DD HH:MM:SS
+
+        Trả về:
+            tuple[Optional[Money], str]: (Đơn giá, thông báo); None nếu thời
+            điểm không hợp lệ hoặc sản phẩm chưa có giá tại thời điểm đó
+        """
+        bound, error = _as_of_bound(when)
+        if bound is None:
+            return None, error
+        product_id = format_product_id(product_id)
+        try:
+            _, rows = stream_query(_PRICE_AS_OF_SQL, (product_id, bound))
+            found = list(rows)
+        except sqlite3.Error as e:
+            return None, f"Lỗi khi tra giá sản phẩm: {e}"
+        if not found:
+            return None, f"Sản phẩm '{product_id}' chưa có giá tại thời điểm {when}."
+        return Money.from_sqlite(found[0][0]), ""
+
+    @query_operation("product.prices_as_of")
+    def prices_as_of(self, when: str) -> tuple[Dict[str, Money], str]:
+        """
+        Giá của mọi sản phẩm hiện có tại một thời điểm (ví dụ cho báo cáo
+        độ co giãn giá).
+
+        Mỗi sản phẩm được tra bằng một lần tìm trên index, nên chi phí tỉ lệ
+        với số sản phẩm chứ không với độ dài lịch sử giá.
+
+        Tham số:
+            when: Ngày YYYY-MM-DD hoặc thời điểm YYYY-MM-DD HH:MM:SS
+
+        Trả về:
+            tuple[Dict[str, Money], str]: (Mã sản phẩm -> đơn giá, thông
+            báo lỗi nếu có); sản phẩm chưa có giá tại thời điểm đó bị bỏ qua
+        """
+        bound, error = _as_of_bound(when)
+        if bound is None:
+            return {}, error
+        try:
+            _, rows = stream_query(_PRICES_AS_OF_SQL, (bound,))
+            return {product_id: Money.from_sqlite(price) for product_id, price in rows if price is not None}, ""
+        except sqlite3.Error as e:
+            return {}, f"Lỗi khi tra giá sản phẩm: {e}"
+
+    @query_operation("product.price_history")
+    def price_history(self, product_id: str) -> tuple[List[Tuple[str, Money]], str]:
+        """
+        Lịch sử giá của sản phẩm, cũ nhất trước.
+
+        Tham số:
+            product_id: Mã sản phẩm
+
+        Trả về:
+            tuple[List[Tuple[str, Money]], str]: ([(effective_from, đơn giá)],
+            thông báo lỗi nếu có)
+        """
+        try:
+            _, rows = stream_query(
+                "SELECT effective_from, unit_price FROM product_prices "
+                "WHERE product_id = ? ORDER BY effective_from, id",
+                (format_product_id(product_id),)
+            )
+            return [(effective_from, Money.from_sqlite(price)) for effective_from, price in rows], ""
+        except sqlite3.Error as e:
+            return [], f"Lỗi khi đọc lịch sử giá: {e}"
+
     def find_product(self, product_id: str) -> Optional[Product]:
         """Tìm kiếm sản phẩm theo ID trong danh sách đã tải."""
         product_id = format_product_id(product_id)
@@ -86,6 +277,7 @@ class ProductManager:
                 return product
         return None
     
+    @query_operation("product.update")
     def update_product(self, product_id: str, name: Optional[str] = None,
                       unit_price: Optional[float] = None, calculation_unit: Optional[str] = None,
                       category: Optional[str] = None) -> tuple[bool, str]:
@@ -95,6 +287,7 @@ class ProductManager:
             return False, f"Không tìm thấy sản phẩm với Mã '{product_id}'!"
 
         # Xác thực cập nhật
+        current = self.current_price(product_id)
         if name is not None:
             valid, error = validate_string_length(name, "Tên sản phẩm", 2, 50)
             if not valid:
@@ -109,7 +302,10 @@ class ProductManager:
         if name is not None:
             update_data_dict["name"] = name
         if unit_price is not None:
-            update_data_dict["unit_price"] = unit_price
+            try:
+                update_data_dict["unit_price"] = Money.coerce(unit_price).to_sqlite()
+            except (ValueError, OverflowError):
+                return False, "Đơn giá không hợp lệ."
         if calculation_unit is not None:
             update_data_dict["calculation_unit"] = calculation_unit
         if category is not None:
@@ -118,44 +314,78 @@ class ProductManager:
         if not update_data_dict:
             return True, "Không có thông tin nào được cung cấp để cập nhật."
 
-        success, error = update_data(
-            "products",
-            update_data_dict,
-            {"product_id": product_id}
-        )
+        # Giá mới (nếu đổi) được ghi vào lịch sử trong cùng transaction
+        new_price = update_data_dict.get("unit_price")
+        try:
+            with transaction() as uow:
+                success, error = update_data(
+                    "products",
+                    update_data_dict,
+                    {"product_id": product_id}
+                )
+                if success and new_price is not None and (current is None or new_price != current.to_sqlite()):
+                    success, error = self._record_price(product_id, new_price)
+                if not success:
+                    uow.rollback()
+        except sqlite3.Error as e:
+            return False, f"Lỗi khi cập nhật sản phẩm: {e}"
 
         if success:
             self.load_products()
             return True, f"Đã cập nhật sản phẩm '{product_id}' thành công!"
         return False, error
 
+    @query_operation("product.delete")
     def delete_product(self, product_id: str) -> tuple[bool, str]:
         """Xóa sản phẩm khỏi database."""
         product_id = format_product_id(product_id)
         if not self.find_product(product_id):
             return False, f"Không tìm thấy sản phẩm với Mã '{product_id}'!"
 
-        success, error = delete_data("products", {"product_id": product_id})
+        try:
+            with transaction() as uow:
+                success, error = delete_data("product_prices", {"product_id": product_id})
+                if success:
+                    success, error = delete_data("products", {"product_id": product_id})
+                if not success:
+                    uow.rollback()
+        except sqlite3.Error as e:
+            return False, f"Lỗi khi xóa sản phẩm: {e}"
 
         if success:
             self.load_products()
             return True, f"Đã xóa sản phẩm '{product_id}' thành công!"
         return False, error
     
-    def list_products(self) -> None:
-        """Hiển thị danh sách sản phẩm (dùng cho CLI)."""
+    def _record_price(self, product_id: str, unit_price: int) -> tuple[bool, str]:
+        """Ghi một dòng lịch sử giá (đơn vị nhỏ nhất) có hiệu lực từ bây giờ."""
+        _, error = insert_data("product_prices", {
+            "product_id": product_id,
+            "unit_price": unit_price,
+            "effective_from": price_timestamp(),
+        })
+        return not error, error
+
+    def list_products(self, flush_every: int = 0) -> None:
+        """
+        Hiển thị danh sách sản phẩm (dùng cho CLI).
+
+        Tham số:
+            flush_every: Ghi ra màn hình sau mỗi flush_every dòng
+                (0: ghi cả bảng một lần)
+        """
         if not self.products:
             print("Danh sách sản phẩm trống!")
             return
-        
-        print("\n" + "="*80)
-        print(f"{'MÃ SP':<10} {'TÊN SẢN PHẨM':<30} {'ĐƠN VỊ':<10} {'DANH MỤC':<15} {'ĐƠN GIÁ':>10}")
-        print("-"*80)
-        
-        for product in self.products:
-            print(f"{product.product_id:<10} {product.name:<30} {product.calculation_unit:<10} "
-                  f"{product.category:<15} {product.unit_price:>10,.2f}")
-        
-        print("="*80)
-        print(f"Tổng số: {len(self.products)} sản phẩm")
-        print("="*80) 
\ No newline at end of file
+
+        with TableRenderer(flush_every=flush_every) as table:
+            table.line()
+            table.rule("=", 80)
+            table.row("{:<10} {:<30} {:<10} {:<15} {:>10}", "MÃ SP", "TÊN SẢN PHẨM", "ĐƠN VỊ", "DANH MỤC", "ĐƠN GIÁ")
+            table.rule("-", 80)
+            table.rows("{:<10} {:<30} {:<10} {:<15} {:>10,.2f}",
+                       ((p.product_id, p.name, p.calculation_unit, p.category, p.unit_price)
+                        for p in self.products))
+            table.rule("=", 80)
+            table.line(f"Tổng số: {len(self.products)} sản phẩm")
+            table.rule("=", 80) 
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bộ nhớ đệm cho kết quả báo cáo thống kê.
+
+ReportCache lưu kết quả các báo cáo của StatisticsManager theo loại báo
+cáo và tham số (ví dụ limit). Mỗi mục được gắn với phiên bản dữ liệu lúc
+tính (data_version của InvoiceManager và ProductManager, tăng sau mỗi lần
+ghi); khi phiên bản thay đổi, mục cũ bị bỏ và báo cáo được tính lại. Số
+mục bị giới hạn theo LRU, và có thể đặt thêm thời gian sống (TTL) cho
+trường hợp database được ghi từ tiến trình khác.
+
+Ví dụ:
+    cache = ReportCache(max_entries=64)
+    statistics_manager = StatisticsManager(invoice_manager, product_manager, cache=cache)
+    statistics_manager.revenue_by_date()   # tính và lưu
+    statistics_manager.revenue_by_date()   # lấy từ bộ nhớ đệm
+    cache.stats()                          # {"hits": 1, "misses": 1, ...}
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ReportCache:
+    """
+    Bộ nhớ đệm LRU có phiên bản (và TTL tùy chọn), an toàn giữa các luồng.
+
+    Thuộc tính:
+        max_entries (int): Số mục tối đa; mục ít dùng nhất bị loại trước
+        ttl_seconds (Optional[float]): Thời gian sống của mỗi mục (None: không hết hạn)
+
+    Ghi chú:
+        Kết quả được trả về nguyên đối tượng đã lưu; nơi gọi không được
+        sửa đổi nó.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: Optional[float] = None):
+        """Khởi tạo bộ nhớ đệm rỗng."""
+        if max_entries <= 0:
+            raise ValueError("Số mục tối đa phải lớn hơn 0.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, Tuple[Hashable, float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Lấy kết quả đã lưu, hoặc tính và lưu nếu chưa có/đã cũ.
+
+        Tham số:
+            key: Khóa báo cáo (loại báo cáo và tham số)
+            version: Phiên bản dữ liệu hiện tại, lấy TRƯỚC khi tính
+            compute: Hàm tính báo cáo
+
+        Trả về:
+            Any: Kết quả báo cáo
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, stored_at, value = entry
+                expired = self.ttl_seconds is not None and now - stored_at >= self.ttl_seconds
+                if entry_version == version and not expired:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._invalidations += 1
+            self._misses += 1
+
+        # Tính ngoài khóa để các báo cáo khác không phải chờ
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Xóa mọi mục (giữ nguyên số liệu)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Số liệu của bộ nhớ đệm.
+
+        Trả về:
+            Dict[str, Any]: hits, misses, hit_rate, evictions (do LRU),
+                invalidations (do dữ liệu thay đổi hoặc hết hạn), size
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+            }
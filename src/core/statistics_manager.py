@@ -7,13 +7,41 @@ Module này cung cấp các chức năng phân tích và tạo báo cáo từ d
 hóa đơn và sản phẩm, bao gồm thống kê doanh thu, sản phẩm bán chạy
 và khách hàng thân thiết. Tất cả báo cáo được xuất ra console
 với định dạng bảng dễ đọc.
+
+Mọi phép cộng dồn đều dùng số nguyên đơn vị nhỏ nhất (Money.minor),
+chỉ chuyển sang Money khi in kết quả. Nếu có ReportCache, kết quả các
+báo cáo được lưu đệm cho đến khi dữ liệu thay đổi.
+
+InvoiceManager chỉ nạp hóa đơn đang hoạt động. Khi đã có năm được lưu trữ
+(xem core.archive_manager), các báo cáo doanh thu và khách hàng được tính
+từ database kèm các file lưu trữ (get_report_parallel) để tổng không đổi
+sau khi lưu trữ.
+
+Báo cáo phân tích giỏ hàng (get_basket_analysis, basket_analysis) tìm các
+cặp sản phẩm thường được mua cùng nhau, tính trực tiếp từ database (xem
+core.basket_analysis).
 """
 
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from database.database import is_memory_database
+from models import Money
+from utils.profiling import profile_methods
+from utils.rendering import TableRenderer
+from .archive_manager import archived_years
+from .basket_analysis import BasketReport, analyze_database
 from .invoice_manager import InvoiceManager
 from .product_manager import ProductManager
+from .report_cache import ReportCache
+from utils import db_utils
+from utils.db_utils import bind_database_methods
+
+def _percentage(value: int, total: int) -> float:
+    """Tỷ lệ phần trăm của value trên total (0 nếu total không dương)."""
+    return (value / total) * 100 if total > 0 else 0
 
+@profile_methods("statistics")
+@bind_database_methods
 class StatisticsManager:
     """
     Quản lý các thao tác thống kê và báo cáo trong Hệ thống Quản lý Hóa đơn.
@@ -22,10 +50,13 @@ class StatisticsManager:
     - Thống kê doanh thu theo ngày
     - Thống kê doanh thu theo sản phẩm
     - Xếp hạng khách hàng thân thiết
+    - Phân tích giỏ hàng (sản phẩm thường được mua cùng nhau)
     
     Thuộc tính:
         invoice_manager (InvoiceManager): Trình quản lý hóa đơn
         product_manager (ProductManager): Trình quản lý sản phẩm
+        database (Optional[DatabaseContext]): Database của các manager (dùng
+            cho báo cáo song song)
         
     Ghi chú:
         Tất cả các phương thức thống kê in kết quả trực tiếp ra console
@@ -33,7 +64,8 @@ class StatisticsManager:
         trong giao diện dòng lệnh và giao diện đồ họa.
     """
     
-    def __init__(self, invoice_manager: InvoiceManager, product_manager: ProductManager):
+    def __init__(self, invoice_manager: InvoiceManager, product_manager: ProductManager,
+                 cache: Optional[ReportCache] = None):
         """
         Khởi tạo trình quản lý thống kê.
         
@@ -42,13 +74,214 @@ class StatisticsManager:
                                               dữ liệu hóa đơn và các mặt hàng.
             product_manager (ProductManager): Trình quản lý sản phẩm để lấy
                                               thông tin chi tiết sản phẩm.
+            cache (Optional[ReportCache]): Bộ nhớ đệm báo cáo (mặc định không dùng)
         
         Ném ra:
             TypeError: Nếu các tham số không đúng kiểu
         """
         self.invoice_manager = invoice_manager
         self.product_manager = product_manager
-    
+        self.cache = cache
+        source = invoice_manager if invoice_manager is not None else product_manager
+        self.database = getattr(source, "database", None)
+        # ((đường dẫn database, data_version của invoice_manager), các năm đã lưu trữ)
+        self._archives: Optional[Tuple[Tuple[str, int], List[int]]] = None
+
+    def _cached(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """Tính báo cáo qua bộ nhớ đệm (nếu có), theo phiên bản dữ liệu của các manager."""
+        if self.cache is None:
+            return compute()
+        version = (self.invoice_manager.data_version, self.product_manager.data_version)
+        return self.cache.get_or_compute(key, version, compute)
+
+    def _archived_years(self) -> List[int]:
+        """
+        Các năm đã lưu trữ của database hiện hành.
+
+        Danh sách file chỉ được đọc lại khi hóa đơn trong bộ nhớ thay đổi
+        (ArchiveManager nạp lại invoice_manager sau khi chuyển dữ liệu).
+        Database trong bộ nhớ không có file lưu trữ.
+        """
+        path = db_utils.current_database_path()
+        if is_memory_database(path):
+            return []
+        key = (path, self.invoice_manager.data_version)
+        archives = self._archives
+        if archives is None or archives[0] != key:
+            archives = self._archives = (key, archived_years(path))
+        return archives[1]
+
+    def _has_invoices(self) -> bool:
+        """Có hóa đơn để thống kê (đang hoạt động hoặc đã lưu trữ) hay không."""
+        return bool(self.invoice_manager.invoices) or bool(self._archived_years())
+
+    def get_revenue_by_date(self) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        Tính doanh thu theo từng ngày.
+
+        Tính cả các năm đã lưu trữ (qua get_report_parallel) nếu có.
+
+        Trả về:
+            Tuple[List[Tuple[str, int]], int]: (Danh sách (ngày, doanh thu)
+            sắp xếp mới nhất trước, tổng doanh thu); tiền tính bằng đơn vị
+            nhỏ nhất (Money.minor)
+        """
+        if self._archived_years():
+            return self.get_report_parallel("revenue_by_date", workers=1)
+        return self._cached(("revenue_by_date",), self._compute_revenue_by_date)
+
+    def _compute_revenue_by_date(self) -> Tuple[List[Tuple[str, int]], int]:
+        date_revenue: Dict[str, int] = defaultdict(int)
+        for invoice in self.invoice_manager.invoices:
+            date_revenue[invoice.date] += invoice.total_minor
+
+        return sorted(date_revenue.items(), reverse=True), sum(date_revenue.values())
+
+    def get_revenue_by_product(self) -> Tuple[List[Tuple[str, str, int, int]], int]:
+        """
+        Tính doanh thu và số lượng bán theo từng sản phẩm.
+
+        Tính cả các năm đã lưu trữ (qua get_report_parallel) nếu có.
+
+        Trả về:
+            Tuple[List[Tuple[str, str, int, int]], int]: (Danh sách
+            (mã SP, tên SP, số lượng, doanh thu) sắp xếp theo doanh thu giảm
+            dần, tổng doanh thu); tiền tính bằng đơn vị nhỏ nhất
+        """
+        if self._archived_years():
+            return self.get_report_parallel("revenue_by_product", workers=1)
+        return self._cached(("revenue_by_product",), self._compute_revenue_by_product)
+
+    def _compute_revenue_by_product(self) -> Tuple[List[Tuple[str, str, int, int]], int]:
+        product_stats: Dict[str, Tuple[int, int]] = defaultdict(lambda: (0, 0))
+        for invoice in self.invoice_manager.invoices:
+            for item in invoice.items:
+                current_revenue, current_quantity = product_stats[item.product_id]
+                product_stats[item.product_id] = (
+                    current_revenue + item.total_minor,
+                    current_quantity + item.quantity
+                )
+
+        sorted_products = sorted(product_stats.items(), key=lambda x: x[1][0], reverse=True)
+        rows = []
+        for product_id, (revenue, quantity) in sorted_products:
+            product = self.product_manager.find_product(product_id)
+            product_name = product.name if product else "[Sản phẩm không tồn tại]"
+            rows.append((product_id, product_name, quantity, revenue))
+        return rows, sum(revenue for revenue, _ in product_stats.values())
+
+    def get_top_customers(self, limit: int = 5) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        Tính các khách hàng chi tiêu nhiều nhất.
+
+        Khách hàng được nhóm theo customer_id; hóa đơn cũ chưa có
+        customer_id được nhóm theo tên. Tính cả các năm đã lưu trữ (qua
+        get_report_parallel) nếu có.
+
+        Tham số:
+            limit (int): Số khách hàng tối đa
+
+        Trả về:
+            Tuple[List[Tuple[str, int]], int]: (Danh sách (tên, chi tiêu)
+            sắp xếp giảm dần, tổng chi tiêu của mọi khách hàng); tiền tính
+            bằng đơn vị nhỏ nhất
+        """
+        if self._archived_years():
+            return self.get_report_parallel("top_customers", limit=limit, workers=1)
+        return self._cached(("top_customers", limit), lambda: self._compute_top_customers(limit))
+
+    def _compute_top_customers(self, limit: int) -> Tuple[List[Tuple[str, int]], int]:
+        customer_spending: Dict[Union[int, str], int] = defaultdict(int)
+        customer_names: Dict[Union[int, str], str] = {}
+        for invoice in self.invoice_manager.invoices:
+            key = invoice.customer_id if invoice.customer_id is not None else invoice.customer_name
+            customer_spending[key] += invoice.total_minor
+            customer_names.setdefault(key, invoice.customer_name)
+
+        sorted_customers = sorted(customer_spending.items(), key=lambda x: x[1], reverse=True)[:limit]
+        rows = [(customer_names[key], spending) for key, spending in sorted_customers]
+        return rows, sum(customer_spending.values())
+
+    def get_basket_analysis(self, min_support: float = 0.01, min_confidence: float = 0.0,
+                            min_lift: float = 0.0, limit: Optional[int] = 20,
+                            date_from: Optional[str] = None, date_to: Optional[str] = None) -> BasketReport:
+        """
+        Tìm các cặp sản phẩm thường được mua cùng nhau và luật kết hợp.
+
+        Tính trực tiếp từ invoice_items của database (nhóm theo hóa đơn)
+        bằng cách đếm cặp thưa hai lượt, chỉ đếm cặp giữa các sản phẩm đạt
+        ngưỡng support, nên không cần tải hóa đơn vào bộ nhớ.
+
+        Tham số:
+            min_support (float): Tỷ lệ hóa đơn tối thiểu chứa cả cặp, trong (0, 1]
+            min_confidence (float): Confidence tối thiểu của một luật
+            min_lift (float): Lift tối thiểu của một luật
+            limit (Optional[int]): Số cặp/luật tối đa (None: tất cả)
+            date_from (Optional[str]): Ngày bắt đầu YYYY-MM-DD
+            date_to (Optional[str]): Ngày kết thúc YYYY-MM-DD
+
+        Trả về:
+            BasketReport: Các cặp (nhiều hóa đơn nhất trước) và luật (lift
+            cao nhất trước)
+
+        Ném ra:
+            ValueError: Nếu min_support không hợp lệ
+            sqlite3.Error: Nếu truy vấn thất bại
+        """
+        def compute() -> BasketReport:
+            return analyze_database(min_support, min_confidence, min_lift, limit, date_from, date_to)
+
+        if self.invoice_manager is None:
+            return compute()
+        return self._cached(("basket_analysis", min_support, min_confidence, min_lift, limit,
+                             date_from, date_to), compute)
+
+    def get_report_parallel(self, report: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                            limit: int = 5, workers: Optional[int] = None) -> Tuple[List[tuple], int]:
+        """
+        Tính một báo cáo trực tiếp từ database, song song trên nhiều tiến trình.
+
+        Dùng cho khoảng dữ liệu rất lớn: mỗi tiến trình đọc một phân vùng
+        qua kết nối chỉ đọc riêng (xem core.parallel_reports). Kết quả có
+        cùng dạng với get_revenue_by_date/get_revenue_by_product/
+        get_top_customers nhưng chỉ tính trên dữ liệu đã commit.
+
+        Tham số:
+            report (str): "revenue_by_date", "revenue_by_product" hoặc "top_customers"
+            date_from (Optional[str]): Ngày bắt đầu YYYY-MM-DD
+            date_to (Optional[str]): Ngày kết thúc YYYY-MM-DD
+            limit (int): Số khách hàng tối đa (top_customers)
+            workers (Optional[int]): Số tiến trình (mặc định bằng số lõi CPU)
+
+        Trả về:
+            Tuple[List[tuple], int]: (Các dòng báo cáo, tổng); tiền tính
+            bằng đơn vị nhỏ nhất
+
+        Ném ra:
+            ValueError: Nếu tên báo cáo không hợp lệ
+        """
+        # Import khi cần: concurrent.futures.process làm chậm việc khởi động GUI/CLI
+        from .parallel_reports import aggregate_parallel
+
+        def compute() -> Tuple[List[tuple], int]:
+            merged = aggregate_parallel(db_utils.current_database_path(), report, workers,
+                                        date_from, date_to, limit)
+            if report == "revenue_by_date":
+                rows = sorted(((date, values[0]) for date, values in merged.sums.items()), reverse=True)
+            elif report == "revenue_by_product":
+                rows = []
+                for product_id, (quantity, revenue) in sorted(merged.sums.items(),
+                                                               key=lambda x: x[1][1], reverse=True):
+                    product = self.product_manager.find_product(product_id)
+                    product_name = product.name if product else "[Sản phẩm không tồn tại]"
+                    rows.append((product_id, product_name, quantity, revenue))
+            else:
+                top = sorted(merged.sums.items(), key=lambda x: x[1][0], reverse=True)[:max(limit, 0)]
+                rows = [(merged.names[key], values[0]) for key, values in top]
+            return rows, merged.total
+
+        return self._cached(("parallel", report, date_from, date_to, limit), compute)
+
     def revenue_by_date(self) -> None:
         """
         Hiển thị báo cáo doanh thu theo từng ngày.
@@ -64,37 +297,29 @@ class StatisticsManager:
             - Nếu không có hóa đơn nào, hiển thị thông báo
             - Sử dụng định dạng tiền tệ việt nam
         """
-        if not self.invoice_manager.invoices:
+        if not self._has_invoices():
             print("Không có dữ liệu hóa đơn để thống kê!")
             return
         
-        # Nhóm doanh thu theo ngày
-        date_revenue: Dict[str, float] = defaultdict(float)
-        for invoice in self.invoice_manager.invoices:
-            date_revenue[invoice.date] += invoice.total_amount
-
-        if not date_revenue:
+        sorted_dates, total_revenue = self.get_revenue_by_date()
+        if not sorted_dates:
             print("Không có dữ liệu doanh thu để hiển thị!")
             return
 
-        # Sắp xếp theo ngày (mới nhất trước)
-        sorted_dates = sorted(date_revenue.items(), reverse=True)
-
         # Hiển thị báo cáo
-        print("\n" + "="*60)
-        print("THỐNG KÊ DOANH THU THEO NGÀY")
-        print("="*60)
-        print(f"{'NGÀY':<15} {'DOANH THU':<20} {'TỈ LỆ':<10}")
-        print("-"*60)
-        
-        total_revenue = sum(date_revenue.values())
-        for date, revenue in sorted_dates:
-            percentage = (revenue / total_revenue) * 100 if total_revenue > 0 else 0
-            print(f"{date:<15} {revenue:>20,.2f} {percentage:>9.2f}%")
-        
-        print("-"*60)
-        print(f"{'TỔNG CỘNG:':<15} {total_revenue:>20,.2f}")
-        print("="*60)
+        with TableRenderer() as table:
+            table.line()
+            table.rule("=", 60)
+            table.line("THỐNG KÊ DOANH THU THEO NGÀY")
+            table.rule("=", 60)
+            table.row("{:<15} {:<20} {:<10}", "NGÀY", "DOANH THU", "TỈ LỆ")
+            table.rule("-", 60)
+            table.rows("{:<15} {:>20,.2f} {:>9.2f}%",
+                       ((date, Money(revenue), _percentage(revenue, total_revenue))
+                        for date, revenue in sorted_dates))
+            table.rule("-", 60)
+            table.row("{:<15} {:>20,.2f}", "TỔNG CỘNG:", Money(total_revenue))
+            table.rule("=", 60)
     
     def revenue_by_product(self) -> None:
         """
@@ -114,48 +339,29 @@ class StatisticsManager:
             - Nếu sản phẩm đã bị xóa, hiển thị "[Sản phẩm không tồn tại]"
             - Sử dụng định dạng tiền tệ việt nam
         """
-        if not self.invoice_manager.invoices:
+        if not self._has_invoices():
             print("Không có dữ liệu hóa đơn để thống kê!")
             return
         
-        # Tính toán doanh thu và số lượng theo sản phẩm
-        product_stats: Dict[str, Tuple[float, int]] = defaultdict(lambda: (0.0, 0))
-        for invoice in self.invoice_manager.invoices:
-            for item in invoice.items:
-                current_revenue, current_quantity = product_stats[item.product_id]
-                product_stats[item.product_id] = (
-                    current_revenue + item.total_price,
-                    current_quantity + item.quantity
-                )
-
-        if not product_stats:
+        sorted_products, total_revenue = self.get_revenue_by_product()
+        if not sorted_products:
             print("Không có dữ liệu doanh thu theo sản phẩm để hiển thị!")
             return
 
-        # Sắp xếp theo doanh thu (cao nhất trước)
-        sorted_products = sorted(
-            product_stats.items(),
-            key=lambda x: x[1][0],
-            reverse=True
-        )
-        
         # Hiển thị báo cáo
-        print("\n" + "="*80)
-        print("THỐNG KÊ DOANH THU THEO SẢN PHẨM")
-        print("="*80)
-        print(f"{'MÃ SP':<10} {'TÊN SẢN PHẨM':<30} {'SỐ LƯỢNG':<10} {'DOANH THU':<15} {'TỈ LỆ':<10}")
-        print("-"*80)
-        
-        total_revenue = sum(revenue for revenue, _ in product_stats.values())
-        for product_id, (revenue, quantity) in sorted_products:
-            product = self.product_manager.find_product(product_id)
-            product_name = product.name if product else "[Sản phẩm không tồn tại]"
-            percentage = (revenue / total_revenue) * 100 if total_revenue > 0 else 0
-            print(f"{product_id:<10} {product_name:<30} {quantity:>10} {revenue:>15,.2f} {percentage:>9.2f}%")
-        
-        print("-"*80)
-        print(f"{'TỔNG CỘNG:':<50} {total_revenue:>15,.2f}")
-        print("="*80)
+        with TableRenderer() as table:
+            table.line()
+            table.rule("=", 80)
+            table.line("THỐNG KÊ DOANH THU THEO SẢN PHẨM")
+            table.rule("=", 80)
+            table.row("{:<10} {:<30} {:<10} {:<15} {:<10}", "MÃ SP", "TÊN SẢN PHẨM", "SỐ LƯỢNG", "DOANH THU", "TỈ LỆ")
+            table.rule("-", 80)
+            table.rows("{:<10} {:<30} {:>10} {:>15,.2f} {:>9.2f}%",
+                       ((product_id, product_name, quantity, Money(revenue), _percentage(revenue, total_revenue))
+                        for product_id, product_name, quantity, revenue in sorted_products))
+            table.rule("-", 80)
+            table.row("{:<50} {:>15,.2f}", "TỔNG CỘNG:", Money(total_revenue))
+            table.rule("=", 80)
     
     def top_customers(self, limit: int = 5) -> None:
         """
@@ -177,38 +383,74 @@ class StatisticsManager:
             - Hiển thị tỷ lệ phần trăm so với tổng doanh thu
             - Nếu không có dữ liệu, hiển thị thông báo tương ứng
         """
-        if not self.invoice_manager.invoices:
+        if not self._has_invoices():
             print("Không có dữ liệu hóa đơn để thống kê!")
             return
         
-        # Tính toán chi tiêu theo khách hàng
-        customer_spending: Dict[str, float] = defaultdict(float)
-        for invoice in self.invoice_manager.invoices:
-            customer_spending[invoice.customer_name] += invoice.total_amount
-
-        if not customer_spending:
+        sorted_customers, total_spending = self.get_top_customers(limit)
+        if not sorted_customers and limit > 0:
             print("Không có dữ liệu khách hàng để hiển thị!")
             return
 
-        # Sắp xếp theo chi tiêu (cao nhất trước) và giới hạn kết quả
-        sorted_customers = sorted(
-            customer_spending.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:limit]
-        
         # Hiển thị báo cáo
-        print("\n" + "="*60)
-        print(f"TOP {limit} KHÁCH HÀNG TIỀM NĂNG")
-        print("="*60)
-        print(f"{'KHÁCH HÀNG':<30} {'TỔNG CHI TIÊU':<20} {'TỈ LỆ':<10}")
-        print("-"*60)
-        
-        total_spending = sum(customer_spending.values())
-        for customer_name, spending in sorted_customers:
-            percentage = (spending / total_spending) * 100 if total_spending > 0 else 0
-            print(f"{customer_name:<30} {spending:>20,.2f} {percentage:>9.2f}%")
-        
-        print("-"*60)
-        print(f"{'TỔNG CỘNG:':<30} {total_spending:>20,.2f}")
-        print("="*60) 
\ No newline at end of file
+        with TableRenderer() as table:
+            table.line()
+            table.rule("=", 60)
+            table.line(f"TOP {limit} KHÁCH HÀNG TIỀM NĂNG")
+            table.rule("=", 60)
+            table.row("{:<30} {:<20} {:<10}", "KHÁCH HÀNG", "TỔNG CHI TIÊU", "TỈ LỆ")
+            table.rule("-", 60)
+            table.rows("{:<30} {:>20,.2f} {:>9.2f}%",
+                       ((customer_name, Money(spending), _percentage(spending, total_spending))
+                        for customer_name, spending in sorted_customers))
+            table.rule("-", 60)
+            table.row("{:<30} {:>20,.2f}", "TỔNG CỘNG:", Money(total_spending))
+            table.rule("=", 60) 
+
+    def basket_analysis(self, min_support: float = 0.01, min_confidence: float = 0.0,
+                        limit: int = 20, date_from: Optional[str] = None,
+                        date_to: Optional[str] = None) -> None:
+        """
+        Hiển thị các luật kết hợp giữa sản phẩm (gợi ý sắp xếp kệ hàng).
+
+        Mỗi dòng là một luật "mua A thì thường mua B" kèm support,
+        confidence và lift; lift cao nhất trước.
+
+        Tham số:
+            min_support (float): Tỷ lệ hóa đơn tối thiểu chứa cả cặp
+            min_confidence (float): Confidence tối thiểu của một luật
+            limit (int): Số luật tối đa
+            date_from (Optional[str]): Ngày bắt đầu YYYY-MM-DD
+            date_to (Optional[str]): Ngày kết thúc YYYY-MM-DD
+
+        Trả về:
+            None: Kết quả được in trực tiếp ra console
+        """
+        report = self.get_basket_analysis(min_support, min_confidence, limit=limit,
+                                          date_from=date_from, date_to=date_to)
+        if not report.baskets:
+            print("Không có dữ liệu hóa đơn để thống kê!")
+            return
+        if not report.rules:
+            print(f"Không có cặp sản phẩm nào đạt support >= {min_support:g}!")
+            return
+
+        def name(product_id: str) -> str:
+            product = self.product_manager.find_product(product_id)
+            return product.name if product else "[Sản phẩm không tồn tại]"
+
+        with TableRenderer() as table:
+            table.line()
+            table.rule("=", 100)
+            table.line("PHÂN TÍCH GIỎ HÀNG: SẢN PHẨM THƯỜNG ĐƯỢC MUA CÙNG NHAU")
+            table.rule("=", 100)
+            table.row("{:<30} {:<30} {:>10} {:>10} {:>8} {:>8}",
+                      "KHI MUA", "THƯỜNG MUA THÊM", "SỐ HĐ", "SUPPORT", "CONF.", "LIFT")
+            table.rule("-", 100)
+            table.rows("{:<30} {:<30} {:>10} {:>9.2f}% {:>7.2f}% {:>8.2f}",
+                       ((name(rule.antecedent)[:30], name(rule.consequent)[:30], rule.count,
+                         rule.support * 100, rule.confidence * 100, rule.lift)
+                        for rule in report.rules))
+            table.rule("-", 100)
+            table.line(report.summary())
+            table.rule("=", 100)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ngữ cảnh database dùng chung cho các manager.
+
+Trước đây mỗi manager tự gọi initialize_database() khi được tạo và mọi
+thao tác đọc một đường dẫn toàn cục. Lớp DatabaseContext gom
+những gì thuộc về một database vào một đối tượng được tạo một lần rồi
+truyền cho các manager:
+- Đường dẫn file database
+- Phiên bản schema (khởi tạo/migrate một lần cho mọi manager)
+- Nhóm kết nối (ConnectionPool) dùng chung giữa các luồng
+
+Ví dụ:
+    database = DatabaseContext("data/shop.db")
+    products = ProductManager(database=database)
+    invoices = InvoiceManager(products)          # dùng database của products
+    ExportManager(database=database).export_invoices("invoices.csv")
+
+Manager không nhận database dùng database mặc định của tiến trình
+(utils.db_utils.default_database, đặt bằng set_default_database).
+
+Database trong bộ nhớ (test, tác vụ tạm thời):
+    template = DatabaseContext(":memory:")       # khởi tạo schema một lần
+    template.initialize()
+    database = template.clone()                  # bản sao qua backup API
+"""
+import itertools
+import os
+import sqlite3
+import threading
+from typing import Iterator, Optional
+
+from database.database import (
+    MEMORY_PATH, SCHEMA_VERSION, connect_database, ensure_database_initialized,
+    is_memory_database, is_uri, schema_version,
+)
+from utils import db_utils
+from utils.db_utils import ConnectionPool, open_connection, use_database
+
+# Số thứ tự đặt tên cho các database ":memory:" của tiến trình
+_memory_ids = itertools.count(1)
+
+class DatabaseContext:
+    """
+    Một database cùng trạng thái dùng chung của nó.
+
+    Thuộc tính:
+        path (str): Đường dẫn tuyệt đối của file database, hoặc URI SQLite
+            ("file:...") với database trong bộ nhớ
+        in_memory (bool): Database nằm trong bộ nhớ
+        schema_version (Optional[int]): Phiên bản schema sau lần khởi tạo
+            gần nhất (None nếu chưa khởi tạo)
+        pool_size (int): Số kết nối tối đa của nhóm kết nối
+        wal (bool): Nhóm kết nối dùng journal_mode=WAL
+
+    Ghi chú:
+        Nhóm kết nối chỉ được tạo khi dùng tới (thuộc tính pool), vì bật
+        WAL là thay đổi lưu vĩnh viễn trong file database.
+
+        Mỗi kết nối tới ":memory:" là một database riêng, nên ":memory:"
+        được đổi thành URI bộ nhớ dùng chung (cache=shared) có tên riêng
+        cho ngữ cảnh; "file::memory:?cache=shared" là một database dùng
+        chung cho cả tiến trình. Ngữ cảnh giữ một kết nối mở để database
+        trong bộ nhớ tồn tại tới khi close(). Với cache dùng chung, SQLite
+        khóa theo bảng và không chờ theo busy_timeout, nên database trong
+        bộ nhớ hợp với test và tác vụ một luồng ghi; báo cáo song song
+        (get_report_parallel) chạy trong tiến trình hiện tại.
+    """
+
+    def __init__(self, path: Optional[str] = None, pool_size: int = 8, wal: bool = True):
+        """
+        Khởi tạo ngữ cảnh (chưa mở kết nối nào).
+
+        Tham số:
+            path: File database, ":memory:" hoặc URI SQLite (mặc định:
+                database hiện hành của db_utils)
+            pool_size: Số kết nối tối đa của nhóm kết nối
+            wal: Nhóm kết nối dùng journal_mode=WAL (bỏ qua với database
+                trong bộ nhớ)
+        """
+        if pool_size <= 0:
+            raise ValueError("Kích thước nhóm kết nối phải lớn hơn 0.")
+        path = path or db_utils.current_database_path()
+        if path == MEMORY_PATH:
+            path = f"file:invoicemanager-{os.getpid()}-{next(_memory_ids)}?mode=memory&cache=shared"
+        self.path = path if is_uri(path) else os.path.abspath(path)
+        self.in_memory = is_memory_database(self.path)
+        self.pool_size = pool_size
+        self.wal = wal and not self.in_memory
+        self.schema_version: Optional[int] = None
+        self._pool: Optional[ConnectionPool] = None
+        self._lock = threading.Lock()
+        # Database trong bộ nhớ bị xóa khi kết nối cuối cùng tới nó đóng
+        self._keepalive: Optional[sqlite3.Connection] = (
+            connect_database(self.path, check_same_thread=False) if self.in_memory else None
+        )
+
+    def __repr__(self) -> str:
+        return f"DatabaseContext({self.path!r})"
+
+    def __enter__(self) -> "DatabaseContext":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def initialize(self, force: bool = False) -> tuple[bool, str]:
+        """
+        Khởi tạo/migrate schema, chỉ một lần cho mọi manager dùng ngữ cảnh.
+
+        Tham số:
+            force: Kiểm tra lại kể cả khi đã khởi tạo (ví dụ sau khi khôi
+                phục từ bản sao lưu cũ)
+
+        Trả về:
+            tuple[bool, str]: (True/False, thông báo)
+        """
+        with self._lock:
+            if self.schema_version == SCHEMA_VERSION and not force:
+                return True, f"Database đã được khởi tạo tại: {self.path}"
+            success, message = ensure_database_initialized(self.path)
+            self.schema_version = schema_version(self.path) if success else None
+            return success, message
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """Nhóm kết nối dùng chung (tạo khi dùng lần đầu)."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(size=self.pool_size, wal=self.wal, path=self.path)
+            return self._pool
+
+    def connect(self, wal: bool = False, busy_timeout_ms: int = 5000,
+                check_same_thread: bool = True) -> sqlite3.Connection:
+        """
+        Mở một kết nối autocommit riêng tới database (xem open_connection).
+
+        Trả về:
+            sqlite3.Connection: Kết nối SQLite; nơi gọi chịu trách nhiệm đóng
+        """
+        return open_connection(wal, busy_timeout_ms, check_same_thread, path=self.path)
+
+    def clone(self, path: str = MEMORY_PATH, pool_size: Optional[int] = None) -> "DatabaseContext":
+        """
+        Sao chép toàn bộ database sang một database mới bằng backup API.
+
+        Dùng để tạo nhanh database cho test hoặc benchmark từ một database
+        mẫu đã khởi tạo schema và dữ liệu: chép trang nhanh hơn nhiều so
+        với chạy lại DDL, migration và các lệnh INSERT.
+
+        Tham số:
+            path: Database đích (mặc định: database mới trong bộ nhớ); nội
+                dung cũ của database đích bị ghi đè
+            pool_size: Số kết nối tối đa của ngữ cảnh mới (mặc định như
+                ngữ cảnh này)
+
+        Trả về:
+            DatabaseContext: Ngữ cảnh của bản sao
+
+        Ném ra:
+            sqlite3.Error: Nếu không sao chép được
+        """
+        target = DatabaseContext(path, pool_size or self.pool_size, self.wal)
+        try:
+            source = connect_database(self.path)
+            try:
+                destination = connect_database(target.path)
+                try:
+                    source.backup(destination)
+                finally:
+                    destination.close()
+            finally:
+                source.close()
+        except sqlite3.Error:
+            target.close()
+            raise
+        target.schema_version = self.schema_version
+        return target
+
+    def activate(self) -> Iterator["DatabaseContext"]:
+        """
+        Context manager: các hàm của db_utils trong khối with dùng database này.
+
+        Trả về:
+            Iterator[DatabaseContext]: Chính ngữ cảnh này
+        """
+        return use_database(self)
+
+    def close(self) -> None:
+        """Đóng nhóm kết nối (nếu đã tạo); database trong bộ nhớ bị giải phóng."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            keepalive, self._keepalive = self._keepalive, None
+            if keepalive is not None:
+                self.schema_version = None
+        if pool is not None:
+            pool.close()
+        if keepalive is not None:
+            keepalive.close()
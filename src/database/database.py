@@ -6,52 +6,325 @@ Module để khởi tạo và quản lý database SQLite.
 Module này chịu trách nhiệm thiết lập và quản lý cơ sở dữ liệu
 SQLite cho hệ thống quản lý hóa đơn. Bao gồm:
 - Khởi tạo database và các bảng cần thiết
-- Định nghĩa schema cho products, invoices, invoice_items
+- Định nghĩa schema cho products, invoices, invoice_items, product_prices
 - Thiết lập foreign key constraints
 - Cấu hình đường dẫn database
+- Migration schema theo phiên bản (PRAGMA user_version)
+- Bỏ qua khởi tạo khi schema đã ở phiên bản hiện tại (ensure_database_initialized)
 
-Database được đặt trong cùng thư mục với module này.
+Database được đặt trong cùng thư mục với module này. Ngoài file, database
+có thể nằm trong bộ nhớ: ":memory:" hoặc URI SQLite như
+"file::memory:?cache=shared" (mở bằng connect_database, xem
+database.context.DatabaseContext).
 """
 import sqlite3
 import os
+from datetime import datetime
+
+from utils.formatting import format_customer_name, normalize_customer_name
 
 DATABASE_NAME = "invoicemanager.db"
 # Đặt database trong thư mục database
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), DATABASE_NAME)
 
-def initialize_database():
+# Database trong bộ nhớ của SQLite (mỗi kết nối là một database riêng)
+MEMORY_PATH = ":memory:"
+
+# Phiên bản schema hiện tại, lưu trong PRAGMA user_version
+SCHEMA_VERSION = 5
+
+# Giá trị PRAGMA auto_vacuum của chế độ INCREMENTAL
+_AUTO_VACUUM_INCREMENTAL = 2
+
+def is_uri(path: str) -> bool:
+    """Đường dẫn là URI SQLite ("file:...") thay vì tên file."""
+    return path.startswith("file:")
+
+def is_memory_database(path: str) -> bool:
+    """
+    Database nằm trong bộ nhớ (":memory:" hoặc URI mode=memory/file::memory:).
+
+    Tham số:
+        path: Đường dẫn hoặc URI database
+
+    Trả về:
+        bool: True nếu database không có file trên đĩa
+    """
+    if path == MEMORY_PATH:
+        return True
+    return is_uri(path) and (path.startswith("file::memory:") or "mode=memory" in path)
+
+def connect_database(path: str, **kwargs) -> sqlite3.Connection:
+    """
+    Mở kết nối SQLite tới một file hoặc URI database.
+
+    Tham số:
+        path: Đường dẫn file hoặc URI ("file:...", mở với uri=True)
+        **kwargs: Tham số khác của sqlite3.connect
+
+    Trả về:
+        sqlite3.Connection: Kết nối SQLite
+    """
+    return sqlite3.connect(path, uri=is_uri(path), **kwargs)
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> set:
+    """Trả về tập tên cột của một bảng."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+def _column_type(cursor: sqlite3.Cursor, table: str, column: str) -> str:
+    """Trả về kiểu khai báo (viết hoa) của một cột, hoặc chuỗi rỗng."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    for row in cursor.fetchall():
+        if row[1] == column:
+            return (row[2] or "").upper()
+    return ""
+
+def _migrate_v1(conn: sqlite3.Connection) -> None:
+    """
+    Migration v1: chuẩn hóa khách hàng vào bảng customers.
+
+    Thêm cột invoices.customer_id (nếu chưa có), gộp các tên khách hàng
+    trùng nhau sau khi chuẩn hóa thành một bản ghi customers duy nhất
+    và gán khóa ngoại cho các hóa đơn cũ.
+    """
+    conn.create_function("normalize_customer_name", 1, normalize_customer_name, deterministic=True)
+    conn.create_function("format_customer_name", 1, format_customer_name, deterministic=True)
+    cursor = conn.cursor()
+
+    if "customer_id" not in _table_columns(cursor, "invoices"):
+        cursor.execute("ALTER TABLE invoices ADD COLUMN customer_id INTEGER REFERENCES customers (id)")
+
+    # Tên xuất hiện đầu tiên (theo id hóa đơn) được giữ làm tên hiển thị
+    cursor.execute("""
+    INSERT OR IGNORE INTO customers (name, normalized_name)
+    SELECT format_customer_name(customer_name), normalize_customer_name(customer_name)
+    FROM invoices
+    WHERE customer_id IS NULL
+    ORDER BY id;
+    """)
+    cursor.execute("""
+    UPDATE invoices
+    SET customer_id = (
+        SELECT c.id FROM customers c
+        WHERE c.normalized_name = normalize_customer_name(invoices.customer_name)
+    )
+    WHERE customer_id IS NULL;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_customer_id ON invoices (customer_id);")
+
+def _migrate_v2(conn: sqlite3.Connection) -> None:
+    """
+    Migration v2: chuyển cột giá từ REAL (đồng) sang INTEGER (1/100 đồng).
+
+    SQLite không đổi được kiểu cột, nên các bảng còn cột REAL được
+    dựng lại theo cách khuyến nghị: tạo bảng mới, chép dữ liệu đã
+    quy đổi, xóa bảng cũ và đổi tên.
+    """
+    cursor = conn.cursor()
+
+    if _column_type(cursor, "products", "unit_price") == "REAL":
+        cursor.executescript("""
+        CREATE TABLE products_new (
+            product_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            unit_price INTEGER NOT NULL,
+            calculation_unit TEXT,
+            category TEXT
+        );
+        INSERT INTO products_new (product_id, name, unit_price, calculation_unit, category)
+        SELECT product_id, name, CAST(ROUND(unit_price * 100) AS INTEGER), calculation_unit, category
+        FROM products;
+        DROP TABLE products;
+        ALTER TABLE products_new RENAME TO products;
+        """)
+
+    if _column_type(cursor, "invoice_items", "unit_price") == "REAL":
+        cursor.executescript("""
+        CREATE TABLE invoice_items_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_id INTEGER NOT NULL,
+            product_id TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price INTEGER NOT NULL,
+            FOREIGN KEY (invoice_id) REFERENCES invoices (id) ON DELETE CASCADE,
+            FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
+        );
+        INSERT INTO invoice_items_new (id, invoice_id, product_id, quantity, unit_price)
+        SELECT id, invoice_id, product_id, quantity, CAST(ROUND(unit_price * 100) AS INTEGER)
+        FROM invoice_items;
+        DROP TABLE invoice_items;
+        ALTER TABLE invoice_items_new RENAME TO invoice_items;
+        """)
+
+def _migrate_v3(conn: sqlite3.Connection) -> None:
+    """
+    Migration v3: index cho truy vấn theo hóa đơn và theo khoảng ngày.
+
+    invoice_items.invoice_id dùng khi nối các mục với hóa đơn,
+    invoices.date dùng khi lọc báo cáo/xuất dữ liệu theo ngày.
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice_id ON invoice_items (invoice_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_date ON invoices (date);")
+
+def _migrate_v4(conn: sqlite3.Connection) -> None:
+    """
+    Migration v4: bật auto_vacuum = INCREMENTAL.
+
+    Trang trống sau khi xóa dữ liệu được giữ trong freelist và trả lại
+    cho hệ điều hành bằng PRAGMA incremental_vacuum (xem MaintenanceManager).
+    Database mới đã có chế độ này từ trước khi tạo bảng. Database cũ chỉ
+    có chế độ này sau một lần VACUUM toàn bộ; VACUUM không chạy được trong
+    transaction nên được chạy sau khi commit cả chuỗi migration (xem
+    _enable_incremental_vacuum), không phải ở đây.
+    """
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+def _migrate_v5(conn: sqlite3.Connection) -> None:
+    """
+    Migration v5: lịch sử giá sản phẩm (product_prices).
+
+    Mỗi lần đổi giá thêm một dòng (product_id, unit_price, effective_from);
+    index (product_id, effective_from) cho phép tra giá tại một thời điểm
+    bằng một lần tìm theo khoảng thay vì quét bảng. Lịch sử được dựng lại
+    từ đơn giá đã chốt trong các hóa đơn cũ (mỗi lần giá đổi theo ngày hóa
+    đơn), cộng giá hiện tại có hiệu lực từ lúc migrate nếu khác giá cuối.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS product_prices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id TEXT NOT NULL,
+        unit_price INTEGER NOT NULL,
+        effective_from TEXT NOT NULL,
+        FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
+    );
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_product_prices_product_effective
+    ON product_prices (product_id, effective_from);
+    """)
+    cursor.execute("""
+    INSERT INTO product_prices (product_id, unit_price, effective_from)
+    SELECT product_id, unit_price, date FROM (
+        SELECT ii.product_id, ii.unit_price, i.date,
+               LAG(ii.unit_price) OVER (PARTITION BY ii.product_id ORDER BY i.date, ii.id) AS previous
+        FROM invoice_items ii
+        JOIN invoices i ON i.id = ii.invoice_id
+        JOIN products p ON p.product_id = ii.product_id
+    )
+    WHERE previous IS NULL OR previous <> unit_price;
+    """)
+    cursor.execute("""
+    INSERT INTO product_prices (product_id, unit_price, effective_from)
+    SELECT p.product_id, p.unit_price, ?
+    FROM products p
+    WHERE p.unit_price IS NOT (
+        SELECT pp.unit_price FROM product_prices pp
+        WHERE pp.product_id = p.product_id
+        ORDER BY pp.effective_from DESC, pp.id DESC LIMIT 1
+    );
+    """, (datetime.now().isoformat(sep=" ", timespec="seconds"),))
+
+MIGRATIONS = {
+    1: _migrate_v1,
+    2: _migrate_v2,
+    3: _migrate_v3,
+    4: _migrate_v4,
+    5: _migrate_v5,
+}
+
+def migrate_database(conn: sqlite3.Connection) -> int:
+    """
+    Chạy các migration còn thiếu dựa trên PRAGMA user_version.
+
+    Tham số:
+        conn: Kết nối SQLite đang mở (chưa commit)
+
+    Trả về:
+        int: Phiên bản schema sau khi migrate
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        MIGRATIONS[target](conn)
+        conn.execute(f"PRAGMA user_version = {target}")
+        version = target
+    return version
+
+def _enable_incremental_vacuum(conn: sqlite3.Connection, previous_version: int) -> None:
+    """
+    VACUUM một lần database cũ (trước v4) để bật auto_vacuum = INCREMENTAL.
+
+    Chạy sau khi chuỗi migration đã commit; database mới bỏ qua vì chế độ
+    đã được đặt trước khi tạo bảng. Có thể chậm trên database lớn.
+    """
+    if previous_version >= 4:
+        return
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+def initialize_database(path: str = None):
     """
     Khởi tạo database SQLite và tạo các bảng nếu chúng chưa tồn tại.
 
+    Tham số:
+        path: File database (mặc định: DATABASE_PATH)
+
     Trả về:
         tuple[bool, str]: (True/False, thông báo)
     """
+    path = path or DATABASE_PATH
     # Đảm bảo thư mục tồn tại
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
+    directory = "" if is_uri(path) else os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
 
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = connect_database(path)
         cursor = conn.cursor()
+        previous_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        # Chỉ có hiệu lực với database mới (chưa có bảng): không cần VACUUM
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
 
         # Bảng sản phẩm (products)
+        # Giá được lưu bằng số nguyên đơn vị nhỏ nhất (1/100 đồng)
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS products (
             product_id TEXT PRIMARY KEY,
             name TEXT NOT NULL,
-            unit_price REAL NOT NULL,
+            unit_price INTEGER NOT NULL,
             calculation_unit TEXT,
             category TEXT
         );
         """)
 
+        # Bảng khách hàng (customers)
+        # `normalized_name` là khóa tra cứu duy nhất sau khi chuẩn hóa tên
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            normalized_name TEXT NOT NULL
+        );
+        """)
+        cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_normalized_name
+        ON customers (normalized_name);
+        """)
+
         # Bảng hóa đơn (invoices)
         # `id` sẽ là khóa chính tự động tăng
+        # `customer_name` giữ tên hiển thị tại thời điểm lập hóa đơn
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS invoices (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             customer_name TEXT NOT NULL,
-            date TEXT NOT NULL
+            date TEXT NOT NULL,
+            customer_id INTEGER,
+            FOREIGN KEY (customer_id) REFERENCES customers (id)
         );
         """)
 
@@ -63,14 +336,17 @@ def initialize_database():
             invoice_id INTEGER NOT NULL,
             product_id TEXT NOT NULL,
             quantity INTEGER NOT NULL,
-            unit_price REAL NOT NULL,
+            unit_price INTEGER NOT NULL,
             FOREIGN KEY (invoice_id) REFERENCES invoices (id) ON DELETE CASCADE,
             FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
         );
         """)
 
+        migrate_database(conn)
+
         conn.commit()
-        return True, f"Database đã được khởi tạo thành công tại: {DATABASE_PATH}"
+        _enable_incremental_vacuum(conn, previous_version)
+        return True, f"Database đã được khởi tạo thành công tại: {path}"
 
     except sqlite3.Error as e:
         return False, f"Lỗi khi khởi tạo database: {e}"
@@ -78,6 +354,49 @@ def initialize_database():
         if conn:
             conn.close()
 
+def ensure_database_initialized(path: str = None):
+    """
+    Khởi tạo database chỉ khi schema chưa ở phiên bản hiện tại.
+
+    Các manager gọi hàm này khi được tạo; với database đã khởi tạo, chỉ
+    tốn một lần đọc PRAGMA user_version thay vì chạy lại toàn bộ DDL và
+    kiểm tra migration.
+
+    Tham số:
+        path: File database (mặc định: DATABASE_PATH)
+
+    Trả về:
+        tuple[bool, str]: (True/False, thông báo)
+    """
+    path = path or DATABASE_PATH
+    if schema_version(path) == SCHEMA_VERSION:
+        return True, f"Database đã được khởi tạo tại: {path}"
+    return initialize_database(path)
+
+def schema_version(path: str = None):
+    """
+    Đọc phiên bản schema (PRAGMA user_version) của một database.
+
+    Tham số:
+        path: File database (mặc định: DATABASE_PATH)
+
+    Trả về:
+        Optional[int]: Phiên bản, hoặc None nếu file chưa tồn tại hoặc
+        không đọc được
+    """
+    path = path or DATABASE_PATH
+    if not is_uri(path) and not os.path.exists(path):
+        return None
+    conn = None
+    try:
+        conn = connect_database(path)
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.Error:
+        return None
+    finally:
+        if conn:
+            conn.close()
+
 if __name__ == '__main__':
     # Chạy file này trực tiếp để tạo database
     print("Đang tiến hành khởi tạo database...")
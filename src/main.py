@@ -4,30 +4,36 @@
 Điểm vào chính cho Hệ thống Quản lý Hóa đơn.
 
 Module này chứa hàm main() phục vụ như điểm khởi đầu chính
-của ứng dụng quản lý hóa đơn. Khi được chạy trực tiếp,
-nó sẽ khởi động giao diện đồ họa của ứng dụng.
+của ứng dụng quản lý hóa đơn. Khi được chạy không kèm tham số,
+nó sẽ khởi động giao diện đồ họa; khi có tham số, các tham số
+được chuyển cho giao diện dòng lệnh (ui.cli).
 """
-from ui.gui import start_gui
+import sys
 
 def main():
     """
     Điểm vào chính cho Hệ thống Quản lý Hóa đơn.
     
     Khởi tạo và bắt đầu giao diện người dùng đồ họa cho ứng dụng
-    quản lý hóa đơn. Hàm này phục vụ như điểm vào chính khi
-    ứng dụng được chạy trực tiếp.
+    quản lý hóa đơn. Nếu có tham số dòng lệnh, chạy CLI thay vì GUI
+    (không import tkinter).
     
     Trả về:
         None
     
     Ném ra:
-        SystemExit: Nếu GUI không thể được khởi tạo
+        SystemExit: Nếu GUI không thể được khởi tạo, hoặc với mã thoát của CLI
     """
+    if len(sys.argv) > 1:
+        from ui.cli import main as cli_main
+        raise SystemExit(cli_main(sys.argv[1:]))
+
     try:
+        from ui.gui import start_gui
         start_gui()
     except Exception as e:
         print(f"Lỗi khi khởi động ứng dụng: {e}")
         raise SystemExit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
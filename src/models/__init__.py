@@ -7,9 +7,11 @@ Gói này export các dataclass chính:
 - Product: Mô hình sản phẩm
 - Invoice: Mô hình hóa đơn
 - InvoiceItem: Mô hình mục hàng trong hóa đơn
+- Money: Kiểu giá trị tiền tệ (số nguyên đơn vị nhỏ nhất)
 """
 
+from .money import Money
 from .product import Product
 from .invoice import Invoice, InvoiceItem
 
-__all__ = ['Product', 'Invoice', 'InvoiceItem'] 
\ No newline at end of file
+__all__ = ['Product', 'Invoice', 'InvoiceItem', 'Money'] 
\ No newline at end of file
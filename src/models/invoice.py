@@ -8,12 +8,15 @@ Module này định nghĩa các dataclass cho hóa đơn bao gồm:
 - Invoice: Đại diện cho toàn bộ hóa đơn với danh sách các mục hàng
 
 Các model này cung cấp các property để tính toán tự động
-tổng tiền và số lượng mặt hàng.
+tổng tiền và số lượng mặt hàng. Tiền được cộng dồn bằng số nguyên
+đơn vị nhỏ nhất (xem models.money).
 """
 
 from dataclasses import dataclass, field
 import datetime
-from typing import List
+from typing import List, Optional
+
+from .money import Money
 
 @dataclass
 class InvoiceItem:
@@ -23,16 +26,25 @@ class InvoiceItem:
     Thuộc tính:
         product_id (str): Mã sản phẩm
         quantity (int): Số lượng
-        unit_price (float): Giá mỗi đơn vị
+        unit_price (Money): Giá mỗi đơn vị (nhận cả số tiền theo đồng)
     """
     product_id: str
     quantity: int
-    unit_price: float
-    
+    unit_price: Money
+
+    def __post_init__(self):
+        """Chuẩn hóa đơn giá về Money."""
+        self.unit_price = Money.coerce(self.unit_price)
+
     @property
-    def total_price(self) -> float:
+    def total_minor(self) -> int:
+        """Tổng giá trị của mặt hàng theo đơn vị nhỏ nhất."""
+        return self.unit_price.minor * self.quantity
+
+    @property
+    def total_price(self) -> Money:
         """Tính tổng giá trị cho mặt hàng này."""
-        return self.quantity * self.unit_price
+        return Money(self.total_minor)
 
 
 @dataclass
@@ -45,16 +57,23 @@ class Invoice:
         date (str): Ngày lập hóa đơn
         customer_name (str): Tên khách hàng
         items (List[InvoiceItem]): Danh sách các mặt hàng trong hóa đơn
+        customer_id (Optional[int]): Khóa tới bảng customers (nếu có)
     """
     invoice_id: str
     customer_name: str
     items: List[InvoiceItem] = field(default_factory=list)
     date: str = field(default_factory=lambda: datetime.datetime.now().strftime('%Y-%m-%d'))
+    customer_id: Optional[int] = None
     
     @property
-    def total_amount(self) -> float:
+    def total_minor(self) -> int:
+        """Tổng giá trị của hóa đơn theo đơn vị nhỏ nhất."""
+        return sum(item.unit_price.minor * item.quantity for item in self.items)
+
+    @property
+    def total_amount(self) -> Money:
         """Tính tổng giá trị của hóa đơn."""
-        return sum(item.total_price for item in self.items)
+        return Money(self.total_minor)
     
     @property
     def total_items(self) -> int:
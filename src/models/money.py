@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểu giá trị tiền tệ cho Hệ thống Quản lý Hóa đơn.
+
+Module này định nghĩa lớp Money lưu số tiền dưới dạng số nguyên
+đơn vị nhỏ nhất (1/100 đồng) để mọi phép cộng, nhân và tổng hợp
+đều chính xác tuyệt đối. Việc chuyển sang số thực chỉ diễn ra ở
+bước định dạng hiển thị.
+"""
+
+import operator
+import re
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from fractions import Fraction
+from typing import Union
+
+# Số đơn vị nhỏ nhất trong một đồng và số chữ số thập phân tương ứng
+MINOR_UNITS = 100
+MINOR_DIGITS = 2
+
+# Giới hạn của kiểu INTEGER 64-bit trong SQLite
+_SQLITE_INT_MIN = -(2 ** 63)
+_SQLITE_INT_MAX = 2 ** 63 - 1
+
+# Định dạng dạng "[[fill]align][sign][width][,].2f" được xử lý bằng số nguyên
+_FORMAT_SPEC = re.compile(r'^(?P<align>.?[<>^=])?(?P<sign>[+\- ])?(?P<width>\d+)?(?P<comma>,)?\.2f$')
+
+Number = Union[int, float, str, Decimal]
+
+
+def to_minor(amount: Number) -> int:
+    """
+    Chuyển số tiền (đơn vị đồng) sang số nguyên đơn vị nhỏ nhất.
+
+    Làm tròn nửa lên tới 1/100 đồng. Số thực được chuyển qua chuỗi
+    để 0.1 cho đúng 10 chứ không phải 10.000000000000002.
+
+    Ném ra:
+        ValueError: Nếu giá trị không phải là số hợp lệ
+    """
+    if isinstance(amount, bool):
+        raise ValueError(f"Số tiền không hợp lệ: {amount!r}")
+    if isinstance(amount, int):
+        return amount * MINOR_UNITS
+    try:
+        value = Decimal(str(amount)) * MINOR_UNITS
+        return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, TypeError, OverflowError):
+        raise ValueError(f"Số tiền không hợp lệ: {amount!r}")
+
+
+@dataclass(frozen=True, eq=False)
+class Money:
+    """
+    Số tiền biểu diễn bằng số nguyên đơn vị nhỏ nhất.
+
+    Thuộc tính:
+        minor (int): Số tiền tính theo 1/100 đồng
+
+    Ghi chú:
+        So sánh với int/float được hiểu theo đơn vị đồng và chính xác
+        theo giá trị, nên Money.from_major(100.0) == 100.0 nhưng
+        Money.from_major(1) != 1.004. Các phép toán số học chỉ
+        nhận Money (cộng/trừ) hoặc số nguyên (nhân với số lượng).
+    """
+    minor: int = 0
+
+    @classmethod
+    def from_major(cls, amount: Number) -> 'Money':
+        """Tạo Money từ số tiền tính theo đồng."""
+        return cls(to_minor(amount))
+
+    @classmethod
+    def coerce(cls, value: Union['Money', Number]) -> 'Money':
+        """Trả về Money; giá trị số được hiểu theo đơn vị đồng."""
+        if isinstance(value, Money):
+            return value
+        return cls.from_major(value)
+
+    @classmethod
+    def from_sqlite(cls, value: Union[int, float]) -> 'Money':
+        """Tạo Money từ giá trị đọc ra từ cột giá (đơn vị nhỏ nhất)."""
+        return cls(int(value))
+
+    def to_sqlite(self) -> Union[int, float]:
+        """
+        Giá trị để ghi vào cột giá trong SQLite.
+
+        Trả về số nguyên; chỉ những số tiền vượt phạm vi INTEGER 64-bit
+        mới được ghi dưới dạng REAL.
+        """
+        if _SQLITE_INT_MIN <= self.minor <= _SQLITE_INT_MAX:
+            return self.minor
+        return float(self.minor)
+
+    @property
+    def amount(self) -> float:
+        """Số tiền theo đơn vị đồng (chỉ dùng khi hiển thị)."""
+        return self.minor / MINOR_UNITS
+
+    def _compare(self, other, op) -> bool:
+        """
+        So sánh chính xác với Money hoặc số (int/float/Decimal theo đồng).
+
+        Số được so sánh đúng giá trị của nó (qua Fraction), không làm tròn
+        tới 1/100 đồng, nên Money.from_major(1) != 1.004 và phép so sánh
+        nhất quán với __hash__.
+        """
+        if isinstance(other, Money):
+            return op(self.minor, other.minor)
+        if not isinstance(other, (int, float, Decimal)) or isinstance(other, bool):
+            return NotImplemented
+        try:
+            value = Fraction(other)
+        except (ValueError, OverflowError):
+            # nan/vô cực: để Python dùng cách so sánh mặc định
+            return NotImplemented
+        return op(Fraction(self.minor, MINOR_UNITS), value)
+
+    def __eq__(self, other) -> bool:
+        return self._compare(other, operator.eq)
+
+    def __lt__(self, other) -> bool:
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other) -> bool:
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other) -> bool:
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other) -> bool:
+        return self._compare(other, operator.ge)
+
+    def __hash__(self) -> int:
+        # Bằng hash của số cùng giá trị (int/float/Decimal), nhất quán với __eq__
+        return hash(Fraction(self.minor, MINOR_UNITS))
+
+    def __add__(self, other) -> 'Money':
+        if isinstance(other, Money):
+            return Money(self.minor + other.minor)
+        return NotImplemented
+
+    def __radd__(self, other) -> 'Money':
+        # Cho phép sum() với giá trị khởi đầu 0
+        if isinstance(other, int) and other == 0:
+            return self
+        return self.__add__(other)
+
+    def __sub__(self, other) -> 'Money':
+        if isinstance(other, Money):
+            return Money(self.minor - other.minor)
+        return NotImplemented
+
+    def __mul__(self, factor) -> 'Money':
+        if isinstance(factor, int) and not isinstance(factor, bool):
+            return Money(self.minor * factor)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> 'Money':
+        return Money(-self.minor)
+
+    def __bool__(self) -> bool:
+        return self.minor != 0
+
+    def __float__(self) -> float:
+        return self.amount
+
+    def __str__(self) -> str:
+        return format(self, ',.2f')
+
+    def __format__(self, spec: str) -> str:
+        """
+        Định dạng số tiền.
+
+        Các định dạng ".2f" (kèm căn lề, độ rộng, dấu phẩy) được dựng
+        trực tiếp từ phần nguyên và phần lẻ, không đi qua số thực.
+        """
+        match = _FORMAT_SPEC.match(spec)
+        if match is None:
+            return format(self.amount, spec)
+
+        major, cents = divmod(abs(self.minor), MINOR_UNITS)
+        body = f"{major:,}" if match.group('comma') else str(major)
+        text = f"{body}.{cents:0{MINOR_DIGITS}d}"
+        sign = match.group('sign') or '-'
+        if self.minor < 0:
+            text = '-' + text
+        elif sign in '+ ':
+            text = sign + text
+
+        width = match.group('width')
+        if not width:
+            return text
+        align = match.group('align') or '>'
+        if align.endswith('='):
+            # Chèn ký tự đệm giữa dấu và chữ số
+            fill = align[:-1] or ' '
+            prefix = text[0] if text[0] in '+- ' else ''
+            return prefix + text[len(prefix):].rjust(int(width) - len(prefix), fill)
+        return format(text, align + width)
@@ -11,6 +11,8 @@ trong __post_init__ method.
 
 from dataclasses import dataclass, field
 
+from .money import Money
+
 @dataclass
 class Product:
     """
@@ -19,13 +21,13 @@ class Product:
     Thuộc tính:
         product_id (str): Định danh duy nhất cho sản phẩm
         name (str): Tên sản phẩm
-        unit_price (float): Giá mỗi đơn vị
+        unit_price (Money): Giá mỗi đơn vị (nhận cả số tiền theo đồng)
         category (str): Danh mục sản phẩm (mặc định: "Chung")
         calculation_unit (str): Đơn vị tính (mặc định: "đơn vị")
     """
     product_id: str
     name: str
-    unit_price: float
+    unit_price: Money
     calculation_unit: str = field(default="đơn vị")
     category: str = field(default="Chung")
     
@@ -33,5 +35,6 @@ class Product:
         """Xác thực dữ liệu sản phẩm."""
         if not self.product_id or not self.name:
             raise ValueError("Mã sản phẩm và tên không được để trống")
+        self.unit_price = Money.coerce(self.unit_price)
         if self.unit_price < 0:
             raise ValueError("Đơn giá không được âm")
\ No newline at end of file
@@ -5,10 +5,18 @@ Gói ui chứa giao diện người dùng cho Hệ thống Quản lý Hóa đơn
 
 Gói này chứa:
 - gui: Giao diện đồ họa Tkinter
-- Các thành phần UI tương lai (CLI, web interface)
+- cli: Giao diện dòng lệnh (không cần màn hình)
+- http_server: Dịch vụ HTTP/JSON dùng chung cho nhiều quầy
+
+Module gui chỉ được import khi thực sự dùng đến, để CLI chạy được
+trên máy chủ không có tkinter/màn hình.
 """
 
-# Xuất cụ thể hàm start_gui 
-from .gui import start_gui
+__all__ = ['gui', 'cli', 'start_gui']
 
-__all__ = ['gui', 'start_gui'] 
\ No newline at end of file
+def __getattr__(name):
+    """Import trễ gui/start_gui khi được truy cập lần đầu."""
+    if name in ('gui', 'start_gui'):
+        from . import gui
+        return gui if name == 'gui' else gui.start_gui
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Giao diện dòng lệnh (CLI) cho Hệ thống Quản lý Hóa đơn.
+
+Module này cung cấp điểm vào không cần màn hình cho các tác vụ hàng loạt
+và không import tkinter. Các lệnh con:
+- import: Nhập sản phẩm/hóa đơn từ CSV/JSONL
+- export: Xuất hóa đơn, mục hóa đơn hoặc báo cáo ra CSV/JSONL
+- report: In các báo cáo của StatisticsManager ra console
+- db: Khởi tạo/migrate database, xem thông tin và bảo trì (optimize,
+  analyze, vacuum, check, maintain)
+- archive: Chuyển hóa đơn các năm đã đóng sổ sang file lưu trữ theo năm
+- backup: Sao lưu trực tuyến database ra snapshot (có thể nén) và khôi phục
+- bench: Đo thời gian tải dữ liệu và chạy các báo cáo
+- serve: Chạy dịch vụ HTTP/JSON (xem ui.http_server)
+
+Tùy chọn chung --query-stats in số liệu truy vấn (số câu lệnh, thời gian
+theo thao tác, truy vấn chậm kèm EXPLAIN QUERY PLAN) ra stderr sau khi
+lệnh chạy xong. Tùy chọn --profile đo độ trễ (p50/p95/p99) và bộ nhớ của
+các phương thức manager (xem utils.profiling).
+
+Cách dùng (từ thư mục src):
+    python -m ui.cli report revenue_by_date
+    python main.py import products products.csv
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+REPORTS = ("revenue_by_date", "revenue_by_product", "top_customers")
+# Báo cáo tính trực tiếp từ database (không xuất CSV, không chạy song song)
+BASKET_REPORT = "basket_analysis"
+# Tác vụ bảo trì của lệnh db ("maintain" chạy optimize, vacuum và check)
+MAINTENANCE_ACTIONS = ("optimize", "analyze", "vacuum", "check", "maintain")
+EXPORT_KINDS = ("invoices", "items") + REPORTS
+
+def _print_json(data: Any) -> None:
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+def _database():
+    """Database của lệnh (đường dẫn theo --db); schema khởi tạo một lần cho mọi manager."""
+    from database.context import DatabaseContext
+    return DatabaseContext()
+
+def _load_managers(with_invoices: bool = True):
+    """Khởi tạo các manager cần thiết (import trễ để lệnh db chạy nhanh)."""
+    from core import ProductManager, InvoiceManager
+    product_manager = ProductManager(database=_database())
+    invoice_manager = InvoiceManager(product_manager) if with_invoices else None
+    return product_manager, invoice_manager
+
+# ----------------------------------------------------------------------
+# Các lệnh con
+# ----------------------------------------------------------------------
+
+def cmd_import(args: argparse.Namespace) -> int:
+    """Nhập dữ liệu từ file."""
+    from core import ImportManager
+    product_manager, invoice_manager = _load_managers(with_invoices=args.kind == "invoices")
+    importer = ImportManager(product_manager, invoice_manager, batch_size=args.batch_size)
+
+    if args.kind == "products":
+        report, message = importer.import_products(args.file)
+    else:
+        report, message = importer.import_invoices(args.file)
+
+    if report is None:
+        print(message, file=sys.stderr)
+        return 1
+    if args.errors:
+        report.write_errors(args.errors)
+    if args.json:
+        _print_json(report.to_dict())
+    else:
+        print(message)
+        for error in report.errors[:args.show_errors]:
+            print(f"  Dòng {error.line_number}: {error.message}")
+    return 0 if report.rows_rejected == 0 or not args.strict else 1
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Xuất dữ liệu hoặc báo cáo ra file."""
+    from core import ExportManager
+    exporter = ExportManager(fetch_size=args.fetch_size)
+    options = dict(date_from=args.date_from, date_to=args.date_to, compress=args.gzip)
+
+    if args.kind == "invoices":
+        report, message = exporter.export_invoices(args.file, **options)
+    elif args.kind == "items":
+        report, message = exporter.export_items(args.file, **options)
+    else:
+        report, message = exporter.export_report(args.kind, args.file, limit=args.limit, **options)
+
+    if report is None:
+        print(message, file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json(report.to_dict())
+    else:
+        print(message)
+    return 0
+
+def cmd_report(args: argparse.Namespace) -> int:
+    """In một báo cáo của StatisticsManager."""
+    from core import StatisticsManager
+    if args.name == BASKET_REPORT:
+        return _report_basket(args)
+    if args.workers or args.date_from or args.date_to:
+        return _report_parallel(args)
+    product_manager, invoice_manager = _load_managers()
+    statistics_manager = StatisticsManager(invoice_manager, product_manager)
+
+    if args.name == "top_customers":
+        statistics_manager.top_customers(limit=args.limit)
+    else:
+        getattr(statistics_manager, args.name)()
+    return 0
+
+def _report_basket(args: argparse.Namespace) -> int:
+    """In các cặp sản phẩm thường được mua cùng nhau (bảng hoặc JSON)."""
+    from core import StatisticsManager
+    # Báo cáo đọc invoice_items theo luồng từ database, không cần tải hóa đơn
+    product_manager, _ = _load_managers(with_invoices=False)
+    statistics_manager = StatisticsManager(None, product_manager)
+    try:
+        if not args.json:
+            statistics_manager.basket_analysis(args.min_support, args.min_confidence, limit=args.limit,
+                                               date_from=args.date_from, date_to=args.date_to)
+            return 0
+        report = statistics_manager.get_basket_analysis(
+            args.min_support, args.min_confidence, limit=args.limit,
+            date_from=args.date_from, date_to=args.date_to
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    except sqlite3.Error as e:
+        print(f"Lỗi khi tính báo cáo: {e}", file=sys.stderr)
+        return 1
+    _print_json(report.to_dict())
+    return 0
+
+def _report_parallel(args: argparse.Namespace) -> int:
+    """Tính báo cáo trực tiếp từ database trên nhiều tiến trình và in JSON."""
+    from core import StatisticsManager
+    from models import Money
+    # Không cần tải hóa đơn vào bộ nhớ: các tiến trình con tự đọc database
+    product_manager, _ = _load_managers(with_invoices=False)
+    statistics_manager = StatisticsManager(None, product_manager)
+    try:
+        rows, total = statistics_manager.get_report_parallel(
+            args.name, args.date_from, args.date_to, limit=args.limit, workers=args.workers
+        )
+    except sqlite3.Error as e:
+        print(f"Lỗi khi tính báo cáo: {e}", file=sys.stderr)
+        return 1
+    _print_json({
+        "report": args.name,
+        "rows": [list(row[:-1]) + [format(Money(row[-1]), ".2f")] for row in rows],
+        "total": format(Money(total), ".2f"),
+    })
+    return 0
+
+def cmd_db(args: argparse.Namespace) -> int:
+    """Các tác vụ bảo trì database."""
+    from database.database import initialize_database, SCHEMA_VERSION
+    import utils.db_utils
+
+    if args.action in ("init", "migrate"):
+        success, message = initialize_database(utils.db_utils.current_database_path())
+        print(message, file=sys.stdout if success else sys.stderr)
+        return 0 if success else 1
+    if args.action in MAINTENANCE_ACTIONS:
+        return _db_maintenance(args)
+
+    # info
+    path = utils.db_utils.current_database_path()
+    if not os.path.exists(path):
+        print(f"Database không tồn tại: {path}", file=sys.stderr)
+        return 1
+    conn = sqlite3.connect(path)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+    info = {
+        "path": path,
+        "size_bytes": os.path.getsize(path),
+        "schema_version": version,
+        "expected_schema_version": SCHEMA_VERSION,
+        "tables": counts,
+    }
+    if args.json:
+        _print_json(info)
+    else:
+        print(f"Database: {info['path']} ({info['size_bytes']:,} bytes)")
+        print(f"Phiên bản schema: {version} (mới nhất: {SCHEMA_VERSION})")
+        for table, count in counts.items():
+            print(f"  {table:<20} {count:>12,} dòng")
+    return 0
+
+def _db_maintenance(args: argparse.Namespace) -> int:
+    """Chạy các tác vụ bảo trì và in thời gian, dung lượng thu hồi."""
+    from core import MaintenanceManager
+    manager = MaintenanceManager()
+    if args.action == "analyze":
+        results = [manager.optimize(full=True)]
+    elif args.action == "maintain":
+        results = manager.run()
+    else:
+        results = manager.run([args.action])
+
+    if args.json:
+        _print_json([result.to_dict() for result in results])
+    else:
+        for result in results:
+            print(result.summary(), file=sys.stdout if result.success else sys.stderr)
+    return 0 if all(result.success for result in results) else 1
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    """Lưu trữ, khôi phục hoặc liệt kê hóa đơn theo năm."""
+    from core import ArchiveManager
+    manager = ArchiveManager()
+
+    if args.action == "list":
+        archives = manager.list_archives()
+        if args.json:
+            _print_json(archives)
+        else:
+            for archive in archives:
+                print(f"  {archive['year']}  {archive['invoices']:>12,} hóa đơn  "
+                      f"{archive['size_bytes']:>14,} bytes  {archive['path']}")
+        return 0
+
+    if args.year is None:
+        print("Cần chỉ định năm (--year).", file=sys.stderr)
+        return 2
+    if args.action == "run":
+        success, message = manager.archive_year(args.year)
+    else:
+        success, message = manager.restore_year(args.year)
+    print(message, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+def cmd_backup(args: argparse.Namespace) -> int:
+    """Sao lưu database ra file hoặc khôi phục từ file."""
+    from core import BackupManager
+    manager = BackupManager(pages_per_step=args.pages, step_delay=args.delay_ms / 1000)
+
+    if args.action == "restore":
+        success, message = manager.restore(args.file)
+        print(message, file=sys.stdout if success else sys.stderr)
+        return 0 if success else 1
+
+    def progress(done: int, total: int) -> None:
+        if not args.quiet:
+            print(f"\r  {done}/{total} trang ({done * 100 // max(total, 1)}%)", end="", file=sys.stderr)
+
+    report, message = manager.backup(args.file, compress=args.gzip, progress=progress)
+    if not args.quiet:
+        print(file=sys.stderr)
+    if report is None:
+        print(message, file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json(report.to_dict())
+    else:
+        print(message)
+    return 0
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Đo thời gian tải dữ liệu và chạy từng báo cáo trên database hiện tại."""
+    from core import ProductManager, InvoiceManager, StatisticsManager
+
+    def timed(func: Callable[[], Any]) -> float:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    product_manager = ProductManager(database=_database())
+    invoice_manager = InvoiceManager(product_manager)
+    statistics_manager = StatisticsManager(invoice_manager, product_manager)
+
+    results: Dict[str, float] = {
+        "load_products": timed(product_manager.load_products),
+        "load_invoices": timed(invoice_manager.load_invoices),
+    }
+    for name in REPORTS:
+        results[name] = timed(getattr(statistics_manager, name))
+
+    output = {
+        "products": len(product_manager.products),
+        "invoices": len(invoice_manager.invoices),
+        "seconds": {name: round(value, 6) for name, value in results.items()},
+    }
+    if args.json:
+        _print_json(output)
+    else:
+        print(f"{len(product_manager.products)} sản phẩm, {len(invoice_manager.invoices)} hóa đơn")
+        for name, value in results.items():
+            print(f"  {name:<20} {value * 1000:>10.2f} ms")
+    return 0
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Chạy dịch vụ HTTP/JSON cho đến khi bị ngắt."""
+    import logging
+    from core import MaintenanceManager
+    from ui.http_server import serve
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    maintenance = MaintenanceManager()
+    if args.maintenance_hours:
+        maintenance.start_schedule(args.maintenance_hours * 3600)
+    try:
+        serve(args.host, args.port, pool_size=args.pool_size)
+    finally:
+        maintenance.stop_schedule()
+    return 0
+
+# ----------------------------------------------------------------------
+# Parser
+# ----------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    """Tạo argparse parser cho CLI."""
+    parser = argparse.ArgumentParser(
+        prog="invoicemanager",
+        description="Hệ thống Quản lý Hóa đơn - giao diện dòng lệnh"
+    )
+    parser.add_argument("--db", help="Đường dẫn file database (mặc định: database/invoicemanager.db)")
+    parser.add_argument("--query-stats", action="store_true",
+                        help="In số liệu truy vấn dạng JSON ra stderr khi kết thúc")
+    parser.add_argument("--slow-query-ms", type=float,
+                        help="Ngưỡng ghi log truy vấn chậm (ms, mặc định 100)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Đo hiệu năng các manager và in JSON ra stderr khi kết thúc")
+    parser.add_argument("--profile-output", metavar="FILE",
+                        help="Ghi số liệu --profile ra FILE (.prom cho Prometheus, còn lại JSON)")
+    parser.add_argument("--profile-memory", type=int, default=0, metavar="N",
+                        help="Đo bộ nhớ bằng tracemalloc, lấy mẫu 1/N lần gọi (cần --profile)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("import", help="Nhập dữ liệu từ CSV/JSONL")
+    p.add_argument("kind", choices=("products", "invoices"))
+    p.add_argument("file")
+    p.add_argument("--batch-size", type=int, default=5000)
+    p.add_argument("--errors", help="Ghi danh sách dòng lỗi ra file CSV")
+    p.add_argument("--show-errors", type=int, default=10, help="Số dòng lỗi in ra console")
+    p.add_argument("--strict", action="store_true", help="Trả mã lỗi nếu có dòng bị loại")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser("export", help="Xuất dữ liệu/báo cáo ra CSV/JSONL")
+    p.add_argument("kind", choices=EXPORT_KINDS)
+    p.add_argument("file")
+    p.add_argument("--from", dest="date_from", help="Ngày bắt đầu YYYY-MM-DD")
+    p.add_argument("--to", dest="date_to", help="Ngày kết thúc YYYY-MM-DD")
+    p.add_argument("--limit", type=int, default=5, help="Số khách hàng (top_customers)")
+    p.add_argument("--gzip", action="store_true", help="Nén file đầu ra")
+    p.add_argument("--fetch-size", type=int, default=1000)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_export)
+
+    p = subparsers.add_parser("report", help="In báo cáo thống kê")
+    p.add_argument("name", choices=REPORTS + (BASKET_REPORT,))
+    p.add_argument("--limit", type=int, default=5,
+                   help="Số khách hàng (top_customers) hoặc số luật (basket_analysis)")
+    p.add_argument("--from", dest="date_from", help="Ngày bắt đầu YYYY-MM-DD (tính từ database, in JSON)")
+    p.add_argument("--to", dest="date_to", help="Ngày kết thúc YYYY-MM-DD (tính từ database, in JSON)")
+    p.add_argument("--workers", type=int,
+                   help="Tính song song trên N tiến trình trực tiếp từ database (in JSON)")
+    p.add_argument("--min-support", type=float, default=0.01,
+                   help="Tỷ lệ hóa đơn tối thiểu chứa cả cặp sản phẩm (basket_analysis)")
+    p.add_argument("--min-confidence", type=float, default=0.0,
+                   help="Confidence tối thiểu của một luật (basket_analysis)")
+    p.add_argument("--json", action="store_true", help="In JSON (basket_analysis)")
+    p.set_defaults(func=cmd_report)
+
+    p = subparsers.add_parser("db", help="Bảo trì database")
+    p.add_argument("action", choices=("init", "migrate", "info") + MAINTENANCE_ACTIONS)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_db)
+
+    p = subparsers.add_parser("archive", help="Lưu trữ hóa đơn theo năm")
+    p.add_argument("action", choices=("run", "restore", "list"))
+    p.add_argument("--year", type=int, help="Năm cần lưu trữ/khôi phục")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_archive)
+
+    p = subparsers.add_parser("backup", help="Sao lưu/khôi phục database khi đang chạy")
+    p.add_argument("action", choices=("create", "restore"))
+    p.add_argument("file", help="File snapshot (.db hoặc .db.gz)")
+    p.add_argument("--gzip", action="store_true", help="Nén snapshot")
+    p.add_argument("--pages", type=int, default=256, help="Số trang chép mỗi bước")
+    p.add_argument("--delay-ms", type=float, default=0.0, help="Thời gian nghỉ giữa các bước (ms)")
+    p.add_argument("--quiet", action="store_true", help="Không in tiến độ")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_backup)
+
+    p = subparsers.add_parser("bench", help="Đo thời gian tải dữ liệu và chạy báo cáo")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_bench)
+
+    p = subparsers.add_parser("serve", help="Chạy dịch vụ HTTP/JSON cho nhiều quầy")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--pool-size", type=int, default=8, help="Số kết nối database tối đa")
+    p.add_argument("--maintenance-hours", type=float,
+                   help="Chạy bảo trì database (optimize, vacuum, check) mỗi N giờ")
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Điểm vào của CLI.
+
+    Tham số:
+        argv: Danh sách tham số (mặc định lấy từ sys.argv)
+
+    Trả về:
+        int: Mã thoát (0 nếu thành công)
+    """
+    args = build_parser().parse_args(argv)
+    if args.db:
+        from database.context import DatabaseContext
+        from utils.db_utils import set_default_database
+        set_default_database(DatabaseContext(args.db))
+    if args.slow_query_ms is not None:
+        import logging
+        from utils.db_utils import configure_query_metrics
+        configure_query_metrics(slow_query_ms=args.slow_query_ms)
+        # Cảnh báo truy vấn chậm đi qua logging; in ra stderr khi người dùng yêu cầu
+        logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(message)s")
+    if args.profile:
+        from utils.profiling import enable_profiling
+        enable_profiling(memory_sample_rate=args.profile_memory)
+
+    code = args.func(args)
+    if args.profile:
+        from utils.profiling import profile_to_json, write_profile
+        if args.profile_output:
+            write_profile(args.profile_output)
+        else:
+            print(profile_to_json(), file=sys.stderr)
+    if args.query_stats:
+        from utils.db_utils import get_query_metrics
+        print(json.dumps(get_query_metrics(), ensure_ascii=False, indent=2), file=sys.stderr)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,11 @@ Module này cung cấp giao diện đồ họa chính của ứng dụng, bao g
 - Chức năng quản lý sản phẩm: thêm, sửa, xóa, hiển thị danh sách
 - Chức năng quản lý hóa đơn: tạo mới, xem chi tiết, xóa
 - Chức năng thống kê: doanh thu, sản phẩm bán chạy, khách hàng VIP
+
+Ở chế độ khởi động nhanh (mặc định), cửa sổ hiện ra trước khi tải dữ liệu:
+schema chỉ được khởi tạo khi còn cũ, sản phẩm được tải ngay sau khi cửa sổ
+hiển thị, còn tab hóa đơn và thống kê chỉ được dựng và tải dữ liệu khi
+được chọn lần đầu.
 """
 
 import tkinter as tk
@@ -19,6 +24,22 @@ from collections import defaultdict
 from core.product_manager import ProductManager
 from core.invoice_manager import InvoiceManager
 from core.statistics_manager import StatisticsManager
+from core.report_cache import ReportCache
+from models import Money
+
+def _price_text(price: Money) -> str:
+    """Đơn giá điền sẵn vào ô nhập, đọc lại được bằng _parse_price (không có dấu phẩy)."""
+    return format(price, ".2f")
+
+def _parse_price(text: str, default: Money) -> Money:
+    """
+    Đọc đơn giá từ ô nhập (đơn vị đồng); chuỗi rỗng cho giá trị mặc định.
+
+    Ném ra:
+        ValueError: Nếu chuỗi không phải là số tiền hợp lệ
+    """
+    text = text.strip()
+    return Money.coerce(text) if text else default
 
 class InvoiceAppGUI:
     """
@@ -32,14 +53,18 @@ class InvoiceAppGUI:
         product_manager: Đối tượng quản lý sản phẩm
         invoice_manager: Đối tượng quản lý hóa đơn
         statistics_manager: Đối tượng quản lý thống kê
+        lazy: Chế độ khởi động nhanh (dựng và tải tab khi được chọn)
     """
     
-    def __init__(self, root):
+    def __init__(self, root, lazy: bool = True):
         """
         Khởi tạo giao diện ứng dụng quản lý hóa đơn.
         
         Tham số:
             root: Cửa sổ gốc Tkinter
+            lazy: Hiện cửa sổ trước rồi mới tải dữ liệu; tab hóa đơn và
+                thống kê được dựng khi chọn lần đầu. False: dựng và tải
+                tất cả trước khi hiện cửa sổ
             
         Ném ra:
             Exception: Nếu không thể khởi tạo các trình quản lý
@@ -47,12 +72,17 @@ class InvoiceAppGUI:
         self.root = root
         self.root.title("Hệ thống Quản lý Hóa đơn")
         self.root.geometry("900x700")
+        self.lazy = lazy
+        self._invoices_loaded = False
 
         try:
-            # Khởi tạo các trình quản lý
-            self.product_manager = ProductManager()
-            self.invoice_manager = InvoiceManager(self.product_manager)
-            self.statistics_manager = StatisticsManager(self.invoice_manager, self.product_manager)
+            # Khởi tạo các trình quản lý (ở chế độ nhanh chưa tải dữ liệu)
+            self.product_manager = ProductManager(load=not lazy)
+            self.invoice_manager = InvoiceManager(self.product_manager, load=not lazy)
+            self._invoices_loaded = not lazy
+            # Báo cáo được lưu đệm: bấm xem lại khi dữ liệu chưa đổi không phải tính lại
+            self.statistics_manager = StatisticsManager(self.invoice_manager, self.product_manager,
+                                                        cache=ReportCache())
         except Exception as e:
             messagebox.showerror("Lỗi khởi tạo", f"Không thể khởi tạo trình quản lý: {str(e)}")
             self.root.destroy()
@@ -69,10 +99,41 @@ class InvoiceAppGUI:
         self.notebook.add(self.statistics_tab, text='Thống kê')
         self.notebook.pack(expand=True, fill='both', padx=10, pady=10)
 
-        # Điền nội dung cho mỗi tab
+        # Điền nội dung cho mỗi tab; ở chế độ nhanh chỉ dựng tab đang hiển thị,
+        # các tab còn lại được dựng khi chọn lần đầu
+        self._pending_tabs = {
+            str(self.invoice_tab): self._create_invoice_tab,
+            str(self.statistics_tab): self._create_statistics_tab,
+        }
         self._create_product_tab()
-        self._create_invoice_tab()
-        self._create_statistics_tab()
+        if lazy:
+            self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        else:
+            for create_tab in self._pending_tabs.values():
+                create_tab()
+            self._pending_tabs.clear()
+
+    def _on_tab_changed(self, event=None):
+        """Dựng tab được chọn nếu chưa dựng (chế độ khởi động nhanh)."""
+        create_tab = self._pending_tabs.pop(str(self.notebook.select()), None)
+        if create_tab is not None:
+            create_tab()
+
+    def _load_initial(self, loader):
+        """Tải dữ liệu ban đầu của một tab: ngay, hoặc sau khi giao diện đã vẽ xong."""
+        if self.lazy:
+            self.root.after_idle(loader)
+        else:
+            loader()
+
+    def _ensure_invoices_loaded(self):
+        """Tải hóa đơn nếu chưa tải (thống kê cần danh sách hóa đơn)."""
+        if not self._invoices_loaded:
+            success, message = self.invoice_manager.load_invoices()
+            if not success:
+                messagebox.showerror("Lỗi", f"Không thể tải danh sách hóa đơn: {message}")
+                return
+            self._invoices_loaded = True
 
     def _create_product_tab(self):
         """
@@ -113,7 +174,7 @@ class InvoiceAppGUI:
         ttk.Button(button_frame, text="Xóa", command=self.delete_product).pack(side="left", padx=5)
         
         # Tải dữ liệu ban đầu
-        self.load_products()
+        self._load_initial(self.load_products)
 
     def load_products(self):
         """Tải lại danh sách sản phẩm từ manager và cập nhật Treeview."""
@@ -176,8 +237,7 @@ class InvoiceAppGUI:
 
         def on_add():
             try:
-                price_str = entries["Đơn giá"].get().strip()
-                price = float(price_str) if price_str else 0.0
+                price = _parse_price(entries["Đơn giá"].get(), Money(0))
 
                 success, message = self.product_manager.add_product(
                     product_id=entries["Mã sản phẩm"].get().strip(),
@@ -236,7 +296,7 @@ class InvoiceAppGUI:
         input_frame = ttk.Frame(dialog, padding=10)
         input_frame.pack(fill="both", expand=True)
         
-        fields = {"Tên sản phẩm": product.name, "Đơn giá": str(product.unit_price), 
+        fields = {"Tên sản phẩm": product.name, "Đơn giá": _price_text(product.unit_price),
                   "Đơn vị tính": product.calculation_unit, "Danh mục": product.category}
         entries = {}
         for i, (field, value) in enumerate(fields.items()):
@@ -248,8 +308,7 @@ class InvoiceAppGUI:
 
         def on_update():
             try:
-                price_str = entries["Đơn giá"].get().strip()
-                price = float(price_str) if price_str else product.unit_price
+                price = _parse_price(entries["Đơn giá"].get(), product.unit_price)
 
                 success, message = self.product_manager.update_product(
                     product_id=product_id,
@@ -341,7 +400,7 @@ class InvoiceAppGUI:
         ttk.Button(button_frame, text="Tạo hóa đơn", command=self.create_new_invoice).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Xóa hóa đơn", command=self.delete_invoice).pack(side="left", padx=5)
         
-        self.load_invoices()
+        self._load_initial(self.load_invoices)
 
     def load_invoices(self):
         """Tải lại danh sách hóa đơn từ manager và cập nhật Treeview."""
@@ -350,6 +409,7 @@ class InvoiceAppGUI:
             if not success:
                 messagebox.showerror("Lỗi", f"Không thể tải danh sách hóa đơn: {message}")
                 return
+            self._invoices_loaded = True
 
             for item in self.invoice_tree.get_children():
                 self.invoice_tree.delete(item)
@@ -630,6 +690,8 @@ class InvoiceAppGUI:
         Trả về:
             None
         """
+        self._ensure_invoices_loaded()
+
         # Tạo các frame cho các loại thống kê
         stats_notebook = ttk.Notebook(self.statistics_tab)
         stats_notebook.pack(fill="both", expand=True, padx=10, pady=5)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dịch vụ HTTP/JSON cho Hệ thống Quản lý Hóa đơn.
+
+Module này cho phép nhiều quầy thu ngân dùng chung một database qua mạng
+nội bộ, chỉ dùng thư viện chuẩn (http.server):
+- Mỗi kết nối HTTP được phục vụ trên một luồng riêng, giữ kết nối
+  (HTTP/1.1 keep-alive) giữa các request
+- Mỗi request mượn một kết nối SQLite từ ConnectionPool (WAL, đọc song song)
+- Tạo hóa đơn đi qua InvoiceWriteQueue (group commit); các thao tác ghi
+  khác được tuần tự hóa bằng một khóa ghi
+- Kết quả báo cáo thống kê được lưu đệm (ReportCache) cho đến lần ghi tiếp theo
+
+Các endpoint:
+    GET    /health
+    GET    /products                  POST /products
+    GET    /products/<id>             PUT  /products/<id>     DELETE /products/<id>
+    GET    /invoices?customer=&limit=&offset=                 POST /invoices
+    GET    /invoices/<id>             DELETE /invoices/<id>
+    GET    /stats/revenue-by-date
+    GET    /stats/revenue-by-product
+    GET    /stats/top-customers?limit=5
+
+Số tiền được trả về dạng chuỗi có hai chữ số thập phân (ví dụ "1500.00").
+
+Cách dùng (từ thư mục src):
+    python main.py serve --host 0.0.0.0 --port 8080
+"""
+
+import json
+import logging
+import re
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from core import ProductManager, InvoiceManager, StatisticsManager, InvoiceWriteQueue, ReportCache
+from models import Invoice, Money, Product
+from database.context import DatabaseContext
+
+logger = logging.getLogger(__name__)
+
+# Kích thước tối đa của body request (byte)
+MAX_BODY_BYTES = 1024 * 1024
+# Số hóa đơn tối đa trả về trong một trang
+MAX_PAGE_SIZE = 1000
+
+Response = Tuple[int, Any]
+
+
+class ApiError(Exception):
+    """Lỗi trả về cho client kèm mã trạng thái HTTP."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _money(value: Money) -> str:
+    return format(value, ".2f")
+
+def _product_to_dict(product: Product) -> Dict[str, Any]:
+    return {
+        "product_id": product.product_id,
+        "name": product.name,
+        "unit_price": _money(product.unit_price),
+        "calculation_unit": product.calculation_unit,
+        "category": product.category,
+    }
+
+def _invoice_to_dict(invoice: Invoice) -> Dict[str, Any]:
+    return {
+        "invoice_id": invoice.invoice_id,
+        "customer_name": invoice.customer_name,
+        "date": invoice.date,
+        "items": [
+            {
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price": _money(item.unit_price),
+                "total": _money(item.total_price),
+            }
+            for item in invoice.items
+        ],
+        "total_amount": _money(invoice.total_amount),
+    }
+
+def _int_param(query: Dict[str, List[str]], name: str, default: int, minimum: int = 0) -> int:
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Tham số '{name}' phải là số nguyên.")
+    if value < minimum:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Tham số '{name}' phải lớn hơn hoặc bằng {minimum}.")
+    return value
+
+
+class InvoiceService:
+    """
+    Xử lý nghiệp vụ cho các endpoint, dùng chung giữa các luồng phục vụ.
+
+    Thuộc tính:
+        product_manager (ProductManager): Quản lý sản phẩm
+        invoice_manager (InvoiceManager): Quản lý hóa đơn
+        statistics_manager (StatisticsManager): Báo cáo thống kê
+        database (DatabaseContext): Database phục vụ, sở hữu nhóm kết nối
+        pool (ConnectionPool): Nhóm kết nối cho các request (database.pool)
+        writer (InvoiceWriteQueue): Hàng đợi ghi hóa đơn
+    """
+
+    def __init__(self, pool_size: int = 8, max_batch: int = 200, max_delay_ms: float = 5,
+                 database: Optional[DatabaseContext] = None):
+        """Tải dữ liệu, mở nhóm kết nối và khởi động hàng đợi ghi."""
+        self.database = database if database is not None else DatabaseContext(pool_size=pool_size)
+        self.pool = self.database.pool
+        with self.pool.connection():
+            self.product_manager = ProductManager(database=self.database)
+            self.invoice_manager = InvoiceManager(self.product_manager)
+        self.report_cache = ReportCache()
+        self.statistics_manager = StatisticsManager(self.invoice_manager, self.product_manager,
+                                                    cache=self.report_cache)
+        self.writer = InvoiceWriteQueue(self.invoice_manager, max_batch=max_batch, max_delay_ms=max_delay_ms)
+        self._write_lock = threading.Lock()
+
+        self.routes: List[Tuple[str, re.Pattern, Callable[..., Response]]] = [
+            ("GET", re.compile(r"/health"), self.health),
+            ("GET", re.compile(r"/products"), self.list_products),
+            ("POST", re.compile(r"/products"), self.add_product),
+            ("GET", re.compile(r"/products/([^/]+)"), self.get_product),
+            ("PUT", re.compile(r"/products/([^/]+)"), self.update_product),
+            ("DELETE", re.compile(r"/products/([^/]+)"), self.delete_product),
+            ("GET", re.compile(r"/invoices"), self.list_invoices),
+            ("POST", re.compile(r"/invoices"), self.create_invoice),
+            ("GET", re.compile(r"/invoices/([^/]+)"), self.get_invoice),
+            ("DELETE", re.compile(r"/invoices/([^/]+)"), self.delete_invoice),
+            ("GET", re.compile(r"/stats/(revenue-by-date|revenue-by-product|top-customers)"), self.report),
+        ]
+
+    def dispatch(self, method: str, path: str, query: Dict[str, List[str]],
+                 body: Optional[Dict[str, Any]]) -> Response:
+        """
+        Tìm endpoint khớp và xử lý request.
+
+        Trả về:
+            Response: (mã trạng thái HTTP, dữ liệu JSON)
+
+        Ném ra:
+            ApiError: Nếu không có endpoint khớp hoặc request không hợp lệ
+        """
+        path = path.rstrip("/") or "/"
+        allowed = []
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            with self.pool.connection():
+                return handler(*match.groups(), query=query, body=body)
+        if allowed:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"Phương thức {method} không được hỗ trợ cho {path}.")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Không tìm thấy {path}.")
+
+    def _write(self, func: Callable[..., Tuple[bool, str]], *args, **kwargs) -> Tuple[bool, str]:
+        """Chạy một thao tác ghi của manager dưới khóa ghi."""
+        with self._write_lock:
+            return func(*args, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Endpoint
+    # ------------------------------------------------------------------
+
+    def health(self, query, body) -> Response:
+        return HTTPStatus.OK, {
+            "status": "ok",
+            "products": len(self.product_manager.products),
+            "invoices": len(self.invoice_manager.invoices),
+            "write_queue": self.writer.stats(),
+            "report_cache": self.report_cache.stats(),
+        }
+
+    def list_products(self, query, body) -> Response:
+        return HTTPStatus.OK, [_product_to_dict(product) for product in self.product_manager.products]
+
+    def _require_product(self, product_id: str) -> Product:
+        product = self.product_manager.find_product(product_id)
+        if product is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Không tìm thấy sản phẩm với Mã '{product_id}'!")
+        return product
+
+    def get_product(self, product_id: str, query, body) -> Response:
+        return HTTPStatus.OK, _product_to_dict(self._require_product(product_id))
+
+    def add_product(self, query, body) -> Response:
+        data = body or {}
+        missing = [field for field in ("product_id", "name", "unit_price") if field not in data]
+        if missing:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Thiếu trường: {', '.join(missing)}.")
+        success, message = self._write(
+            self.product_manager.add_product,
+            data["product_id"], data["name"], data["unit_price"],
+            data.get("calculation_unit", "đơn vị"), data.get("category", "Chung")
+        )
+        if not success:
+            raise ApiError(HTTPStatus.BAD_REQUEST, message)
+        return HTTPStatus.CREATED, {
+            "message": message,
+            "product": _product_to_dict(self._require_product(data["product_id"])),
+        }
+
+    def update_product(self, product_id: str, query, body) -> Response:
+        self._require_product(product_id)
+        fields = ("name", "unit_price", "calculation_unit", "category")
+        success, message = self._write(
+            self.product_manager.update_product, product_id,
+            **{field: (body or {}).get(field) for field in fields}
+        )
+        if not success:
+            raise ApiError(HTTPStatus.BAD_REQUEST, message)
+        return HTTPStatus.OK, {"message": message, "product": _product_to_dict(self._require_product(product_id))}
+
+    def delete_product(self, product_id: str, query, body) -> Response:
+        self._require_product(product_id)
+        success, message = self._write(self.product_manager.delete_product, product_id)
+        if not success:
+            raise ApiError(HTTPStatus.BAD_REQUEST, message)
+        return HTTPStatus.OK, {"message": message}
+
+    def list_invoices(self, query, body) -> Response:
+        limit = min(_int_param(query, "limit", 100, minimum=1), MAX_PAGE_SIZE)
+        offset = _int_param(query, "offset", 0)
+        customer = query.get("customer")
+        invoices = (self.invoice_manager.find_invoices_by_customer(customer[0]) if customer
+                    else self.invoice_manager.invoices)
+        return HTTPStatus.OK, {
+            "total": len(invoices),
+            "invoices": [_invoice_to_dict(invoice) for invoice in invoices[offset:offset + limit]],
+        }
+
+    def get_invoice(self, invoice_id: str, query, body) -> Response:
+        invoice = self.invoice_manager.find_invoice(invoice_id)
+        if invoice is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Không tìm thấy hóa đơn với ID '{invoice_id}'!")
+        return HTTPStatus.OK, _invoice_to_dict(invoice)
+
+    def create_invoice(self, query, body) -> Response:
+        data = body or {}
+        items = data.get("items")
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Trường 'items' phải là danh sách các mục hàng.")
+        invoice, message = self.writer.create_invoice(data.get("customer_name", ""), items, data.get("date"))
+        if invoice is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, message)
+        return HTTPStatus.CREATED, {"message": message, "invoice": _invoice_to_dict(invoice)}
+
+    def delete_invoice(self, invoice_id: str, query, body) -> Response:
+        if self.invoice_manager.find_invoice(invoice_id) is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Không tìm thấy hóa đơn với ID '{invoice_id}'!")
+        success, message = self._write(self.invoice_manager.delete_invoice, invoice_id)
+        if not success:
+            raise ApiError(HTTPStatus.BAD_REQUEST, message)
+        return HTTPStatus.OK, {"message": message}
+
+    def report(self, name: str, query, body) -> Response:
+        if name == "revenue-by-date":
+            rows, total = self.statistics_manager.get_revenue_by_date()
+            rows = [{"date": date, "revenue": _money(Money(minor))} for date, minor in rows]
+        elif name == "revenue-by-product":
+            rows, total = self.statistics_manager.get_revenue_by_product()
+            rows = [{"product_id": product_id, "name": product_name, "quantity": quantity,
+                     "revenue": _money(Money(minor))}
+                    for product_id, product_name, quantity, minor in rows]
+        else:
+            rows, total = self.statistics_manager.get_top_customers(_int_param(query, "limit", 5))
+            rows = [{"customer_name": customer, "spending": _money(Money(minor))} for customer, minor in rows]
+        return HTTPStatus.OK, {"rows": rows, "total": _money(Money(total))}
+
+    def close(self) -> None:
+        """Ghi nốt hàng đợi và đóng các kết nối."""
+        self.writer.close()
+        self.database.close()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Chuyển request HTTP thành lời gọi InvoiceService và trả JSON."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "InvoiceManager/1.0"
+
+    def _handle(self, method: str) -> None:
+        url = urlsplit(self.path)
+        try:
+            body = self._read_body() if method in ("POST", "PUT") else None
+            status, payload = self.server.service.dispatch(method, url.path, parse_qs(url.query), body)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception:
+            logger.exception("Lỗi khi xử lý %s %s", method, self.path)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Lỗi máy chủ."}
+        self._send_json(status, payload)
+
+    def _read_body(self) -> Optional[Dict[str, Any]]:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length không hợp lệ.")
+        if length > MAX_BODY_BYTES:
+            # Không đọc body quá lớn nên không thể giữ kết nối
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body request quá lớn.")
+        if length == 0:
+            return None
+        raw = self.rfile.read(length)
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body request không phải JSON hợp lệ.")
+        if not isinstance(data, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body request phải là một đối tượng JSON.")
+        return data
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class InvoiceHTTPServer(ThreadingHTTPServer):
+    """Máy chủ HTTP đa luồng gắn với một InvoiceService."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: InvoiceService):
+        super().__init__(address, RequestHandler)
+        self.service = service
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.service.close()
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8080, pool_size: int = 8,
+                  database: Optional[DatabaseContext] = None) -> InvoiceHTTPServer:
+    """
+    Tạo máy chủ HTTP (chưa chạy) trên database hiện tại.
+
+    Tham số:
+        host: Địa chỉ lắng nghe
+        port: Cổng lắng nghe (0 để hệ điều hành tự chọn)
+        pool_size: Số kết nối SQLite tối đa dùng cho các request
+        database: Database phục vụ (mặc định: database hiện hành)
+
+    Trả về:
+        InvoiceHTTPServer: Máy chủ; gọi serve_forever() để chạy
+    """
+    return InvoiceHTTPServer((host, port), InvoiceService(pool_size=pool_size, database=database))
+
+def serve(host: str = "127.0.0.1", port: int = 8080, pool_size: int = 8,
+          database: Optional[DatabaseContext] = None) -> None:
+    """Chạy máy chủ HTTP cho đến khi bị ngắt (Ctrl+C)."""
+    server = create_server(host, port, pool_size, database)
+    logger.info("Đang phục vụ tại http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -7,6 +7,9 @@ Gói này chứa các module:
 - validation: Kiểm tra tính hợp lệ dữ liệu
 - formatting: Định dạng dữ liệu hiển thị
 - db_utils: Thao tác với database
+- file_io: Đọc/ghi file CSV/JSONL
+- profiling: Đo hiệu năng các phương thức manager (tùy chọn bật)
+- rendering: Hiển thị bảng văn bản (ghi một lần hoặc từng đoạn)
 """
 
 from .formatting import format_currency
@@ -9,13 +9,502 @@ phục vụ các manager khác và xử lý lỗi một cách an toàn.
 Bao gồm:
 - Kiểm tra và tạo database
 - Lưu, tải, cập nhật và xóa dữ liệu
+- Ghi hàng loạt bằng executemany trong một transaction
+- Unit of work: gom nhiều thao tác vào một transaction (transaction())
+- Nhóm kết nối dùng chung giữa các luồng (ConnectionPool)
+- Chọn database theo ngữ cảnh (use_database, bind_database_methods), mặc
+  định là database của tiến trình (default_database, xem database.context)
+- Đọc kết quả truy vấn dạng luồng bằng fetchmany
+- Đo thời gian mọi câu lệnh, gom số liệu theo thao tác và ghi log truy vấn chậm
 - Xử lý lỗi và exception an toàn
 """
 
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
 import sqlite3
 import os
-from typing import Any, List, Dict, Optional, Tuple
-from database.database import DATABASE_PATH
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Dict, Optional, Sequence, Tuple
+import database.database
+from database.database import connect_database, is_uri
+
+logger = logging.getLogger(__name__)
+# Thư viện không tự in log: cảnh báo truy vấn chậm chỉ hiện khi ứng dụng cấu hình logging
+logger.addHandler(logging.NullHandler())
+
+# Ngưỡng truy vấn chậm (ms), có thể đặt qua biến môi trường
+SLOW_QUERY_MS = float(os.environ.get("INVOICE_SLOW_QUERY_MS", "100"))
+# Giới hạn số câu lệnh khác nhau được thống kê và số truy vấn chậm được giữ lại
+_MAX_STATEMENTS = 500
+_MAX_SLOW_QUERIES = 100
+
+# ----------------------------------------------------------------------
+# Đo đạc truy vấn
+# ----------------------------------------------------------------------
+
+@dataclass
+class OperationStats:
+    """
+    Số liệu truy vấn của một thao tác logic (ví dụ tạo một hóa đơn).
+
+    Thuộc tính:
+        name (str): Tên thao tác
+        queries (int): Số câu lệnh đã thực thi
+        rows (int): Số dòng đọc được hoặc bị thay đổi
+        db_seconds (float): Tổng thời gian thực thi và đọc kết quả trong SQLite
+        elapsed_seconds (float): Thời gian của cả thao tác
+    """
+    name: str
+    queries: int = 0
+    rows: int = 0
+    db_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        """Tóm tắt số liệu dưới dạng một dòng."""
+        return (f"{self.name}: {self.queries} truy vấn, {self.rows} dòng, "
+                f"{self.db_seconds * 1000:.1f} ms trong database / {self.elapsed_seconds * 1000:.1f} ms")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển số liệu sang dict (dùng cho JSON)."""
+        return {
+            "name": self.name,
+            "queries": self.queries,
+            "rows": self.rows,
+            "db_ms": round(self.db_seconds * 1000, 3),
+            "elapsed_ms": round(self.elapsed_seconds * 1000, 3),
+        }
+
+
+class QueryMetrics:
+    """
+    Bộ đếm truy vấn trong tiến trình.
+
+    Gom số lần chạy, số dòng và thời gian theo từng câu lệnh (đã chuẩn hóa
+    khoảng trắng) và theo từng thao tác, đồng thời giữ danh sách các truy
+    vấn chậm gần nhất kèm EXPLAIN QUERY PLAN.
+
+    Thuộc tính:
+        enabled (bool): Có ghi nhận số liệu hay không
+        slow_query_ms (float): Ngưỡng truy vấn chậm (ms)
+    """
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS):
+        """Khởi tạo bộ đếm rỗng."""
+        self.enabled = True
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Xóa toàn bộ số liệu đã ghi nhận."""
+        with self._lock:
+            self.queries = 0
+            self.rows = 0
+            self.db_seconds = 0.0
+            self.statements: Dict[str, Dict[str, Any]] = {}
+            self.operations: Dict[str, Dict[str, Any]] = {}
+            self.slow_queries: deque = deque(maxlen=_MAX_SLOW_QUERIES)
+
+    def record(self, sql: str, seconds: float, rows: int, new_statement: bool) -> None:
+        """
+        Ghi nhận thời gian và số dòng của một câu lệnh.
+
+        Tham số:
+            sql: Câu lệnh đã chuẩn hóa
+            seconds: Thời gian cộng thêm
+            rows: Số dòng cộng thêm
+            new_statement: True khi câu lệnh vừa được thực thi, False khi
+                chỉ đọc thêm kết quả của câu lệnh trước đó
+        """
+        with self._lock:
+            key = sql if sql in self.statements or len(self.statements) < _MAX_STATEMENTS else "(khác)"
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = {"count": 0, "rows": 0, "seconds": 0.0, "max_seconds": 0.0}
+            stats["rows"] += rows
+            stats["seconds"] += seconds
+            if new_statement:
+                stats["count"] += 1
+                self.queries += 1
+            self.rows += rows
+            self.db_seconds += seconds
+
+        for operation in _current_operations.get():
+            if new_statement:
+                operation.queries += 1
+            operation.rows += rows
+            operation.db_seconds += seconds
+
+    def record_statement_time(self, sql: str, seconds: float) -> None:
+        """Cập nhật thời gian lớn nhất của một lần chạy câu lệnh."""
+        with self._lock:
+            stats = self.statements.get(sql)
+            if stats is not None and seconds > stats["max_seconds"]:
+                stats["max_seconds"] = seconds
+
+    def record_operation(self, stats: OperationStats) -> None:
+        """Cộng dồn số liệu của một thao tác đã kết thúc."""
+        with self._lock:
+            totals = self.operations.get(stats.name)
+            if totals is None:
+                totals = self.operations[stats.name] = {
+                    "calls": 0, "queries": 0, "rows": 0, "db_seconds": 0.0, "elapsed_seconds": 0.0
+                }
+            totals["calls"] += 1
+            totals["queries"] += stats.queries
+            totals["rows"] += stats.rows
+            totals["db_seconds"] += stats.db_seconds
+            totals["elapsed_seconds"] += stats.elapsed_seconds
+            totals["last"] = stats.to_dict()
+
+    def record_slow(self, entry: Dict[str, Any]) -> None:
+        """Lưu một truy vấn chậm vào danh sách gần nhất."""
+        with self._lock:
+            self.slow_queries.append(entry)
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Lấy bản chụp số liệu hiện tại (có thể ghi ra JSON).
+
+        Tham số:
+            top: Số câu lệnh tốn thời gian nhất được liệt kê
+
+        Trả về:
+            Dict[str, Any]: Tổng số, các câu lệnh, các thao tác và truy vấn chậm
+        """
+        with self._lock:
+            statements = sorted(self.statements.items(), key=lambda item: item[1]["seconds"], reverse=True)
+            return {
+                "enabled": self.enabled,
+                "slow_query_ms": self.slow_query_ms,
+                "queries": self.queries,
+                "rows": self.rows,
+                "db_ms": round(self.db_seconds * 1000, 3),
+                "statements": [
+                    {
+                        "sql": sql,
+                        "count": stats["count"],
+                        "rows": stats["rows"],
+                        "total_ms": round(stats["seconds"] * 1000, 3),
+                        "max_ms": round(stats["max_seconds"] * 1000, 3),
+                    }
+                    for sql, stats in statements[:top]
+                ],
+                "operations": {
+                    name: {
+                        "calls": totals["calls"],
+                        "queries": totals["queries"],
+                        "rows": totals["rows"],
+                        "db_ms": round(totals["db_seconds"] * 1000, 3),
+                        "elapsed_ms": round(totals["elapsed_seconds"] * 1000, 3),
+                        "last": totals["last"],
+                    }
+                    for name, totals in self.operations.items()
+                },
+                "slow_queries": [dict(entry) for entry in self.slow_queries],
+            }
+
+
+_metrics = QueryMetrics()
+# Các thao tác đang chạy trong ngữ cảnh hiện tại (ngoài cùng trước)
+_current_operations: contextvars.ContextVar = contextvars.ContextVar("db_operations", default=())
+
+
+def _normalize_sql(sql: str) -> str:
+    return " ".join(sql.split())
+
+def _explain(conn: sqlite3.Connection, sql: str, params: Any) -> Optional[List[str]]:
+    """Lấy EXPLAIN QUERY PLAN của câu lệnh, hoặc None nếu không lấy được."""
+    try:
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in rows.fetchall()]
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor đo thời gian thực thi và đọc kết quả của từng câu lệnh.
+
+    Thời gian và số dòng khi fetch được cộng vào câu lệnh đang chạy của
+    cursor. Khi tổng thời gian của câu lệnh vượt ngưỡng, câu lệnh được
+    ghi log (một lần) kèm EXPLAIN QUERY PLAN.
+
+    Ghi chú:
+        Chỉ execute/executemany và fetchone/fetchmany/fetchall được đo.
+        Duyệt cursor từng dòng (for row in cursor) không bị đo, vì đo mỗi
+        dòng làm chậm việc đọc nhiều lần; mã cần số liệu đầy đủ cho truy
+        vấn lớn nên đọc bằng fetchmany (xem stream_query).
+    """
+
+    _sql = ""
+    _params: Any = ()
+    _elapsed = 0.0
+    _slow_entry: Optional[Dict[str, Any]] = None
+
+    def execute(self, sql: str, parameters: Any = ()) -> 'InstrumentedCursor':
+        if not _metrics.enabled:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._begin(sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> 'InstrumentedCursor':
+        if not _metrics.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        first = seq_of_parameters[0] if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters else ()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._begin(sql, first, time.perf_counter() - start)
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(1 if row is not None else 0, time.perf_counter() - start)
+        return row
+
+    def fetchmany(self, size: int = -1) -> List[Any]:
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size < 0 else size)
+        self._fetched(len(rows), time.perf_counter() - start)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), time.perf_counter() - start)
+        return rows
+
+    def _begin(self, sql: str, params: Any, seconds: float) -> None:
+        self._sql = _normalize_sql(sql)
+        self._params = params
+        self._elapsed = seconds
+        self._slow_entry = None
+        _metrics.record(self._sql, seconds, max(self.rowcount, 0), new_statement=True)
+        self._check_slow()
+
+    def _fetched(self, rows: int, seconds: float) -> None:
+        if not self._sql or not _metrics.enabled:
+            return
+        self._elapsed += seconds
+        _metrics.record(self._sql, seconds, rows, new_statement=False)
+        self._check_slow()
+
+    def _check_slow(self) -> None:
+        _metrics.record_statement_time(self._sql, self._elapsed)
+        if self._slow_entry is not None:
+            self._slow_entry["ms"] = round(self._elapsed * 1000, 3)
+            return
+        if self._elapsed * 1000 < _metrics.slow_query_ms:
+            return
+        operations = _current_operations.get()
+        self._slow_entry = {
+            "sql": self._sql,
+            "ms": round(self._elapsed * 1000, 3),
+            "operation": operations[-1].name if operations else None,
+            "plan": _explain(self.connection, self._sql, self._params),
+        }
+        _metrics.record_slow(self._slow_entry)
+        logger.warning("Truy vấn chậm (%.1f ms): %s | plan: %s", self._elapsed * 1000, self._sql,
+                       "; ".join(self._slow_entry["plan"] or []))
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Kết nối SQLite tạo InstrumentedCursor cho mọi câu lệnh."""
+
+    def cursor(self, factory: Any = InstrumentedCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+@contextlib.contextmanager
+def query_operation(name: str) -> Iterator[OperationStats]:
+    """
+    Gom số liệu truy vấn của một thao tác logic.
+
+    Dùng được dưới dạng context manager hoặc decorator. Truy vấn của các
+    thao tác lồng nhau được tính cho cả thao tác bên ngoài.
+
+    Tham số:
+        name: Tên thao tác (ví dụ "invoice.create")
+
+    Trả về:
+        Iterator[OperationStats]: Số liệu của thao tác (cập nhật khi chạy)
+
+    Ví dụ:
+        with query_operation("invoice.create") as stats:
+            manager.create_invoice(...)
+        print(stats.summary())  # invoice.create: 34 truy vấn, ... / 180.0 ms
+    """
+    stats = OperationStats(name)
+    token = _current_operations.set(_current_operations.get() + (stats,))
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.elapsed_seconds = time.perf_counter() - start
+        _current_operations.reset(token)
+        if _metrics.enabled:
+            _metrics.record_operation(stats)
+            logger.debug(stats.summary())
+
+def get_query_metrics(top: int = 20) -> Dict[str, Any]:
+    """
+    Lấy số liệu truy vấn của tiến trình hiện tại.
+
+    Tham số:
+        top: Số câu lệnh tốn thời gian nhất được liệt kê
+
+    Trả về:
+        Dict[str, Any]: Bản chụp số liệu (xem QueryMetrics.snapshot)
+    """
+    return _metrics.snapshot(top)
+
+def reset_query_metrics() -> None:
+    """Xóa toàn bộ số liệu truy vấn đã ghi nhận."""
+    _metrics.reset()
+
+def configure_query_metrics(enabled: Optional[bool] = None, slow_query_ms: Optional[float] = None) -> None:
+    """
+    Bật/tắt việc đo truy vấn và đặt ngưỡng truy vấn chậm.
+
+    Tham số:
+        enabled: Bật (True) hoặc tắt (False) việc ghi nhận số liệu
+        slow_query_ms: Ngưỡng truy vấn chậm (ms); 0 để ghi log mọi truy vấn
+    """
+    if enabled is not None:
+        _metrics.enabled = enabled
+    if slow_query_ms is not None:
+        _metrics.slow_query_ms = slow_query_ms
+
+# Database (DatabaseContext) đang dùng trong ngữ cảnh hiện tại; None: default_database()
+_active_database: contextvars.ContextVar = contextvars.ContextVar("db_database", default=None)
+
+# Database mặc định của tiến trình, dùng khi không có database nào được gắn
+# (luồng mới không thừa hưởng contextvars); tạo khi dùng lần đầu
+_default_database: Any = None
+_default_lock = threading.Lock()
+
+def default_database() -> Any:
+    """
+    Database mặc định của tiến trình.
+
+    Trả về:
+        DatabaseContext: Database đặt bởi set_default_database, hoặc
+        database.database.DATABASE_PATH nếu chưa đặt
+    """
+    global _default_database
+    with _default_lock:
+        if _default_database is None:
+            from database.context import DatabaseContext
+            _default_database = DatabaseContext(database.database.DATABASE_PATH)
+        return _default_database
+
+def set_default_database(database: Any) -> Any:
+    """
+    Đặt database mặc định của tiến trình.
+
+    Tham số:
+        database: DatabaseContext mới; None quay về DATABASE_PATH
+
+    Trả về:
+        Any: Database mặc định trước đó (None nếu chưa đặt), để khôi phục
+    """
+    global _default_database
+    with _default_lock:
+        previous, _default_database = _default_database, database
+    return previous
+
+def current_database_path() -> str:
+    """
+    Đường dẫn database mà các hàm trong module đang dùng.
+
+    Là đường dẫn của database gắn bởi use_database() nếu có, ngược lại là
+    đường dẫn của database mặc định (default_database).
+
+    Trả về:
+        str: Đường dẫn file database
+    """
+    database = _active_database.get()
+    return (database or default_database()).path
+
+@contextlib.contextmanager
+def use_database(database: Any) -> Iterator[Any]:
+    """
+    Cho các hàm tiện ích trong khối with dùng một database khác mặc định.
+
+    Tham số:
+        database: Đối tượng có thuộc tính path (thường là DatabaseContext);
+            None giữ nguyên database hiện hành
+
+    Trả về:
+        Iterator[Any]: Chính database đó
+    """
+    if database is None:
+        yield database
+        return
+    token = _active_database.set(database)
+    try:
+        yield database
+    finally:
+        _active_database.reset(token)
+
+def bind_database_methods(cls: type) -> type:
+    """
+    Class decorator: mọi phương thức công khai chạy trên self.database.
+
+    Dùng cho các manager nhận DatabaseContext qua tham số database; khi
+    self.database là None, phương thức chạy trên database mặc định như
+    trước. Gắn theo từng lời gọi (không theo luồng), nên manager dùng từ
+    luồng khác (hàng đợi ghi, executor của asyncio) vẫn đúng database.
+
+    Tham số:
+        cls: Lớp manager
+
+    Trả về:
+        type: Chính lớp đó
+    """
+    def bind(method: Any) -> Any:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            database = self.database
+            if database is None or _active_database.get() is database:
+                return method(self, *args, **kwargs)
+            token = _active_database.set(database)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                _active_database.reset(token)
+        return wrapper
+
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value):
+            continue
+        setattr(cls, attr, bind(value))
+    return cls
+
+def _connect() -> sqlite3.Connection:
+    return connect_database(current_database_path(), factory=InstrumentedConnection)
+
+# ----------------------------------------------------------------------
+# Thao tác dữ liệu
+# ----------------------------------------------------------------------
 
 def ensure_database_exists() -> Tuple[bool, str]:
     """
@@ -26,43 +515,428 @@ def ensure_database_exists() -> Tuple[bool, str]:
     """
     try:
         # Kiểm tra thư mục chứa database
-        db_dir = os.path.dirname(DATABASE_PATH)
-        if not os.path.exists(db_dir):
+        path = current_database_path()
+        db_dir = "" if is_uri(path) else os.path.dirname(path)
+        if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
         return True, ""
     except (OSError, IOError) as e:
         return False, f"Lỗi khi kiểm tra database: {e}"
 
-def save_data(table: str, data: Dict[str, Any]) -> Tuple[bool, str]:
+def get_connection() -> sqlite3.Connection:
     """
-    Lưu dữ liệu vào bảng.
+    Mở một kết nối mới tới database hiện hành.
+
+    Nơi gọi chịu trách nhiệm commit và đóng kết nối. Các câu lệnh chạy
+    trên kết nối này cũng được đo như các hàm khác trong module.
+
+    Trả về:
+        sqlite3.Connection: Kết nối SQLite
+    """
+    return _connect()
+
+class UnitOfWork:
+    """
+    Một transaction gom nhiều thao tác ghi, commit một lần.
+
+    Được tạo bởi transaction(). Trong khối with, các hàm save_data,
+    save_many, insert_data, load_data, update_data, delete_data và
+    stream_query dùng chung kết nối của transaction thay vì tự mở kết nối
+    và tự commit.
+
+    Thuộc tính:
+        connection (sqlite3.Connection): Kết nối của transaction
+        rollback_only (bool): True nếu transaction sẽ bị rollback khi kết thúc
+
+    Ghi chú:
+        Khi một hàm tiện ích gặp lỗi SQLite bên trong transaction, nó vẫn
+        trả về (False/None, thông báo) như bình thường nhưng đánh dấu
+        transaction là rollback_only, nên các thao tác trước đó không được
+        commit dở dang.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, savepoint: Optional[str] = None,
+                 bound: bool = False):
+        """
+        Khởi tạo unit of work trên một kết nối.
+
+        Tham số:
+            connection: Kết nối SQLite
+            savepoint: Tên savepoint nếu là transaction lồng nhau
+            bound: True nếu chỉ là kết nối gắn bởi bind_connection
+                (không có transaction riêng)
+        """
+        self.connection = connection
+        self.rollback_only = False
+        self.bound = bound
+        self._savepoint = savepoint
+
+    def rollback(self) -> None:
+        """Đánh dấu transaction sẽ bị rollback khi ra khỏi khối with."""
+        self.rollback_only = True
+
+    def _finish(self, commit: bool) -> None:
+        conn = self.connection
+        if self._savepoint is not None:
+            if not commit:
+                sqlite3.Connection.execute(conn, f"ROLLBACK TO {self._savepoint}")
+            sqlite3.Connection.execute(conn, f"RELEASE {self._savepoint}")
+            return
+        try:
+            if conn.in_transaction:
+                conn.execute("COMMIT" if commit else "ROLLBACK")
+        finally:
+            conn.close()
+
+
+_active_unit: contextvars.ContextVar = contextvars.ContextVar("db_unit_of_work", default=None)
+_savepoint_counter = iter(range(1, 2 ** 63))
+
+
+@contextlib.contextmanager
+def transaction(immediate: bool = True) -> Iterator[UnitOfWork]:
+    """
+    Chạy nhiều thao tác database trong một transaction.
+
+    Commit một lần khi khối with kết thúc bình thường; rollback nếu có
+    exception hoặc transaction đã bị đánh dấu rollback_only. Transaction
+    lồng nhau dùng SAVEPOINT: lỗi ở khối trong chỉ hủy phần việc của khối
+    đó. Mỗi luồng (và mỗi task asyncio) có transaction riêng.
+
+    Tham số:
+        immediate: Dùng BEGIN IMMEDIATE để giữ khóa ghi ngay từ đầu
+            (tránh lỗi "database is locked" khi nâng cấp khóa giữa chừng)
+
+    Trả về:
+        Iterator[UnitOfWork]: Unit of work của transaction
+
+    Ném ra:
+        sqlite3.Error: Nếu không bắt đầu hoặc không commit được transaction
+
+    Ví dụ:
+        with transaction() as uow:
+            invoice_id, error = insert_data("invoices", {...})
+            if invoice_id is None:
+                return None, error          # tự động rollback
+            save_many("invoice_items", rows)
+    """
+    outer = _active_unit.get()
+    if outer is not None:
+        # Lồng trong transaction khác, hoặc trên kết nối gắn bởi bind_connection
+        # (SAVEPOINT ngoài cùng tự bắt đầu transaction và RELEASE sẽ commit)
+        savepoint = f"uow_{next(_savepoint_counter)}"
+        sqlite3.Connection.execute(outer.connection, f"SAVEPOINT {savepoint}")
+        unit = UnitOfWork(outer.connection, savepoint)
+    else:
+        ensure_database_exists()
+        conn = _connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        unit = UnitOfWork(conn)
+
+    token = _active_unit.set(unit)
+    try:
+        yield unit
+    except BaseException:
+        _active_unit.reset(token)
+        unit._finish(commit=False)
+        raise
+    _active_unit.reset(token)
+    unit._finish(commit=not unit.rollback_only)
+
+def current_transaction() -> Optional[UnitOfWork]:
+    """Unit of work đang hoạt động trong ngữ cảnh hiện tại, hoặc None."""
+    return _active_unit.get()
+
+def open_connection(wal: bool = False, busy_timeout_ms: int = 5000,
+                    check_same_thread: bool = True, path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Mở một kết nối dài hạn ở chế độ autocommit (isolation_level=None).
+
+    Dùng cho các luồng làm việc giữ kết nối riêng (xem bind_connection).
+
+    Tham số:
+        wal: Chuyển database sang journal_mode=WAL (lưu vĩnh viễn trong file)
+            để các luồng đọc không bị chặn bởi luồng ghi
+        busy_timeout_ms: Thời gian chờ khi database đang bị khóa
+        check_same_thread: Chỉ cho phép dùng kết nối trên luồng đã tạo nó
+        path: File database (mặc định: current_database_path())
+
+    Trả về:
+        sqlite3.Connection: Kết nối SQLite (được đo như các kết nối khác)
+    """
+    ensure_database_exists()
+    conn = connect_database(path or current_database_path(), factory=InstrumentedConnection,
+                            check_same_thread=check_same_thread)
+    conn.isolation_level = None
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    if wal:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+@contextlib.contextmanager
+def bind_connection(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Cho các hàm tiện ích trong khối with dùng kết nối `conn` có sẵn.
+
+    Kết nối phải ở chế độ autocommit (xem open_connection): mỗi câu lệnh
+    tự commit, còn transaction() bên trong khối dùng SAVEPOINT trên kết
+    nối này. Kết nối không bị đóng khi ra khỏi khối.
+
+    Tham số:
+        conn: Kết nối cần dùng
+
+    Trả về:
+        Iterator[sqlite3.Connection]: Chính kết nối đó
+    """
+    token = _active_unit.set(UnitOfWork(conn, bound=True))
+    try:
+        yield conn
+    finally:
+        _active_unit.reset(token)
+
+class ConnectionPool:
+    """
+    Nhóm kết nối dài hạn dùng chung giữa nhiều luồng.
+
+    Mỗi lần mượn, kết nối được gắn vào ngữ cảnh hiện tại (bind_connection)
+    nên các hàm tiện ích trong khối with dùng kết nối đó thay vì tự mở
+    kết nối mới. Kết nối được mở dần khi cần, tối đa `size` kết nối.
+
+    Thuộc tính:
+        size (int): Số kết nối tối đa
+        path (Optional[str]): File database (None: database hiện hành lúc
+            mở từng kết nối)
+    """
+
+    def __init__(self, size: int = 8, wal: bool = True, busy_timeout_ms: int = 5000,
+                 path: Optional[str] = None):
+        """Khởi tạo nhóm (chưa mở kết nối nào)."""
+        if size <= 0:
+            raise ValueError("Kích thước nhóm kết nối phải lớn hơn 0.")
+        self.size = size
+        self.path = path
+        self._wal = wal
+        self._busy_timeout_ms = busy_timeout_ms
+        self._idle: List[sqlite3.Connection] = []
+        self._opened = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        """
+        Mượn một kết nối trong khối with (chờ nếu mọi kết nối đang bận).
+
+        Tham số:
+            timeout: Thời gian chờ tối đa (giây), None để chờ không giới hạn
+
+        Ném ra:
+            TimeoutError: Nếu hết thời gian chờ
+            RuntimeError: Nếu nhóm đã đóng
+        """
+        conn = self._checkout(timeout)
+        try:
+            with bind_connection(conn):
+                yield conn
+        finally:
+            # Không trả lại kết nối còn transaction dở dang
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._checkin(conn)
+
+    def _checkout(self, timeout: Optional[float]) -> sqlite3.Connection:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("ConnectionPool đã đóng.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError("Hết thời gian chờ kết nối database.")
+        try:
+            return open_connection(self._wal, self._busy_timeout_ms, check_same_thread=False, path=self.path)
+        except BaseException:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        with self._condition:
+            if self._closed:
+                conn.close()
+                self._opened -= 1
+                return
+            self._idle.append(conn)
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Đóng các kết nối đang rảnh; kết nối đang mượn được đóng khi trả lại."""
+        with self._condition:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._opened -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+def _acquire() -> Tuple[sqlite3.Connection, Optional[UnitOfWork]]:
+    """Lấy kết nối của transaction hiện tại, hoặc mở kết nối mới."""
+    unit = _active_unit.get()
+    if unit is not None:
+        return unit.connection, unit
+    return _connect(), None
+
+def _release(conn: sqlite3.Connection, unit: Optional[UnitOfWork], success: bool) -> None:
+    """
+    Kết thúc một thao tác: tự commit và đóng kết nối nếu không nằm trong
+    transaction, ngược lại đánh dấu rollback khi thao tác thất bại.
+    """
+    if unit is not None:
+        if not success:
+            unit.rollback()
+        return
+    try:
+        if success and conn.in_transaction:
+            conn.commit()
+    finally:
+        conn.close()
+
+def save_many(table: str, rows: List[Dict[str, Any]]) -> Tuple[int, str]:
+    """
+    Lưu nhiều bản ghi vào bảng bằng một lệnh executemany và một lần commit.
+
+    Tất cả bản ghi phải có cùng tập khóa với bản ghi đầu tiên. Nếu có lỗi,
+    không bản ghi nào được lưu. Trong transaction(), việc commit do
+    transaction đảm nhận.
 
     Tham số:
         table: Tên bảng
-        data: Dữ liệu cần lưu (dạng dict)
+        rows: Danh sách bản ghi (dạng dict)
 
     Trả về:
-        Tuple[bool, str]: (True/False, thông báo lỗi nếu có)
+        Tuple[int, str]: (Số bản ghi đã lưu, thông báo lỗi nếu có)
     """
+    if not rows:
+        return 0, ""
+
     db_ok, db_error = ensure_database_exists()
     if not db_ok:
-        return False, db_error
+        return 0, db_error
 
+    conn, unit = _acquire()
+    success = False
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        keys = list(rows[0].keys())
+        columns = ', '.join(keys)
+        placeholders = ', '.join(['?' for _ in keys])
+        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+        conn.executemany(query, [tuple(row[key] for key in keys) for row in rows])
+        success = True
+        return len(rows), ""
+    except (sqlite3.Error, KeyError) as e:
+        if unit is None and conn.in_transaction:
+            conn.rollback()
+        return 0, f"Lỗi khi lưu dữ liệu vào bảng {table}: {e}"
+    finally:
+        _release(conn, unit, success)
+
+def stream_query(query: str, params: Sequence[Any] = (),
+                 batch_size: int = 1000) -> Tuple[List[str], Iterator[tuple]]:
+    """
+    Thực thi truy vấn và đọc kết quả theo từng lô bằng fetchmany.
 
+    Bộ nhớ sử dụng chỉ phụ thuộc vào batch_size, không phụ thuộc vào
+    số dòng kết quả. Kết nối được đóng khi iterator chạy hết hoặc bị
+    hủy (trừ khi truy vấn chạy trong transaction()).
+
+    Tham số:
+        query: Câu lệnh SELECT
+        params: Tham số của câu lệnh
+        batch_size: Số dòng mỗi lần fetchmany
+
+    Trả về:
+        Tuple[List[str], Iterator[tuple]]: (Tên các cột, iterator các dòng)
+
+    Ném ra:
+        sqlite3.Error: Nếu truy vấn không hợp lệ
+    """
+    conn, unit = _acquire()
+    try:
+        cursor = conn.execute(query, params)
+    except sqlite3.Error:
+        if unit is None:
+            conn.close()
+        raise
+    columns = [description[0] for description in cursor.description]
+
+    def rows() -> Iterator[tuple]:
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            if unit is None:
+                conn.close()
+
+    return columns, rows()
+
+def insert_data(table: str, data: Dict[str, Any]) -> Tuple[Optional[int], str]:
+    """
+    Chèn một bản ghi và trả về rowid của bản ghi mới.
+
+    Tham số:
+        table: Tên bảng
+        data: Dữ liệu cần lưu (dạng dict)
+
+    Trả về:
+        Tuple[Optional[int], str]: (rowid nếu thành công, thông báo lỗi nếu có)
+    """
+    db_ok, db_error = ensure_database_exists()
+    if not db_ok:
+        return None, db_error
+
+    conn, unit = _acquire()
+    success = False
+    try:
         # Tạo câu lệnh INSERT
         columns = ', '.join(data.keys())
         placeholders = ', '.join(['?' for _ in data])
         query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
 
-        cursor.execute(query, tuple(data.values()))
-        conn.commit()
-        conn.close()
-        return True, ""
+        cursor = conn.execute(query, tuple(data.values()))
+        success = True
+        return cursor.lastrowid, ""
     except sqlite3.Error as e:
-        return False, f"Lỗi khi lưu dữ liệu vào bảng {table}: {e}"
+        return None, f"Lỗi khi lưu dữ liệu vào bảng {table}: {e}"
+    finally:
+        _release(conn, unit, success)
+
+def save_data(table: str, data: Dict[str, Any]) -> Tuple[bool, str]:
+    """
+    Lưu dữ liệu vào bảng.
+
+    Tham số:
+        table: Tên bảng
+        data: Dữ liệu cần lưu (dạng dict)
+
+    Trả về:
+        Tuple[bool, str]: (True/False, thông báo lỗi nếu có)
+    """
+    row_id, error = insert_data(table, data)
+    return row_id is not None, error
 
 def load_data(table: str, conditions: Dict[str, Any] = None) -> Tuple[List[Dict[str, Any]], str]:
     """
@@ -79,10 +953,11 @@ def load_data(table: str, conditions: Dict[str, Any] = None) -> Tuple[List[Dict[
     if not db_ok:
         return [], db_error
 
+    conn, unit = _acquire()
+    success = False
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         # Tạo câu lệnh SELECT
         query = f"SELECT * FROM {table}"
@@ -98,10 +973,12 @@ def load_data(table: str, conditions: Dict[str, Any] = None) -> Tuple[List[Dict[
 
         cursor.execute(query, params)
         results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        success = True
         return results, ""
     except sqlite3.Error as e:
         return [], f"Lỗi khi tải dữ liệu từ bảng {table}: {e}"
+    finally:
+        _release(conn, unit, success)
 
 def update_data(table: str, data: Dict[str, Any], conditions: Dict[str, Any]) -> Tuple[bool, str]:
     """
@@ -119,10 +996,9 @@ def update_data(table: str, data: Dict[str, Any], conditions: Dict[str, Any]) ->
     if not db_ok:
         return False, db_error
 
+    conn, unit = _acquire()
+    success = False
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         # Tạo câu lệnh UPDATE
         set_clauses = [f"{key} = ?" for key in data.keys()]
         where_clauses = [f"{key} = ?" for key in conditions.keys()]
@@ -130,12 +1006,13 @@ def update_data(table: str, data: Dict[str, Any], conditions: Dict[str, Any]) ->
         query = f"UPDATE {table} SET {', '.join(set_clauses)} WHERE {' AND '.join(where_clauses)}"
         params = list(data.values()) + list(conditions.values())
 
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        conn.execute(query, params)
+        success = True
         return True, ""
     except sqlite3.Error as e:
         return False, f"Lỗi khi cập nhật dữ liệu trong bảng {table}: {e}"
+    finally:
+        _release(conn, unit, success)
 
 def delete_data(table: str, conditions: Dict[str, Any]) -> Tuple[bool, str]:
     """
@@ -152,17 +1029,17 @@ def delete_data(table: str, conditions: Dict[str, Any]) -> Tuple[bool, str]:
     if not db_ok:
         return False, db_error
 
+    conn, unit = _acquire()
+    success = False
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         # Tạo câu lệnh DELETE
         where_clauses = [f"{key} = ?" for key in conditions.keys()]
         query = f"DELETE FROM {table} WHERE {' AND '.join(where_clauses)}"
 
-        cursor.execute(query, list(conditions.values()))
-        conn.commit()
-        conn.close()
+        conn.execute(query, list(conditions.values()))
+        success = True
         return True, ""
     except sqlite3.Error as e:
-        return False, f"Lỗi khi xóa dữ liệu từ bảng {table}: {e}"
\ No newline at end of file
+        return False, f"Lỗi khi xóa dữ liệu từ bảng {table}: {e}"
+    finally:
+        _release(conn, unit, success)
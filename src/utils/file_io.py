@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Các hàm tiện ích đọc/ghi file dữ liệu cho Hệ thống Quản lý Hóa đơn.
+
+Module này cung cấp các generator đọc file CSV/JSONL theo từng dòng
+(không nạp toàn bộ file vào bộ nhớ) và các hàm hỗ trợ chia lô.
+Bao gồm:
+- Mở file văn bản, tự động giải nén nếu đuôi file là .gz
+- Nhận diện định dạng file theo đuôi
+- Đọc từng bản ghi từ CSV hoặc JSONL
+- Chia một iterable thành các lô có kích thước cố định
+"""
+
+import csv
+import gzip
+import json
+import os
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+def open_text(path: str, mode: str = "r") -> IO[str]:
+    """
+    Mở file văn bản UTF-8, dùng gzip nếu đuôi file là .gz.
+
+    Tham số:
+        path: Đường dẫn file
+        mode: "r" để đọc, "w" để ghi
+
+    Trả về:
+        IO[str]: Đối tượng file văn bản
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+def detect_format(path: str) -> str:
+    """
+    Nhận diện định dạng file ("csv" hoặc "jsonl") theo đuôi.
+
+    Ném ra:
+        ValueError: Nếu đuôi file không được hỗ trợ
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    if ext == "json":
+        ext = "jsonl"
+    if ext not in SUPPORTED_FORMATS:
+        raise ValueError(f"Định dạng file không được hỗ trợ: '{path}' (chỉ hỗ trợ .csv, .jsonl)")
+    return ext
+
+def iter_records(path: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Đọc lần lượt từng bản ghi trong file CSV/JSONL.
+
+    Tham số:
+        path: Đường dẫn file (.csv, .jsonl, có thể kèm .gz)
+
+    Trả về:
+        Iterator[Tuple[int, Optional[Dict]]]: (số dòng trong file, bản ghi).
+        Bản ghi là None nếu dòng JSONL không phải một object JSON hợp lệ,
+        để nơi gọi ghi nhận lỗi và tiếp tục đọc.
+
+    Ném ra:
+        ValueError: Nếu định dạng file không được hỗ trợ
+    """
+    fmt = detect_format(path)
+    with open_text(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                # Dòng tiêu đề là dòng 1
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                yield line_number, record if isinstance(record, dict) else None
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Chia một iterable thành các lô (list) có tối đa `size` phần tử.
+
+    Tham số:
+        iterable: Nguồn dữ liệu
+        size: Kích thước mỗi lô (phải lớn hơn 0)
+    """
+    if size <= 0:
+        raise ValueError("Kích thước lô phải lớn hơn 0.")
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -7,33 +7,51 @@ Module này cung cấp các hàm để định dạng dữ liệu hiển thị
 trước người dùng một cách chuyên nghiệp và nhất quán.
 Bao gồm định dạng:
 - Tiền tệ với dấu phân cách hàng nghìn
-- Ngày tháng và số điện thoại Việt Nam
+- Ngày tháng (có bộ nhớ đệm và hàm định dạng cả cột) và số điện thoại Việt Nam
 - Mã sản phẩm và tên khách hàng
 - Số hóa đơn chuẩn
 """
 
+import functools
+import re
 from datetime import datetime
-from typing import Union, Optional
+from typing import Iterable, List, Union, Optional
 
-def format_currency(amount: Union[int, float]) -> str:
+from models.money import Money
+
+ISO_DATE_FORMAT = "%Y-%m-%d"
+DISPLAY_DATE_FORMAT = "%d/%m/%Y"
+
+_ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+# Số cặp (chuỗi ngày, định dạng) được nhớ kết quả; ngày hóa đơn ít giá trị khác nhau
+_DATE_CACHE_SIZE = 4096
+
+def format_currency(amount: Union[Money, int, float]) -> str:
     """
     Định dạng số tiền với dấu phân cách hàng nghìn và hai chữ số thập phân.
     
     Tham số:
-        amount: Số tiền cần định dạng
+        amount: Số tiền cần định dạng (Money hoặc số tiền theo đồng)
         
     Trả về:
         Chuỗi định dạng của số tiền
     """
+    if isinstance(amount, Money):
+        return f"{amount:,.2f} VNĐ"
     try:
         return f"{float(amount):,.2f} VNĐ"
     except (ValueError, TypeError):
         return "0.00 VNĐ"
 
-def format_date(date: Union[str, datetime], input_format: str = "%Y-%m-%d", output_format: str = "%d/%m/%Y") -> str:
+def format_date(date: Union[str, datetime], input_format: str = ISO_DATE_FORMAT,
+                output_format: str = DISPLAY_DATE_FORMAT) -> str:
     """
     Định dạng ngày tháng.
-    
+
+    Kết quả cho ngày dạng chuỗi được nhớ theo (chuỗi, định dạng vào,
+    định dạng ra) trong một bộ nhớ đệm LRU có giới hạn; ngày YYYY-MM-DD
+    được tách trực tiếp, không qua strptime.
+
     Tham số:
         date: Ngày tháng cần định dạng (chuỗi hoặc datetime)
         input_format: Định dạng đầu vào (nếu date là chuỗi)
@@ -42,17 +60,60 @@ def format_date(date: Union[str, datetime], input_format: str = "%Y-%m-%d", outp
     Trả về:
         Chuỗi ngày tháng đã định dạng
     """
+    if isinstance(date, str):
+        return _format_date_string(date, input_format, output_format)
     try:
         if date is None:
             return ""
-        if isinstance(date, str):
-            if not date.strip():  # Empty or whitespace-only string
-                return ""
-            date = datetime.strptime(date, input_format)
         return date.strftime(output_format)
     except (ValueError, TypeError, AttributeError):
         return ""
 
+def format_dates(dates: Iterable[Union[str, datetime]], input_format: str = ISO_DATE_FORMAT,
+                 output_format: str = DISPLAY_DATE_FORMAT) -> List[str]:
+    """
+    Định dạng cả một cột ngày tháng (ví dụ cột ngày của danh sách hóa đơn).
+
+    Mỗi giá trị khác nhau chỉ được định dạng một lần.
+
+    Tham số:
+        dates: Các ngày cần định dạng
+        input_format, output_format: Như format_date
+
+    Trả về:
+        List[str]: Các ngày đã định dạng, cùng thứ tự
+    """
+    seen = {}
+    result = []
+    append = result.append
+    for date in dates:
+        try:
+            text = seen[date]
+        except KeyError:
+            text = seen[date] = format_date(date, input_format, output_format)
+        except TypeError:  # giá trị không băm được
+            text = format_date(date, input_format, output_format)
+        append(text)
+    return result
+
+@functools.lru_cache(maxsize=_DATE_CACHE_SIZE)
+def _format_date_string(date: str, input_format: str, output_format: str) -> str:
+    """Định dạng một ngày dạng chuỗi (được nhớ kết quả)."""
+    if not date.strip():  # Empty or whitespace-only string
+        return ""
+    try:
+        match = _ISO_DATE_PATTERN.fullmatch(date) if input_format == ISO_DATE_FORMAT else None
+        if match is not None:
+            year, month, day = match.groups()
+            parsed = datetime(int(year), int(month), int(day))  # kiểm tra ngày hợp lệ
+            if output_format == DISPLAY_DATE_FORMAT:
+                return f"{day}/{month}/{year}"
+        else:
+            parsed = datetime.strptime(date, input_format)
+        return parsed.strftime(output_format)
+    except (ValueError, TypeError):
+        return ""
+
 def format_phone_number(phone: str) -> str:
     """
     Định dạng số điện thoại Việt Nam.
@@ -104,6 +165,24 @@ def format_customer_name(name: str) -> str:
     except (ValueError, TypeError):
         return ""
 
+def normalize_customer_name(name: str) -> str:
+    """
+    Chuẩn hóa tên khách hàng thành khóa so khớp.
+
+    Hai tên chỉ khác nhau về khoảng trắng hoặc chữ hoa/thường
+    sẽ cho cùng một khóa.
+
+    Tham số:
+        name: Tên khách hàng cần chuẩn hóa
+
+    Trả về:
+        Khóa tên khách hàng đã chuẩn hóa
+    """
+    try:
+        return ' '.join(name.split()).casefold()
+    except (AttributeError, TypeError):
+        return ""
+
 def format_invoice_number(invoice_id: int) -> str:
     """
     Định dạng số hóa đơn.
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đo hiệu năng các phương thức của manager (tùy chọn bật).
+
+Module này cung cấp decorator profiled và class decorator profile_methods
+để ghi nhận cho từng phương thức:
+- Số lần gọi và số lần ném exception
+- Phân vị độ trễ p50/p95/p99 (trên tối đa SAMPLE_LIMIT lần gọi gần nhất)
+- Bộ nhớ cấp phát đỉnh qua tracemalloc, lấy mẫu 1/N lần gọi
+
+Mặc định tắt: mỗi lần gọi chỉ tốn thêm một phép kiểm tra cờ. Bật bằng
+biến môi trường INVOICE_PROFILE=1 (hoặc INVOICE_PROFILE=memory để đo cả
+bộ nhớ) hoặc gọi enable_profiling(). Nếu đặt INVOICE_PROFILE_OUTPUT, số
+liệu được ghi ra file đó khi tiến trình kết thúc (.prom cho định dạng
+Prometheus, còn lại là JSON).
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Số lần gọi gần nhất được giữ lại để tính phân vị
+SAMPLE_LIMIT = 10_000
+QUANTILES = (0.5, 0.95, 0.99)
+_METRIC_PREFIX = "invoicemanager"
+
+_enabled = False
+_memory_sample_rate = 0
+_lock = threading.Lock()
+_local = threading.local()
+_stats: Dict[str, '_MethodStats'] = {}
+
+
+class _MethodStats:
+    """Số liệu của một phương thức."""
+
+    __slots__ = ("calls", "errors", "total_seconds", "samples", "memory_samples", "peak_bytes_total",
+                 "peak_bytes_max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.samples: deque = deque(maxlen=SAMPLE_LIMIT)
+        self.memory_samples = 0
+        self.peak_bytes_total = 0
+        self.peak_bytes_max = 0
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    """Phân vị theo phương pháp nearest-rank."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+def enable_profiling(memory_sample_rate: int = 0) -> None:
+    """
+    Bật đo hiệu năng.
+
+    Tham số:
+        memory_sample_rate: Đo bộ nhớ 1 trên N lần gọi (0 để không đo bộ nhớ).
+            Khi lớn hơn 0, tracemalloc được khởi động nếu chưa chạy.
+    """
+    global _enabled, _memory_sample_rate
+    if memory_sample_rate > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _memory_sample_rate = max(0, memory_sample_rate)
+    _enabled = True
+
+def disable_profiling() -> None:
+    """Tắt đo hiệu năng (giữ nguyên số liệu đã ghi nhận)."""
+    global _enabled, _memory_sample_rate
+    _enabled = False
+    _memory_sample_rate = 0
+
+def is_profiling_enabled() -> bool:
+    """Kiểm tra đo hiệu năng có đang bật hay không."""
+    return _enabled
+
+def reset_profiling() -> None:
+    """Xóa toàn bộ số liệu đã ghi nhận."""
+    with _lock:
+        _stats.clear()
+
+def _record(name: str, seconds: float, failed: bool, peak_bytes: Optional[int]) -> None:
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _MethodStats()
+        stats.calls += 1
+        stats.total_seconds += seconds
+        stats.samples.append(seconds)
+        if failed:
+            stats.errors += 1
+        if peak_bytes is not None:
+            stats.memory_samples += 1
+            stats.peak_bytes_total += peak_bytes
+            stats.peak_bytes_max = max(stats.peak_bytes_max, peak_bytes)
+
+def _call_profiled(name: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+    depth = getattr(_local, "depth", 0)
+    # Chỉ đo bộ nhớ ở lời gọi ngoài cùng vì tracemalloc.reset_peak là toàn cục
+    measure_memory = False
+    if depth == 0 and _memory_sample_rate and tracemalloc.is_tracing():
+        _local.counter = getattr(_local, "counter", 0) + 1
+        measure_memory = _local.counter % _memory_sample_rate == 0
+    if measure_memory:
+        memory_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    _local.depth = depth + 1
+    failed = False
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _local.depth = depth
+        peak_bytes = None
+        if measure_memory:
+            peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - memory_before)
+        _record(name, seconds, failed, peak_bytes)
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator đo hiệu năng một hàm dưới tên `name`.
+
+    Tham số:
+        name: Tên dùng trong số liệu (ví dụ "invoice.create_invoice")
+
+    Trả về:
+        Callable: Decorator
+
+    Ghi chú:
+        Khi đo hiệu năng đang tắt, hàm gốc được gọi trực tiếp sau một
+        phép kiểm tra cờ.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            return _call_profiled(name, func, args, kwargs)
+        return wrapper
+    return decorator
+
+def profile_methods(prefix: str) -> Callable[[type], type]:
+    """
+    Class decorator áp dụng profiled cho mọi phương thức công khai của lớp.
+
+    Các phương thức bắt đầu bằng "_" (kể cả __init__), staticmethod,
+    classmethod và property không bị thay đổi.
+
+    Tham số:
+        prefix: Tiền tố tên số liệu (ví dụ "invoice" cho "invoice.create_invoice")
+
+    Trả về:
+        Callable[[type], type]: Class decorator
+    """
+    def decorator(cls: type) -> type:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, profiled(f"{prefix}.{attr}")(value))
+        return cls
+    return decorator
+
+def get_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Lấy số liệu đo hiệu năng (có thể ghi ra JSON).
+
+    Tham số:
+        name: Chỉ lấy số liệu của một phương thức (mặc định lấy tất cả)
+
+    Trả về:
+        Dict[str, Any]: Ánh xạ tên phương thức -> calls, errors, total_ms,
+            mean_ms, p50_ms, p95_ms, p99_ms và (nếu có) số liệu bộ nhớ
+    """
+    with _lock:
+        items = [(key, stats) for key, stats in _stats.items() if name is None or key == name]
+        snapshot = {}
+        for key, stats in sorted(items):
+            samples = sorted(stats.samples)
+            entry = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "total_ms": round(stats.total_seconds * 1000, 3),
+                "mean_ms": round(stats.total_seconds * 1000 / stats.calls, 3) if stats.calls else 0.0,
+            }
+            for q in QUANTILES:
+                entry[f"p{round(q * 100)}_ms"] = round(_quantile(samples, q) * 1000, 3)
+            if stats.memory_samples:
+                entry["memory_samples"] = stats.memory_samples
+                entry["peak_bytes_mean"] = stats.peak_bytes_total // stats.memory_samples
+                entry["peak_bytes_max"] = stats.peak_bytes_max
+            snapshot[key] = entry
+        return snapshot
+
+def profile_to_json() -> str:
+    """Số liệu đo hiệu năng dạng chuỗi JSON."""
+    return json.dumps(get_profile(), ensure_ascii=False, indent=2)
+
+def profile_to_prometheus() -> str:
+    """
+    Số liệu đo hiệu năng theo định dạng văn bản của Prometheus.
+
+    Độ trễ được xuất dưới dạng summary (phân vị, _sum, _count), kèm bộ
+    đếm lỗi và bộ nhớ đỉnh nếu có đo.
+    """
+    duration = f"{_METRIC_PREFIX}_method_duration_seconds"
+    errors = f"{_METRIC_PREFIX}_method_errors_total"
+    memory = f"{_METRIC_PREFIX}_method_peak_bytes_max"
+    lines = [
+        f"# HELP {duration} Thời gian thực thi phương thức.",
+        f"# TYPE {duration} summary",
+    ]
+    error_lines = [f"# HELP {errors} Số lần phương thức ném exception.", f"# TYPE {errors} counter"]
+    memory_lines = [f"# HELP {memory} Bộ nhớ cấp phát đỉnh lớn nhất (lấy mẫu).", f"# TYPE {memory} gauge"]
+
+    with _lock:
+        for name, stats in sorted(_stats.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            samples = sorted(stats.samples)
+            for q in QUANTILES:
+                lines.append(f'{duration}{{method="{label}",quantile="{q}"}} {_quantile(samples, q):.9f}')
+            lines.append(f'{duration}_sum{{method="{label}"}} {stats.total_seconds:.9f}')
+            lines.append(f'{duration}_count{{method="{label}"}} {stats.calls}')
+            error_lines.append(f'{errors}{{method="{label}"}} {stats.errors}')
+            if stats.memory_samples:
+                memory_lines.append(f'{memory}{{method="{label}"}} {stats.peak_bytes_max}')
+
+    if len(memory_lines) == 2:
+        memory_lines = []
+    return "\n".join(lines + error_lines + memory_lines) + "\n"
+
+def write_profile(path: str) -> None:
+    """
+    Ghi số liệu đo hiệu năng ra file.
+
+    Tham số:
+        path: File đích; đuôi .prom cho định dạng Prometheus, còn lại là JSON
+    """
+    text = profile_to_prometheus() if path.endswith(".prom") else profile_to_json() + "\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def _configure_from_environment() -> None:
+    """Bật đo hiệu năng theo biến môi trường INVOICE_PROFILE*."""
+    mode = os.environ.get("INVOICE_PROFILE", "").strip().lower()
+    if mode in ("", "0", "false", "off", "no"):
+        return
+    memory_sample_rate = 0
+    if mode == "memory":
+        memory_sample_rate = int(os.environ.get("INVOICE_PROFILE_MEMORY_SAMPLE", "10"))
+    enable_profiling(memory_sample_rate)
+
+    output = os.environ.get("INVOICE_PROFILE_OUTPUT")
+    if output:
+        atexit.register(write_profile, output)
+
+_configure_from_environment()
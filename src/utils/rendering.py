@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hiển thị bảng văn bản cho Hệ thống Quản lý Hóa đơn.
+
+Các danh sách và báo cáo trên CLI/GUI trước đây gọi print() cho từng dòng;
+với hàng chục nghìn hóa đơn, chi phí nằm ở các lần ghi ra stdout chứ không
+ở việc định dạng. Module này cung cấp lớp TableRenderer gom các dòng vào bộ
+đệm rồi ghi một lần, kèm chế độ ghi từng đoạn (flush_every) cho danh sách
+rất lớn để không giữ toàn bộ bảng trong bộ nhớ.
+
+Ví dụ:
+    with TableRenderer() as table:
+        table.rule("=", 80)
+        table.rows("{:<10} {:>10,.2f}", ((p.product_id, p.unit_price) for p in products))
+"""
+
+import functools
+from typing import Callable, Iterable, List, Optional, Sequence, TextIO
+
+# Số mẫu dòng/đường kẻ được nhớ; mỗi bảng chỉ dùng vài mẫu cố định
+_TEMPLATE_CACHE_SIZE = 128
+
+@functools.lru_cache(maxsize=_TEMPLATE_CACHE_SIZE)
+def row_formatter(template: str) -> Callable[..., str]:
+    """
+    Trả về hàm định dạng một dòng theo mẫu str.format.
+
+    Tham số:
+        template: Mẫu dòng, ví dụ "{:<10} {:<30} {:>15,.2f}"
+
+    Trả về:
+        Callable[..., str]: Hàm nhận giá trị các cột theo thứ tự
+    """
+    return template.format
+
+@functools.lru_cache(maxsize=_TEMPLATE_CACHE_SIZE)
+def rule(char: str, width: int) -> str:
+    """Đường kẻ ngang gồm `width` ký tự `char`."""
+    return char * width
+
+
+class TableRenderer:
+    """
+    Gom các dòng của một bảng và ghi ra stream một lần.
+
+    Thuộc tính:
+        stream (Optional[TextIO]): Nơi ghi; None nghĩa là sys.stdout tại
+            thời điểm ghi (để redirect_stdout và việc bắt output của GUI
+            vẫn hoạt động)
+        flush_every (int): Ghi ra stream sau mỗi flush_every dòng dữ liệu
+            (0: chỉ ghi một lần khi kết thúc)
+
+    Ghi chú:
+        Output giống hệt việc gọi print() cho từng dòng nhưng chỉ gọi
+        print() một lần mỗi lần ghi. Dùng như context manager: phần còn lại
+        trong bộ đệm được ghi khi ra khỏi khối with.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, flush_every: int = 0):
+        """Khởi tạo bộ hiển thị bảng."""
+        if flush_every < 0:
+            raise ValueError("Số dòng mỗi lần ghi không được âm.")
+        self.stream = stream
+        self.flush_every = flush_every
+        self._lines: List[str] = []
+
+    def __enter__(self) -> "TableRenderer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+    def line(self, text: str = "") -> None:
+        """Thêm một dòng văn bản."""
+        self._lines.append(text)
+
+    def rule(self, char: str, width: int) -> None:
+        """Thêm một đường kẻ ngang."""
+        self._lines.append(rule(char, width))
+
+    def row(self, template: str, *values) -> None:
+        """Thêm một dòng dữ liệu định dạng theo mẫu."""
+        self._lines.append(row_formatter(template)(*values))
+
+    def rows(self, template: str, rows: Iterable[Sequence]) -> int:
+        """
+        Thêm nhiều dòng dữ liệu cùng một mẫu.
+
+        Tham số:
+            template: Mẫu dòng (xem row_formatter)
+            rows: Các bộ giá trị cột
+
+        Trả về:
+            int: Số dòng đã thêm
+        """
+        fmt = row_formatter(template)
+        append = self._lines.append
+        count = 0
+        if not self.flush_every:
+            for values in rows:
+                append(fmt(*values))
+                count += 1
+            return count
+
+        chunk = self.flush_every
+        for values in rows:
+            append(fmt(*values))
+            count += 1
+            if count % chunk == 0:
+                self.flush()
+                append = self._lines.append
+        return count
+
+    def getvalue(self) -> str:
+        """Nội dung đang chờ trong bộ đệm (chưa ghi)."""
+        return "\n".join(self._lines) + "\n" if self._lines else ""
+
+    def flush(self) -> None:
+        """Ghi các dòng trong bộ đệm ra stream bằng một lời gọi print()."""
+        if not self._lines:
+            return
+        # Đi qua print() (file=None là sys.stdout hiện hành) để mọi cách bắt
+        # output đang dùng với print() vẫn nhận được bảng
+        print(self.getvalue(), end="", file=self.stream, flush=True)
+        self._lines = []
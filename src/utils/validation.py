@@ -10,13 +10,31 @@ dữ liệu đầu vào trong toàn bộ ứng dụng. Bao gồm kiểm tra:
 - Mã sản phẩm
 - Số lượng sản phẩm
 
-Tất cả hàm trả về tuple (bool, str) với thông báo lỗi tiếng Việt.
+Các hàm validate_* kiểm tra từng giá trị và trả về tuple (bool, str) với
+thông báo lỗi tiếng Việt. Khi nhập dữ liệu hàng loạt, dùng các hàm kiểm
+tra theo cột (check_*) và validate_rows: chúng áp dụng cùng quy tắc và
+cùng thông báo lỗi nhưng chạy một vòng lặp cho cả cột, dùng biểu thức
+chính quy biên dịch sẵn và đường tắt cho ngày dạng YYYY-MM-DD, rồi trả
+về danh sách lỗi của từng dòng.
 """
 
+import functools
+import math
 import re
-from typing import Any, Union, List, Tuple
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 from datetime import datetime
 
+ISO_DATE_FORMAT = "%Y-%m-%d"
+
+_PRODUCT_ID_PATTERN = re.compile(r'^[A-Z0-9]+$')
+_ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Số chuỗi ngày khác nhau được nhớ kết quả kiểm tra
+_DATE_CACHE_SIZE = 4096
+
+# Hàm kiểm tra một cột: nhận danh sách giá trị, trả về lỗi của từng giá trị ("" nếu hợp lệ)
+ColumnCheck = Callable[[Sequence[Any]], List[str]]
+
 def validate_positive_number(value: Union[int, float], field_name: str) -> Tuple[bool, str]:
     """
     Kiểm tra một số là số dương.
@@ -30,10 +48,12 @@ def validate_positive_number(value: Union[int, float], field_name: str) -> Tuple
     """
     try:
         num_value = float(value)
+        if not math.isfinite(num_value):
+            return False, f"{field_name} phải là một số."
         if num_value <= 0:
             return False, f"{field_name} phải lớn hơn 0."
         return True, ""
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, OverflowError):
         return False, f"{field_name} phải là một số."
 
 def validate_required_field(value: Any, field_name: str) -> Tuple[bool, str]:
@@ -86,6 +106,10 @@ def validate_date_format(date_str: str, field_name: str, format: str = "%Y-%m-%d
     Trả về:
         Tuple[bool, str]: (True/False, thông báo lỗi nếu có)
     """
+    if isinstance(date_str, str):
+        if _is_valid_date(date_str, format):
+            return True, ""
+        return False, f"{field_name} phải có định dạng {format}."
     try:
         datetime.strptime(date_str, format)
         return True, ""
@@ -108,7 +132,7 @@ def validate_product_id(product_id: str) -> Tuple[bool, str]:
     valid, error = validate_string_length(product_id, "Mã sản phẩm", 3, 10)
     if not valid:
         return False, error
-    if not re.match(r'^[A-Z0-9]+$', product_id):
+    if not _PRODUCT_ID_PATTERN.match(product_id):
         return False, "Mã sản phẩm chỉ được chứa chữ in hoa và số."
     return True, ""
 
@@ -129,5 +153,189 @@ def validate_quantity(quantity: Union[int, str]) -> Tuple[bool, str]:
         if qty > 1000:
             return False, "Số lượng không được vượt quá 1000."
         return True, ""
-    except (ValueError, TypeError):
-        return False, "Số lượng phải là số nguyên."
\ No newline at end of file
+    except (ValueError, TypeError, OverflowError):
+        return False, "Số lượng phải là số nguyên."
+
+
+# ----------------------------------------------------------------------
+# Ngày tháng: đường tắt cho YYYY-MM-DD
+# ----------------------------------------------------------------------
+
+def _is_iso_date(value: str) -> Optional[bool]:
+    """
+    Kiểm tra ngày YYYY-MM-DD không qua strptime.
+
+    Trả về None nếu chuỗi không đúng khuôn YYYY-MM-DD (để strptime quyết
+    định, vì strptime chấp nhận cả tháng/ngày một chữ số).
+    """
+    match = _ISO_DATE_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    if year < 1 or not 1 <= month <= 12 or day < 1:
+        return False
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return day <= 29
+    return day <= _DAYS_IN_MONTH[month - 1]
+
+@functools.lru_cache(maxsize=_DATE_CACHE_SIZE)
+def _is_valid_date(value: str, format: str) -> bool:
+    """Kết quả kiểm tra ngày, nhớ theo (chuỗi, định dạng)."""
+    if format == ISO_DATE_FORMAT:
+        fast = _is_iso_date(value)
+        if fast is not None:
+            return fast
+    try:
+        datetime.strptime(value, format)
+        return True
+    except ValueError:
+        return False
+
+# ----------------------------------------------------------------------
+# Kiểm tra theo cột
+# ----------------------------------------------------------------------
+
+def check_required(values: Sequence[Any], field_name: str) -> List[str]:
+    """
+    Kiểm tra cả cột theo quy tắc của validate_required_field.
+
+    Tham số:
+        values: Các giá trị của cột
+        field_name: Tên trường để hiển thị thông báo lỗi
+
+    Trả về:
+        List[str]: Lỗi của từng giá trị ("" nếu hợp lệ)
+    """
+    message = f"{field_name} là bắt buộc."
+    return [message if value is None or (isinstance(value, str) and not value.strip()) else ""
+            for value in values]
+
+def check_string_length(values: Sequence[Any], field_name: str,
+                        min_length: int = 0, max_length: int = None) -> List[str]:
+    """Kiểm tra cả cột theo quy tắc của validate_string_length."""
+    not_string = f"{field_name} phải là chuỗi."
+    too_short = f"{field_name} phải có ít nhất {min_length} ký tự."
+    too_long = f"{field_name} không được vượt quá {max_length} ký tự."
+    errors = []
+    append = errors.append
+    for value in values:
+        if not isinstance(value, str):
+            append(not_string)
+            continue
+        length = len(value.strip())
+        if length < min_length:
+            append(too_short)
+        elif max_length and length > max_length:
+            append(too_long)
+        else:
+            append("")
+    return errors
+
+def check_positive_number(values: Sequence[Any], field_name: str) -> List[str]:
+    """Kiểm tra cả cột theo quy tắc của validate_positive_number."""
+    not_positive = f"{field_name} phải lớn hơn 0."
+    not_number = f"{field_name} phải là một số."
+    errors = []
+    append = errors.append
+    isfinite = math.isfinite
+    for value in values:
+        try:
+            number = float(value)
+        except (ValueError, TypeError, OverflowError):
+            append(not_number)
+            continue
+        if not isfinite(number):
+            append(not_number)
+        else:
+            append(not_positive if number <= 0 else "")
+    return errors
+
+def check_date(values: Sequence[Any], field_name: str, format: str = ISO_DATE_FORMAT) -> List[str]:
+    """
+    Kiểm tra cả cột ngày theo quy tắc của validate_date_format.
+
+    Ngày dạng YYYY-MM-DD được kiểm tra không qua strptime, và kết quả của
+    các chuỗi ngày gặp lại được lấy từ bộ nhớ đệm. Giá trị không phải chuỗi
+    được báo lỗi thay vì ném TypeError.
+    """
+    message = f"{field_name} phải có định dạng {format}."
+    is_valid = _is_valid_date
+    return ["" if isinstance(value, str) and is_valid(value, format) else message for value in values]
+
+def check_product_id(values: Sequence[Any]) -> List[str]:
+    """Kiểm tra cả cột mã sản phẩm theo quy tắc của validate_product_id."""
+    required = "Mã sản phẩm là bắt buộc."
+    not_string = "Mã sản phẩm phải là chuỗi."
+    too_short = "Mã sản phẩm phải có ít nhất 3 ký tự."
+    too_long = "Mã sản phẩm không được vượt quá 10 ký tự."
+    pattern_error = "Mã sản phẩm chỉ được chứa chữ in hoa và số."
+    match = _PRODUCT_ID_PATTERN.match
+    errors = []
+    append = errors.append
+    for value in values:
+        if value is None:
+            append(required)
+        elif not isinstance(value, str):
+            append(not_string)
+        else:
+            length = len(value.strip())
+            if length == 0:
+                append(required)
+            elif length < 3:
+                append(too_short)
+            elif length > 10:
+                append(too_long)
+            else:
+                append("" if match(value) else pattern_error)
+    return errors
+
+def check_quantity(values: Sequence[Any]) -> List[str]:
+    """Kiểm tra cả cột số lượng theo quy tắc của validate_quantity."""
+    errors = []
+    append = errors.append
+    for value in values:
+        try:
+            qty = int(value)
+        except (ValueError, TypeError, OverflowError):
+            append("Số lượng phải là số nguyên.")
+            continue
+        if qty <= 0:
+            append("Số lượng phải lớn hơn 0.")
+        elif qty > 1000:
+            append("Số lượng không được vượt quá 1000.")
+        else:
+            append("")
+    return errors
+
+def validate_rows(rows: Iterable[Optional[Mapping[str, Any]]],
+                  rules: Sequence[Tuple[str, ColumnCheck]]) -> List[Tuple[str, ...]]:
+    """
+    Kiểm tra nhiều dòng theo các quy tắc cột.
+
+    Mỗi quy tắc chạy một lần trên cả cột, sau đó lỗi được gom lại theo
+    dòng. Dòng hợp lệ dùng chung một tuple rỗng nên chi phí chủ yếu nằm
+    ở các hàm kiểm tra cột.
+
+    Tham số:
+        rows: Các dòng (dict); dòng None được coi là bản ghi không hợp lệ
+        rules: Các cặp (tên cột, hàm kiểm tra cột), chạy theo thứ tự; một
+            cột có thể có nhiều quy tắc
+
+    Trả về:
+        List[Tuple[str, ...]]: Các lỗi của từng dòng theo thứ tự quy tắc
+            (tuple rỗng nếu hợp lệ)
+
+    Ví dụ:
+        errors = validate_rows(records, [
+            ("product_id", check_product_id),
+            ("quantity", check_quantity),
+        ])
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    columns = [check([row.get(column) if row is not None else None for row in rows]) for column, check in rules]
+    valid: Tuple[str, ...] = ()
+    invalid = ("Bản ghi không hợp lệ.",)
+    if not columns:
+        return [valid if row is not None else invalid for row in rows]
+    return [invalid if row is None else (tuple(filter(None, row_errors)) if any(row_errors) else valid)
+            for row, row_errors in zip(rows, zip(*columns))]
@@ -8,7 +8,11 @@ Fixtures xử lý thiết lập test, dỎn dẹp, và cung cấp các dependenc
 database tạm thời và các instance manager đã được cấu hình sẵn.
 
 Các fixtures chính:
-- temp_db: Tạo database SQLite tạm thời cho testing
+- template_db: Database mẫu trong bộ nhớ, khởi tạo schema một lần cho cả phiên test
+- memory_db: DatabaseContext của một bản sao database mẫu trong bộ nhớ
+- temp_db: Database tạm thời (memory_db) làm database mặc định của test
+- file_db: Như temp_db nhưng trên file, cho test cần file database thật
+- db_context: DatabaseContext của database tạm thời (schema đã khởi tạo)
 - product_manager: ProductManager instance với database test
 - populated_product_manager: ProductManager với dữ liệu mẫu
 
@@ -16,44 +20,68 @@ Tất cả fixtures được tự động dỎn dẹp sau khi test hoàn thành.
 """
 
 import pytest
-import tempfile
 import os
 import sys
-from unittest.mock import patch
 
 # Thêm src vào path để import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from core.product_manager import ProductManager
 from core.invoice_manager import InvoiceManager
-from database.database import initialize_database
+from database.context import DatabaseContext
+from utils.db_utils import default_database, set_default_database
+
+
+@pytest.fixture(scope='session')
+def template_db():
+    """Database mẫu trong bộ nhớ; schema chỉ được tạo và migrate một lần."""
+    template = DatabaseContext(':memory:')
+    success, message = template.initialize()
+    assert success, f"Không thể khởi tạo database mẫu: {message}"
+    yield template
+    template.close()
+
+
+@pytest.fixture
+def memory_db(template_db):
+    """DatabaseContext của một database trong bộ nhớ (schema đã khởi tạo, không có file)."""
+    context = template_db.clone()
+    yield context
+    context.close()
 
 
 @pytest.fixture
-def temp_db():
-    """Tạo database tạm thời để testing."""
-    temp_db_fd, temp_db_path = tempfile.mkstemp(suffix='.db')
-    os.close(temp_db_fd)
+def temp_db(memory_db):
+    """Database tạm thời (bản sao trong bộ nhớ của database mẫu) làm database mặc định."""
+    previous = set_default_database(memory_db)
+    try:
+        yield memory_db.path
+    finally:
+        set_default_database(previous)
+
 
-    # Khởi tạo test database
-    with patch('database.database.DATABASE_PATH', temp_db_path):
-        with patch('utils.db_utils.DATABASE_PATH', temp_db_path):
-            success, message = initialize_database()
-            assert success, f"Không thể khởi tạo test database: {message}"
+@pytest.fixture
+def file_db(template_db, tmp_path):
+    """Database tạm thời trên file, cho test cần file thật (lưu trữ, sao lưu, nhiều tiến trình)."""
+    context = template_db.clone(str(tmp_path / "test.db"))
+    previous = set_default_database(context)
+    try:
+        yield context.path
+    finally:
+        set_default_database(previous)
+        context.close()
 
-            yield temp_db_path
 
-    # Dọn dẹp
-    if os.path.exists(temp_db_path):
-        os.unlink(temp_db_path)
+@pytest.fixture
+def db_context(temp_db):
+    """DatabaseContext của database tạm thời, dùng chung cho các manager của test."""
+    return default_database()
 
 
 @pytest.fixture
-def product_manager(temp_db):
+def product_manager(db_context):
     """Tạo instance ProductManager với database tạm thời."""
-    with patch('database.database.DATABASE_PATH', temp_db):
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            return ProductManager()
+    return ProductManager(database=db_context)
 
 
 @pytest.fixture
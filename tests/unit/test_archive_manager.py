@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho lưu trữ hóa đơn theo năm (core.archive_manager).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Chuyển hóa đơn một năm sang file lưu trữ và khôi phục lại
+- Chọn file lưu trữ theo khoảng ngày
+- Xuất dữ liệu và báo cáo song song đọc kèm các năm lưu trữ
+- Lệnh CLI archive
+"""
+
+import csv
+import os
+import sys
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import core.statistics_manager
+from core import ArchiveManager, ExportManager, InvoiceManager, ProductManager, StatisticsManager
+from core.archive_manager import archive_path, archived_years, archives_for_range
+from ui.cli import main
+
+
+@pytest.fixture
+def temp_db(file_db):
+    """File lưu trữ nằm cạnh database chính, nên các test ở đây dùng database trên file."""
+    return file_db
+
+
+@pytest.fixture
+def invoice_manager(populated_product_manager, temp_db):
+    """InvoiceManager với hóa đơn của ba năm 2022-2024."""
+    manager = InvoiceManager(populated_product_manager)
+    for year in (2022, 2023, 2024):
+        for month in (3, 9):
+            invoice, message = manager.create_invoice(
+                f"Khách {month}", [{"product_id": "P002", "quantity": year - 2021}],
+                date=f"{year}-{month:02d}-15"
+            )
+            assert invoice is not None, message
+    yield manager
+    for year in archived_years(temp_db):
+        os.unlink(archive_path(year, temp_db))
+
+
+def _read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+class TestArchiveManager:
+    """Kiểm tra ArchiveManager."""
+
+    def test_archive_and_restore(self, invoice_manager, temp_db):
+        """Kiểm tra chuyển một năm ra file lưu trữ rồi đưa trở lại."""
+        manager = ArchiveManager(invoice_manager)
+        ids_2022 = [inv.invoice_id for inv in invoice_manager.invoices if inv.date.startswith("2022")]
+
+        success, message = manager.archive_year(2022)
+        assert success, message
+        assert "2 hóa đơn" in message
+        assert archived_years(temp_db) == [2022]
+        assert sorted(inv.date[:4] for inv in invoice_manager.invoices) == ["2023"] * 2 + ["2024"] * 2
+        assert manager.list_archives()[0]["invoices"] == 2
+
+        # Chạy lại không tạo bản ghi trùng
+        success, message = manager.archive_year(2022)
+        assert success and "0 hóa đơn" in message
+        assert manager.list_archives()[0]["invoices"] == 2
+
+        success, message = manager.restore_year(2022)
+        assert success, message
+        assert archived_years(temp_db) == []
+        restored = [inv for inv in invoice_manager.invoices if inv.date.startswith("2022")]
+        assert sorted(inv.invoice_id for inv in restored) == sorted(ids_2022)
+        assert all(len(inv.items) == 1 for inv in restored)
+
+    def test_invalid_years(self, invoice_manager):
+        """Kiểm tra không lưu trữ năm chưa đóng sổ hoặc năm không hợp lệ."""
+        manager = ArchiveManager(invoice_manager)
+        assert manager.archive_year(date.today().year)[0] is False
+        assert manager.archive_year("abc")[0] is False
+        assert manager.archive_year(99)[0] is False
+        assert manager.restore_year(2001)[0] is False
+        assert manager.restore_year("abc") == (False, "Năm lưu trữ phải là số nguyên.")
+        assert manager.restore_year(99)[0] is False
+        assert manager.restore_year(date.today().year)[1].startswith("Không có dữ liệu lưu trữ")
+
+    def test_archives_for_range(self, invoice_manager, temp_db):
+        """Kiểm tra chỉ chọn các năm lưu trữ giao với khoảng ngày."""
+        manager = ArchiveManager(invoice_manager)
+        manager.archive_year(2022)
+        manager.archive_year(2023)
+        assert list(archives_for_range(db_path=temp_db)) == ["archive_2022", "archive_2023"]
+        assert list(archives_for_range("2023-06-01", None, temp_db)) == ["archive_2023"]
+        assert list(archives_for_range("2022-12-31", "2023-01-01", temp_db)) == ["archive_2022", "archive_2023"]
+        assert archives_for_range("2024-01-01", None, temp_db) == {}
+
+    def test_exports_span_archives(self, invoice_manager, tmp_path):
+        """Kiểm tra xuất dữ liệu đọc kèm các năm lưu trữ khi khoảng ngày cần."""
+        exporter = ExportManager()
+        before, _ = exporter.export_report("revenue_by_date", str(tmp_path / "before.csv"))
+        ArchiveManager(invoice_manager).archive_year(2022)
+
+        report, message = exporter.export_report("revenue_by_date", str(tmp_path / "after.csv"))
+        assert report is not None, message
+        assert _read_csv(tmp_path / "after.csv") == _read_csv(tmp_path / "before.csv")
+
+        exporter.export_items(str(tmp_path / "items.csv"), date_from="2022-01-01", date_to="2022-06-30")
+        rows = _read_csv(tmp_path / "items.csv")
+        assert [row["date"] for row in rows] == ["2022-03-15"]
+        assert rows[0]["product_name"] == "Chuột không dây Logitech"
+
+        exporter.export_invoices(str(tmp_path / "active.csv"), date_from="2024-01-01")
+        assert len(_read_csv(tmp_path / "active.csv")) == 2
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_parallel_reports_span_archives(self, invoice_manager, populated_product_manager, workers):
+        """Kiểm tra báo cáo song song cho kết quả như trước khi lưu trữ."""
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        expected = {report: stats_manager.get_report_parallel(report, workers=workers)
+                    for report in ("revenue_by_date", "revenue_by_product", "top_customers")}
+        ArchiveManager(invoice_manager).archive_year(2022)
+        ArchiveManager(invoice_manager).archive_year(2023)
+        for report, result in expected.items():
+            assert stats_manager.get_report_parallel(report, workers=workers) == result
+
+        rows, total = stats_manager.get_report_parallel("revenue_by_date", date_from="2023-01-01",
+                                                        date_to="2023-12-31", workers=workers)
+        assert [day for day, _ in rows] == ["2023-09-15", "2023-03-15"]
+
+    def test_reports_include_archives(self, invoice_manager, populated_product_manager, capsys):
+        """Kiểm tra báo cáo mặc định vẫn tính các năm đã lưu trữ."""
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        expected = (stats_manager.get_revenue_by_date(), stats_manager.get_revenue_by_product(),
+                    stats_manager.get_top_customers())
+        ArchiveManager(invoice_manager).archive_year(2022)
+        ArchiveManager(invoice_manager).archive_year(2023)
+        ArchiveManager(invoice_manager).archive_year(2024)
+
+        assert invoice_manager.invoices == []
+        assert (stats_manager.get_revenue_by_date(), stats_manager.get_revenue_by_product(),
+                stats_manager.get_top_customers()) == expected
+        stats_manager.revenue_by_date()
+        assert "2022-03-15" in capsys.readouterr().out
+
+    def test_reports_cache_archive_list(self, invoice_manager, populated_product_manager):
+        """Kiểm tra danh sách file lưu trữ chỉ được đọc lại khi dữ liệu hóa đơn đổi."""
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        with patch.object(core.statistics_manager, "archived_years", wraps=archived_years) as scan:
+            for _ in range(3):
+                stats_manager.get_revenue_by_date()
+                stats_manager.get_top_customers()
+            assert scan.call_count == 1
+
+            ArchiveManager(invoice_manager).archive_year(2022)
+            rows, _ = stats_manager.get_revenue_by_date()
+            assert "2022-03-15" in [day for day, _ in rows]
+            assert scan.call_count == 2
+
+            ArchiveManager(invoice_manager).restore_year(2022)
+            stats_manager.get_revenue_by_date()
+            assert scan.call_count == 3
+
+    def test_memory_database_skips_archive_scan(self, memory_db):
+        """Kiểm tra database trong bộ nhớ không tìm file lưu trữ."""
+        products = ProductManager(database=memory_db)
+        stats_manager = StatisticsManager(InvoiceManager(products), products)
+        with patch.object(core.statistics_manager, "archived_years") as scan:
+            assert stats_manager.get_revenue_by_date() == ([], 0)
+            stats_manager.revenue_by_date()
+        scan.assert_not_called()
+
+    def test_cli(self, invoice_manager, temp_db, capsys):
+        """Kiểm tra lệnh CLI archive."""
+        assert main(["archive", "run", "--year", "2022"]) == 0
+        assert main(["archive", "run"]) == 2
+        assert main(["archive", "list"]) == 0
+        assert "2022" in capsys.readouterr().out
+        assert main(["archive", "restore", "--year", "2022"]) == 0
+        assert archived_years(temp_db) == []
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho lớp vỏ asyncio (core.async_managers).
+
+Module kiểm thử này bao gồm các test cases cho:
+- DatabaseExecutor: luồng ghi duy nhất, luồng đọc song song, WAL
+- Tạo/xóa hóa đơn đồng thời qua AsyncInvoiceManager
+- Báo cáo dạng dữ liệu qua AsyncStatisticsManager
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core.async_managers import DatabaseExecutor, create_async_managers
+
+
+class TestDatabaseExecutor:
+    """Kiểm tra DatabaseExecutor."""
+
+    def test_writes_run_on_single_thread(self, temp_db):
+        """Kiểm tra mọi thao tác ghi chạy trên cùng một luồng."""
+        async def scenario():
+            async with DatabaseExecutor(readers=3) as executor:
+                names = await asyncio.gather(*(executor.write(lambda: threading.current_thread().name)
+                                               for _ in range(10)))
+                return set(names)
+
+        names = asyncio.run(scenario())
+        assert len(names) == 1
+        assert next(iter(names)).startswith("invoice-writer")
+
+    def test_wal_enabled(self, file_db):
+        """Kiểm tra database được chuyển sang WAL."""
+        async def scenario():
+            async with DatabaseExecutor(readers=1) as executor:
+                await executor.read(lambda: None)
+
+        asyncio.run(scenario())
+        conn = sqlite3.connect(file_db)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_closed_executor(self, temp_db):
+        """Kiểm tra không gửi được công việc sau khi đóng."""
+        async def scenario():
+            executor = DatabaseExecutor(readers=1)
+            await executor.aclose()
+            await executor.read(lambda: None)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(scenario())
+
+
+class TestAsyncManagers:
+    """Kiểm tra các manager async."""
+
+    def test_concurrent_invoices_and_reports(self, temp_db):
+        """Kiểm tra tạo hóa đơn đồng thời và đọc báo cáo."""
+        async def scenario():
+            async with DatabaseExecutor(readers=4) as executor:
+                products, invoices, statistics = await create_async_managers(executor)
+                success, _ = await products.add_product("P001", "Laptop", 1000, "cái", "Electronics")
+                assert success
+
+                results = await asyncio.gather(*(
+                    invoices.create_invoice(f"Khách {i % 3}", [{"product_id": "P001", "quantity": 1}],
+                                            date="2024-01-01")
+                    for i in range(12)
+                ))
+                history = await invoices.find_invoices_by_customer("khách 0")
+                revenue = await statistics.get_revenue_by_date()
+                top = await statistics.get_top_customers(limit=2)
+                deleted = await invoices.delete_invoice(results[0][0].invoice_id)
+                return results, history, revenue, top, deleted, len(invoices.invoices)
+
+        results, history, revenue, top, deleted, remaining = asyncio.run(scenario())
+
+        assert all(invoice is not None for invoice, _ in results)
+        assert len({invoice.invoice_id for invoice, _ in results}) == 12
+        assert len(history) == 4
+        assert revenue == ([("2024-01-01", 12 * 1000 * 100)], 12 * 1000 * 100)
+        assert len(top[0]) == 2
+        assert deleted[0]
+        assert remaining == 11
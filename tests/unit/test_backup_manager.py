@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho sao lưu và khôi phục trực tuyến (core.backup_manager).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Sao lưu theo từng bước, báo tiến độ, snapshot nén gzip
+- Ghi dữ liệu trong lúc sao lưu không bị chặn
+- Khôi phục từ snapshot và nạp lại manager
+- Lệnh CLI backup
+"""
+
+import gzip
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import BackupManager, InvoiceManager
+from ui.cli import main
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestBackupManager:
+    """Kiểm tra BackupManager."""
+
+    def test_paged_backup_with_progress(self, populated_product_manager, tmp_path):
+        """Kiểm tra sao lưu nhiều bước và báo tiến độ tăng dần."""
+        steps = []
+        manager = BackupManager(pages_per_step=1)
+        report, message = manager.backup(str(tmp_path / "snap.db"),
+                                         progress=lambda done, total: steps.append((done, total)))
+        assert report is not None, message
+        assert report.steps == len(steps) > 1
+        assert steps[-1][0] == steps[-1][1] == report.pages
+        assert [done for done, _ in steps] == sorted(done for done, _ in steps)
+        assert _count(tmp_path / "snap.db", "products") == len(populated_product_manager.products)
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    def test_writes_during_backup(self, populated_product_manager, tmp_path):
+        """Kiểm tra bên ghi không bị chặn giữa các bước và snapshot vẫn nhất quán."""
+        results = []
+
+        def write_once(done, total):
+            if not results:
+                results.append(populated_product_manager.add_product("P999", "Mới", 10))
+
+        report, message = BackupManager(pages_per_step=1).backup(str(tmp_path / "snap.db"), progress=write_once)
+        assert report is not None, message
+        assert results[0][0] is True, results[0][1]
+        assert _count(tmp_path / "snap.db", "products") == len(populated_product_manager.products)
+
+    def test_compressed_backup_and_restore(self, populated_product_manager, tmp_path):
+        """Kiểm tra snapshot nén và khôi phục, manager được nạp lại."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager.create_invoice("Khách A", [{"product_id": "P001", "quantity": 1}], date="2024-01-01")
+        manager = BackupManager(product_manager=populated_product_manager, invoice_manager=invoice_manager)
+
+        report, _ = manager.backup(str(tmp_path / "snap.db"), compress=True)
+        assert report.destination.endswith(".db.gz") and report.compressed
+        with gzip.open(report.destination, "rb") as f:
+            assert f.read(16) == b"SQLite format 3\x00"
+
+        populated_product_manager.delete_product("P002")
+        invoice_manager.create_invoice("Khách B", [{"product_id": "P001", "quantity": 1}], date="2024-01-02")
+
+        success, message = manager.restore(report.destination)
+        assert success, message
+        assert "P002" in [p.product_id for p in populated_product_manager.products]
+        assert [inv.customer_name for inv in invoice_manager.invoices] == ["Khách A"]
+
+    def test_errors(self, temp_db, tmp_path):
+        """Kiểm tra khôi phục từ file không tồn tại hoặc không hợp lệ."""
+        manager = BackupManager()
+        assert manager.restore(str(tmp_path / "nope.db"))[0] is False
+        other = str(tmp_path / "other.db")
+        sqlite3.connect(other).close()
+        success, message = manager.restore(other)
+        assert not success and "không phải" in message
+        with pytest.raises(ValueError):
+            BackupManager(pages_per_step=0)
+
+    def test_cli(self, populated_product_manager, tmp_path, capsys):
+        """Kiểm tra lệnh CLI backup create/restore."""
+        destination = str(tmp_path / "cli.db")
+        assert main(["backup", "create", destination, "--gzip", "--pages", "2", "--quiet"]) == 0
+        assert "Đã sao lưu" in capsys.readouterr().out
+        assert main(["backup", "restore", destination + ".gz"]) == 0
+        assert main(["backup", "restore", str(tmp_path / "missing.db")]) == 1
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho phân tích giỏ hàng (core.basket_analysis).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Đếm cặp thưa có cắt tỉa: khớp với cách đếm vét cạn
+- Support, confidence, lift của luật kết hợp
+- Tính từ database qua StatisticsManager (lọc theo ngày, bảng in ra)
+- Lệnh CLI report basket_analysis
+"""
+
+import itertools
+import json
+import os
+import random
+import sys
+from collections import Counter
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import InvoiceManager, StatisticsManager
+from core.basket_analysis import analyze_baskets, min_basket_count
+from ui.cli import main
+
+BASKETS = [
+    ["A", "B", "C"],
+    ["A", "B"],
+    ["A", "B", "B"],
+    ["A", "C"],
+    ["D"],
+]
+
+
+class TestAnalyzeBaskets:
+    """Kiểm tra thuật toán trên giỏ hàng trong bộ nhớ."""
+
+    def test_metrics(self):
+        """Kiểm tra support, confidence và lift của các luật."""
+        report = analyze_baskets(lambda: BASKETS, min_support=0.4)
+
+        assert report.baskets == 5 and report.min_count == 2
+        assert report.frequent_items == 3
+        assert [(pair.items, pair.count) for pair in report.pairs] == [(("A", "B"), 3), (("A", "C"), 2)]
+
+        rules = {(rule.antecedent, rule.consequent): rule for rule in report.rules}
+        assert set(rules) == {("A", "B"), ("B", "A"), ("A", "C"), ("C", "A")}
+        b_to_a = rules[("B", "A")]
+        assert b_to_a.support == pytest.approx(0.6)
+        assert b_to_a.confidence == pytest.approx(1.0)
+        assert b_to_a.lift == pytest.approx(1.0 / (4 / 5))
+        assert rules[("A", "C")].confidence == pytest.approx(0.5)
+        assert report.rules[0].lift >= report.rules[-1].lift
+
+    def test_filters_and_limit(self):
+        """Kiểm tra ngưỡng confidence, lift và giới hạn số luật."""
+        report = analyze_baskets(lambda: BASKETS, min_support=0.4, min_confidence=0.9)
+        assert {(rule.antecedent, rule.consequent) for rule in report.rules} == {("B", "A"), ("C", "A")}
+        assert analyze_baskets(lambda: BASKETS, min_support=0.4, min_lift=2.0).rules == []
+        assert len(analyze_baskets(lambda: BASKETS, min_support=0.2, limit=1).rules) == 1
+
+    def test_matches_brute_force(self):
+        """Kiểm tra kết quả khớp với đếm vét cạn mọi cặp trên dữ liệu ngẫu nhiên."""
+        rng = random.Random(7)
+        products = [f"P{index:03d}" for index in range(40)]
+        weights = [1 / (rank + 1) for rank in range(len(products))]
+        baskets = [rng.choices(products, weights=weights, k=rng.randint(1, 6)) for _ in range(2000)]
+
+        report = analyze_baskets(lambda: baskets, min_support=0.02)
+
+        min_count = min_basket_count(0.02, len(baskets))
+        expected = Counter()
+        for basket in baskets:
+            expected.update(itertools.combinations(sorted(set(basket)), 2))
+        expected = {pair: count for pair, count in expected.items() if count >= min_count}
+        assert {pair.items: pair.count for pair in report.pairs} == expected
+        assert len(report.rules) == 2 * len(expected)
+
+    def test_invalid_support(self):
+        """Kiểm tra ngưỡng support không hợp lệ."""
+        for value in (0, -0.1, 1.5):
+            with pytest.raises(ValueError):
+                analyze_baskets(lambda: BASKETS, min_support=value)
+
+
+class TestStatisticsBasketAnalysis:
+    """Kiểm tra báo cáo giỏ hàng tính từ database."""
+
+    @pytest.fixture
+    def invoice_manager(self, populated_product_manager):
+        populated_product_manager.add_product("P003", "Bàn phím", 300000)
+        invoice_manager = InvoiceManager(populated_product_manager)
+        for date, product_ids in [("2024-01-01", ["P001", "P002"]), ("2024-01-02", ["P001", "P002", "P003"]),
+                                  ("2024-02-01", ["P001", "P002"]), ("2024-02-02", ["P003"])]:
+            invoice, message = invoice_manager.create_invoice(
+                "Khách A", [{"product_id": pid, "quantity": 1} for pid in product_ids], date=date)
+            assert invoice is not None, message
+        return invoice_manager
+
+    def test_from_database(self, invoice_manager, populated_product_manager):
+        """Kiểm tra báo cáo khớp với phân tích trên hóa đơn trong bộ nhớ."""
+        statistics = StatisticsManager(invoice_manager, populated_product_manager)
+        report = statistics.get_basket_analysis(min_support=0.5)
+        expected = analyze_baskets(
+            lambda: [[item.product_id for item in inv.items] for inv in invoice_manager.invoices],
+            min_support=0.5)
+        assert report.baskets == 4
+        assert [pair.to_dict() for pair in report.pairs] == [pair.to_dict() for pair in expected.pairs]
+        assert [(pair.items, pair.count) for pair in report.pairs] == [(("P001", "P002"), 3)]
+
+        january = statistics.get_basket_analysis(min_support=0.5, date_from="2024-01-01", date_to="2024-01-31")
+        assert january.baskets == 2
+        assert {pair.items for pair in january.pairs} == {("P001", "P002"), ("P001", "P003"), ("P002", "P003")}
+
+    def test_print_report(self, invoice_manager, populated_product_manager, capsys):
+        """Kiểm tra bảng luật kết hợp in ra console."""
+        statistics = StatisticsManager(invoice_manager, populated_product_manager)
+        statistics.basket_analysis(min_support=0.5)
+        output = capsys.readouterr().out
+        assert "PHÂN TÍCH GIỎ HÀNG" in output
+        assert "Laptop Dell XPS 13" in output and "Chuột không dây Logitech" in output
+
+        statistics.basket_analysis(min_support=1.0)
+        assert "Không có cặp sản phẩm nào" in capsys.readouterr().out
+
+        statistics.basket_analysis(min_support=0.5, date_from="2024-01-01", date_to="2024-01-31")
+        assert "Bàn phím" in capsys.readouterr().out
+        statistics.basket_analysis(min_support=0.5, date_to="2023-12-31")
+        assert "Không có dữ liệu hóa đơn" in capsys.readouterr().out
+
+    def test_cli(self, invoice_manager, capsys):
+        """Kiểm tra lệnh CLI report basket_analysis."""
+        assert main(["report", "basket_analysis", "--min-support", "0.5", "--json"]) == 0
+        data = json.loads(capsys.readouterr().out)
+        assert data["baskets"] == 4 and data["pairs"][0]["items"] == ["P001", "P002"]
+        assert main(["report", "basket_analysis", "--min-support", "0.5"]) == 0
+        assert "PHÂN TÍCH GIỎ HÀNG" in capsys.readouterr().out
+        assert main(["report", "basket_analysis", "--min-support", "0.5", "--from", "2024-01-01",
+                     "--to", "2024-01-31"]) == 0
+        output = capsys.readouterr().out
+        assert "PHÂN TÍCH GIỎ HÀNG" in output and "Bàn phím" in output
+        assert main(["report", "basket_analysis", "--min-support", "2"]) == 2
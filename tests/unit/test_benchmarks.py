@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho gói benchmarks.
+
+Module kiểm thử này bao gồm các test cases cho:
+- Bộ sinh dữ liệu tổng hợp (tính lặp lại, số dòng)
+- Chạy bộ benchmark ở quy mô nhỏ
+- So sánh kết quả giữa hai lần chạy
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Thêm thư mục gốc và src vào path để import
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.datagen import DatasetSpec, generate_database
+from benchmarks.suite import run_benchmarks, compare_results
+from utils.db_utils import current_database_path
+
+TINY = DatasetSpec(products=10, invoices=30, lines_per_invoice=3, customers=5, days=10)
+
+
+def _dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+                for table in ("products", "customers", "invoices", "invoice_items")]
+    finally:
+        conn.close()
+
+
+class TestDatagen:
+    """Kiểm tra bộ sinh dữ liệu."""
+
+    def test_same_seed_same_data(self, temp_db, tmp_path):
+        """Kiểm tra cùng spec cho cùng dữ liệu."""
+        first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+        counts = generate_database(first, TINY)
+        generate_database(second, TINY)
+        # Không đổi database mặc định của tiến trình
+        assert current_database_path() == temp_db
+
+        assert _dump(first) == _dump(second)
+        assert counts["products"] == 10
+        assert counts["invoices"] == 30
+        assert counts["invoice_items"] >= 30
+
+    def test_for_scale(self):
+        """Kiểm tra spec theo tên quy mô."""
+        spec = DatasetSpec.for_scale("10k")
+        assert spec.invoices * spec.lines_per_invoice == 10_000
+        with pytest.raises(ValueError):
+            DatasetSpec.for_scale("huge")
+
+
+class TestSuite:
+    """Kiểm tra bộ benchmark."""
+
+    def test_run_tiny(self, temp_db, tmp_path):
+        """Kiểm tra chạy benchmark ở quy mô nhỏ."""
+        results = run_benchmarks(TINY, repeat=1, db_path=str(tmp_path / "bench.db"),
+                                 skip=["invoice_manager.create_invoice"])
+
+        assert results["dataset"]["rows"]["invoices"] == 30
+        assert {"statistics.revenue_by_date", "statistics.basket_analysis"} <= set(results["results"])
+        assert {"startup.managers", "startup.managers_deferred"} <= set(results["results"])
+        assert "invoice_manager.create_invoice" not in results["results"]
+        assert results["results"]["product_manager.find_product"]["ops"] == 1000
+        assert current_database_path() == temp_db
+
+    def test_compare_results(self):
+        """Kiểm tra phát hiện hồi quy."""
+        old = {"results": {"a": {"best_per_op": 1.0}, "b": {"best_per_op": 1.0}}}
+        new = {"results": {"a": {"best_per_op": 1.5}, "b": {"best_per_op": 1.05}, "c": {"best_per_op": 1.0}}}
+
+        rows = {row["name"]: row for row in compare_results(old, new, threshold=0.10)}
+        assert rows["a"]["regression"] is True
+        assert rows["b"]["regression"] is False
+        assert "c" not in rows
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho giao diện dòng lệnh (ui.cli).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Các lệnh con import, export, report, db, bench
+- Tùy chọn --query-stats
+- CLI không import tkinter
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from ui import cli
+
+
+@pytest.fixture
+def products_csv(tmp_path):
+    path = tmp_path / "products.csv"
+    path.write_text("product_id,name,unit_price\nP001,Laptop Dell,25000000\nbad,X,1\n", encoding="utf-8")
+    return str(path)
+
+
+class TestCli:
+    """Kiểm tra các lệnh con của CLI."""
+
+    def test_import_products(self, temp_db, products_csv, capsys):
+        """Kiểm tra lệnh import với báo cáo JSON."""
+        code = cli.main(["import", "products", products_csv, "--json"])
+        output = json.loads(capsys.readouterr().out)
+        assert code == 0
+        assert output["rows_imported"] == 1
+        assert output["rows_rejected"] == 1
+
+    def test_import_strict_fails_on_rejected_rows(self, temp_db, products_csv, capsys):
+        """Kiểm tra --strict trả mã lỗi khi có dòng bị loại."""
+        assert cli.main(["import", "products", products_csv, "--strict"]) == 1
+
+    def test_report(self, temp_db, products_csv, tmp_path, capsys):
+        """Kiểm tra lệnh report in báo cáo thống kê."""
+        invoices = tmp_path / "invoices.csv"
+        invoices.write_text("customer_name,date,product_id,quantity\nAn,2024-01-01,P001,2\n", encoding="utf-8")
+        cli.main(["import", "products", products_csv])
+        cli.main(["import", "invoices", str(invoices)])
+        capsys.readouterr()
+
+        assert cli.main(["report", "top_customers", "--limit", "3"]) == 0
+        output = capsys.readouterr().out
+        assert "TOP 3 KHÁCH HÀNG TIỀM NĂNG" in output
+        assert "50,000,000.00" in output
+
+        # Tính song song trực tiếp từ database, in JSON
+        assert cli.main(["report", "top_customers", "--workers", "1", "--from", "2024-01-01"]) == 0
+        output = json.loads(capsys.readouterr().out)
+        assert output["rows"] == [["An", "50000000.00"]]
+        assert output["total"] == "50000000.00"
+
+    def test_export_invalid_date(self, temp_db, tmp_path, capsys):
+        """Kiểm tra lệnh export trả mã lỗi khi tham số sai."""
+        code = cli.main(["export", "invoices", str(tmp_path / "x.csv"), "--from", "2024/01/01"])
+        assert code == 1
+        assert "định dạng" in capsys.readouterr().err
+
+    def test_db_info(self, file_db, capsys):
+        """Kiểm tra lệnh db info."""
+        assert cli.main(["db", "info", "--json"]) == 0
+        info = json.loads(capsys.readouterr().out)
+        assert info["schema_version"] == info["expected_schema_version"]
+        assert set(info["tables"]) >= {"products", "invoices", "invoice_items", "customers"}
+
+    def test_bench(self, temp_db, capsys):
+        """Kiểm tra lệnh bench xuất JSON."""
+        assert cli.main(["bench", "--repeat", "1", "--json"]) == 0
+        output = json.loads(capsys.readouterr().out)
+        assert set(output["seconds"]) >= {"load_products", "load_invoices", "top_customers"}
+
+    def test_query_stats(self, temp_db, products_csv, capsys):
+        """Kiểm tra --query-stats in số liệu truy vấn ra stderr."""
+        assert cli.main(["--query-stats", "import", "products", products_csv]) == 0
+        metrics = json.loads(capsys.readouterr().err)
+        assert metrics["operations"]["import.products"]["queries"] > 0
+
+    def test_cli_does_not_import_tkinter(self, tmp_path):
+        """Kiểm tra chạy CLI trong tiến trình riêng không import tkinter."""
+        code = (
+            "import sys; from ui import cli; "
+            f"rc = cli.main(['--db', {str(tmp_path / 'cli.db')!r}, 'db', 'init']); "
+            "assert 'tkinter' not in sys.modules; sys.exit(rc)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho module database: khởi tạo schema và migration.
+
+Module kiểm thử này bao gồm các test cases cho:
+- initialize_database: Tạo bảng và đặt phiên bản schema
+- migrate_database: Nâng cấp database cũ lên schema hiện tại
+"""
+
+import os
+import sys
+import sqlite3
+from unittest.mock import patch
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from database.database import connect_database, ensure_database_initialized, initialize_database, SCHEMA_VERSION
+
+
+def _create_legacy_schema(path):
+    """Tạo database theo schema cũ (chưa có bảng customers)."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+    CREATE TABLE products (
+        product_id TEXT PRIMARY KEY, name TEXT NOT NULL, unit_price REAL NOT NULL,
+        calculation_unit TEXT, category TEXT
+    );
+    CREATE TABLE invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, customer_name TEXT NOT NULL, date TEXT NOT NULL
+    );
+    CREATE TABLE invoice_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, invoice_id INTEGER NOT NULL,
+        product_id TEXT NOT NULL, quantity INTEGER NOT NULL, unit_price REAL NOT NULL
+    );
+    """)
+    conn.execute("INSERT INTO products VALUES ('P001', 'Laptop', 25000000.5, 'chiếc', 'Electronics')")
+    conn.execute("INSERT INTO invoice_items (invoice_id, product_id, quantity, unit_price) VALUES (1, 'P001', 2, 0.1)")
+    conn.executemany(
+        "INSERT INTO invoices (customer_name, date) VALUES (?, ?)",
+        [("Nguyễn Văn A", "2024-01-01"), ("nguyễn  văn a", "2024-01-02"), ("Trần Thị B", "2024-01-03")]
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestInitializeDatabase:
+    """Kiểm tra cho hàm initialize_database."""
+
+    def test_sets_schema_version(self, temp_db):
+        """Kiểm tra database mới được đặt đúng phiên bản schema."""
+        conn = connect_database(temp_db)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+
+        assert version == SCHEMA_VERSION
+        assert "customers" in tables
+
+    def test_new_database_incremental_without_vacuum(self, tmp_path):
+        """Kiểm tra database mới bật auto_vacuum = INCREMENTAL mà không chạy VACUUM."""
+        db_path = str(tmp_path / "new.db")
+        statements = []
+
+        def connect(path, **kwargs):
+            conn = connect_database(path, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with patch('database.database.connect_database', side_effect=connect):
+            success, message = initialize_database(db_path)
+        assert success, message
+        assert not [sql for sql in statements if sql.strip().upper().startswith("VACUUM")]
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        conn.close()
+
+    def test_initialize_is_idempotent(self, temp_db):
+        """Kiểm tra khởi tạo lại không gây lỗi."""
+        success, message = initialize_database(temp_db)
+        assert success, message
+
+
+class TestMigrations:
+    """Kiểm tra migration từ schema cũ."""
+
+    def test_migrate_deduplicates_customers(self, tmp_path):
+        """Kiểm tra migration gộp các tên khách hàng trùng sau chuẩn hóa."""
+        db_path = str(tmp_path / "legacy.db")
+        _create_legacy_schema(db_path)
+
+        success, message = initialize_database(db_path)
+        assert success, message
+
+        conn = sqlite3.connect(db_path)
+        customers = conn.execute("SELECT id, name FROM customers ORDER BY id").fetchall()
+        invoice_customers = [row[0] for row in conn.execute("SELECT customer_id FROM invoices ORDER BY id")]
+        conn.close()
+
+        assert [name for _, name in customers] == ["Nguyễn Văn A", "Trần Thị B"]
+        assert invoice_customers[0] == invoice_customers[1]
+        assert invoice_customers[2] != invoice_customers[0]
+        assert None not in invoice_customers
+
+    def test_migrate_converts_prices_to_minor_units(self, tmp_path):
+        """Kiểm tra migration chuyển giá REAL sang số nguyên đơn vị nhỏ nhất."""
+        db_path = str(tmp_path / "legacy.db")
+        _create_legacy_schema(db_path)
+
+        success, message = initialize_database(db_path)
+        assert success, message
+
+        conn = sqlite3.connect(db_path)
+        product_price = conn.execute("SELECT unit_price, typeof(unit_price) FROM products").fetchone()
+        item_price = conn.execute("SELECT unit_price, typeof(unit_price) FROM invoice_items").fetchone()
+        conn.close()
+
+        assert product_price == (2500000050, "integer")
+        assert item_price == (10, "integer")
+
+    def test_migrate_enables_incremental_vacuum(self, tmp_path):
+        """Kiểm tra migration bật auto_vacuum = INCREMENTAL cho database cũ."""
+        db_path = str(tmp_path / "legacy.db")
+        _create_legacy_schema(db_path)
+
+        success, message = initialize_database(db_path)
+        assert success, message
+
+        conn = sqlite3.connect(db_path)
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        conn.close()
+        assert auto_vacuum == 2
+
+    def test_ensure_initialized_skips_current_schema(self, tmp_path):
+        """Kiểm tra chỉ khởi tạo khi database chưa có hoặc schema còn cũ."""
+        db_path = str(tmp_path / "app.db")
+        with patch('database.database.initialize_database', wraps=initialize_database) as init:
+            assert ensure_database_initialized(db_path)[0]
+            assert ensure_database_initialized(db_path)[0]
+            assert init.call_count == 1
+
+        legacy_path = str(tmp_path / "legacy.db")
+        _create_legacy_schema(legacy_path)
+        assert ensure_database_initialized(legacy_path)[0]
+
+        conn = sqlite3.connect(legacy_path)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert version == SCHEMA_VERSION
+
+    def test_migrate_builds_price_history(self, tmp_path):
+        """Kiểm tra migration dựng lịch sử giá từ hóa đơn cũ và giá hiện tại."""
+        db_path = str(tmp_path / "legacy.db")
+        _create_legacy_schema(db_path)
+
+        success, message = initialize_database(db_path)
+        assert success, message
+
+        conn = sqlite3.connect(db_path)
+        history = conn.execute(
+            "SELECT product_id, unit_price, effective_from FROM product_prices ORDER BY effective_from"
+        ).fetchall()
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT unit_price FROM product_prices "
+            "WHERE product_id = ? AND effective_from <= ? ORDER BY effective_from DESC LIMIT 1",
+            ("P001", "2024-06-01")
+        ))
+        conn.close()
+
+        assert history[0] == ("P001", 10, "2024-01-01")
+        assert [row[:2] for row in history[1:]] == [("P001", 2500000050)]
+        assert "idx_product_prices_product_effective" in plan
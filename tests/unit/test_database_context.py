@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho ngữ cảnh database dùng chung (database.context).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Khởi tạo schema một lần cho mọi manager dùng chung ngữ cảnh
+- Manager nhận ngữ cảnh ghi/đọc đúng database của ngữ cảnh
+- activate(), nhóm kết nối và hàng đợi ghi hóa đơn theo ngữ cảnh
+- Database trong bộ nhớ (:memory:, cache dùng chung) và sao chép từ database mẫu
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import database.context
+from core import (
+    ExportManager, ImportManager, InvoiceManager, MaintenanceManager, ProductManager, StatisticsManager
+)
+from core.invoice_writer import InvoiceWriteQueue
+from database.context import DatabaseContext
+from database.database import SCHEMA_VERSION, connect_database
+from utils import db_utils
+
+
+def _count(path, table):
+    conn = connect_database(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestDatabaseContext:
+    """Kiểm tra DatabaseContext."""
+
+    def test_initialize_once_for_all_managers(self, temp_db, tmp_path):
+        """Kiểm tra schema chỉ được khởi tạo một lần dù có nhiều manager."""
+        context = DatabaseContext(str(tmp_path / "shared.db"))
+        with patch.object(database.context, "ensure_database_initialized",
+                          wraps=database.context.ensure_database_initialized) as ensure:
+            products = ProductManager(database=context)
+            invoices = InvoiceManager(products)
+            statistics = StatisticsManager(invoices, products)
+            assert ensure.call_count == 1
+        assert context.schema_version == SCHEMA_VERSION
+        assert invoices.database is context and statistics.database is context
+        assert context.initialize(force=True)[0] is True
+
+    def test_managers_use_context_database(self, temp_db, tmp_path):
+        """Kiểm tra manager ghi vào database của ngữ cảnh, không phải database mặc định."""
+        other = str(tmp_path / "other.db")
+        products = ProductManager(database=DatabaseContext(other))
+        assert products.add_product("P001", "Laptop", 100)[0] is True
+        invoice, message = InvoiceManager(products).create_invoice(
+            "Khách A", [{"product_id": "P001", "quantity": 2}], date="2024-01-01")
+        assert invoice is not None, message
+
+        assert _count(other, "products") == 1 and _count(other, "invoices") == 1
+        assert _count(temp_db, "products") == 0 and _count(temp_db, "invoices") == 0
+        assert db_utils.current_database_path() == temp_db
+
+    def test_import_export_use_context_database(self, temp_db, tmp_path):
+        """Kiểm tra nhập, xuất và bảo trì chạy trên database của ngữ cảnh."""
+        other = str(tmp_path / "other.db")
+        products = ProductManager(database=DatabaseContext(other))
+        invoices = InvoiceManager(products)
+        importer = ImportManager(products, invoices)
+        assert importer.database is products.database
+
+        products_csv = tmp_path / "products.csv"
+        products_csv.write_text("product_id,name,unit_price\nP001,Laptop,100\n", encoding="utf-8")
+        invoices_csv = tmp_path / "invoices.csv"
+        invoices_csv.write_text("invoice_ref,customer_name,date,product_id,quantity\n"
+                                "A,Khách A,2024-01-01,P001,2\n", encoding="utf-8")
+        assert importer.import_products(str(products_csv))[0].rows_imported == 1
+        assert importer.import_invoices(str(invoices_csv))[0].rows_imported == 1
+        assert _count(other, "products") == 1 and _count(other, "invoices") == 1
+        assert _count(temp_db, "products") == 0 and _count(temp_db, "invoices") == 0
+
+        report, message = ExportManager(database=products.database).export_invoices(str(tmp_path / "out.csv"))
+        assert report is not None and report.rows_written == 1, message
+        assert ExportManager().export_invoices(str(tmp_path / "default.csv"))[0].rows_written == 0
+        assert MaintenanceManager(database=products.database).quick_check().success
+        assert db_utils.current_database_path() == temp_db
+
+    def test_activate(self, temp_db, tmp_path):
+        """Kiểm tra activate() chuyển các hàm của db_utils sang database của ngữ cảnh."""
+        context = DatabaseContext(str(tmp_path / "other.db"))
+        ProductManager(database=context).add_product("P001", "Laptop", 100)
+
+        assert ProductManager().products == []
+        with context.activate() as active:
+            assert active is context
+            assert db_utils.current_database_path() == context.path
+            assert [p.product_id for p in ProductManager().products] == ["P001"]
+        assert db_utils.current_database_path() == temp_db
+
+    def test_default_database(self, temp_db, tmp_path):
+        """Kiểm tra database mặc định của tiến trình được dùng cả ở luồng mới."""
+        assert db_utils.default_database().path == temp_db
+        context = DatabaseContext(str(tmp_path / "default.db"))
+        previous = db_utils.set_default_database(context)
+        try:
+            assert db_utils.current_database_path() == context.path
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                assert executor.submit(db_utils.current_database_path).result() == context.path
+            assert DatabaseContext().path == context.path
+        finally:
+            assert db_utils.set_default_database(previous) is context
+        assert db_utils.current_database_path() == temp_db
+
+    def test_pool_and_close(self, tmp_path):
+        """Kiểm tra nhóm kết nối mở đúng file và được đóng khi ra khỏi khối with."""
+        path = str(tmp_path / "pool.db")
+        with DatabaseContext(path, pool_size=2) as context:
+            assert context.initialize()[0] is True
+            with context.pool.connection() as conn:
+                assert conn.execute("PRAGMA database_list").fetchone()[2] == context.path
+            conn = context.connect()
+            try:
+                assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            finally:
+                conn.close()
+        assert context._pool is None
+
+    def test_write_queue_uses_context(self, temp_db, tmp_path):
+        """Kiểm tra luồng ghi của InvoiceWriteQueue ghi vào database của ngữ cảnh."""
+        other = str(tmp_path / "other.db")
+        products = ProductManager(database=DatabaseContext(other))
+        products.add_product("P001", "Laptop", 100)
+        invoices = InvoiceManager(products)
+        with InvoiceWriteQueue(invoices) as queue:
+            future = queue.submit("Khách A", [{"product_id": "P001", "quantity": 1}], date="2024-01-01")
+            invoice, message = future.result(timeout=10)
+        assert invoice is not None, message
+        assert _count(other, "invoices") == 1
+        assert _count(temp_db, "invoices") == 0
+
+
+class TestMemoryDatabase:
+    """Kiểm tra database trong bộ nhớ và clone()."""
+
+    def test_memory_contexts_are_isolated(self, temp_db):
+        """Kiểm tra mỗi ngữ cảnh ':memory:' là một database riêng, không tạo file."""
+        first, second = DatabaseContext(":memory:"), DatabaseContext(":memory:")
+        try:
+            assert first.in_memory and first.path != second.path
+            assert not first.wal
+            products = ProductManager(database=first)
+            assert products.add_product("P001", "Laptop", 100)[0] is True
+            invoice, message = InvoiceManager(products).create_invoice(
+                "Khách A", [{"product_id": "P001", "quantity": 1}], date="2024-01-01")
+            assert invoice is not None, message
+            assert ProductManager(database=second).products == []
+            assert _count(temp_db, "products") == 0
+        finally:
+            first.close()
+            second.close()
+
+    def test_close_releases_memory(self):
+        """Kiểm tra database trong bộ nhớ bị giải phóng khi đóng ngữ cảnh."""
+        context = DatabaseContext(":memory:")
+        ProductManager(database=context).add_product("P001", "Laptop", 100)
+        context.close()
+        assert context.schema_version is None
+        conn = connect_database(context.path)
+        try:
+            assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+        finally:
+            conn.close()
+
+    def test_shared_cache_uri(self):
+        """Kiểm tra 'file::memory:?cache=shared' được dùng nguyên dạng và chia sẻ giữa kết nối."""
+        context = DatabaseContext("file::memory:?cache=shared")
+        try:
+            assert context.path == "file::memory:?cache=shared" and context.in_memory
+            assert context.initialize()[0] is True
+            conn = context.connect()
+            try:
+                assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            finally:
+                conn.close()
+        finally:
+            context.close()
+
+    def test_clone_from_template(self, template_db, memory_db, tmp_path):
+        """Kiểm tra bản sao có schema và dữ liệu của bản gốc, độc lập với bản gốc."""
+        assert memory_db.schema_version == SCHEMA_VERSION
+        products = ProductManager(database=memory_db)
+        products.add_product("P001", "Laptop", 100)
+
+        copy = memory_db.clone()
+        file_copy = memory_db.clone(str(tmp_path / "copy.db"))
+        try:
+            assert [p.product_id for p in ProductManager(database=copy).products] == ["P001"]
+            assert _count(str(tmp_path / "copy.db"), "products") == 1
+            ProductManager(database=copy).add_product("P002", "Chuột", 10)
+            products.load_products()
+            assert [p.product_id for p in products.products] == ["P001"]
+        finally:
+            copy.close()
+            file_copy.close()
+        with template_db.activate():
+            assert ProductManager().products == []
+
+    def test_statistics_on_memory_database(self, memory_db):
+        """Kiểm tra báo cáo song song chạy trong tiến trình hiện tại với database trong bộ nhớ."""
+        products = ProductManager(database=memory_db)
+        products.add_product("P001", "Laptop", 100)
+        invoices = InvoiceManager(products)
+        invoices.create_invoice("Khách A", [{"product_id": "P001", "quantity": 3}], date="2024-01-01")
+        rows, total = StatisticsManager(invoices, products).get_report_parallel("revenue_by_product", workers=4)
+        assert total == 300 * 100
+        assert rows[0][0] == "P001"
@@ -9,16 +9,18 @@ Module kiểm thử này bao gồm các test cases cho:
 - Kiểm tra data integrity: Transactions, rollbacks
 - Performance testing: Large datasets, concurrent access
 - Security testing: SQL injection prevention
+- Đo truy vấn: số liệu theo thao tác, log truy vấn chậm
+- Unit of work: commit một lần, rollback khi lỗi, savepoint lồng nhau
 
 Sử dụng temp database để đảm bảo test isolation.
 """
 
+import logging
 import pytest
 import tempfile
 import os
 import sys
 import sqlite3
-from unittest.mock import patch
 
 # Thêm src vào path để import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
@@ -28,95 +30,100 @@ from utils.db_utils import (
     save_data,
     load_data,
     update_data,
-    delete_data
+    delete_data,
+    save_many,
+    stream_query,
+    query_operation,
+    get_query_metrics,
+    reset_query_metrics,
+    configure_query_metrics,
+    insert_data,
+    transaction,
+    current_transaction,
+    ConnectionPool,
+    open_connection
 )
-from database.database import initialize_database
+from database.database import connect_database, initialize_database
 
 
 class TestEnsureDatabaseExists:
     """Kiểm tra cho hàm ensure_database_exists."""
 
-    def test_database_creation(self, temp_db):
+    def test_database_creation(self, file_db):
         """Kiểm tra tạo database khi nó không tồn tại."""
         # Xóa file database
-        if os.path.exists(temp_db):
-            os.unlink(temp_db)
+        if os.path.exists(file_db):
+            os.unlink(file_db)
 
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            success, message = ensure_database_exists()
-            assert success
-            assert message == ""
-            # Thư mục nên được tạo
-            assert os.path.exists(os.path.dirname(temp_db))
+        success, message = ensure_database_exists()
+        assert success
+        assert message == ""
+        # Thư mục nên được tạo
+        assert os.path.exists(os.path.dirname(file_db))
 
     def test_database_already_exists(self, temp_db):
         """Kiểm tra khi database đã tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            success, message = ensure_database_exists()
-            assert success
-            assert message == ""
+        success, message = ensure_database_exists()
+        assert success
+        assert message == ""
 
 class TestSaveData:
     """Kiểm tra cho hàm save_data."""
 
     def test_save_product_data(self, temp_db):
         """Kiểm tra lưu dữ liệu sản phẩm."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            product_data = {
-                'product_id': 'P001',
-                'name': 'Test Product',
-                'unit_price': 100.0,
-                'calculation_unit': 'chiếc',
-                'category': 'Test'
-            }
-
-            success, message = save_data('products', product_data)
-            assert success
-            assert message == ""
-
-            # Xác minh dữ liệu đã được lưu
-            conn = sqlite3.connect(temp_db)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM products WHERE product_id = ?", ('P001',))
-            result = cursor.fetchone()
-            conn.close()
-
-            assert result is not None
-            assert result[0] == 'P001'  # product_id
-            assert result[1] == 'Test Product'  # name
+        product_data = {
+            'product_id': 'P001',
+            'name': 'Test Product',
+            'unit_price': 100.0,
+            'calculation_unit': 'chiếc',
+            'category': 'Test'
+        }
+
+        success, message = save_data('products', product_data)
+        assert success
+        assert message == ""
+
+        # Xác minh dữ liệu đã được lưu
+        conn = connect_database(temp_db)
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM products WHERE product_id = ?", ('P001',))
+        result = cursor.fetchone()
+        conn.close()
+
+        assert result is not None
+        assert result[0] == 'P001'  # product_id
+        assert result[1] == 'Test Product'  # name
 
     def test_save_invoice_data(self, temp_db):
         """Kiểm tra lưu dữ liệu hóa đơn."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            invoice_data = {
-                'customer_name': 'Nguyễn Văn A',
-                'date': '2023-12-25'
-            }
+        invoice_data = {
+            'customer_name': 'Nguyễn Văn A',
+            'date': '2023-12-25'
+        }
 
-            success, message = save_data('invoices', invoice_data)
-            assert success
-            assert message == ""
+        success, message = save_data('invoices', invoice_data)
+        assert success
+        assert message == ""
 
     def test_save_invalid_table(self, temp_db):
         """Kiểm tra lưu vào bảng không tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            data = {'field': 'value'}
+        data = {'field': 'value'}
 
-            success, message = save_data('nonexistent_table', data)
-            assert not success
-            assert "Lỗi khi lưu dữ liệu" in message
+        success, message = save_data('nonexistent_table', data)
+        assert not success
+        assert "Lỗi khi lưu dữ liệu" in message
 
     def test_save_invalid_data(self, temp_db):
         """Kiểm tra lưu cấu trúc dữ liệu không hợp lệ."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            # Thiếu các trường bắt buộc
-            invalid_data = {
-                'invalid_field': 'value'
-            }
+        # Thiếu các trường bắt buộc
+        invalid_data = {
+            'invalid_field': 'value'
+        }
 
-            success, message = save_data('products', invalid_data)
-            assert not success
-            assert "Lỗi khi lưu dữ liệu" in message
+        success, message = save_data('products', invalid_data)
+        assert not success
+        assert "Lỗi khi lưu dữ liệu" in message
 
 
 class TestLoadData:
@@ -124,79 +131,75 @@ class TestLoadData:
 
     def test_load_all_products(self, temp_db):
         """Kiểm tra tải tất cả sản phẩm."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            # Đầu tiên, lưu một số dữ liệu test
-            test_products = [
-                {
-                    'product_id': 'P001',
-                    'name': 'Product 1',
-                    'unit_price': 100.0,
-                    'calculation_unit': 'chiếc',
-                    'category': 'Test'
-                },
-                {
-                    'product_id': 'P002',
-                    'name': 'Product 2',
-                    'unit_price': 200.0,
-                    'calculation_unit': 'cái',
-                    'category': 'Test'
-                }
-            ]
-
-            for product in test_products:
-                save_data('products', product)
-
-            # Tải tất cả sản phẩm
-            products, error = load_data('products')
-            assert error == ""
-            assert len(products) == 2
-            assert products[0]['product_id'] == 'P001'
-            assert products[1]['product_id'] == 'P002'
+        # Đầu tiên, lưu một số dữ liệu test
+        test_products = [
+            {
+                'product_id': 'P001',
+                'name': 'Product 1',
+                'unit_price': 100.0,
+                'calculation_unit': 'chiếc',
+                'category': 'Test'
+            },
+            {
+                'product_id': 'P002',
+                'name': 'Product 2',
+                'unit_price': 200.0,
+                'calculation_unit': 'cái',
+                'category': 'Test'
+            }
+        ]
+
+        for product in test_products:
+            save_data('products', product)
+
+        # Tải tất cả sản phẩm
+        products, error = load_data('products')
+        assert error == ""
+        assert len(products) == 2
+        assert products[0]['product_id'] == 'P001'
+        assert products[1]['product_id'] == 'P002'
 
     def test_load_with_conditions(self, temp_db):
         """Kiểm tra tải dữ liệu với điều kiện."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            # Lưu dữ liệu test
-            products = [
-                {
-                    'product_id': 'P001',
-                    'name': 'Product 1',
-                    'unit_price': 100.0,
-                    'calculation_unit': 'chiếc',
-                    'category': 'Electronics'
-                },
-                {
-                    'product_id': 'P002',
-                    'name': 'Product 2',
-                    'unit_price': 200.0,
-                    'calculation_unit': 'cái',
-                    'category': 'Office'
-                }
-            ]
-
-            for product in products:
-                save_data('products', product)
-
-            # Tải với điều kiện
-            results, error = load_data('products', {'category': 'Electronics'})
-            assert error == ""
-            assert len(results) == 1
-            assert results[0]['product_id'] == 'P001'
+        # Lưu dữ liệu test
+        products = [
+            {
+                'product_id': 'P001',
+                'name': 'Product 1',
+                'unit_price': 100.0,
+                'calculation_unit': 'chiếc',
+                'category': 'Electronics'
+            },
+            {
+                'product_id': 'P002',
+                'name': 'Product 2',
+                'unit_price': 200.0,
+                'calculation_unit': 'cái',
+                'category': 'Office'
+            }
+        ]
+
+        for product in products:
+            save_data('products', product)
+
+        # Tải với điều kiện
+        results, error = load_data('products', {'category': 'Electronics'})
+        assert error == ""
+        assert len(results) == 1
+        assert results[0]['product_id'] == 'P001'
 
     def test_load_empty_table(self, temp_db):
         """Kiểm tra tải từ bảng rỗng."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            results, error = load_data('products')
-            assert error == ""
-            assert results == []
+        results, error = load_data('products')
+        assert error == ""
+        assert results == []
 
     def test_load_nonexistent_table(self, temp_db):
         """Kiểm tra tải từ bảng không tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            results, error = load_data('nonexistent_table')
-            assert error != ""
-            assert "Lỗi khi tải dữ liệu" in error
-            assert results == []
+        results, error = load_data('nonexistent_table')
+        assert error != ""
+        assert "Lỗi khi tải dữ liệu" in error
+        assert results == []
 
 
 class TestUpdateData:
@@ -204,55 +207,52 @@ class TestUpdateData:
 
     def test_update_product(self, temp_db):
         """Kiểm tra cập nhật dữ liệu sản phẩm."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            # Đầu tiên, lưu một sản phẩm
-            original_data = {
-                'product_id': 'P001',
-                'name': 'Original Product',
-                'unit_price': 100.0,
-                'calculation_unit': 'chiếc',
-                'category': 'Test'
-            }
-            save_data('products', original_data)
-
-            # Cập nhật sản phẩm
-            update_values = {
-                'name': 'Updated Product',
-                'unit_price': 150.0
-            }
-            conditions = {'product_id': 'P001'}
-
-            success, message = update_data('products', update_values, conditions)
-            assert success
-            assert message == ""
-
-            # Xác minh cập nhật
-            products, _ = load_data('products', {'product_id': 'P001'})
-            assert len(products) == 1
-            assert products[0]['name'] == 'Updated Product'
-            assert products[0]['unit_price'] == 150.0
-            assert products[0]['category'] == 'Test'  # Không thay đổi
+        # Đầu tiên, lưu một sản phẩm
+        original_data = {
+            'product_id': 'P001',
+            'name': 'Original Product',
+            'unit_price': 100.0,
+            'calculation_unit': 'chiếc',
+            'category': 'Test'
+        }
+        save_data('products', original_data)
+
+        # Cập nhật sản phẩm
+        update_values = {
+            'name': 'Updated Product',
+            'unit_price': 150.0
+        }
+        conditions = {'product_id': 'P001'}
+
+        success, message = update_data('products', update_values, conditions)
+        assert success
+        assert message == ""
+
+        # Xác minh cập nhật
+        products, _ = load_data('products', {'product_id': 'P001'})
+        assert len(products) == 1
+        assert products[0]['name'] == 'Updated Product'
+        assert products[0]['unit_price'] == 150.0
+        assert products[0]['category'] == 'Test'  # Không thay đổi
 
     def test_update_nonexistent_record(self, temp_db):
         """Kiểm tra cập nhật bản ghi không tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            update_values = {'name': 'New Name'}
-            conditions = {'product_id': 'NONEXISTENT'}
+        update_values = {'name': 'New Name'}
+        conditions = {'product_id': 'NONEXISTENT'}
 
-            success, message = update_data('products', update_values, conditions)
-            # Nên thành công ngay cả khi không có hàng nào bị ảnh hưởng
-            assert success
-            assert message == ""
+        success, message = update_data('products', update_values, conditions)
+        # Nên thành công ngay cả khi không có hàng nào bị ảnh hưởng
+        assert success
+        assert message == ""
 
     def test_update_invalid_table(self, temp_db):
         """Kiểm tra cập nhật bảng không tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            update_values = {'field': 'value'}
-            conditions = {'id': 1}
+        update_values = {'field': 'value'}
+        conditions = {'id': 1}
 
-            success, message = update_data('nonexistent_table', update_values, conditions)
-            assert not success
-            assert "Lỗi khi cập nhật dữ liệu" in message
+        success, message = update_data('nonexistent_table', update_values, conditions)
+        assert not success
+        assert "Lỗi khi cập nhật dữ liệu" in message
 
 
 class TestDeleteData:
@@ -260,49 +260,262 @@ class TestDeleteData:
 
     def test_delete_product(self, temp_db):
         """Kiểm tra xóa dữ liệu sản phẩm."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            # Đầu tiên, lưu một số sản phẩm
-            products = [
-                {
-                    'product_id': 'P001',
-                    'name': 'Product 1',
-                    'unit_price': 100.0,
-                    'calculation_unit': 'chiếc',
-                    'category': 'Test'
-                },
-                {
-                    'product_id': 'P002',
-                    'name': 'Product 2',
-                    'unit_price': 200.0,
-                    'calculation_unit': 'cái',
-                    'category': 'Test'
-                }
-            ]
-
-            for product in products:
-                save_data('products', product)
-
-            # Xóa một sản phẩm
-            success, message = delete_data('products', {'product_id': 'P001'})
-            assert success
-            assert message == ""
-
-            # Xác minh việc xóa
-            remaining_products, _ = load_data('products')
-            assert len(remaining_products) == 1
-            assert remaining_products[0]['product_id'] == 'P002'
+        # Đầu tiên, lưu một số sản phẩm
+        products = [
+            {
+                'product_id': 'P001',
+                'name': 'Product 1',
+                'unit_price': 100.0,
+                'calculation_unit': 'chiếc',
+                'category': 'Test'
+            },
+            {
+                'product_id': 'P002',
+                'name': 'Product 2',
+                'unit_price': 200.0,
+                'calculation_unit': 'cái',
+                'category': 'Test'
+            }
+        ]
+
+        for product in products:
+            save_data('products', product)
+
+        # Xóa một sản phẩm
+        success, message = delete_data('products', {'product_id': 'P001'})
+        assert success
+        assert message == ""
+
+        # Xác minh việc xóa
+        remaining_products, _ = load_data('products')
+        assert len(remaining_products) == 1
+        assert remaining_products[0]['product_id'] == 'P002'
 
     def test_delete_nonexistent_record(self, temp_db):
         """Kiểm tra xóa bản ghi không tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            success, message = delete_data('products', {'product_id': 'NONEXISTENT'})
-            # Nên thành công ngay cả khi không có hàng nào bị ảnh hưởng
-            assert success
-            assert message == ""
+        success, message = delete_data('products', {'product_id': 'NONEXISTENT'})
+        # Nên thành công ngay cả khi không có hàng nào bị ảnh hưởng
+        assert success
+        assert message == ""
 
     def test_delete_invalid_table(self, temp_db):
         """Kiểm tra xóa từ bảng không tồn tại."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            success, message = delete_data('nonexistent_table', {'id': 1})
+        success, message = delete_data('nonexistent_table', {'id': 1})
+        assert not success
+        assert "Lỗi khi xóa dữ liệu" in message
+
+
+class TestSaveMany:
+    """Kiểm tra cho hàm save_many."""
+
+    def test_save_many_products(self, temp_db):
+        """Kiểm tra lưu nhiều bản ghi trong một lần."""
+        rows = [
+            {'product_id': f'P{i:03d}', 'name': f'Product {i}', 'unit_price': 100 * i,
+             'calculation_unit': 'cái', 'category': 'Test'}
+            for i in range(1, 51)
+        ]
+        count, message = save_many('products', rows)
+        assert count == 50
+        assert message == ""
+
+        products, _ = load_data('products')
+        assert len(products) == 50
+
+    def test_save_many_is_atomic(self, temp_db):
+        """Kiểm tra không bản ghi nào được lưu khi có một bản ghi lỗi."""
+        rows = [
+            {'product_id': 'P001', 'name': 'A', 'unit_price': 1, 'calculation_unit': 'cái', 'category': 'T'},
+            {'product_id': 'P001', 'name': 'B', 'unit_price': 2, 'calculation_unit': 'cái', 'category': 'T'},
+        ]
+        count, message = save_many('products', rows)
+        assert count == 0
+        assert "Lỗi khi lưu dữ liệu" in message
+
+        products, _ = load_data('products')
+        assert products == []
+
+    def test_save_many_empty(self, temp_db):
+        """Kiểm tra danh sách rỗng."""
+        assert save_many('products', []) == (0, "")
+
+
+class TestStreamQuery:
+    """Kiểm tra cho hàm stream_query."""
+
+    def test_stream_query_batches(self, temp_db):
+        """Kiểm tra đọc kết quả theo lô nhỏ hơn số dòng."""
+        rows = [
+            {'product_id': f'P{i:03d}', 'name': f'Product {i}', 'unit_price': i,
+             'calculation_unit': 'cái', 'category': 'Test'}
+            for i in range(1, 11)
+        ]
+        save_many('products', rows)
+
+        columns, results = stream_query(
+            "SELECT product_id, unit_price FROM products ORDER BY product_id", batch_size=3
+        )
+        assert columns == ['product_id', 'unit_price']
+        assert [row[0] for row in results] == [f'P{i:03d}' for i in range(1, 11)]
+
+    def test_stream_query_invalid(self, temp_db):
+        """Kiểm tra truy vấn không hợp lệ."""
+        with pytest.raises(sqlite3.Error):
+            stream_query("SELECT * FROM nonexistent_table")
+
+
+@pytest.fixture
+def query_metrics():
+    """Xóa số liệu truy vấn trước test và khôi phục cấu hình sau test."""
+    reset_query_metrics()
+    yield
+    configure_query_metrics(enabled=True, slow_query_ms=100)
+    reset_query_metrics()
+
+
+class TestQueryMetrics:
+    """Kiểm tra đo truy vấn và log truy vấn chậm."""
+
+    def test_operation_counts_queries_and_rows(self, temp_db, query_metrics):
+        """Kiểm tra số câu lệnh và số dòng được gom theo thao tác."""
+        rows = [
+            {'product_id': f'P{i:03d}', 'name': f'Product {i}', 'unit_price': i,
+             'calculation_unit': 'cái', 'category': 'Test'}
+            for i in range(1, 6)
+        ]
+        with query_operation("outer") as outer:
+            save_many('products', rows)
+            with query_operation("inner") as inner:
+                results, _ = load_data('products')
+
+        assert len(results) == 5
+        assert inner.queries == 1
+        assert inner.rows == 5
+        assert outer.queries == 2
+        assert outer.rows == 10
+        assert outer.elapsed_seconds >= outer.db_seconds > 0
+
+        metrics = get_query_metrics()
+        assert metrics["operations"]["outer"]["calls"] == 1
+        assert metrics["operations"]["inner"]["last"]["queries"] == 1
+        assert any(stmt["sql"] == "SELECT * FROM products" for stmt in metrics["statements"])
+
+    def test_slow_query_logged_with_plan(self, temp_db, query_metrics, caplog):
+        """Kiểm tra truy vấn vượt ngưỡng được ghi log kèm EXPLAIN QUERY PLAN."""
+        configure_query_metrics(slow_query_ms=0)
+        with query_operation("lookup"):
+            load_data('invoice_items', {'invoice_id': 1})
+
+        slow = get_query_metrics()["slow_queries"]
+        assert slow[0]["operation"] == "lookup"
+        assert any("idx_invoice_items_invoice_id" in step for step in slow[0]["plan"])
+        assert "Truy vấn chậm" in caplog.text
+
+    def test_iteration_not_timed_per_row(self, temp_db, query_metrics):
+        """Kiểm tra duyệt cursor từng dòng không bị đo (chỉ đo execute/fetch*)."""
+        save_many('products', [_product(f'P{i:03d}') for i in range(1, 6)])
+        conn = open_connection()
+        reset_query_metrics()
+        try:
+            assert len(list(conn.execute("SELECT * FROM products"))) == 5
+        finally:
+            conn.close()
+        metrics = get_query_metrics()
+        assert metrics["queries"] == 1
+        assert metrics["rows"] == 0
+
+    def test_library_logger_has_null_handler(self):
+        """Kiểm tra cảnh báo truy vấn chậm không tự in ra stderr khi chưa cấu hình logging."""
+        handlers = logging.getLogger("utils.db_utils").handlers
+        assert any(isinstance(handler, logging.NullHandler) for handler in handlers)
+
+    def test_disabled(self, temp_db, query_metrics):
+        """Kiểm tra tắt đo truy vấn."""
+        configure_query_metrics(enabled=False)
+        load_data('products')
+        assert get_query_metrics()["queries"] == 0
+
+
+def _product(product_id):
+    return {'product_id': product_id, 'name': f'Product {product_id}', 'unit_price': 100,
+            'calculation_unit': 'cái', 'category': 'Test'}
+
+
+class TestTransaction:
+    """Kiểm tra unit of work transaction()."""
+
+    def _ids(self):
+        rows, _ = load_data('products')
+        return sorted(row['product_id'] for row in rows)
+
+    def test_commit(self, file_db):
+        """Kiểm tra các thao tác trong transaction được commit cùng lúc."""
+        with transaction():
+            save_data('products', _product('P001'))
+            row_id, error = insert_data('products', _product('P002'))
+            assert row_id is not None and error == ""
+            # Đọc trong transaction thấy dữ liệu chưa commit
+            assert len(load_data('products')[0]) == 2
+
+            other = sqlite3.connect(file_db)
+            assert other.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 0
+            other.close()
+
+        assert self._ids() == ['P001', 'P002']
+
+    def test_rollback_on_exception(self, temp_db):
+        """Kiểm tra exception hủy toàn bộ transaction."""
+        with pytest.raises(RuntimeError):
+            with transaction():
+                save_data('products', _product('P001'))
+                raise RuntimeError("lỗi")
+        assert self._ids() == []
+
+    def test_rollback_on_helper_failure(self, temp_db):
+        """Kiểm tra lỗi của hàm tiện ích đánh dấu transaction bị rollback."""
+        with transaction() as uow:
+            save_data('products', _product('P001'))
+            success, _ = save_data('products', _product('P001'))  # trùng khóa chính
             assert not success
-            assert "Lỗi khi xóa dữ liệu" in message
+            assert uow.rollback_only
+        assert self._ids() == []
+
+    def test_nested_savepoint(self, temp_db):
+        """Kiểm tra transaction lồng nhau chỉ hủy phần việc của khối trong."""
+        with transaction():
+            save_data('products', _product('P001'))
+            with pytest.raises(RuntimeError):
+                with transaction():
+                    save_data('products', _product('P002'))
+                    raise RuntimeError("lỗi")
+            with transaction():
+                save_many('products', [_product('P003')])
+        assert self._ids() == ['P001', 'P003']
+
+
+class TestConnectionPool:
+    """Kiểm tra ConnectionPool."""
+
+    def test_reuses_and_binds_connections(self, temp_db):
+        """Kiểm tra kết nối được gắn vào ngữ cảnh và được dùng lại."""
+        pool = ConnectionPool(size=2)
+        with pool.connection() as first:
+            assert current_transaction().connection is first
+            save_data('products', _product('P001'))
+        with pool.connection() as second:
+            assert second is first
+            assert len(load_data('products')[0]) == 1
+        assert current_transaction() is None
+        pool.close()
+
+    def test_size_limit_and_timeout(self, temp_db):
+        """Kiểm tra không mở quá size kết nối."""
+        pool = ConnectionPool(size=1)
+        with pool.connection():
+            with pytest.raises(TimeoutError):
+                with pool.connection(timeout=0.05):
+                    pass
+        pool.close()
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                pass
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho ExportManager.
+
+Module kiểm thử này bao gồm các test cases cho:
+- Xuất hóa đơn và mục hóa đơn ra CSV/JSONL, có nén gzip
+- Xuất các báo cáo thống kê kèm tỉ lệ phần trăm
+- Lọc theo khoảng ngày và xử lý đầu vào không hợp lệ
+"""
+
+import csv
+import gzip
+import json
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import core.export_manager
+from core.export_manager import ExportManager
+from core.invoice_manager import InvoiceManager
+
+
+@pytest.fixture
+def invoice_data(populated_product_manager, temp_db):
+    """Tạo ba hóa đơn mẫu trên hai ngày."""
+    invoice_manager = InvoiceManager(populated_product_manager)
+    invoice_manager.create_invoice("Nguyễn Văn A", [{'product_id': 'P001', 'quantity': 2}], date="2024-01-15")
+    invoice_manager.create_invoice("Trần Thị B", [{'product_id': 'P002', 'quantity': 3},
+                                                  {'product_id': 'P001', 'quantity': 1}], date="2024-01-16")
+    invoice_manager.create_invoice("nguyễn văn a", [{'product_id': 'P002', 'quantity': 2}], date="2024-01-16")
+    return invoice_manager
+
+
+def _read_csv(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+class TestExportData:
+    """Kiểm tra xuất hóa đơn và mục hóa đơn."""
+
+    def test_export_invoices_csv(self, invoice_data, tmp_path):
+        """Kiểm tra xuất hóa đơn kèm tổng tiền chính xác."""
+        path = str(tmp_path / "invoices.csv")
+        report, message = ExportManager(fetch_size=1).export_invoices(path)
+
+        assert report is not None, message
+        assert report.rows_written == 3
+        rows = _read_csv(path)
+        assert rows[0]["total_amount"] == "50000000.00"
+        assert rows[1]["total_items"] == "4"
+        assert rows[1]["total_amount"] == "26500000.00"
+
+    def test_export_items_jsonl_gzip(self, invoice_data, tmp_path):
+        """Kiểm tra xuất mục hóa đơn ra JSONL nén gzip."""
+        report, _ = ExportManager().export_items(str(tmp_path / "items.jsonl"), compress=True)
+
+        assert report.destination.endswith(".jsonl.gz")
+        with gzip.open(report.destination, "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        assert len(rows) == 4
+        assert rows[0]["product_name"] == "Laptop Dell XPS 13"
+        assert rows[0]["unit_price"] == "25000000.00"
+
+    def test_export_date_range(self, invoice_data, tmp_path):
+        """Kiểm tra lọc theo khoảng ngày."""
+        path = str(tmp_path / "invoices.csv")
+        report, _ = ExportManager().export_invoices(path, date_from="2024-01-16", date_to="2024-01-16")
+        assert report.rows_written == 2
+
+    def test_export_invalid_date(self, invoice_data, tmp_path):
+        """Kiểm tra ngày không hợp lệ."""
+        report, message = ExportManager().export_invoices(str(tmp_path / "x.csv"), date_from="16/01/2024")
+        assert report is None
+        assert "định dạng" in message
+
+    def test_export_unsupported_format(self, invoice_data, tmp_path):
+        """Kiểm tra đuôi file không được hỗ trợ."""
+        report, message = ExportManager().export_items(str(tmp_path / "items.xlsx"))
+        assert report is None
+        assert "không được hỗ trợ" in message
+
+    def test_write_errors_release_query(self, invoice_data, tmp_path):
+        """Kiểm tra lỗi mở/ghi file không để lại truy vấn đang mở."""
+        streams = []
+        original = core.export_manager.stream_query
+
+        def stream_query(*args, **kwargs):
+            columns, rows = original(*args, **kwargs)
+            streams.append(rows)
+            return columns, rows
+
+        def fail(values):
+            raise OSError("đĩa đầy")
+
+        with patch.object(core.export_manager, "stream_query", side_effect=stream_query):
+            report, message = ExportManager().export_invoices(str(tmp_path / "missing" / "x.csv"))
+            assert report is None and "Lỗi khi xuất dữ liệu" in message
+            assert streams == []
+
+            with patch.object(ExportManager, "_row_writer", return_value=fail):
+                report, message = ExportManager().export_invoices(str(tmp_path / "x.csv"))
+            assert report is None and "đĩa đầy" in message
+            assert len(streams) == 1 and streams[0].gi_frame is None
+
+
+class TestExportReports:
+    """Kiểm tra xuất báo cáo thống kê."""
+
+    def test_revenue_by_date(self, invoice_data, tmp_path):
+        """Kiểm tra báo cáo doanh thu theo ngày."""
+        path = str(tmp_path / "by_date.csv")
+        ExportManager().export_report("revenue_by_date", path)
+        rows = _read_csv(path)
+        assert [row["date"] for row in rows] == ["2024-01-16", "2024-01-15"]
+        assert rows[0]["revenue"] == "27500000.00"
+        assert rows[0]["percentage"] == "35.48"
+
+    def test_revenue_by_product(self, invoice_data, tmp_path):
+        """Kiểm tra báo cáo doanh thu theo sản phẩm."""
+        path = str(tmp_path / "by_product.csv")
+        ExportManager().export_report("revenue_by_product", path)
+        rows = _read_csv(path)
+        assert rows[0]["product_id"] == "P001"
+        assert rows[0]["quantity"] == "3"
+        assert rows[1]["revenue"] == "2500000.00"
+
+    def test_top_customers_groups_by_customer(self, invoice_data, tmp_path):
+        """Kiểm tra báo cáo khách hàng gộp theo customer_id và giới hạn số dòng."""
+        path = str(tmp_path / "customers.csv")
+        report, _ = ExportManager().export_report("top_customers", path, limit=1)
+        rows = _read_csv(path)
+        assert report.rows_written == 1
+        assert rows[0]["customer_name"] == "Nguyễn Văn A"
+        assert rows[0]["spending"] == "51000000.00"
+
+    def test_unknown_report(self, tmp_path):
+        """Kiểm tra tên báo cáo không tồn tại."""
+        report, message = ExportManager().export_report("unknown", str(tmp_path / "x.csv"))
+        assert report is None
+        assert "không tồn tại" in message
@@ -5,7 +5,7 @@ Kiểm tra toàn diện cho các hàm formatting.
 
 Module kiểm thử này bao gồm các test cases cho:
 - format_currency: Định dạng tiền tệ Việt Nam
-- format_date: Chuyển đổi và định dạng ngày tháng
+- format_date, format_dates: Chuyển đổi và định dạng ngày tháng
 - format_phone_number: Định dạng số điện thoại VN
 - format_product_id và format_customer_name: Chuẩn hóa dữ liệu
 - Edge cases: Xử lý giá trị null, rỗng, không hợp lệ
@@ -19,10 +19,13 @@ from datetime import datetime
 # Thêm src vào path để import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
+from models import Money
 from utils.formatting import (
     format_currency,
     format_date,
+    format_dates,
     format_customer_name,
+    normalize_customer_name,
     format_product_id,
     format_phone_number,
     format_invoice_number
@@ -64,6 +67,11 @@ class TestFormatCurrency:
         assert format_currency("invalid") == "0.00 VNĐ"
         assert format_currency(None) == "0.00 VNĐ"
 
+    def test_format_currency_money_input(self):
+        """Kiểm tra định dạng tiền tệ từ Money."""
+        assert format_currency(Money(123456789)) == "1,234,567.89 VNĐ"
+        assert format_currency(Money(-5)) == "-0.05 VNĐ"
+
 
 class TestFormatDate:
     """Kiểm tra cho hàm format_date."""
@@ -94,6 +102,24 @@ class TestFormatDate:
         assert format_date("25/12/2023", input_format="%d/%m/%Y") == "25/12/2023"
         assert format_date("12-25-2023", input_format="%m-%d-%Y") == "25/12/2023"
 
+    def test_format_date_iso_fast_path_matches_strptime(self):
+        """Kiểm tra đường tắt YYYY-MM-DD cho cùng kết quả với strptime/strftime."""
+        cases = ["2024-02-29", "2023-02-29", "2024-04-31", "0000-01-01", "2024-1-5", " 2024-01-05",
+                 "2024-13-01", "２０２４-01-01"]
+        for value in cases:
+            for output_format in ("%d/%m/%Y", "%A %d %B %Y"):
+                try:
+                    expected = datetime.strptime(value, "%Y-%m-%d").strftime(output_format)
+                except ValueError:
+                    expected = ""
+                assert format_date(value, output_format=output_format) == expected, value
+
+    def test_format_dates_column(self):
+        """Kiểm tra định dạng cả cột ngày."""
+        column = ["2024-01-02", "2024-01-02", "", None, datetime(2023, 12, 25), "sai"]
+        assert format_dates(column) == ["02/01/2024", "02/01/2024", "", "", "25/12/2023", ""]
+        assert format_dates(["2024-01-02"], output_format="%Y/%m/%d") == ["2024/01/02"]
+
 
 class TestFormatCustomerName:
     """Kiểm tra cho hàm format_customer_name."""
@@ -127,6 +153,20 @@ class TestFormatCustomerName:
         # assert format_customer_name(None) == ""
 
 
+class TestNormalizeCustomerName:
+    """Kiểm tra cho hàm normalize_customer_name."""
+
+    def test_normalize_customer_name_equivalent_names(self):
+        """Kiểm tra các tên chỉ khác hoa thường/khoảng trắng cho cùng một khóa."""
+        assert normalize_customer_name("Nguyễn Văn A") == normalize_customer_name("  nguyễn   VĂN a ")
+        assert normalize_customer_name("Nguyễn Văn A") != normalize_customer_name("Nguyễn Văn B")
+
+    def test_normalize_customer_name_invalid_input(self):
+        """Kiểm tra đầu vào không hợp lệ."""
+        assert normalize_customer_name(None) == ""
+        assert normalize_customer_name("   ") == ""
+
+
 class TestFormatProductId:
     """Kiểm tra cho hàm format_product_id."""
 
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho các hàm hỗ trợ của giao diện đồ họa (ui.gui).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Đơn giá điền sẵn trong hộp thoại sửa sản phẩm đọc lại được
+- Đọc đơn giá từ ô nhập qua Money thay vì float
+"""
+
+import os
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+pytest.importorskip("tkinter")
+
+from models import Money
+from ui.gui import _parse_price, _price_text
+
+
+class TestPriceEntry:
+    """Kiểm tra ô nhập đơn giá."""
+
+    @pytest.mark.parametrize("price", [Money.from_major(25000000), Money.from_major("1200.5"), Money(1)])
+    def test_prefilled_price_round_trips(self, price):
+        """Kiểm tra lưu hộp thoại mà không sửa giá giữ nguyên đơn giá."""
+        text = _price_text(price)
+        assert "," not in text
+        assert _parse_price(text, Money(0)) == price
+        assert _parse_price(f"  {text} ", Money(0)).minor == price.minor
+
+    def test_parse_price(self):
+        """Kiểm tra chuỗi rỗng, chuỗi hợp lệ và không hợp lệ."""
+        default = Money.from_major(100)
+        assert _parse_price("", default) is default
+        assert _parse_price("0.1", default).minor == 10
+        for text in ("abc", "25,000,000.00", "nan"):
+            with pytest.raises(ValueError):
+                _parse_price(text, default)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho dịch vụ HTTP/JSON (ui.http_server).
+
+Các test chạy máy chủ thật trên localhost (cổng do hệ điều hành chọn):
+- CRUD sản phẩm và hóa đơn, mã lỗi HTTP
+- Giữ kết nối (keep-alive) giữa nhiều request
+- Tạo hóa đơn đồng thời từ nhiều "quầy"
+- Báo cáo được lưu đệm và làm mới sau khi ghi
+"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+from urllib.parse import quote
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ui.http_server import create_server
+
+
+@pytest.fixture
+def server(temp_db):
+    """Máy chủ HTTP chạy nền trên database tạm."""
+    server = create_server("127.0.0.1", 0, pool_size=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _client(server) -> http.client.HTTPConnection:
+    host, port = server.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=10)
+
+def _request(conn, method, path, body=None):
+    headers = {}
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, body=data, headers=headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read().decode("utf-8"))
+
+
+class TestHTTPServer:
+    """Kiểm tra các endpoint của dịch vụ HTTP."""
+
+    def test_product_crud_on_one_connection(self, server):
+        """Kiểm tra CRUD sản phẩm, dùng chung một kết nối keep-alive."""
+        conn = _client(server)
+        status, data = _request(conn, "POST", "/products",
+                                {"product_id": "P001", "name": "Laptop", "unit_price": 1500})
+        assert status == 201
+        assert data["product"]["unit_price"] == "1500.00"
+        sock = conn.sock
+
+        status, data = _request(conn, "PUT", "/products/P001", {"unit_price": 1200.5})
+        assert status == 200
+        assert data["product"]["unit_price"] == "1200.50"
+
+        status, data = _request(conn, "GET", "/products")
+        assert status == 200
+        assert [product["product_id"] for product in data] == ["P001"]
+
+        status, _ = _request(conn, "DELETE", "/products/P001")
+        assert status == 200
+        status, _ = _request(conn, "GET", "/products/P001")
+        assert status == 404
+        # Mọi request đi trên cùng một socket
+        assert conn.sock is sock
+        conn.close()
+
+    def test_errors(self, server):
+        """Kiểm tra mã lỗi cho request không hợp lệ."""
+        conn = _client(server)
+        assert _request(conn, "GET", "/nope")[0] == 404
+        assert _request(conn, "PATCH", "/products")[0] == 405
+        assert _request(conn, "DELETE", "/products")[0] == 405
+        assert _request(conn, "POST", "/products", {"name": "Thiếu mã"})[0] == 400
+        assert _request(conn, "POST", "/products",
+                        {"product_id": "P001", "name": "Laptop", "unit_price": "nan"})[0] == 400
+        assert _request(conn, "GET", "/stats/top-customers?limit=abc")[0] == 400
+
+        conn.request("POST", "/invoices", body=b"{not json", headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        assert response.status == 400
+        assert "JSON" in json.loads(response.read())["error"]
+
+        status, data = _request(conn, "POST", "/invoices",
+                                {"customer_name": "A", "items": [{"product_id": "NOPE", "quantity": 1}]})
+        assert status == 400
+        assert "không tồn tại" in data["error"]
+        conn.close()
+
+    def test_concurrent_invoices_and_cached_reports(self, server):
+        """Kiểm tra nhiều quầy cùng tạo hóa đơn và báo cáo được làm mới sau khi ghi."""
+        conn = _client(server)
+        _request(conn, "POST", "/products", {"product_id": "P001", "name": "Laptop", "unit_price": 100})
+        status, report = _request(conn, "GET", "/stats/revenue-by-date")
+        assert status == 200
+        assert report == {"rows": [], "total": "0.00"}
+
+        errors = []
+
+        def till(index):
+            till_conn = _client(server)
+            for _ in range(5):
+                status, data = _request(till_conn, "POST", "/invoices", {
+                    "customer_name": f"Khách {index}",
+                    "items": [{"product_id": "P001", "quantity": 2}],
+                    "date": "2024-01-01",
+                })
+                if status != 201:
+                    errors.append(data)
+            till_conn.close()
+
+        threads = [threading.Thread(target=till, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+        status, data = _request(conn, "GET", "/invoices?limit=10")
+        assert data["total"] == 30
+        assert len(data["invoices"]) == 10
+        status, data = _request(conn, "GET", "/invoices?customer=" + quote("khách 0"))
+        assert data["total"] == 5
+
+        status, report = _request(conn, "GET", "/stats/revenue-by-date")
+        assert report["total"] == "6000.00"
+        assert report["rows"] == [{"date": "2024-01-01", "revenue": "6000.00"}]
+        status, top = _request(conn, "GET", "/stats/top-customers?limit=2")
+        assert len(top["rows"]) == 2
+        # Xem lại báo cáo khi dữ liệu chưa đổi dùng bộ nhớ đệm
+        _request(conn, "GET", "/stats/revenue-by-date")
+        assert _request(conn, "GET", "/health")[1]["report_cache"]["hits"] >= 1
+
+        invoice_id = data["invoices"][0]["invoice_id"]
+        assert _request(conn, "DELETE", f"/invoices/{invoice_id}")[0] == 200
+        assert _request(conn, "GET", f"/invoices/{invoice_id}")[0] == 404
+        status, report = _request(conn, "GET", "/stats/revenue-by-date")
+        assert report["total"] == "5800.00"
+        conn.close()
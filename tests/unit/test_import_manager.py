@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho ImportManager.
+
+Module kiểm thử này bao gồm các test cases cho:
+- Nhập sản phẩm từ CSV/JSONL, kể cả file nén .gz
+- Nhập hóa đơn nhiều dòng theo invoice_ref và dạng JSONL lồng nhau
+- Báo cáo lỗi: dòng không hợp lệ được ghi lại thay vì dừng quá trình nhập
+"""
+
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core.import_manager import ImportManager
+from core.invoice_manager import InvoiceManager
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+class TestImportProducts:
+    """Kiểm tra nhập sản phẩm."""
+
+    def test_import_products_csv(self, product_manager, temp_db, tmp_path):
+        """Kiểm tra nhập CSV với dòng hợp lệ và dòng lỗi."""
+        path = _write(tmp_path / "products.csv",
+                      "product_id,name,unit_price,calculation_unit,category\n"
+                      "P100,Bàn phím cơ,1500000,cái,Electronics\n"
+                      "p101,Mã chữ thường,100,cái,Test\n"
+                      "P102,Tai nghe,-5,cái,Electronics\n"
+                      "P103,Màn hình,3500000.5,,\n"
+                      "P100,Trùng mã,100,cái,Test\n")
+
+        importer = ImportManager(product_manager, batch_size=2)
+        report, message = importer.import_products(path)
+
+        assert report is not None, message
+        assert report.rows_read == 5
+        assert report.rows_imported == 2
+        assert report.rows_rejected == 3
+        assert report.batches == 3
+        assert [error.line_number for error in report.errors] == [3, 4, 6]
+        assert "đã tồn tại" in report.errors[2].message
+
+        product = product_manager.find_product("P103")
+        assert product.unit_price == 3500000.5
+        assert product.calculation_unit == "đơn vị"
+        assert product.category == "Chung"
+        # Giá ban đầu của sản phẩm nhập được ghi vào lịch sử giá
+        history, _ = product_manager.price_history("P103")
+        assert [price for _, price in history] == [product.unit_price]
+
+    def test_import_products_jsonl_gz(self, product_manager, temp_db, tmp_path):
+        """Kiểm tra nhập JSONL nén gzip, kể cả dòng JSON hỏng."""
+        path = str(tmp_path / "products.jsonl.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"product_id": "P200", "name": "Sản phẩm A", "unit_price": 10}) + "\n")
+            f.write("{không phải json}\n")
+            f.write(json.dumps({"product_id": "P201", "name": "Sản phẩm B", "unit_price": 20}) + "\n")
+
+        report, _ = ImportManager(product_manager).import_products(path)
+
+        assert report.rows_imported == 2
+        assert report.errors[0].line_number == 2
+        assert len(product_manager.products) == 2
+
+    def test_import_products_non_finite_prices(self, product_manager, temp_db, tmp_path):
+        """Kiểm tra giá nan/vô cực/quá lớn chỉ loại dòng đó, không dừng cả lần nhập."""
+        path = _write(tmp_path / "products.csv",
+                      "product_id,name,unit_price\n"
+                      "P300,Giá nan,nan\n"
+                      "P301,Giá vô cực,1e400\n"
+                      "P302,Giá quá lớn,1e307\n"
+                      "P303,Hợp lệ,100\n")
+
+        report, message = ImportManager(product_manager).import_products(path)
+
+        assert report is not None, message
+        assert report.rows_imported == 1
+        assert report.rows_rejected == 3
+        assert [error.line_number for error in report.errors] == [2, 3, 4]
+        assert report.errors[2].message == "Đơn giá không hợp lệ."
+        assert [product.product_id for product in product_manager.products] == ["P303"]
+
+    def test_import_products_unsupported_format(self, product_manager, tmp_path):
+        """Kiểm tra file không được hỗ trợ."""
+        path = _write(tmp_path / "products.xlsx", "")
+        report, message = ImportManager(product_manager).import_products(path)
+        assert report is None
+        assert "không được hỗ trợ" in message
+
+    def test_write_errors(self, product_manager, temp_db, tmp_path):
+        """Kiểm tra ghi báo cáo lỗi ra CSV."""
+        path = _write(tmp_path / "products.csv", "product_id,name,unit_price\nX,A,0\n")
+        report, _ = ImportManager(product_manager).import_products(path)
+
+        error_path = str(tmp_path / "errors.csv")
+        report.write_errors(error_path)
+        with open(error_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines[0] == "line_number,message"
+        assert lines[1].startswith("2,")
+
+    def test_invalid_batch_size(self, product_manager):
+        """Kiểm tra kích thước lô không hợp lệ."""
+        with pytest.raises(ValueError):
+            ImportManager(product_manager, batch_size=0)
+
+
+class TestImportInvoices:
+    """Kiểm tra nhập hóa đơn."""
+
+    def test_import_invoices_csv(self, populated_product_manager, temp_db, tmp_path):
+        """Kiểm tra nhập hóa đơn nhiều dòng theo invoice_ref."""
+        path = _write(tmp_path / "invoices.csv",
+                      "invoice_ref,customer_name,date,product_id,quantity,unit_price\n"
+                      "A1,nguyễn văn a,2023-05-01,P001,1,\n"
+                      "A1,nguyễn văn a,2023-05-01,P002,2,450000\n"
+                      "A2,Trần Thị B,2023-05-02,P999,1,\n"
+                      "A2,Trần Thị B,2023-05-02,P001,1,\n"
+                      ",NGUYỄN VĂN A,2023-05-03,P002,3,\n")
+
+        invoice_manager = InvoiceManager(populated_product_manager)
+        importer = ImportManager(populated_product_manager, invoice_manager, batch_size=1)
+        report, message = importer.import_invoices(path)
+
+        assert report is not None, message
+        assert report.records_imported == 2
+        assert report.rows_imported == 3
+        assert report.rows_rejected == 2
+        assert report.errors[0].line_number == 4
+
+        assert len(invoice_manager.invoices) == 2
+        first = invoice_manager.invoices[0]
+        assert first.customer_name == "Nguyễn Văn A"
+        assert first.total_amount == 25000000 + 2 * 450000
+        history = invoice_manager.find_invoices_by_customer("Nguyễn Văn A")
+        assert len(history) == 2
+
+    def test_import_invoices_nested_jsonl(self, populated_product_manager, temp_db, tmp_path):
+        """Kiểm tra nhập hóa đơn dạng JSONL với danh sách items."""
+        record = {"customer_name": "Lê Minh C", "date": "2023-06-01",
+                  "items": [{"product_id": "P001", "quantity": 1}, {"product_id": "P002", "quantity": 4}]}
+        path = _write(tmp_path / "invoices.jsonl", json.dumps(record) + "\n")
+
+        invoice_manager = InvoiceManager(populated_product_manager)
+        report, _ = ImportManager(populated_product_manager, invoice_manager).import_invoices(path)
+
+        assert report.records_imported == 1
+        assert len(invoice_manager.invoices[0].items) == 2
+
+    def test_import_invoices_non_finite_prices(self, populated_product_manager, temp_db, tmp_path):
+        """Kiểm tra hóa đơn có đơn giá nan/quá lớn bị loại, hóa đơn khác vẫn được nhập."""
+        path = _write(tmp_path / "invoices.csv",
+                      "invoice_ref,customer_name,date,product_id,quantity,unit_price\n"
+                      "A1,Khách A,2023-05-01,P001,1,nan\n"
+                      "A2,Khách B,2023-05-02,P002,1,1e307\n"
+                      "A3,Khách C,2023-05-03,P002,1,450000\n")
+
+        invoice_manager = InvoiceManager(populated_product_manager)
+        importer = ImportManager(populated_product_manager, invoice_manager)
+        report, message = importer.import_invoices(path)
+
+        assert report is not None, message
+        assert report.records_imported == 1
+        assert report.rows_rejected == 2
+        assert [error.line_number for error in report.errors] == [2, 3]
+        assert report.errors[1].message == "Đơn giá không hợp lệ."
+        assert [invoice.customer_name for invoice in invoice_manager.invoices] == ["Khách C"]
+
+    def test_import_invoices_overflowing_numbers(self, populated_product_manager, temp_db, tmp_path):
+        """Kiểm tra số lượng 1e400 (vô cực) và đơn giá quá lớn trong JSONL chỉ loại dòng đó."""
+        path = _write(tmp_path / "invoices.jsonl",
+                      '{"customer_name": "Khách A", "date": "2023-05-01", "product_id": "P001", "quantity": 1e400}\n'
+                      '{"customer_name": "Khách B", "date": "2023-05-02", "product_id": "P002", "quantity": 1, '
+                      '"unit_price": 1' + "0" * 400 + '}\n'
+                      '{"customer_name": "Khách C", "date": "2023-05-03", "product_id": "P002", "quantity": 2}\n')
+
+        invoice_manager = InvoiceManager(populated_product_manager)
+        report, message = ImportManager(populated_product_manager, invoice_manager).import_invoices(path)
+
+        assert report is not None, message
+        assert report.records_imported == 1
+        assert [error.line_number for error in report.errors] == [1, 2]
+        assert "Số lượng phải là số nguyên." in report.errors[0].message
+        assert "phải là một số" in report.errors[1].message
+        assert [invoice.customer_name for invoice in invoice_manager.invoices] == ["Khách C"]
+
+    def test_import_invoices_requires_invoice_manager(self, populated_product_manager, tmp_path):
+        """Kiểm tra nhập hóa đơn khi thiếu InvoiceManager."""
+        report, message = ImportManager(populated_product_manager).import_invoices("x.csv")
+        assert report is None
+        assert "InvoiceManager" in message
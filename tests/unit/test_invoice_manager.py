@@ -25,268 +25,388 @@ class TestInvoiceManager:
 
     def test_create_invoice_valid(self, populated_product_manager, temp_db):
         """Test creating a valid invoice."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
-
-                items_data = [
-                    {'product_id': 'P001', 'quantity': 2},
-                    {'product_id': 'P002', 'quantity': 1}
-                ]
-
-                invoice, message = invoice_manager.create_invoice(
-                    customer_name="Nguyễn Văn A",
-                    items_data=items_data
-                )
-
-                assert invoice is not None
-                assert "thành công" in message
-                assert invoice.customer_name == "Nguyễn Văn A"
-                assert len(invoice.items) == 2
-                assert invoice.total_amount > 0
+        invoice_manager = InvoiceManager(populated_product_manager)
+
+        items_data = [
+            {'product_id': 'P001', 'quantity': 2},
+            {'product_id': 'P002', 'quantity': 1}
+        ]
+
+        invoice, message = invoice_manager.create_invoice(
+            customer_name="Nguyễn Văn A",
+            items_data=items_data
+        )
+
+        assert invoice is not None
+        assert "thành công" in message
+        assert invoice.customer_name == "Nguyễn Văn A"
+        assert len(invoice.items) == 2
+        assert invoice.total_amount > 0
+
+    def test_create_invoice_reads_cached_price(self, populated_product_manager, temp_db):
+        """Test that invoice items use the in-memory current price, not a product scan."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        populated_product_manager.update_product('P002', unit_price=450000)
+        with patch.object(populated_product_manager, 'find_product', side_effect=AssertionError):
+            invoice, message = invoice_manager.create_invoice(
+                "Nguyễn Văn A", [{'product_id': 'p002', 'quantity': 2}], date="2024-05-01")
+        assert invoice is not None, message
+        assert invoice.items[0].unit_price == 450000
+
+    def test_create_invoice_does_not_reload(self, populated_product_manager, temp_db):
+        """Test that a new invoice is added to memory without reloading every invoice."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        version = invoice_manager.data_version
+        with patch.object(invoice_manager, 'load_invoices', side_effect=AssertionError):
+            invoice, message = invoice_manager.create_invoice(
+                "nguyễn văn a", [{'product_id': 'P001', 'quantity': 1}], date="2024-05-01")
+        assert invoice is not None, message
+        assert invoice_manager.invoices == [invoice]
+        assert invoice_manager.data_version == version + 1
+
+        invoice_manager.load_invoices()
+        loaded = invoice_manager.find_invoice(invoice.invoice_id)
+        assert (loaded.customer_name, loaded.customer_id, loaded.total_amount) == (
+            invoice.customer_name, invoice.customer_id, invoice.total_amount)
 
     def test_create_invoice_empty_customer_name(self, populated_product_manager, temp_db):
         """Test creating invoice with empty customer name."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
 
-                items_data = [{'product_id': 'P001', 'quantity': 1}]
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
 
-                invoice, message = invoice_manager.create_invoice(
-                    customer_name="",
-                    items_data=items_data
-                )
+        invoice, message = invoice_manager.create_invoice(
+            customer_name="",
+            items_data=items_data
+        )
 
-                assert invoice is None
-                assert "bắt buộc" in message
+        assert invoice is None
+        assert "bắt buộc" in message
 
     def test_create_invoice_empty_items(self, populated_product_manager, temp_db):
         """Test creating invoice with no items."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
 
-                invoice, message = invoice_manager.create_invoice(
-                    customer_name="Nguyễn Văn A",
-                    items_data=[]
-                )
+        invoice, message = invoice_manager.create_invoice(
+            customer_name="Nguyễn Văn A",
+            items_data=[]
+        )
 
-                assert invoice is None
-                assert "ít nhất một mặt hàng" in message
+        assert invoice is None
+        assert "ít nhất một mặt hàng" in message
 
     def test_create_invoice_invalid_product(self, populated_product_manager, temp_db):
         """Test creating invoice with non-existent product."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
 
-                items_data = [{'product_id': 'NONEXISTENT', 'quantity': 1}]
+        items_data = [{'product_id': 'NONEXISTENT', 'quantity': 1}]
 
-                invoice, message = invoice_manager.create_invoice(
-                    customer_name="Nguyễn Văn A",
-                    items_data=items_data
-                )
+        invoice, message = invoice_manager.create_invoice(
+            customer_name="Nguyễn Văn A",
+            items_data=items_data
+        )
 
-                assert invoice is None
-                assert "không tồn tại" in message
+        assert invoice is None
+        assert "không tồn tại" in message
 
     def test_create_invoice_invalid_date(self, populated_product_manager, temp_db):
         """Test creating invoice with invalid date format."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
 
-                items_data = [{'product_id': 'P001', 'quantity': 1}]
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
 
-                invoice, message = invoice_manager.create_invoice(
-                    customer_name="Nguyễn Văn A",
-                    items_data=items_data,
-                    date="invalid-date"
-                )
+        invoice, message = invoice_manager.create_invoice(
+            customer_name="Nguyễn Văn A",
+            items_data=items_data,
+            date="invalid-date"
+        )
 
-                assert invoice is None
-                assert "Ngày" in message or "định dạng" in message
+        assert invoice is None
+        assert "Ngày" in message or "định dạng" in message
 
     def test_create_invoice_invalid_quantity(self, populated_product_manager, temp_db):
         """Test creating invoice with invalid quantity."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
 
-                items_data = [{'product_id': 'P001', 'quantity': -1}]
+        items_data = [{'product_id': 'P001', 'quantity': -1}]
 
-                invoice, message = invoice_manager.create_invoice(
-                    customer_name="Nguyễn Văn A",
-                    items_data=items_data
-                )
+        invoice, message = invoice_manager.create_invoice(
+            customer_name="Nguyễn Văn A",
+            items_data=items_data
+        )
 
-                assert invoice is None
-                assert "Số lượng" in message or "không hợp lệ" in message
+        assert invoice is None
+        assert "Số lượng" in message or "không hợp lệ" in message
 
     def test_load_invoices_empty_database(self, populated_product_manager, temp_db):
         """Test loading invoices from empty database."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Clear any existing invoices by creating a fresh manager
-                invoice_manager.invoices = []
-                success, message = invoice_manager.load_invoices()
+        # Clear any existing invoices by creating a fresh manager
+        invoice_manager.invoices = []
+        success, message = invoice_manager.load_invoices()
                 
-                assert success
-                assert "0 hóa đơn" in message
+        assert success
+        assert "0 hóa đơn" in message
 
     def test_load_invoices_with_error(self, populated_product_manager, temp_db):
         """Test loading invoices when database returns error."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                with patch('utils.db_utils.load_data') as mock_load:
-                    mock_load.return_value = (None, "Database error")
+        with patch('utils.db_utils.load_data') as mock_load:
+            mock_load.return_value = (None, "Database error")
                     
-                    invoice_manager = InvoiceManager(populated_product_manager)
-                    success, message = invoice_manager.load_invoices()
+            invoice_manager = InvoiceManager(populated_product_manager)
+            success, message = invoice_manager.load_invoices()
                     
-                    if "Database error" in message:
-                        assert not success
-                    else:
-                        assert success
-                        assert "Đã tải 0 hóa đơn từ database." in message
+            if "Database error" in message:
+                assert not success
+            else:
+                assert success
+                assert "Đã tải 0 hóa đơn từ database." in message
 
     # Removed test_load_invoices_item_error - mocking doesn't work properly with existing instance
 
     def test_find_invoice(self, populated_product_manager, temp_db):
         """Test finding existing and non-existing invoices."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Create a test invoice first
-                items_data = [{'product_id': 'P001', 'quantity': 1}]
-                invoice, _ = invoice_manager.create_invoice(
-                    customer_name="Test Customer",
-                    items_data=items_data
-                )
+        # Create a test invoice first
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        invoice, _ = invoice_manager.create_invoice(
+            customer_name="Test Customer",
+            items_data=items_data
+        )
                 
-                # Test finding existing invoice
-                found_invoice = invoice_manager.find_invoice(invoice.invoice_id)
-                assert found_invoice is not None
-                assert found_invoice.invoice_id == invoice.invoice_id
+        # Test finding existing invoice
+        found_invoice = invoice_manager.find_invoice(invoice.invoice_id)
+        assert found_invoice is not None
+        assert found_invoice.invoice_id == invoice.invoice_id
                 
-                # Test finding non-existing invoice
-                not_found = invoice_manager.find_invoice("99999")
-                assert not_found is None
+        # Test finding non-existing invoice
+        not_found = invoice_manager.find_invoice("99999")
+        assert not_found is None
 
     def test_delete_invoice_success(self, populated_product_manager, temp_db):
         """Test successfully deleting an invoice."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Create a test invoice first
-                items_data = [{'product_id': 'P001', 'quantity': 1}]
-                invoice, _ = invoice_manager.create_invoice(
-                    customer_name="Test Customer",
-                    items_data=items_data
-                )
+        # Create a test invoice first
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        invoice, _ = invoice_manager.create_invoice(
+            customer_name="Test Customer",
+            items_data=items_data
+        )
                 
-                # Delete the invoice
-                success, message = invoice_manager.delete_invoice(invoice.invoice_id)
+        # Delete the invoice
+        success, message = invoice_manager.delete_invoice(invoice.invoice_id)
                 
-                assert success
-                assert "thành công" in message
-                assert invoice_manager.find_invoice(invoice.invoice_id) is None
+        assert success
+        assert "thành công" in message
+        assert invoice_manager.find_invoice(invoice.invoice_id) is None
 
     def test_delete_invoice_not_found(self, populated_product_manager, temp_db):
         """Test deleting non-existent invoice."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                success, message = invoice_manager.delete_invoice("99999")
+        success, message = invoice_manager.delete_invoice("99999")
                 
-                assert not success
-                assert "Không tìm thấy" in message
+        assert not success
+        assert "Không tìm thấy" in message
 
     def test_delete_invoice_invalid_id(self, populated_product_manager, temp_db):
         """Test deleting invoice with invalid ID format."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Create a mock invoice in the list but with invalid ID for deletion
-                mock_invoice = Invoice("invalid_id", "Test", "2024-01-01", [])
-                invoice_manager.invoices.append(mock_invoice)
+        # Create a mock invoice in the list but with invalid ID for deletion
+        mock_invoice = Invoice("invalid_id", "Test", "2024-01-01", [])
+        invoice_manager.invoices.append(mock_invoice)
                 
-                success, message = invoice_manager.delete_invoice("invalid_id")
+        success, message = invoice_manager.delete_invoice("invalid_id")
                 
-                assert not success
-                assert "không hợp lệ" in message
+        assert not success
+        assert "không hợp lệ" in message
 
     # Removed test_delete_invoice_database_error and test_delete_invoice_exception 
     # These tests try to mock after manager instantiation which doesn't work correctly
 
     def test_view_invoice_detail(self, populated_product_manager, temp_db, capsys):
         """Test viewing invoice details."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Create a test invoice first
-                items_data = [{'product_id': 'P001', 'quantity': 2}]
-                invoice, _ = invoice_manager.create_invoice(
-                    customer_name="Test Customer",
-                    items_data=items_data
-                )
+        # Create a test invoice first
+        items_data = [{'product_id': 'P001', 'quantity': 2}]
+        invoice, _ = invoice_manager.create_invoice(
+            customer_name="Test Customer",
+            items_data=items_data
+        )
                 
-                # View the invoice detail
-                invoice_manager.view_invoice_detail(invoice.invoice_id)
+        # View the invoice detail
+        invoice_manager.view_invoice_detail(invoice.invoice_id)
                 
-                captured = capsys.readouterr()
-                assert "CHI TIẾT HÓA ĐƠN" in captured.out
-                assert "Test Customer" in captured.out
-                assert "P001" in captured.out
+        captured = capsys.readouterr()
+        assert "CHI TIẾT HÓA ĐƠN" in captured.out
+        assert "Test Customer" in captured.out
+        assert "P001" in captured.out
 
     def test_view_invoice_detail_not_found(self, populated_product_manager, temp_db, capsys):
         """Test viewing details of non-existent invoice."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                invoice_manager.view_invoice_detail("99999")
+        invoice_manager.view_invoice_detail("99999")
                 
-                captured = capsys.readouterr()
-                assert "Không tìm thấy" in captured.out
+        captured = capsys.readouterr()
+        assert "Không tìm thấy" in captured.out
 
     def test_list_invoices_empty(self, populated_product_manager, temp_db, capsys):
         """Test listing invoices when list is empty."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                invoice_manager.list_invoices()
+        invoice_manager.list_invoices()
                 
-                captured = capsys.readouterr()
-                assert "trống" in captured.out
+        captured = capsys.readouterr()
+        assert "trống" in captured.out
 
     def test_list_invoices_with_data(self, populated_product_manager, temp_db, capsys):
         """Test listing invoices when there are invoices."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Create a test invoice first
-                items_data = [{'product_id': 'P001', 'quantity': 1}]
-                invoice_manager.create_invoice(
-                    customer_name="Test Customer",
-                    items_data=items_data
-                )
+        # Create a test invoice first
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        invoice_manager.create_invoice(
+            customer_name="Test Customer",
+            items_data=items_data
+        )
                 
-                invoice_manager.list_invoices()
+        invoice_manager.list_invoices()
                 
-                captured = capsys.readouterr()
-                assert "MÃ HĐ" in captured.out
-                assert "Test Customer" in captured.out
-                assert "Tổng số:" in captured.out
+        captured = capsys.readouterr()
+        assert "MÃ HĐ" in captured.out
+        assert "Test Customer" in captured.out
+        assert "Tổng số:" in captured.out
 
     # Remove the problematic tests that don't match implementation behavior
+
+    def test_create_invoice_reuses_customer(self, populated_product_manager, temp_db):
+        """Test that invoices for the same normalized name share one customer_id."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        first, _ = invoice_manager.create_invoice("nguyễn văn a", items_data, date="2024-01-01")
+        second, _ = invoice_manager.create_invoice("  NGUYỄN  VĂN A ", items_data, date="2024-01-02")
+        other, _ = invoice_manager.create_invoice("Trần Thị B", items_data, date="2024-01-02")
+
+        assert first.customer_id is not None
+        assert first.customer_id == second.customer_id
+        assert other.customer_id != first.customer_id
+
+    def test_find_invoices_by_customer(self, populated_product_manager, temp_db):
+        """Test per-customer invoice history lookup."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        invoice_manager.create_invoice("Nguyễn Văn A", items_data, date="2024-01-01")
+        invoice_manager.create_invoice("Trần Thị B", items_data, date="2024-01-02")
+        invoice_manager.create_invoice("nguyễn văn a", items_data, date="2024-01-03")
+
+        history = invoice_manager.find_invoices_by_customer("NGUYỄN VĂN A")
+        assert sorted(invoice.date for invoice in history) == ["2024-01-01", "2024-01-03"]
+        assert invoice_manager.find_invoices_by_customer("Không Tồn Tại") == []
+
+    def test_find_invoices_by_customer_tracks_changes(self, populated_product_manager, temp_db):
+        """Test customer history follows create, delete and reload without scanning all invoices."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        first, _ = invoice_manager.create_invoice("Nguyễn Văn A", items_data, date="2024-01-01")
+        second, _ = invoice_manager.create_invoice("Nguyễn Văn A", items_data, date="2024-01-02")
+
+        assert invoice_manager.delete_invoice(first.invoice_id)[0] is True
+        assert [inv.invoice_id for inv in invoice_manager.find_invoices_by_customer("nguyễn văn a")] == [
+            second.invoice_id
+        ]
+
+        reloaded = InvoiceManager(populated_product_manager)
+        reloaded.invoices = None  # the lookup must not scan the invoice list
+        history = reloaded.find_invoices_by_customer("Nguyễn Văn A")
+        assert [inv.invoice_id for inv in history] == [second.invoice_id]
+        assert history[0].date == "2024-01-02"
+
+    def test_create_invoice_same_customer_same_date(self, populated_product_manager, temp_db):
+        """Test two invoices for one customer on one date get their own items."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+
+        first, _ = invoice_manager.create_invoice(
+            "Nguyễn Văn A", [{'product_id': 'P001', 'quantity': 1}], date="2024-01-01")
+        second, _ = invoice_manager.create_invoice(
+            "Nguyễn Văn A", [{'product_id': 'P002', 'quantity': 3}], date="2024-01-01")
+
+        assert first.invoice_id != second.invoice_id
+        assert [item.product_id for item in first.items] == ['P001']
+        assert [item.product_id for item in second.items] == ['P002']
+
+    def test_create_invoice_rolls_back_on_item_failure(self, populated_product_manager, temp_db):
+        """Test a failed item insert leaves no invoice header or new customer behind."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+
+        with patch('core.invoice_manager.save_many', return_value=(0, "Lỗi giả lập")):
+            invoice, message = invoice_manager.create_invoice(
+                "Khách Mới", [{'product_id': 'P001', 'quantity': 1}])
+
+        assert invoice is None
+        assert message == "Lỗi giả lập"
+        assert invoice_manager.invoices == []
+        assert invoice_manager.find_customer_id("Khách Mới") is None
+
+    def test_delete_invoice_rolls_back_on_header_failure(self, populated_product_manager, temp_db):
+        """Test items are kept when deleting the invoice header fails."""
+        from utils import db_utils
+
+        invoice_manager = InvoiceManager(populated_product_manager)
+        invoice, _ = invoice_manager.create_invoice("Nguyễn Văn A", [{'product_id': 'P001', 'quantity': 2}])
+
+        real_delete = db_utils.delete_data
+
+        def failing_delete(table, conditions):
+            if table == "invoices":
+                return False, "Lỗi giả lập"
+            return real_delete(table, conditions)
+
+        with patch('core.invoice_manager.delete_data', side_effect=failing_delete):
+            success, message = invoice_manager.delete_invoice(invoice.invoice_id)
+
+        assert not success
+        assert "Lỗi giả lập" in message
+        invoice_manager.load_invoices()
+        assert invoice_manager.find_invoice(invoice.invoice_id).total_items == 2
+
+    def test_load_invoices_groups_items_in_one_query(self, populated_product_manager, temp_db):
+        """Test items of all invoices are loaded with one query and grouped per invoice."""
+        from utils import db_utils
+
+        invoice_manager = InvoiceManager(populated_product_manager)
+        first, _ = invoice_manager.create_invoice("Khách A", [{'product_id': 'P001', 'quantity': 1},
+                                                             {'product_id': 'P002', 'quantity': 3}])
+        second, _ = invoice_manager.create_invoice("Khách B", [{'product_id': 'P002', 'quantity': 2}])
+
+        with patch('core.invoice_manager.stream_query', wraps=db_utils.stream_query) as query, \
+                patch('core.invoice_manager.load_data', wraps=db_utils.load_data) as load:
+            success, message = invoice_manager.load_invoices()
+
+        assert success, message
+        assert query.call_count == 1
+        assert [call.args[0] for call in load.call_args_list] == ["invoices"]
+        loaded = invoice_manager.find_invoice(first.invoice_id)
+        assert [(item.product_id, item.quantity) for item in loaded.items] == [("P001", 1), ("P002", 3)]
+        assert invoice_manager.find_invoice(second.invoice_id).total_items == 2
+
+    def test_deferred_load(self, populated_product_manager, temp_db):
+        """Test managers created with load=False start empty until loaded."""
+        InvoiceManager(populated_product_manager).create_invoice(
+            "Khách A", [{'product_id': 'P001', 'quantity': 1}])
+
+        products = ProductManager(load=False)
+        invoice_manager = InvoiceManager(products, load=False)
+        assert products.products == [] and invoice_manager.invoices == []
+
+        assert invoice_manager.load_invoices()[0]
+        assert products.load_products()[0]
+        assert len(invoice_manager.invoices) == 1
+        assert len(products.products) == 2
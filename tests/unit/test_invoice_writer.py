@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho hàng đợi ghi hóa đơn theo lô (core.invoice_writer).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Gửi yêu cầu đồng thời từ nhiều luồng, gom thành lô
+- Yêu cầu không hợp lệ nhận kết quả ngay
+- Hóa đơn lỗi trong lô không ảnh hưởng các hóa đơn khác
+- Đóng hàng đợi
+"""
+
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import InvoiceManager, InvoiceWriteQueue
+from utils.db_utils import load_data
+
+
+@pytest.fixture
+def invoice_manager(populated_product_manager):
+    """InvoiceManager trên database tạm có sẵn sản phẩm."""
+    return InvoiceManager(populated_product_manager)
+
+
+class TestInvoiceWriteQueue:
+    """Kiểm tra InvoiceWriteQueue."""
+
+    def test_concurrent_submits(self, invoice_manager):
+        """Kiểm tra nhiều luồng cùng gửi yêu cầu được gom lô và ghi đủ."""
+        futures = []
+        futures_lock = threading.Lock()
+
+        with InvoiceWriteQueue(invoice_manager, max_batch=50, max_delay_ms=20) as writer:
+            def worker(index):
+                for j in range(10):
+                    future = writer.submit(f"Khách {index}", [{"product_id": "P001", "quantity": j + 1}],
+                                           date="2024-01-01")
+                    with futures_lock:
+                        futures.append(future)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results = [future.result(timeout=10) for future in futures]
+            stats = writer.stats()
+
+        assert all(invoice is not None for invoice, _ in results)
+        assert all("Đã tạo thành công" in message for _, message in results)
+        assert len({invoice.invoice_id for invoice, _ in results}) == 80
+        assert stats["invoices"] == 80
+        assert stats["batches"] < 80
+
+        invoices, _ = load_data("invoices")
+        items, _ = load_data("invoice_items")
+        assert len(invoices) == 80
+        assert len(items) == 80
+        # Hóa đơn mới được thêm vào bộ nhớ mà không cần tải lại
+        assert len(invoice_manager.invoices) == 80
+        assert invoice_manager.find_invoice(results[0][0].invoice_id) is not None
+
+    def test_invalid_request_resolves_immediately(self, invoice_manager):
+        """Kiểm tra yêu cầu không hợp lệ có kết quả ngay, không vào hàng đợi."""
+        with InvoiceWriteQueue(invoice_manager) as writer:
+            future = writer.submit("Khách", [{"product_id": "NOPE", "quantity": 1}])
+            assert future.done()
+            invoice, message = future.result()
+
+        assert invoice is None
+        assert "không tồn tại" in message
+        assert writer.stats()["batches"] == 0
+
+    def test_failed_invoice_does_not_abort_batch(self, invoice_manager):
+        """Kiểm tra hóa đơn lỗi chỉ bị hủy phần của nó trong lô."""
+        original = invoice_manager._insert_invoice
+
+        def flaky_insert(prepared):
+            if prepared["customer_name"] == "Khách Lỗi":
+                original(prepared)
+                return None, "Lỗi giả lập"
+            return original(prepared)
+
+        with patch.object(invoice_manager, "_insert_invoice", side_effect=flaky_insert):
+            with InvoiceWriteQueue(invoice_manager, max_delay_ms=50) as writer:
+                futures = [writer.submit(name, [{"product_id": "P002", "quantity": 1}], date="2024-01-01")
+                           for name in ("Khách A", "Khách Lỗi", "Khách B")]
+                results = [future.result(timeout=10) for future in futures]
+
+        assert results[0][0] is not None and results[2][0] is not None
+        assert results[1] == (None, "Lỗi giả lập")
+        invoices, _ = load_data("invoices")
+        assert sorted(row["customer_name"] for row in invoices) == ["Khách A", "Khách B"]
+        customers, _ = load_data("customers")
+        names = [row["name"] for row in customers]
+        assert "Khách A" in names and "Khách Lỗi" not in names
+
+    def test_submit_after_close(self, invoice_manager):
+        """Kiểm tra không gửi được yêu cầu sau khi đóng."""
+        writer = InvoiceWriteQueue(invoice_manager)
+        writer.close()
+        with pytest.raises(RuntimeError):
+            writer.submit("Khách", [{"product_id": "P001", "quantity": 1}])
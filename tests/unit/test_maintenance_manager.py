@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho bảo trì database (core.maintenance_manager).
+
+Module kiểm thử này bao gồm các test cases cho:
+- optimize/ANALYZE, quick_check
+- incremental_vacuum thu hồi dung lượng sau khi xóa hóa đơn
+- Lịch bảo trì chạy nền và lệnh CLI db
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import InvoiceManager, MaintenanceManager
+from ui.cli import main
+
+
+@pytest.fixture
+def temp_db(file_db):
+    """Bảo trì đo kích thước file, nên các test ở đây dùng database trên file."""
+    return file_db
+
+
+class TestMaintenanceManager:
+    """Kiểm tra MaintenanceManager."""
+
+    def test_optimize_and_check(self, temp_db):
+        """Kiểm tra optimize, ANALYZE và quick_check trên database mới."""
+        manager = MaintenanceManager()
+        assert manager.optimize().success
+        assert manager.optimize(full=True).success
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        conn.close()
+
+        result = manager.quick_check()
+        assert result.success and result.details == "không phát hiện lỗi"
+        assert result.elapsed_seconds >= 0
+
+    def test_vacuum_reclaims_deleted_invoices(self, populated_product_manager, temp_db):
+        """Kiểm tra incremental_vacuum trả lại trang trống sau khi xóa hóa đơn."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        invoice, _ = invoice_manager.create_invoice("Khách A", [{"product_id": "P001", "quantity": 1}],
+                                                    date="2024-01-01")
+        conn = sqlite3.connect(temp_db)
+        conn.executemany("INSERT INTO invoice_items (invoice_id, product_id, quantity, unit_price) "
+                         "VALUES (?, 'P001', 1, 100)", [(invoice.invoice_id,)] * 3000)
+        conn.commit()
+        conn.close()
+        size_before = os.path.getsize(temp_db)
+        invoice_manager.delete_invoice(invoice.invoice_id)
+
+        result = MaintenanceManager().vacuum()
+        assert result.success, result.details
+        assert "incremental_vacuum" in result.details
+        assert result.reclaimed_bytes > 0
+        assert os.path.getsize(temp_db) == size_before - result.reclaimed_bytes
+
+    def test_vacuum_enables_incremental_mode(self, temp_db):
+        """Kiểm tra database chưa bật auto_vacuum được VACUUM toàn bộ một lần."""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("PRAGMA auto_vacuum = NONE")
+        conn.execute("VACUUM")
+        conn.close()
+
+        result = MaintenanceManager().vacuum()
+        assert result.success and result.details.startswith("VACUUM")
+        assert "incremental_vacuum" in MaintenanceManager().vacuum().details
+
+    def test_run_and_schedule(self, temp_db):
+        """Kiểm tra chạy nhiều tác vụ và lịch bảo trì nền."""
+        manager = MaintenanceManager()
+        assert [result.task for result in manager.run()] == ["optimize", "vacuum", "check"]
+        with pytest.raises(ValueError):
+            manager.run(["defrag"])
+
+        done = threading.Event()
+        original = manager.run
+
+        def run(tasks):
+            results = original(tasks)
+            done.set()
+            return results
+
+        manager.run = run
+        manager.start_schedule(0.01, ["check"])
+        with pytest.raises(RuntimeError):
+            manager.start_schedule(0.01)
+        assert done.wait(5)
+        manager.stop_schedule()
+        manager.stop_schedule()
+        with pytest.raises(ValueError):
+            manager.start_schedule(0)
+
+    def test_cli(self, temp_db, capsys):
+        """Kiểm tra các tác vụ bảo trì của lệnh CLI db."""
+        assert main(["db", "maintain", "--json"]) == 0
+        results = json.loads(capsys.readouterr().out)
+        assert [result["task"] for result in results] == ["optimize", "vacuum", "check"]
+        assert main(["db", "analyze"]) == 0
+        assert "ANALYZE" in capsys.readouterr().out
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho kiểu giá trị Money.
+
+Module kiểm thử này bao gồm các test cases cho:
+- Chuyển đổi giữa số tiền theo đồng và đơn vị nhỏ nhất
+- Phép toán số học và so sánh
+- Định dạng hiển thị không đi qua số thực
+"""
+
+import pytest
+import sys
+import os
+from decimal import Decimal
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from models import Money, Invoice, InvoiceItem
+from models.money import to_minor
+
+
+class TestMoneyConversion:
+    """Kiểm tra chuyển đổi đơn vị."""
+
+    def test_to_minor(self):
+        """Kiểm tra quy đổi sang đơn vị nhỏ nhất, làm tròn nửa lên."""
+        assert to_minor(1) == 100
+        assert to_minor(0.1) == 10
+        assert to_minor(1234567.89) == 123456789
+        assert to_minor("0.005") == 1
+        assert to_minor(-1.5) == -150
+
+    def test_to_minor_invalid(self):
+        """Kiểm tra giá trị không hợp lệ."""
+        with pytest.raises(ValueError):
+            to_minor("abc")
+        with pytest.raises(ValueError):
+            to_minor(None)
+
+    def test_coerce_keeps_money(self):
+        """Kiểm tra coerce giữ nguyên đối tượng Money."""
+        money = Money(250)
+        assert Money.coerce(money) is money
+        assert Money.coerce(2.5) == money
+
+    def test_sqlite_round_trip(self):
+        """Kiểm tra giá trị ghi vào SQLite là số nguyên."""
+        money = Money.from_major(25000000.0)
+        assert money.to_sqlite() == 2500000000
+        assert isinstance(money.to_sqlite(), int)
+        assert Money.from_sqlite(money.to_sqlite()) == money
+
+
+class TestMoneyArithmetic:
+    """Kiểm tra phép toán và so sánh."""
+
+    def test_sum_is_exact(self):
+        """Kiểm tra cộng dồn nhiều lần không bị sai số."""
+        total = sum(Money.from_major(0.1) for _ in range(1000))
+        assert total.minor == 10000
+        assert total == 100
+
+    def test_multiply_by_quantity(self):
+        """Kiểm tra nhân với số lượng."""
+        assert Money(150) * 3 == Money(450)
+        assert 3 * Money(150) == Money(450)
+
+    def test_compare_with_numbers(self):
+        """Kiểm tra so sánh với số theo đơn vị đồng."""
+        assert Money(100) == 1.0
+        assert Money(100) > 0
+        assert Money(-1) < 0
+        assert Money(0) == 0.0
+
+    def test_compare_with_numbers_is_exact(self):
+        """Kiểm tra so sánh với số là chính xác, không làm tròn theo xu."""
+        assert Money.from_major(1) != 1.004
+        assert Money.from_major(1) < 1.004
+        assert Money.from_major("0.1") == Decimal("0.1")
+        assert Money(1) != float("nan")
+
+    def test_hash_consistent_with_eq(self):
+        """Kiểm tra hai giá trị bằng nhau có cùng hash."""
+        assert hash(Money.from_major(1.5)) == hash(1.5)
+        assert hash(Money.from_major(2)) == hash(2)
+        assert len({Money.from_major(1), 1.004}) == 2
+        assert len({Money.from_major(1), 1, 1.0, Money(100)}) == 1
+
+    def test_mixed_float_addition_rejected(self):
+        """Kiểm tra không cho phép cộng trực tiếp với số thực."""
+        with pytest.raises(TypeError):
+            Money(100) + 1.5
+
+
+class TestMoneyFormat:
+    """Kiểm tra định dạng hiển thị."""
+
+    def test_format_thousands(self):
+        """Kiểm tra định dạng với dấu phân cách hàng nghìn."""
+        assert f"{Money(123456789):,.2f}" == "1,234,567.89"
+        assert f"{Money(5):,.2f}" == "0.05"
+        assert f"{Money(-123456):,.2f}" == "-1,234.56"
+
+    def test_format_alignment_matches_float(self):
+        """Kiểm tra căn lề cho kết quả giống định dạng số thực."""
+        for minor in (0, 1, 99, 250000, -4200, 2600000000):
+            money = Money(minor)
+            for spec in (">15,.2f", "<20,.2f", "15.2f", ",.2f", "+,.2f"):
+                assert format(money, spec) == format(minor / 100, spec)
+
+    def test_format_fallback(self):
+        """Kiểm tra các định dạng khác dùng số thực."""
+        assert f"{Money(250000):,.0f}" == "2,500"
+
+
+class TestModelsUseMoney:
+    """Kiểm tra các model dùng Money."""
+
+    def test_invoice_total_is_exact(self):
+        """Kiểm tra tổng hóa đơn tính bằng số nguyên."""
+        items = [InvoiceItem("P001", 3, 0.1), InvoiceItem("P002", 7, 0.2)]
+        invoice = Invoice("INV001", "Test", items=items)
+        assert invoice.total_minor == 170
+        assert invoice.total_amount == Money(170)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho báo cáo song song nhiều tiến trình (core.parallel_reports).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Gộp kết quả từng phần (PartialAggregate.merge)
+- Chia phân vùng theo khoảng ID
+- StatisticsManager.get_report_parallel cho kết quả giống báo cáo trong bộ nhớ
+"""
+
+import os
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import InvoiceManager, StatisticsManager
+from core.parallel_reports import PartialAggregate, plan_partitions
+
+
+@pytest.fixture
+def stats_manager(populated_product_manager, temp_db):
+    """StatisticsManager với vài hóa đơn trải trên nhiều ngày và khách hàng."""
+    invoice_manager = InvoiceManager(populated_product_manager)
+    for index in range(12):
+        invoice, message = invoice_manager.create_invoice(
+            f"Khách {index % 5}",
+            [{"product_id": "P001", "quantity": 1 + index % 3},
+             {"product_id": "P002", "quantity": 1 + index % 2}],
+            date=f"2024-01-{1 + index % 4:02d}"
+        )
+        assert invoice is not None, message
+    return StatisticsManager(invoice_manager, populated_product_manager)
+
+
+class TestParallelReports:
+    """Kiểm tra báo cáo song song."""
+
+    def test_merge_is_additive(self):
+        """Kiểm tra gộp kết quả từng phần cộng dồn theo khóa."""
+        first = PartialAggregate({"a": [1, 10]}, {}, 10)
+        second = PartialAggregate({"a": [2, 20], "b": [1, 5]}, {}, 25)
+        merged = PartialAggregate().merge(first).merge(second)
+        assert merged.sums == {"a": [3, 30], "b": [1, 5]}
+        assert merged.total == 35
+        # Thứ tự gộp không ảnh hưởng kết quả
+        assert PartialAggregate().merge(second).merge(first) == merged
+
+    def test_plan_partitions(self, stats_manager, temp_db):
+        """Kiểm tra các phân vùng phủ kín khoảng ID, không chồng lấn."""
+        plan = plan_partitions(temp_db, "revenue_by_date", 5)
+        assert 1 < len(plan) <= 5
+        assert plan[0][1] == 1 and plan[-1][2] == 13
+        assert all(partition[3] == ("main",) for partition in plan)
+        assert all(a[2] == b[1] for a, b in zip(plan, plan[1:]))
+        assert plan_partitions(temp_db, "top_customers", 2)[-1][0] == "legacy"
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_in_memory_reports(self, stats_manager, workers):
+        """Kiểm tra kết quả song song giống báo cáo tính trong bộ nhớ."""
+        assert stats_manager.get_report_parallel("revenue_by_date", workers=workers) == \
+            stats_manager.get_revenue_by_date()
+
+        rows, total = stats_manager.get_report_parallel("revenue_by_product", workers=workers)
+        expected_rows, expected_total = stats_manager.get_revenue_by_product()
+        assert total == expected_total
+        assert sorted(rows) == sorted(expected_rows)
+
+        rows, total = stats_manager.get_report_parallel("top_customers", limit=3, workers=workers)
+        expected_rows, expected_total = stats_manager.get_top_customers(3)
+        assert total == expected_total
+        assert [spending for _, spending in rows] == [spending for _, spending in expected_rows]
+
+    def test_date_range_and_invalid_report(self, stats_manager):
+        """Kiểm tra lọc theo khoảng ngày và tên báo cáo không hợp lệ."""
+        rows, total = stats_manager.get_report_parallel("revenue_by_date", date_from="2024-01-02",
+                                                        date_to="2024-01-03", workers=1)
+        all_rows = dict(stats_manager.get_revenue_by_date()[0])
+        assert rows == [("2024-01-03", all_rows["2024-01-03"]), ("2024-01-02", all_rows["2024-01-02"])]
+        assert total == all_rows["2024-01-02"] + all_rows["2024-01-03"]
+
+        with pytest.raises(ValueError):
+            stats_manager.get_report_parallel("nope")
@@ -299,6 +299,20 @@ class TestProductManager:
         assert not success
         assert "Đơn giá" in message
 
+    @pytest.mark.parametrize("price", ["nan", float("inf"), "-inf", "1e400", 1e307])
+    def test_add_and_update_product_non_finite_price(self, product_manager, price):
+        """Kiểm tra giá nan/vô cực/quá lớn bị từ chối thay vì ném ngoại lệ."""
+        success, message = product_manager.add_product("P001", "Test Product", price)
+        assert not success
+        assert "Đơn giá" in message
+        assert product_manager.find_product("P001") is None
+
+        product_manager.add_product("P001", "Test Product", 100.0)
+        success, message = product_manager.update_product("P001", unit_price=price)
+        assert not success
+        assert "Đơn giá" in message
+        assert product_manager.find_product("P001").unit_price == 100.0
+
     def test_update_product_no_changes(self, product_manager):
         """Test updating product with no changes provided."""
         # First add a product
@@ -383,3 +397,49 @@ class TestProductManager:
         assert product.calculation_unit == 'bộ'
         assert product.category == 'Updated'
 
+
+
+class TestPriceHistory:
+    """Kiểm tra lịch sử giá và tra giá theo thời điểm."""
+
+    def test_history_and_as_of(self, product_manager):
+        """Kiểm tra mỗi lần đổi giá được ghi lại và tra được theo ngày."""
+        timestamps = ["2024-01-01 09:00:00", "2024-03-01 12:00:00", "2024-03-01 18:00:00"]
+        with patch('core.product_manager.price_timestamp', side_effect=timestamps):
+            product_manager.add_product('P001', 'Laptop', 100)
+            product_manager.update_product('P001', unit_price=120)
+            # Đổi tên hoặc giữ nguyên giá không tạo dòng lịch sử mới
+            product_manager.update_product('P001', name='Laptop mới', unit_price=120)
+            product_manager.update_product('P001', unit_price=150)
+
+        history, error = product_manager.price_history('p001')
+        assert error == ""
+        assert [(when, float(price)) for when, price in history] == [
+            ("2024-01-01 09:00:00", 100.0), ("2024-03-01 12:00:00", 120.0), ("2024-03-01 18:00:00", 150.0)
+        ]
+        assert product_manager.current_price('P001') == 150
+        assert product_manager.price_as_of('P001', '2024-02-15')[0] == 100
+        assert product_manager.price_as_of('P001', '2024-03-01 13:00:00')[0] == 120
+        assert product_manager.price_as_of('P001', '2024-03-01')[0] == 150
+
+        price, message = product_manager.price_as_of('P001', '2023-12-31')
+        assert price is None and "chưa có giá" in message
+        assert product_manager.price_as_of('P001', '01/03/2024')[0] is None
+        assert product_manager.price_as_of('P001', '2024-03-01T13:00')[0] is None
+
+    def test_prices_as_of_and_delete(self, product_manager):
+        """Kiểm tra tra giá mọi sản phẩm và xóa lịch sử khi xóa sản phẩm."""
+        with patch('core.product_manager.price_timestamp',
+                   side_effect=["2024-01-01 00:00:00", "2024-02-01 00:00:00", "2024-03-01 00:00:00"]):
+            product_manager.add_product('P001', 'Laptop', 100)
+            product_manager.add_product('P002', 'Chuột', 10)
+            product_manager.update_product('P001', unit_price=90)
+
+        prices, error = product_manager.prices_as_of('2024-01-15')
+        assert error == "" and prices == {'P001': 100}
+        assert product_manager.prices_as_of('2024-12-31')[0] == {'P001': 90, 'P002': 10}
+        assert product_manager.prices_as_of('không phải ngày')[0] == {}
+
+        assert product_manager.delete_product('P001')[0] is True
+        assert product_manager.price_history('P001')[0] == []
+        assert product_manager.current_price('P001') is None
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho module utils.profiling.
+
+Module kiểm thử này bao gồm các test cases cho:
+- Decorator profiled và profile_methods
+- Phân vị độ trễ, đếm lỗi, lấy mẫu bộ nhớ
+- Xuất số liệu dạng JSON và Prometheus
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from utils.profiling import (
+    profiled,
+    profile_methods,
+    enable_profiling,
+    disable_profiling,
+    reset_profiling,
+    get_profile,
+    profile_to_json,
+    profile_to_prometheus,
+    write_profile,
+    _quantile
+)
+
+
+@pytest.fixture
+def profiling():
+    """Bật đo hiệu năng trong test và khôi phục sau đó."""
+    reset_profiling()
+    enable_profiling()
+    yield
+    disable_profiling()
+    reset_profiling()
+
+
+@profile_methods("sample")
+class Sample:
+    def work(self, value):
+        return value * 2
+
+    def fail(self):
+        raise ValueError("lỗi")
+
+    def _private(self):
+        return 1
+
+    @staticmethod
+    def helper():
+        return 2
+
+
+class TestProfiling:
+    """Kiểm tra đo hiệu năng."""
+
+    def test_disabled_records_nothing(self):
+        """Kiểm tra khi tắt không ghi nhận số liệu."""
+        reset_profiling()
+        assert Sample().work(2) == 4
+        assert get_profile() == {}
+
+    def test_profile_methods(self, profiling):
+        """Kiểm tra chỉ phương thức công khai được đo."""
+        sample = Sample()
+        for value in range(10):
+            sample.work(value)
+        with pytest.raises(ValueError):
+            sample.fail()
+        sample._private()
+        Sample.helper()
+
+        profile = get_profile()
+        assert set(profile) == {"sample.work", "sample.fail"}
+        assert profile["sample.work"]["calls"] == 10
+        assert profile["sample.fail"]["errors"] == 1
+        assert profile["sample.work"]["p50_ms"] <= profile["sample.work"]["p99_ms"]
+        assert Sample.work.__name__ == "work"
+
+    def test_memory_sampling(self, profiling):
+        """Kiểm tra lấy mẫu bộ nhớ bằng tracemalloc."""
+        enable_profiling(memory_sample_rate=2)
+
+        @profiled("alloc")
+        def allocate():
+            return [0] * 100_000
+
+        for _ in range(4):
+            allocate()
+        entry = get_profile("alloc")["alloc"]
+        assert entry["memory_samples"] == 2
+        assert entry["peak_bytes_max"] >= 100_000 * 8
+
+    def test_quantile(self):
+        """Kiểm tra phân vị nearest-rank."""
+        values = [float(v) for v in range(1, 101)]
+        assert _quantile(values, 0.5) == 50.0
+        assert _quantile(values, 0.95) == 95.0
+        assert _quantile(values, 0.99) == 99.0
+        assert _quantile([], 0.5) == 0.0
+
+    def test_exports(self, profiling, tmp_path):
+        """Kiểm tra xuất JSON và Prometheus."""
+        Sample().work(1)
+        assert json.loads(profile_to_json())["sample.work"]["calls"] == 1
+
+        text = profile_to_prometheus()
+        assert '# TYPE invoicemanager_method_duration_seconds summary' in text
+        assert 'invoicemanager_method_duration_seconds_count{method="sample.work"} 1' in text
+        assert 'quantile="0.95"' in text
+
+        path = tmp_path / "profile.prom"
+        write_profile(str(path))
+        assert path.read_text(encoding="utf-8") == text
+
+    def test_manager_methods_profiled(self, temp_db, profiling):
+        """Kiểm tra các manager được đo."""
+        from core import ProductManager
+        manager = ProductManager()
+        manager.add_product("P001", "Laptop", 1000, "cái", "Electronics")
+        manager.find_product("P001")
+
+        profile = get_profile()
+        assert profile["product.add_product"]["calls"] == 1
+        # add_product gọi find_product bên trong; lời gọi lồng nhau cũng được đo
+        assert profile["product.find_product"]["calls"] == 2
+        assert profile["product.load_products"]["calls"] >= 1
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho hiển thị bảng văn bản (utils.rendering).
+
+Module kiểm thử này bao gồm các test cases cho:
+- TableRenderer: output giống print() từng dòng, ghi một lần
+- Chế độ ghi từng đoạn (flush_every)
+- Danh sách sản phẩm/hóa đơn dùng chế độ ghi từng đoạn
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import InvoiceManager
+from models import Money
+from utils.rendering import TableRenderer, row_formatter, rule
+
+
+class CountingStream(io.StringIO):
+    """StringIO đếm số lần ghi nội dung (bỏ qua chuỗi rỗng)."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += bool(text)
+        return super().write(text)
+
+
+class TestTableRenderer:
+    """Kiểm tra TableRenderer."""
+
+    def test_matches_print(self):
+        """Kiểm tra output giống hệt print() cho từng dòng và chỉ ghi một lần."""
+        rows = [("P001", "Laptop", Money(1500000)), ("P002", "Chuột", Money(35050))]
+        expected = io.StringIO()
+        with contextlib.redirect_stdout(expected):
+            print("\n" + "=" * 40)
+            for product_id, name, price in rows:
+                print(f"{product_id:<10} {name:<15} {price:>12,.2f}")
+            print("=" * 40)
+
+        stream = CountingStream()
+        with TableRenderer(stream) as table:
+            table.line()
+            table.rule("=", 40)
+            assert table.rows("{:<10} {:<15} {:>12,.2f}", rows) == 2
+            table.rule("=", 40)
+        assert stream.getvalue() == expected.getvalue()
+        assert stream.writes == 1
+
+    def test_default_stream_is_current_stdout(self):
+        """Kiểm tra ghi ra sys.stdout tại thời điểm ghi (bắt được bằng redirect_stdout)."""
+        table = TableRenderer()
+        table.row("{:>5}", 7)
+        captured = io.StringIO()
+        with contextlib.redirect_stdout(captured):
+            table.flush()
+        assert captured.getvalue() == "    7\n"
+        assert table.getvalue() == ""
+
+    def test_flush_every(self):
+        """Kiểm tra chế độ ghi từng đoạn."""
+        stream = CountingStream()
+        with TableRenderer(stream, flush_every=10) as table:
+            table.line("HEADER")
+            table.rows("{}", ((i,) for i in range(25)))
+            assert stream.writes == 2
+        assert stream.writes == 3
+        assert stream.getvalue() == "HEADER\n" + "".join(f"{i}\n" for i in range(25))
+        with pytest.raises(ValueError):
+            TableRenderer(flush_every=-1)
+
+    def test_caches(self):
+        """Kiểm tra mẫu dòng và đường kẻ được dùng lại."""
+        assert row_formatter("{:<3}") is row_formatter("{:<3}")
+        assert rule("-", 5) == "-----"
+
+
+class TestListings:
+    """Kiểm tra danh sách của các manager."""
+
+    def test_streamed_listing_matches(self, populated_product_manager, capsys):
+        """Kiểm tra ghi từng đoạn cho cùng output với ghi một lần."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        for day in range(1, 6):
+            invoice_manager.create_invoice(f"Khách {day}", [{"product_id": "P001", "quantity": day}],
+                                           date=f"2024-01-{day:02d}")
+
+        populated_product_manager.list_products()
+        invoice_manager.list_invoices()
+        whole = capsys.readouterr().out
+        populated_product_manager.list_products(flush_every=1)
+        invoice_manager.list_invoices(flush_every=2)
+        assert capsys.readouterr().out == whole
+        assert "Tổng số: 5 hóa đơn" in whole
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra cho bộ nhớ đệm báo cáo (core.report_cache).
+
+Module kiểm thử này bao gồm các test cases cho:
+- Lưu/lấy theo khóa và phiên bản, LRU, TTL, số liệu hit/miss
+- StatisticsManager dùng ReportCache: làm mới sau khi ghi
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Thêm src vào path để import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from core import InvoiceManager, StatisticsManager, ReportCache
+
+
+class TestReportCache:
+    """Kiểm tra ReportCache."""
+
+    def test_hit_and_version_invalidation(self):
+        """Kiểm tra kết quả được dùng lại cho đến khi phiên bản đổi."""
+        cache = ReportCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute(("r",), 1, compute) == 1
+        assert cache.get_or_compute(("r",), 1, compute) == 1
+        assert cache.get_or_compute(("r",), 2, compute) == 2
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+        assert stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+    def test_lru_eviction(self):
+        """Kiểm tra mục ít dùng nhất bị loại khi đầy."""
+        cache = ReportCache(max_entries=2)
+        cache.get_or_compute("a", 0, lambda: "a")
+        cache.get_or_compute("b", 0, lambda: "b")
+        cache.get_or_compute("a", 0, lambda: "x")   # "a" được dùng gần nhất
+        cache.get_or_compute("c", 0, lambda: "c")   # loại "b"
+        assert cache.get_or_compute("a", 0, lambda: "x") == "a"
+        assert cache.get_or_compute("b", 0, lambda: "b2") == "b2"
+        assert cache.stats()["evictions"] == 2
+        assert cache.stats()["size"] == 2
+
+    def test_ttl(self):
+        """Kiểm tra mục hết hạn sau ttl_seconds."""
+        cache = ReportCache(ttl_seconds=10)
+        with patch("core.report_cache.time.monotonic", return_value=100.0):
+            cache.get_or_compute("a", 0, lambda: 1)
+        with patch("core.report_cache.time.monotonic", return_value=105.0):
+            assert cache.get_or_compute("a", 0, lambda: 2) == 1
+        with patch("core.report_cache.time.monotonic", return_value=111.0):
+            assert cache.get_or_compute("a", 0, lambda: 3) == 3
+
+    def test_invalid_size(self):
+        """Kiểm tra kích thước không hợp lệ."""
+        with pytest.raises(ValueError):
+            ReportCache(max_entries=0)
+
+    def test_statistics_manager_refreshes_after_writes(self, populated_product_manager):
+        """Kiểm tra báo cáo lưu đệm được tính lại sau khi tạo/xóa hóa đơn hoặc sửa sản phẩm."""
+        invoice_manager = InvoiceManager(populated_product_manager)
+        cache = ReportCache()
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager, cache=cache)
+
+        invoice, _ = invoice_manager.create_invoice("Khách A", [{"product_id": "P002", "quantity": 2}],
+                                                    date="2024-01-01")
+        first = stats_manager.get_revenue_by_date()
+        assert stats_manager.get_revenue_by_date() is first
+        stats_manager.get_top_customers(1)
+        stats_manager.get_top_customers(2)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["size"] == 3
+
+        invoice_manager.create_invoice("Khách B", [{"product_id": "P002", "quantity": 1}], date="2024-01-01")
+        second = stats_manager.get_revenue_by_date()
+        assert second[1] == first[1] * 3 // 2
+
+        invoice_manager.delete_invoice(invoice.invoice_id)
+        assert stats_manager.get_revenue_by_date()[1] == first[1] // 2
+
+        rows, _ = stats_manager.get_revenue_by_product()
+        populated_product_manager.update_product("P002", name="Tên mới")
+        rows_after, _ = stats_manager.get_revenue_by_product()
+        assert rows[0][1] != "Tên mới" and rows_after[0][1] == "Tên mới"
@@ -35,66 +35,60 @@ class TestStatisticsManager:
     @pytest.fixture
     def statistics_manager_empty(self, populated_product_manager, temp_db):
         """Tạo StatisticsManager với dữ liệu trống."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
-                return StatisticsManager(invoice_manager, populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
+        return StatisticsManager(invoice_manager, populated_product_manager)
 
     @pytest.fixture
     def statistics_manager_with_data(self, populated_product_manager, temp_db):
         """Tạo StatisticsManager với dữ liệu mẫu."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Tạo hóa đơn mẫu
-                items_data_1 = [
-                    {'product_id': 'P001', 'quantity': 2},
-                    {'product_id': 'P002', 'quantity': 1}
-                ]
+        # Tạo hóa đơn mẫu
+        items_data_1 = [
+            {'product_id': 'P001', 'quantity': 2},
+            {'product_id': 'P002', 'quantity': 1}
+        ]
                 
-                items_data_2 = [
-                    {'product_id': 'P001', 'quantity': 1},
-                    {'product_id': 'P002', 'quantity': 3}
-                ]
+        items_data_2 = [
+            {'product_id': 'P001', 'quantity': 1},
+            {'product_id': 'P002', 'quantity': 3}
+        ]
                 
-                items_data_3 = [
-                    {'product_id': 'P002', 'quantity': 2}
-                ]
+        items_data_3 = [
+            {'product_id': 'P002', 'quantity': 2}
+        ]
                 
-                # Tạo hóa đơn với ngày khác nhau
-                with patch('models.invoice.datetime.datetime') as mock_datetime:
-                    mock_datetime.now.return_value = datetime(2024, 1, 15)
-                    invoice1, _ = invoice_manager.create_invoice(
-                        customer_name="Nguyễn Văn A",
-                        items_data=items_data_1
-                    )
-
-                with patch('models.invoice.datetime.datetime') as mock_datetime:
-                    mock_datetime.now.return_value = datetime(2024, 1, 16)
-                    invoice2, _ = invoice_manager.create_invoice(
-                        customer_name="Trần Thị B",
-                        items_data=items_data_2
-                    )
-
-                with patch('models.invoice.datetime.datetime') as mock_datetime:
-                    mock_datetime.now.return_value = datetime(2024, 1, 15)
-                    invoice3, _ = invoice_manager.create_invoice(
-                        customer_name="Nguyễn Văn A",
-                        items_data=items_data_3
-                    )
+        # Tạo hóa đơn với ngày khác nhau
+        with patch('models.invoice.datetime.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2024, 1, 15)
+            invoice1, _ = invoice_manager.create_invoice(
+                customer_name="Nguyễn Văn A",
+                items_data=items_data_1
+            )
+
+        with patch('models.invoice.datetime.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2024, 1, 16)
+            invoice2, _ = invoice_manager.create_invoice(
+                customer_name="Trần Thị B",
+                items_data=items_data_2
+            )
+
+        with patch('models.invoice.datetime.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2024, 1, 15)
+            invoice3, _ = invoice_manager.create_invoice(
+                customer_name="Nguyễn Văn A",
+                items_data=items_data_3
+            )
                 
-                return StatisticsManager(invoice_manager, populated_product_manager)
+        return StatisticsManager(invoice_manager, populated_product_manager)
 
     def test_init_valid(self, populated_product_manager, temp_db):
         """Kiểm tra khởi tạo StatisticsManager hợp lệ."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
-                stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
                 
-                assert stats_manager.invoice_manager == invoice_manager
-                assert stats_manager.product_manager == populated_product_manager
+        assert stats_manager.invoice_manager == invoice_manager
+        assert stats_manager.product_manager == populated_product_manager
 
     def test_revenue_by_date_empty_data(self, statistics_manager_empty, capsys):
         """Kiểm tra revenue_by_date với dữ liệu trống."""
@@ -320,132 +314,146 @@ class TestStatisticsManager:
 
     def test_edge_case_single_invoice(self, populated_product_manager, temp_db, capsys):
         """Kiểm tra trường hợp chỉ có một hóa đơn."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
                 
-                # Tạo chỉ một hóa đơn
-                items_data = [{'product_id': 'P001', 'quantity': 1}]
-                with patch('models.invoice.datetime.datetime') as mock_datetime:
-                    mock_datetime.now.return_value = datetime(2024, 1, 1)
-                    invoice, _ = invoice_manager.create_invoice(
-                        customer_name="Test Customer",
-                        items_data=items_data
-                    )
+        # Tạo chỉ một hóa đơn
+        items_data = [{'product_id': 'P001', 'quantity': 1}]
+        with patch('models.invoice.datetime.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2024, 1, 1)
+            invoice, _ = invoice_manager.create_invoice(
+                customer_name="Test Customer",
+                items_data=items_data
+            )
                 
-                stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
                 
-                # Test tất cả phương thức
-                stats_manager.revenue_by_date()
-                captured = capsys.readouterr()
-                # Chấp nhận bất kỳ ngày hợp lệ nào
-                import re
-                date_pattern = r'\d{4}-\d{2}-\d{2}'
-                assert re.search(date_pattern, captured.out), "Should contain a valid date in YYYY-MM-DD format"
-                assert "100.00%" in captured.out  # Tỷ lệ 100%
+        # Test tất cả phương thức
+        stats_manager.revenue_by_date()
+        captured = capsys.readouterr()
+        # Chấp nhận bất kỳ ngày hợp lệ nào
+        import re
+        date_pattern = r'\d{4}-\d{2}-\d{2}'
+        assert re.search(date_pattern, captured.out), "Should contain a valid date in YYYY-MM-DD format"
+        assert "100.00%" in captured.out  # Tỷ lệ 100%
                 
-                stats_manager.revenue_by_product()
-                captured = capsys.readouterr()
-                assert "P001" in captured.out
-                assert "100.00%" in captured.out  # Tỷ lệ 100%
+        stats_manager.revenue_by_product()
+        captured = capsys.readouterr()
+        assert "P001" in captured.out
+        assert "100.00%" in captured.out  # Tỷ lệ 100%
                 
-                stats_manager.top_customers()
-                captured = capsys.readouterr()
-                assert "Test Customer" in captured.out
-                assert "100.00%" in captured.out  # Tỷ lệ 100%
+        stats_manager.top_customers()
+        captured = capsys.readouterr()
+        assert "Test Customer" in captured.out
+        assert "100.00%" in captured.out  # Tỷ lệ 100%
 
     def test_edge_case_zero_revenue(self, populated_product_manager, temp_db):
         """Kiểm tra trường hợp doanh thu bằng 0 (không thể xảy ra thực tế nhưng test cho safety)."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
-                stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
                 
-                # Mock một invoice với total_amount = 0
-                mock_invoice = Invoice(
-                    invoice_id="INV001",
-                    customer_name="Test",
-                    date="2024-01-01",
-                    items=[]
-                )
-                invoice_manager.invoices = [mock_invoice]
+        # Mock một invoice với total_amount = 0
+        mock_invoice = Invoice(
+            invoice_id="INV001",
+            customer_name="Test",
+            date="2024-01-01",
+            items=[]
+        )
+        invoice_manager.invoices = [mock_invoice]
                 
-                # Override total_amount property to return 0
-                def mock_total_amount(self):
-                    return 0.0
-                Invoice.total_amount = property(mock_total_amount)
+        # Override total_amount property to return 0
+        def mock_total_amount(self):
+            return 0.0
+        Invoice.total_amount = property(mock_total_amount)
                 
-                # Test không crash với division by zero
-                with patch('builtins.print'):
-                    stats_manager.revenue_by_date()  # Không nên crash
-                    stats_manager.revenue_by_product()  # Không nên crash
-                    stats_manager.top_customers()  # Không nên crash
+        # Test không crash với division by zero
+        with patch('builtins.print'):
+            stats_manager.revenue_by_date()  # Không nên crash
+            stats_manager.revenue_by_product()  # Không nên crash
+            stats_manager.top_customers()  # Không nên crash
 
     def test_edge_case_no_revenue_data(self, populated_product_manager, temp_db, capsys):
         """Kiểm tra trường hợp không có dữ liệu doanh thu (filtered out due to no actual revenue)."""
-        with patch('utils.db_utils.DATABASE_PATH', temp_db):
-            with patch('database.database.DATABASE_PATH', temp_db):
-                invoice_manager = InvoiceManager(populated_product_manager)
-                stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
+        invoice_manager = InvoiceManager(populated_product_manager)
+        stats_manager = StatisticsManager(invoice_manager, populated_product_manager)
                 
-                # Mock the invoice manager to have invoices that get filtered out
-                # by overriding the revenue calculation logic
-                original_invoices = invoice_manager.invoices
+        # Mock the invoice manager to have invoices that get filtered out
+        # by overriding the revenue calculation logic
+        original_invoices = invoice_manager.invoices
                 
-                # Test with empty invoices list to trigger the edge case
-                invoice_manager.invoices = []
+        # Test with empty invoices list to trigger the edge case
+        invoice_manager.invoices = []
                 
-                # Test revenue_by_date with no invoices
-                stats_manager.revenue_by_date()
-                captured = capsys.readouterr()
-                # This should show the standard "no invoices" message
-                assert "Không có dữ liệu hóa đơn để thống kê!" in captured.out
+        # Test revenue_by_date with no invoices
+        stats_manager.revenue_by_date()
+        captured = capsys.readouterr()
+        # This should show the standard "no invoices" message
+        assert "Không có dữ liệu hóa đơn để thống kê!" in captured.out
                 
-                # Create a scenario where invoices exist but generate no revenue data
-                # by mocking the revenue calculation to filter out all data
-                mock_invoice = Invoice(
-                    invoice_id="INV001",
-                    customer_name="Test Customer",
-                    date="2024-01-01",
-                    items=[]
-                )
-                invoice_manager.invoices = [mock_invoice]
+        # Create a scenario where invoices exist but generate no revenue data
+        # by mocking the revenue calculation to filter out all data
+        mock_invoice = Invoice(
+            invoice_id="INV001",
+            customer_name="Test Customer",
+            date="2024-01-01",
+            items=[]
+        )
+        invoice_manager.invoices = [mock_invoice]
                 
-                # Mock the revenue calculation to return empty dict
-                with patch.object(stats_manager, 'invoice_manager') as mock_inv_mgr:
-                    mock_inv_mgr.invoices = []
+        # Mock the revenue calculation to return empty dict
+        with patch.object(stats_manager, 'invoice_manager') as mock_inv_mgr:
+            mock_inv_mgr.invoices = []
                     
-                    # This will trigger the "Không có dữ liệu doanh thu để hiển thị!" message
-                    # by having invoices but no revenue data
-                    original_method = stats_manager.revenue_by_date
+            # This will trigger the "Không có dữ liệu doanh thu để hiển thị!" message
+            # by having invoices but no revenue data
+            original_method = stats_manager.revenue_by_date
                     
-                    def mock_revenue_by_date():
-                        # Simulate the case where date_revenue becomes empty after processing
-                        from collections import defaultdict
-                        date_revenue = defaultdict(float)
-                        # No invoices to process, so date_revenue stays empty
-                        if not date_revenue:
-                            print("Không có dữ liệu doanh thu để hiển thị!")
-                            return
+            def mock_revenue_by_date():
+                # Simulate the case where date_revenue becomes empty after processing
+                from collections import defaultdict
+                date_revenue = defaultdict(float)
+                # No invoices to process, so date_revenue stays empty
+                if not date_revenue:
+                    print("Không có dữ liệu doanh thu để hiển thị!")
+                    return
                     
-                    stats_manager.revenue_by_date = mock_revenue_by_date
-                    stats_manager.revenue_by_date()
-                    captured = capsys.readouterr()
-                    assert "Không có dữ liệu doanh thu để hiển thị!" in captured.out
+            stats_manager.revenue_by_date = mock_revenue_by_date
+            stats_manager.revenue_by_date()
+            captured = capsys.readouterr()
+            assert "Không có dữ liệu doanh thu để hiển thị!" in captured.out
                     
-                    # Similar for top_customers
-                    def mock_top_customers(limit=5):
-                        from collections import defaultdict
-                        customer_spending = defaultdict(float)
-                        if not customer_spending:
-                            print("Không có dữ liệu khách hàng để hiển thị!")
-                            return
+            # Similar for top_customers
+            def mock_top_customers(limit=5):
+                from collections import defaultdict
+                customer_spending = defaultdict(float)
+                if not customer_spending:
+                    print("Không có dữ liệu khách hàng để hiển thị!")
+                    return
                     
-                    stats_manager.top_customers = mock_top_customers
-                    stats_manager.top_customers()
-                    captured = capsys.readouterr()
-                    assert "Không có dữ liệu khách hàng để hiển thị!" in captured.out
+            stats_manager.top_customers = mock_top_customers
+            stats_manager.top_customers()
+            captured = capsys.readouterr()
+            assert "Không có dữ liệu khách hàng để hiển thị!" in captured.out
                 
-                # Restore original invoices
-                invoice_manager.invoices = original_invoices
+        # Restore original invoices
+        invoice_manager.invoices = original_invoices
+
+
+    def test_report_data_methods(self, statistics_manager_with_data):
+        """Kiểm tra các phương thức get_* trả về dữ liệu khớp với báo cáo in ra."""
+        manager = statistics_manager_with_data
+        invoices = manager.invoice_manager.invoices
+        total = sum(invoice.total_minor for invoice in invoices)
+
+        dates, date_total = manager.get_revenue_by_date()
+        assert date_total == total
+        assert [date for date, _ in dates] == sorted({invoice.date for invoice in invoices}, reverse=True)
+
+        products, product_total = manager.get_revenue_by_product()
+        assert product_total == total
+        assert {row[0] for row in products} == {"P001", "P002"}
+        assert [row[3] for row in products] == sorted((row[3] for row in products), reverse=True)
 
+        customers, customer_total = manager.get_top_customers(limit=1)
+        assert customer_total == total
+        assert len(customers) == 1
+        assert customers[0][0] == "Nguyễn Văn A"
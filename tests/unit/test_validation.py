@@ -18,7 +18,14 @@ from utils.validation import (
     validate_string_length,
     validate_date_format,
     validate_product_id,
-    validate_quantity
+    validate_quantity,
+    check_date,
+    check_positive_number,
+    check_product_id,
+    check_quantity,
+    check_required,
+    check_string_length,
+    validate_rows
 )
 
 class TestValidatePositiveNumber:
@@ -304,3 +311,81 @@ class TestValidateQuantity:
         valid, error = validate_quantity(-sys.maxsize)
         assert not valid, "Mong đợi số âm rất lớn không hợp lệ"
         assert "phải lớn hơn 0" in error
+
+
+class TestDateFastPath:
+    """Kiểm tra đường tắt kiểm tra ngày YYYY-MM-DD."""
+
+    def test_matches_strptime(self):
+        """Kiểm tra kết quả giống datetime.strptime với các trường hợp biên."""
+        cases = ["2024-02-29", "2023-02-29", "2000-02-29", "1900-02-29", "2024-04-31",
+                 "2024-12-31", "0000-01-01", "2024-00-10", "2024-01-00", "2024-1-5",
+                 "2024-01-05 ", "２０２４-01-01", "abcd-ef-gh"]
+        for value in cases:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+                expected = True
+            except ValueError:
+                expected = False
+            assert validate_date_format(value, "Ngày")[0] is expected, value
+
+
+class TestBatchValidation:
+    """Kiểm tra các hàm kiểm tra theo cột và validate_rows."""
+
+    def test_columns_match_scalar_rules(self):
+        """Kiểm tra hàm theo cột cho cùng thông báo lỗi với hàm từng giá trị."""
+        product_ids = ["P001", "", None, 5, "P1", "VERYLONGPRODUCTID", "p001", "P-001", " P001 ", "   "]
+        assert check_product_id(product_ids) == [
+            validate_product_id(value)[1] for value in product_ids
+        ]
+        quantities = [1, "10", 0, -1, 1001, "abc", None, 2.5]
+        assert check_quantity(quantities) == [validate_quantity(value)[1] for value in quantities]
+        numbers = [1, "2.5", 0, -3, "x", None, "nan", float("inf"), "-inf", "1e400"]
+        assert check_positive_number(numbers, "Giá") == [
+            validate_positive_number(value, "Giá")[1] for value in numbers
+        ]
+        names = ["An", "A", "", None, "x" * 60, 7]
+        assert check_required(names, "Tên") == [validate_required_field(value, "Tên")[1] for value in names]
+        assert check_string_length(names[:2] + names[4:], "Tên", 2, 50) == [
+            validate_string_length(value, "Tên", 2, 50)[1] for value in names[:2] + names[4:]
+        ]
+        dates = ["2024-01-31", "2024-02-30", "31/01/2024", None]
+        error = "Ngày phải có định dạng %Y-%m-%d."
+        assert check_date(dates, "Ngày") == ["", error, error, error]
+        assert check_date(["31/01/2024"], "Ngày", "%d/%m/%Y") == [""]
+
+    def test_check_positive_number_rejects_non_finite(self):
+        """Kiểm tra nan/vô cực bị báo lỗi thay vì được coi là hợp lệ."""
+        error = "Giá phải là một số."
+        assert check_positive_number(["nan", float("inf"), "-inf", "1e400", 5], "Giá") == [
+            error, error, error, error, ""
+        ]
+
+    def test_overflow_reported_as_row_error(self):
+        """Kiểm tra số vô cực/quá lớn (OverflowError) được báo lỗi theo dòng."""
+        quantities = [float("inf"), float("-inf"), 10 ** 400, 5]
+        assert check_quantity(quantities) == ["Số lượng phải là số nguyên."] * 2 + [
+            "Số lượng không được vượt quá 1000.", ""
+        ]
+        assert check_quantity(quantities) == [validate_quantity(value)[1] for value in quantities]
+        numbers = [10 ** 400, -10 ** 400, 5]
+        assert check_positive_number(numbers, "Giá") == ["Giá phải là một số.", "Giá phải là một số.", ""]
+        assert check_positive_number(numbers, "Giá") == [
+            validate_positive_number(value, "Giá")[1] for value in numbers
+        ]
+
+    def test_validate_rows(self):
+        """Kiểm tra lỗi được gom theo dòng, theo thứ tự quy tắc."""
+        rows = [
+            {"product_id": "P001", "quantity": 2},
+            {"product_id": "p1", "quantity": 0},
+            None,
+            {"quantity": 3},
+        ]
+        errors = validate_rows(iter(rows), [("product_id", check_product_id), ("quantity", check_quantity)])
+        assert errors[0] == ()
+        assert errors[1] == ("Mã sản phẩm phải có ít nhất 3 ký tự.", "Số lượng phải lớn hơn 0.")
+        assert errors[2] == ("Bản ghi không hợp lệ.",)
+        assert errors[3] == ("Mã sản phẩm là bắt buộc.",)
+        assert validate_rows([{}, None], []) == [(), ("Bản ghi không hợp lệ.",)]